@@ -34,11 +34,7 @@ from core import api as core_api
 from core.sandbox import api as sandbox_api
 from core.billing.api import router as billing_router
 from core.setup import router as setup_router, webhook_router
-from core.admin.admin_api import router as admin_router
-from core.admin.billing_admin_api import router as billing_admin_router
-from core.admin.notification_admin_api import router as notification_admin_router
-from core.admin.analytics_admin_api import router as analytics_admin_router
-from core.services import transcription as transcription_api
+from core.utils.lazy_routers import LazyRouterRegistry
 import sys
 from core.triggers import api as triggers_api
 from core.services import api_keys_api
@@ -132,6 +128,20 @@ async def lifespan(app: FastAPI):
             except asyncio.CancelledError:
                 pass
         
+        try:
+            from core.notifications.novu_service import novu_service
+            await novu_service.close()
+        except Exception as e:
+            logger.error(f"Error flushing Novu notifications: {e}")
+
+        # Only loaded if the (lazily mounted) transcription router was used
+        transcription = sys.modules.get("core.services.transcription")
+        if transcription is not None:
+            try:
+                await transcription.close_client()
+            except Exception as e:
+                logger.error(f"Error closing transcription client: {e}")
+
         try:
             logger.debug("Closing Redis connection")
             await redis.close()
@@ -265,28 +275,32 @@ api_router.include_router(billing_router)
 api_router.include_router(setup_router)
 api_router.include_router(webhook_router)  # Webhooks at /api/webhooks/*
 api_router.include_router(api_keys_api.router)
-api_router.include_router(billing_admin_router)
-api_router.include_router(admin_router)
-api_router.include_router(notification_admin_router)
-api_router.include_router(analytics_admin_router)
+
+# Rarely used routers; with LAZY_ROUTER_REGISTRATION they are imported on first request
+lazy_routers = LazyRouterRegistry(api_prefix="/v1", lazy=config.LAZY_ROUTER_REGISTRATION)
+lazy_routers.register(("/admin/billing",), "core.admin.billing_admin_api")
+lazy_routers.register(("/admin",), "core.admin.admin_api")
+lazy_routers.register(("/admin/notifications",), "core.admin.notification_admin_api")
+lazy_routers.register(("/admin/analytics",), "core.admin.analytics_admin_api")
+lazy_routers.register(("",), "core.templates.presentations_api", include_prefix="/presentation-templates")
+lazy_routers.register(("/transcription",), "core.services.transcription")
+lazy_routers.register(("/google", "/presentation-tools"), "core.google.google_slides_api")
+lazy_routers.register(("/document-tools",), "core.google.google_docs_api")
+lazy_routers.register(("/referrals",), "core.referrals.api")
 
 from core.mcp_module import api as mcp_api
 from core.credentials import api as credentials_api
 from core.templates import api as template_api
-from core.templates import presentations_api
 
 api_router.include_router(mcp_api.router)
 api_router.include_router(credentials_api.router, prefix="/secure-mcp")
 api_router.include_router(template_api.router, prefix="/templates")
-api_router.include_router(presentations_api.router, prefix="/presentation-templates")
 
 # [PROPHET CUSTOM] Daytona preview proxy - routes preview URLs through our backend
 from core.routes import daytona_proxy
 daytona_proxy.initialize(db)
 api_router.include_router(daytona_proxy.router, prefix="/preview", tags=["preview"])
 
-api_router.include_router(transcription_api.router)
-
 from core.knowledge_base import api as knowledge_base_api
 api_router.include_router(knowledge_base_api.router)
 
@@ -300,14 +314,10 @@ api_router.include_router(presence_api.router)
 from core.composio_integration import api as composio_api
 api_router.include_router(composio_api.router)
 
-from core.google.google_slides_api import router as google_slides_router
-api_router.include_router(google_slides_router)
-
-from core.google.google_docs_api import router as google_docs_router
-api_router.include_router(google_docs_router)
-
-from core.referrals import router as referrals_router
-api_router.include_router(referrals_router)
+if lazy_routers.lazy:
+    lazy_routers.install(app)
+else:
+    lazy_routers.include_eager(api_router)
 
 @api_router.get("/health", summary="Health Check", operation_id="health_check", tags=["system"])
 async def health_check():
@@ -328,6 +338,18 @@ async def queue_metrics_endpoint():
         logger.error(f"Failed to get queue metrics: {e}")
         raise HTTPException(status_code=500, detail="Failed to get queue metrics")
 
+@api_router.get("/metrics/runtime-cache", summary="Runtime Cache Metrics", operation_id="runtime_cache_metrics", tags=["system"])
+async def runtime_cache_metrics_endpoint():
+    """Get hit/miss/stampede counters for the runtime cache in this API instance."""
+    from core.runtime_cache import get_runtime_cache_stats
+    return {**get_runtime_cache_stats(), "instance_id": instance_id}
+
+@api_router.get("/metrics/icon-generation", summary="Icon Generation Metrics", operation_id="icon_generation_metrics", tags=["system"])
+async def icon_generation_metrics_endpoint():
+    """Get cache hit ratio, coalescing and latency percentiles for icon generation in this API instance."""
+    from core.utils.icon_generator import get_icon_generation_stats
+    return {**get_icon_generation_stats(), "instance_id": instance_id}
+
 @api_router.get("/health-docker", summary="Docker Health Check", operation_id="health_check_docker", tags=["system"])
 async def health_check_docker():
     logger.debug("Health docker check endpoint called")
@@ -5,7 +5,6 @@ from datetime import datetime, timedelta, timezone
 from core.services.supabase import DBConnection
 from core.utils.auth_utils import verify_and_get_user_id_from_jwt, verify_admin_api_key
 from core.utils.logger import logger
-from core.sandbox.sandbox import delete_sandbox
 from core.billing.external.stripe import StripeAPIWrapper
 
 router = APIRouter(tags=["account-deletion"])
@@ -192,6 +191,26 @@ async def delete_account_sandboxes_endpoint(
         logger.error(f"Error in delete_account_sandboxes_endpoint: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to delete sandboxes: {str(e)}")
 
+@router.post("/internal/resume-sandbox-teardowns")
+async def resume_sandbox_teardowns_endpoint(
+    _: bool = Depends(verify_admin_api_key)
+):
+    """Internal endpoint to re-dispatch unfinished sandbox teardowns. Called hourly by cron. Protected by admin API key."""
+    from core.sandbox.teardown import resume_pending_teardowns
+    try:
+        db = DBConnection()
+        client = await db.client
+        
+        account_count = await resume_pending_teardowns(client)
+        
+        return {
+            "success": True,
+            "resumed_accounts": account_count
+        }
+    except Exception as e:
+        logger.error(f"Error in resume_sandbox_teardowns_endpoint: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to resume sandbox teardowns: {str(e)}")
+
 async def check_and_schedule_subscriptions(account_id: str, cancel_at: datetime, client) -> None:
     try:
         credit_account = await client.from_('credit_accounts').select(
@@ -325,39 +344,22 @@ async def cancel_account_subscriptions_immediately(account_id: str, client) -> d
         raise
 
 async def delete_account_sandboxes(account_id: str, client) -> int:
-    """Delete all Daytona sandboxes associated with an account's projects."""
-    deleted_count = 0
+    """
+    Record an account's sandboxes for teardown and start the background job that deletes them.
+    
+    Returns the number of newly recorded sandboxes. Must run before the account's projects are deleted.
+    """
+    from core.sandbox.teardown import record_account_sandbox_teardown, dispatch_account_sandbox_teardown
+    queued_count = 0
     try:
-        # Get all projects for this account that have sandboxes
-        projects_result = await client.table('projects').select('project_id, sandbox').eq('account_id', account_id).execute()
-        
-        if not projects_result.data:
-            logger.info(f"No projects found for account {account_id}")
-            return 0
-        
-        for project in projects_result.data:
-            sandbox_data = project.get('sandbox')
-            if not sandbox_data or not isinstance(sandbox_data, dict):
-                continue
-            
-            sandbox_id = sandbox_data.get('id')
-            if not sandbox_id:
-                continue
-            
-            try:
-                await delete_sandbox(sandbox_id)
-                deleted_count += 1
-                logger.info(f"Deleted sandbox {sandbox_id} for project {project['project_id']}")
-            except Exception as e:
-                # Log but don't fail - sandbox might already be deleted or not exist
-                logger.warning(f"Failed to delete sandbox {sandbox_id} for project {project['project_id']}: {str(e)}")
-        
-        logger.info(f"Deleted {deleted_count} sandboxes for account {account_id}")
-        return deleted_count
+        queued_count = await record_account_sandbox_teardown(account_id, client)
+        dispatch_account_sandbox_teardown(account_id)
+        logger.info(f"Queued teardown of {queued_count} sandboxes for account {account_id}")
+        return queued_count
     except Exception as e:
-        logger.error(f"Error deleting sandboxes for account {account_id}: {str(e)}")
+        logger.error(f"Error queueing sandbox teardown for account {account_id}: {str(e)}")
         # Don't raise - continue with account deletion even if sandbox deletion fails
-        return deleted_count
+        return queued_count
 
 @router.delete("/account/delete-immediately")
 async def delete_account_immediately(
@@ -378,7 +380,7 @@ async def delete_account_immediately(
         logger.info(f"Cancelled subscriptions before account deletion: {cancel_result}")
         
         sandbox_count = await delete_account_sandboxes(account_id, client)
-        logger.info(f"Deleted {sandbox_count} sandboxes before account deletion")
+        logger.info(f"Queued {sandbox_count} sandboxes for deletion before account deletion")
         
         result = await client.rpc('delete_user_immediately', {
             'p_account_id': account_id,
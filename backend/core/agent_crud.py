@@ -146,6 +146,9 @@ async def update_agent(
                         'current_version_id': version_id,
                         'version_count': 1
                     }).eq('agent_id', agent_id).execute()
+                    from core.runtime_cache import invalidate_agent_config_cache, set_current_agent_version
+                    await set_current_agent_version(agent_id, version_id)
+                    await invalidate_agent_config_cache(agent_id)
                     current_version_data = initial_version_data
                     logger.debug(f"Created initial version for agent {agent_id}")
                 else:
@@ -289,6 +292,8 @@ async def update_agent(
                 print(f"[DEBUG] update_agent DB UPDATE: About to update agent {agent_id} with data: {update_data}")
                 
                 update_result = await client.table('agents').update(update_data).eq("agent_id", agent_id).eq("account_id", user_id).execute()
+                from core.runtime_cache import invalidate_agent_config_cache
+                await invalidate_agent_config_cache(agent_id)
                 
                 # Debug logging after DB update
                 if config.ENV_MODE == EnvMode.STAGING:
@@ -422,6 +427,8 @@ async def delete_agent(agent_id: str, user_id: str = Depends(verify_and_get_user
             # Continue with agent deletion even if trigger cleanup fails
         
         delete_result = await client.table('agents').delete().eq('agent_id', agent_id).execute()
+        from core.runtime_cache import invalidate_agent_config_cache
+        await invalidate_agent_config_cache(agent_id)
         
         if not delete_result.data:
             logger.warning(f"No agent was deleted for agent_id: {agent_id}, user_id: {user_id}")
@@ -4,6 +4,7 @@ Unified agent loading and transformation.
 This module consolidates all agent data loading logic into one place,
 eliminating duplication across agent_crud, agent_service, and agent_runs.
 """
+import asyncio
 from typing import Dict, Any, Optional
 from dataclasses import dataclass
 from core.utils.logger import logger
@@ -195,14 +196,47 @@ class AgentLoader:
         import time
         t_start = time.time()
         
-        # Check cache first (if loading config and not skipping cache)
+        # Read through the cache; concurrent misses for the same agent share one DB load
         if load_config and not skip_cache:
-            from core.runtime_cache import get_cached_agent_config
-            cached = await get_cached_agent_config(agent_id)
-            if cached:
-                logger.debug(f"⚡ Using cached config for agent {agent_id} ({(time.time() - t_start)*1000:.1f}ms)")
-                return self._dict_to_agent_data(cached)
-        
+            from core.runtime_cache import get_or_load_agent_config
+            
+            async def load_from_db() -> Dict[str, Any]:
+                agent_data = await self._load_agent_from_db(agent_id, user_id, load_config)
+                data = agent_data.to_dict()
+                if not agent_data.config_loaded:
+                    data['config_loaded'] = False
+                return data
+            
+            def cache_if(d: Dict[str, Any]) -> bool:
+                # Suna's static config lives in memory and its MCPs are cached separately
+                return d.get('config_loaded', True) and not d.get('is_suna_default')
+            
+            data = await get_or_load_agent_config(agent_id, load_from_db, cache_if=cache_if, scope=user_id)
+            if not await self._is_current_version(agent_id, data):
+                # Built from a version that has since been replaced, e.g. written through
+                # by a list load that raced a version change; reload it from the database
+                from core.runtime_cache import invalidate_agent_config_cache
+                await invalidate_agent_config_cache(agent_id)
+                data = await get_or_load_agent_config(agent_id, load_from_db, cache_if=cache_if, scope=user_id)
+            # The cached entry is shared by every caller, so repeat the DB path's access check on it
+            if data['account_id'] != user_id and not data.get('is_public', False):
+                raise ValueError(f"Access denied to agent {agent_id}")
+            logger.debug(f"⏱️ load_agent completed in {(time.time() - t_start)*1000:.1f}ms")
+            return self._dict_to_agent_data(data)
+        
+        agent_data = await self._load_agent_from_db(agent_id, user_id, load_config)
+        logger.debug(f"⏱️ load_agent completed in {(time.time() - t_start)*1000:.1f}ms")
+        return agent_data
+    
+    async def _is_current_version(self, agent_id: str, data: Dict[str, Any]) -> bool:
+        if data.get('is_suna_default') or not data.get('current_version_id'):
+            return True
+        from core.runtime_cache import get_current_agent_version
+        current_version_id = await get_current_agent_version(agent_id)
+        return current_version_id is None or current_version_id == data['current_version_id']
+    
+    async def _load_agent_from_db(self, agent_id: str, user_id: str, load_config: bool) -> AgentData:
+        """Fetch an agent and, if requested, its current version config from the database."""
         client = await self.db.client
         
         # Fetch agent metadata
@@ -223,17 +257,7 @@ class AgentLoader:
         # Load configuration if requested
         if load_config and agent_row.get('current_version_id'):
             await self._load_agent_config(agent_data, user_id)
-            
-            # Cache the result
-            from core.runtime_cache import set_cached_agent_config
-            await set_cached_agent_config(
-                agent_id,
-                agent_data.to_dict(),
-                version_id=agent_row.get('current_version_id'),
-                is_suna_default=agent_data.is_suna_default
-            )
         
-        logger.debug(f"⏱️ load_agent completed in {(time.time() - t_start)*1000:.1f}ms")
         return agent_data
     
     async def load_agents_list(
@@ -361,7 +385,7 @@ class AgentLoader:
             version_created_by=current_version.get('created_by'),
             is_suna_default=data.get('is_suna_default', False),
             centrally_managed=data.get('centrally_managed', False),
-            config_loaded=True,  # Cached data always has config
+            config_loaded=data.get('config_loaded', True),
             restrictions=data.get('restrictions', {})
         )
     
@@ -440,21 +464,11 @@ class AgentLoader:
         agent.centrally_managed = static_config['centrally_managed']
         agent.restrictions = static_config['restrictions']
         
-        # 2. Load user-specific MCPs (check cache first)
+        # 2. Load user-specific MCPs (cache first; concurrent misses share one DB load)
         if agent.current_version_id and user_id:
-            from core.runtime_cache import get_cached_user_mcps, set_cached_user_mcps
-            
-            # Try cache first
-            cached_mcps = await get_cached_user_mcps(agent.agent_id)
-            if cached_mcps:
-                agent.configured_mcps = cached_mcps.get('configured_mcps', [])
-                agent.custom_mcps = cached_mcps.get('custom_mcps', [])
-                agent.triggers = cached_mcps.get('triggers', [])
-                logger.debug(f"⚡ Suna config loaded in {(time.time() - t_start)*1000:.1f}ms (MCPs from cache)")
-                return
+            from core.runtime_cache import get_or_load_user_mcps
             
-            # Cache miss - fetch from DB
-            try:
+            async def load_mcps_from_db() -> Dict[str, Any]:
                 from core.versioning.version_service import get_version_service
                 version_service = await get_version_service()
                 
@@ -469,23 +483,23 @@ class AgentLoader:
                 if 'config' in version_dict and version_dict['config']:
                     config = version_dict['config']
                     tools = config.get('tools', {})
-                    agent.configured_mcps = tools.get('mcp', [])
-                    agent.custom_mcps = tools.get('custom_mcp', [])
-                    agent.triggers = config.get('triggers', [])
-                else:
-                    agent.configured_mcps = version_dict.get('configured_mcps', [])
-                    agent.custom_mcps = version_dict.get('custom_mcps', [])
-                    agent.triggers = []
-                
-                # Cache for next time
-                await set_cached_user_mcps(
-                    agent.agent_id,
-                    agent.configured_mcps,
-                    agent.custom_mcps,
-                    agent.triggers
-                )
-                
-                logger.debug(f"Suna config loaded in {(time.time() - t_start)*1000:.1f}ms (MCPs from DB, now cached)")
+                    return {
+                        'configured_mcps': tools.get('mcp', []),
+                        'custom_mcps': tools.get('custom_mcp', []),
+                        'triggers': config.get('triggers', [])
+                    }
+                return {
+                    'configured_mcps': version_dict.get('configured_mcps', []),
+                    'custom_mcps': version_dict.get('custom_mcps', []),
+                    'triggers': []
+                }
+            
+            try:
+                mcps = await get_or_load_user_mcps(agent.agent_id, load_mcps_from_db)
+                agent.configured_mcps = mcps.get('configured_mcps', [])
+                agent.custom_mcps = mcps.get('custom_mcps', [])
+                agent.triggers = mcps.get('triggers', [])
+                logger.debug(f"⚡ Suna config loaded in {(time.time() - t_start)*1000:.1f}ms")
             except Exception as e:
                 logger.warning(f"Failed to load MCPs for Suna agent {agent.agent_id}: {e}")
                 agent.configured_mcps = []
@@ -567,58 +581,68 @@ class AgentLoader:
         agent.version_name = 'v1'
         agent.restrictions = {}
     
-    async def _batch_load_configs(self, agents: list[AgentData]):
-        """Batch load configurations for multiple agents."""
+    async def batch_load_version_rows(self, agents: list[AgentData]) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch current version rows for custom agents, one batch per owner.
+        
+        Args:
+            agents: Agents to fetch versions for (Suna agents are skipped)
+            
+        Returns:
+            Raw agent_versions rows keyed by agent_id
+        """
+        by_owner: Dict[str, Dict[str, str]] = {}
+        for agent in agents:
+            if agent.current_version_id and not agent.is_suna_default:
+                by_owner.setdefault(agent.account_id, {})[agent.agent_id] = agent.current_version_id
         
-        # Get all version IDs for non-Suna agents
-        version_ids = [a.current_version_id for a in agents if a.current_version_id and not a.is_suna_default]
+        if not by_owner:
+            return {}
         
-        if not version_ids:
-            # Only Suna agents, load their configs
-            for agent in agents:
-                if agent.is_suna_default:
-                    await self._load_suna_config(agent, agent.account_id)
-                    agent.config_loaded = True
-            return
+        from core.versioning.version_service import get_version_service
+        version_service = await get_version_service()
+        
+        results = await asyncio.gather(
+            *(version_service.get_version_rows_batch(version_ids, owner_id) for owner_id, version_ids in by_owner.items()),
+            return_exceptions=True
+        )
         
+        version_rows = {}
+        for owner_id, result in zip(by_owner, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Failed to batch load versions for account {owner_id}: {result}")
+                continue
+            version_rows.update(result)
+        return version_rows
+    
+    async def cache_loaded_configs(self, agents: list[AgentData]) -> None:
+        """Write loaded custom agent configs through to the runtime cache used by load_agent."""
+        from core.runtime_cache import set_cached_agent_configs
+        
+        await set_cached_agent_configs({
+            agent.agent_id: agent.to_dict()
+            for agent in agents
+            if agent.config_loaded and not agent.is_suna_default
+        })
+    
+    async def _batch_load_configs(self, agents: list[AgentData]):
+        """Batch load configurations for multiple agents."""
         try:
-            # Use versioning service instead of direct config access
-            from core.versioning.version_service import get_version_service
-            version_service = await get_version_service()
-            
-            # Create version map using versioning service
-            version_map = {}
-            for agent in agents:
-                if agent.current_version_id and not agent.is_suna_default:
-                    try:
-                        version = await version_service.get_version(
-                            agent_id=agent.agent_id,
-                            version_id=agent.current_version_id,
-                            user_id=agent.account_id
-                        )
-                        if version:
-                            version_map[agent.agent_id] = version.to_dict()
-                    except Exception as e:
-                        logger.warning(f"Failed to load version {agent.current_version_id} for agent {agent.agent_id}: {e}")
-                        continue
-            
-            # Apply configs
-            for agent in agents:
-                if agent.is_suna_default:
-                    await self._load_suna_config(agent, agent.account_id)
-                    agent.config_loaded = True
-                elif agent.agent_id in version_map:
-                    self._apply_version_config(agent, version_map[agent.agent_id])
-                    agent.config_loaded = True
-                # else: leave config_loaded = False
-                
+            version_rows = await self.batch_load_version_rows(agents)
         except Exception as e:
             logger.warning(f"Failed to batch load agent configs: {e}")
-            # Fallback: load Suna configs only
-            for agent in agents:
-                if agent.is_suna_default:
-                    await self._load_suna_config(agent, agent.account_id)
-                    agent.config_loaded = True
+            version_rows = {}
+        
+        for agent in agents:
+            if agent.is_suna_default:
+                await self._load_suna_config(agent, agent.account_id)
+                agent.config_loaded = True
+            elif agent.agent_id in version_rows:
+                self._apply_version_config(agent, version_rows[agent.agent_id])
+                agent.config_loaded = True
+            # else: leave config_loaded = False
+        
+        await self.cache_loaded_configs(agents)
     
     def _apply_version_config(self, agent: AgentData, version_row: Dict[str, Any]):
         """Apply version configuration to agent."""
@@ -635,6 +659,9 @@ class AgentLoader:
         agent.triggers = config.get('triggers', [])
         agent.version_name = version_row.get('version_name', 'v1')
         agent.version_number = version_row.get('version_number')
+        agent.version_created_at = version_row.get('created_at')
+        agent.version_updated_at = version_row.get('updated_at')
+        agent.version_created_by = version_row.get('created_by')
         agent.restrictions = {}
 
 
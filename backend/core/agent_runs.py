@@ -14,7 +14,7 @@ from core.utils.config import config, EnvMode
 from core.services import redis
 from core.sandbox.sandbox import create_sandbox, delete_sandbox, get_or_start_sandbox
 from core.utils.sandbox_utils import generate_unique_filename, get_uploads_directory
-from run_agent_background import run_agent_background
+from run_agent_background import run_agent_background, schedule_agent_run
 import dramatiq
 
 from core.ai_models import model_manager
@@ -399,17 +399,22 @@ async def _trigger_agent_background(
 
     logger.info(f"🚀 Sending agent run {agent_run_id} to Dramatiq queue (thread: {thread_id}, model: {effective_model})")
     
+    run_kwargs = dict(
+        agent_run_id=agent_run_id,
+        thread_id=thread_id,
+        instance_id=utils.instance_id,
+        project_id=project_id,
+        model_name=effective_model,
+        agent_id=agent_id,  # Pass agent_id instead of full agent_config
+        account_id=account_id,  # Pass account_id for worker authorization
+        request_id=request_id,
+    )
+    
     try:
-        message = run_agent_background.send(
-            agent_run_id=agent_run_id,
-            thread_id=thread_id,
-            instance_id=utils.instance_id,
-            project_id=project_id,
-            model_name=effective_model,
-            agent_id=agent_id,  # Pass agent_id instead of full agent_config
-            account_id=account_id,  # Pass account_id for worker authorization
-            request_id=request_id,
-        )
+        if config.AGENT_RUN_FAIR_SCHEDULING:
+            message = await schedule_agent_run(**run_kwargs)
+        else:
+            message = run_agent_background.send(**run_kwargs)
         message_id = message.message_id if hasattr(message, 'message_id') else 'N/A'
         logger.info(f"✅ Successfully enqueued agent run {agent_run_id} to Dramatiq (message_id: {message_id})")
     except Exception as e:
@@ -729,9 +734,10 @@ async def start_agent_run(
         
         structlog.contextvars.bind_contextvars(thread_id=thread_id, project_id=project_id, account_id=account_id)
         
-        # Update thread count cache
+        # Drop the cached sidebar page before returning; the counter update can run in the background
         try:
-            from core.runtime_cache import increment_thread_count_cache
+            from core.runtime_cache import increment_thread_count_cache, invalidate_thread_list_cache
+            await invalidate_thread_list_cache(account_id)
             asyncio.create_task(increment_thread_count_cache(account_id))
         except Exception:
             pass
@@ -224,36 +224,13 @@ class AgentService:
         )
 
     async def _load_agent_versions_batch(self, agents: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
-        version_map = {}
-        version_ids = list({agent['current_version_id'] for agent in agents if agent.get('current_version_id')})
-        
-        if version_ids:
-            try:
-                # Use versioning service instead of direct config access
-                from core.versioning.version_service import get_version_service
-                version_service = await get_version_service()
-                
-                version_map = {}
-                for agent in agents:
-                    version_id = agent.get('current_version_id')
-                    if version_id:
-                        try:
-                            # Get version data using versioning service
-                            version = await version_service.get_version(
-                                agent_id=agent['agent_id'],
-                                version_id=version_id,
-                                user_id=agent['account_id']  # Use account_id as user_id
-                            )
-                            if version:
-                                version_dict = version.to_dict()
-                                version_map[agent['agent_id']] = version_dict
-                        except Exception as e:
-                            logger.warning(f"Failed to load version {version_id} for agent {agent['agent_id']}: {e}")
-                            continue
-                        
-            except Exception as e:
-                logger.warning(f"Failed to batch load agent versions: {e}")
-                version_map = {}
+        try:
+            return await self.loader.batch_load_version_rows(
+                [self.loader._row_to_agent_data(agent) for agent in agents]
+            )
+        except Exception as e:
+            logger.warning(f"Failed to batch load agent versions: {e}")
+            return {}
 
     async def _passes_complex_filters(
         self, 
@@ -364,9 +341,10 @@ class AgentService:
                 await self.loader._load_suna_config(agent, agent.account_id)
                 agent.config_loaded = True
             
-            agent_datas.append(agent.to_dict())
+            agent_datas.append(agent)
         
-        return agent_datas
+        await self.loader.cache_loaded_configs(agent_datas)
+        return [agent.to_dict() for agent in agent_datas]
 
     async def _transform_agent_data(
         self, 
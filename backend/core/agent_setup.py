@@ -242,6 +242,8 @@ async def setup_agent_from_chat(
         await client.table('agents').update({
             "current_version_id": version.version_id
         }).eq("agent_id", agent_id).execute()
+        from core.runtime_cache import invalidate_agent_config_cache
+        await invalidate_agent_config_cache(agent_id)
         
         # Invalidate cache
         from core.utils.cache import Cache
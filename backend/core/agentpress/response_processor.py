@@ -9,6 +9,7 @@ This module handles the processing of LLM responses, including:
 """
 
 import json
+import logging
 import uuid
 import asyncio
 from pathlib import Path
@@ -18,7 +19,7 @@ from typing import List, Dict, Any, Optional, AsyncGenerator, Tuple, Union, Call
 if TYPE_CHECKING:
     from core.jit.config import JITConfig
 from dataclasses import dataclass
-from core.utils.logger import logger
+from core.utils.logger import get_module_logger, log_enabled
 from core.utils.config import config as global_config
 from core.agentpress.tool import ToolResult
 from core.agentpress.tool_registry import ToolRegistry
@@ -35,6 +36,8 @@ from core.agentpress.native_tool_parser import (
     convert_buffer_to_metadata_tool_calls
 )
 from core.agentpress.error_processor import ErrorProcessor
+from core.agentpress.tool_scheduler import ToolCallScheduler
+from core.agentpress.stream_buffers import TextAccumulator, XmlScanWindow
 from langfuse.client import StatefulTraceClient
 from core.services.langfuse import langfuse
 from core.utils.json_helpers import (
@@ -45,9 +48,12 @@ from core.agentpress.xml_tool_parser import strip_xml_tool_calls
 
 # Note: Debug stream saving is controlled by global_config.DEBUG_SAVE_LLM_IO
 
+# Tagged so LOG_SAMPLE_RATES can sample this module's per-chunk DEBUG/INFO events
+logger = get_module_logger(__name__)
+
 
 # Type alias for tool execution strategy
-ToolExecutionStrategy = Literal["sequential", "parallel"]
+ToolExecutionStrategy = Literal["sequential", "parallel", "scheduled"]
 
 @dataclass
 class ToolExecutionContext:
@@ -72,7 +78,8 @@ class ProcessorConfig:
         native_tool_calling: Enable OpenAI-style function calling format
         execute_tools: Whether to automatically execute detected tool calls
         execute_on_stream: For streaming, execute tools as they appear vs. at the end
-        tool_execution_strategy: How to execute multiple tools ("sequential" or "parallel")
+        tool_execution_strategy: How to execute multiple tools ("sequential", "parallel" or
+            "scheduled", which runs non-conflicting tools concurrently)
         
     NOTE: Default values are loaded from core.utils.config (backend/core/utils/config.py)
     Change AGENT_XML_TOOL_CALLING, AGENT_NATIVE_TOOL_CALLING, etc. in config.py
@@ -458,11 +465,19 @@ class ResponseProcessor:
         continuous_state = continuous_state or {}
         # Don't carry over accumulated_content when auto-continuing after tool_calls
         # Each assistant message should be separate
+        # Content is collected in a list-backed buffer and joined once the stream ends
+        content_buffer = TextAccumulator()
         accumulated_content = ""
         tool_calls_buffer = {}
-        current_xml_content = ""
+        # Holds only text that can still become part of a <function_calls> block
+        xml_scan_window = XmlScanWindow()
         xml_chunks_buffer = []
         pending_tool_executions = []
+        # Orders streamed tool executions that touch the same sandbox resources
+        stream_tool_scheduler = (
+            ToolCallScheduler(self._execute_tool, self.trace)
+            if config.tool_execution_strategy == "scheduled" else None
+        )
         yielded_tool_indices = set() # Stores indices of tools whose *status* has been yielded
         executed_native_tool_indices = set() # Track which native tool call indices have been executed
         tool_index = 0
@@ -475,7 +490,6 @@ class ResponseProcessor:
         agent_should_terminate = False # Flag to track if a terminating tool has been executed
         complete_native_tool_calls = [] # Initialize early for use in assistant_response_end
         xml_tool_calls_with_ids = [] # Track XML tool calls with their IDs for metadata storage
-        content_chunk_buffer = {} # Buffer to reorder content chunks: sequence -> chunk_data
         next_expected_sequence = 0 # Track the next expected sequence number for ordering
 
         # Store the complete LiteLLM response object as received
@@ -545,7 +559,11 @@ class ResponseProcessor:
             # Setup debug file saving for raw stream output (if enabled)
             debug_file = None
             debug_file_json = None
-            raw_chunks_data = []  # Store all chunk data for JSONL export
+            # Chunk data goes straight to the JSONL file; only the counts are kept
+            chunks_with_content = 0
+            chunks_with_reasoning = 0
+            chunks_with_usage = 0
+            chunks_with_finish_reason = 0
             
             if global_config.DEBUG_SAVE_LLM_IO:
                 debug_dir = Path("debug_streams")
@@ -580,7 +598,7 @@ class ResponseProcessor:
                 
                 # Log info about chunks periodically for debugging
                 if chunk_count == 1 or (chunk_count % 1000 == 0) or hasattr(chunk, 'usage'):
-                    logger.debug(f"Processing chunk #{chunk_count}, type={type(chunk).__name__}")
+                    logger.debug("Processing chunk #%d, type=%s", chunk_count, type(chunk).__name__)
                 
                 # Save raw chunk data for debugging (if enabled)
                 if global_config.DEBUG_SAVE_LLM_IO:
@@ -620,7 +638,10 @@ class ResponseProcessor:
                                 "cache_creation_tokens": getattr(chunk.usage, 'cache_creation_input_tokens', None),
                             }
                         
-                        raw_chunks_data.append(chunk_data)
+                        chunks_with_content += chunk_data["has_content"]
+                        chunks_with_reasoning += chunk_data["has_reasoning"]
+                        chunks_with_usage += chunk_data["has_usage"]
+                        chunks_with_finish_reason += bool(chunk_data["finish_reason"])
                         
                         # Write to JSONL file incrementally
                         with open(debug_file_json, 'a', encoding='utf-8') as f:
@@ -640,9 +661,10 @@ class ResponseProcessor:
                     finish_reason = chunk.choices[0].finish_reason
                     if finish_reason == "stop":
                         # Check if stop token appeared in content
-                        if "|||STOP_AGENT|||" in accumulated_content:
+                        content_so_far = content_buffer.getvalue()
+                        if "|||STOP_AGENT|||" in content_so_far:
                             logger.info(f"🛑 Stop sequence triggered - |||STOP_AGENT||| detected in content")
-                        elif "<function_calls>" in accumulated_content:
+                        elif "<function_calls>" in content_so_far:
                             logger.info(f"🛑 Stop sequence triggered after function call")
                         else:
                             logger.debug(f"Natural completion at chunk #{chunk_count}")
@@ -666,16 +688,14 @@ class ResponseProcessor:
                         # logger.debug(f"Processing reasoning_content: type={type(reasoning_content)}, value={reasoning_content}")
                         if isinstance(reasoning_content, list):
                             reasoning_content = ''.join(str(item) for item in reasoning_content)
-                        # logger.debug(f"About to concatenate reasoning_content (type={type(reasoning_content)}) to accumulated_content (type={type(accumulated_content)})")
-                        accumulated_content += reasoning_content
+                        content_buffer.append(reasoning_content)
 
                     # Process content chunk - HOT PATH, optimized for minimum latency
                     if delta and hasattr(delta, 'content') and delta.content:
                         chunk_content = delta.content
                         if isinstance(chunk_content, list):
                             chunk_content = ''.join(str(item) for item in chunk_content)
-                        accumulated_content += chunk_content
-                        current_xml_content += chunk_content
+                        content_buffer.append(chunk_content)
 
                         # Yield content chunk IMMEDIATELY - no datetime call, use pre-built metadata
                         # This is the hot path - every microsecond counts!
@@ -692,9 +712,8 @@ class ResponseProcessor:
 
                         # --- Process XML Tool Calls (if enabled) ---
                         if config.xml_tool_calling:
-                            xml_chunks = extract_xml_chunks(current_xml_content)
+                            xml_chunks = xml_scan_window.feed(chunk_content)
                             for xml_chunk in xml_chunks:
-                                current_xml_content = current_xml_content.replace(xml_chunk, "", 1)
                                 xml_chunks_buffer.append(xml_chunk)
                                 # Parse ALL tool calls from this chunk (can be multiple <invoke> tags)
                                 current_assistant_id = last_assistant_message_object['message_id'] if last_assistant_message_object else None
@@ -727,7 +746,10 @@ class ResponseProcessor:
                                         if started_msg_obj: yield format_for_yield(started_msg_obj)
                                         yielded_tool_indices.add(tool_index) # Mark status as yielded
 
-                                        execution_task = asyncio.create_task(self._execute_tool(tool_call))
+                                        execution_task = (
+                                            stream_tool_scheduler.submit(tool_call) if stream_tool_scheduler
+                                            else asyncio.create_task(self._execute_tool(tool_call))
+                                        )
                                         pending_tool_executions.append({
                                             "task": execution_task, "tool_call": tool_call,
                                             "tool_index": tool_index, "context": context
@@ -787,7 +809,10 @@ class ResponseProcessor:
                                 if started_msg_obj: yield format_for_yield(started_msg_obj)
                                 yielded_tool_indices.add(tool_index) # Mark status as yielded
 
-                                execution_task = asyncio.create_task(self._execute_tool(tool_call_data))
+                                execution_task = (
+                                    stream_tool_scheduler.submit(tool_call_data) if stream_tool_scheduler
+                                    else asyncio.create_task(self._execute_tool(tool_call_data))
+                                )
                                 pending_tool_executions.append({
                                     "task": execution_task, "tool_call": tool_call_data,
                                     "tool_index": tool_index, "context": context
@@ -839,6 +864,8 @@ class ResponseProcessor:
                                 }
                                 __sequence += 1
 
+            accumulated_content = content_buffer.getvalue()
+
             # Log when stream naturally ends
             if finish_reason == "stop":
                 logger.info(f"✅ Stream naturally ended after stop sequence. Total chunks: {chunk_count}, finish_reason: {finish_reason}")
@@ -891,10 +918,10 @@ class ResponseProcessor:
                         f.write(accumulated_content + "\n\n")
                         f.write("=" * 80 + "\n")
                         f.write(f"Total chunks: {chunk_count}\n")
-                        f.write(f"Chunks with content: {sum(1 for c in raw_chunks_data if c.get('has_content'))}\n")
-                        f.write(f"Chunks with reasoning: {sum(1 for c in raw_chunks_data if c.get('has_reasoning'))}\n")
-                        f.write(f"Chunks with usage: {sum(1 for c in raw_chunks_data if c.get('has_usage'))}\n")
-                        f.write(f"Chunks with finish_reason: {sum(1 for c in raw_chunks_data if c.get('finish_reason'))}\n")
+                        f.write(f"Chunks with content: {chunks_with_content}\n")
+                        f.write(f"Chunks with reasoning: {chunks_with_reasoning}\n")
+                        f.write(f"Chunks with usage: {chunks_with_usage}\n")
+                        f.write(f"Chunks with finish_reason: {chunks_with_finish_reason}\n")
                     
                     logger.info(f"✅ Saved stream debug files: {debug_file} and {debug_file_json}")
                 except Exception as e:
@@ -919,6 +946,8 @@ class ResponseProcessor:
                 self.trace.event(name="waiting_for_pending_streamed_tool_executions", level="DEFAULT", status_message=(f"Waiting for {len(pending_tool_executions)} pending streamed tool executions"))
                 pending_tasks = [execution["task"] for execution in pending_tool_executions]
                 done, _ = await asyncio.wait(pending_tasks)
+                if stream_tool_scheduler:
+                    stream_tool_scheduler.report_timing()
 
                 for execution in pending_tool_executions:
                     tool_idx = execution.get("tool_index", -1)
@@ -1089,7 +1118,7 @@ class ResponseProcessor:
                 parsed_xml_data = []
                 if config.xml_tool_calling:
                     # Reparse remaining content just in case (should be empty if processed correctly)
-                    xml_chunks = extract_xml_chunks(current_xml_content)
+                    xml_chunks = xml_scan_window.flush()
                     xml_chunks_buffer.extend(xml_chunks)
 
                     for chunk in xml_chunks_buffer:
@@ -1374,6 +1403,8 @@ class ResponseProcessor:
         finally:
             # IMPORTANT: Finally block runs even when stream is stopped (GeneratorExit)
             # We MUST NOT yield here - just save to DB silently for billing/usage tracking
+            # Materialize content streamed so far in case the loop exited early
+            accumulated_content = content_buffer.getvalue()
             
             # Phase 3: Resource Cleanup - Cancel pending tasks and close generator
             try:
@@ -1832,7 +1863,7 @@ class ResponseProcessor:
 
             logger.debug(f"🔧 EXECUTING TOOL: {function_name}")
             # logger.debug(f"📝 RAW ARGUMENTS TYPE: {type(arguments)}")
-            logger.debug(f"📝 RAW ARGUMENTS VALUE: {arguments}")
+            logger.debug("📝 RAW ARGUMENTS VALUE: %s", arguments)
             self.trace.event(name="executing_tool", level="DEFAULT", status_message=(f"Executing tool: {function_name} with arguments: {arguments}"))
 
             # Get available functions from tool registry
@@ -1944,9 +1975,10 @@ class ResponseProcessor:
                 # Arguments are already parsed (dict or other type)
                 if isinstance(arguments, dict):
                     # Log argument types to verify they're preserved correctly
-                    arg_types = {k: type(v).__name__ for k, v in arguments.items()}
-                    logger.debug(f"✅ Arguments are already a dict, unpacking. Types: {arg_types}")
-                    logger.debug(f"📋 Arguments: {arguments}")
+                    if log_enabled(logging.DEBUG):
+                        arg_types = {k: type(v).__name__ for k, v in arguments.items()}
+                        logger.debug("✅ Arguments are already a dict, unpacking. Types: %s", arg_types)
+                    logger.debug("📋 Arguments: %s", arguments)
                     result = await tool_fn(**arguments)
                 else:
                     logger.debug(f"🔄 Arguments are non-dict type ({type(arguments)}), passing as single argument")
@@ -2065,7 +2097,7 @@ class ResponseProcessor:
         execution_strategy: ToolExecutionStrategy = "sequential"
     ) -> List[Tuple[Dict[str, Any], ToolResult]]:
         logger.debug(f"🎯 MAIN EXECUTE_TOOLS: Executing {len(tool_calls)} tools with strategy: {execution_strategy}")
-        logger.debug(f"📋 Tool calls received: {tool_calls}")
+        logger.debug("📋 Tool calls received: %s", tool_calls)
 
         if not isinstance(tool_calls, list):
             logger.error(f"❌ tool_calls must be a list, got {type(tool_calls)}: {tool_calls}")
@@ -2089,6 +2121,9 @@ class ResponseProcessor:
             elif execution_strategy == "parallel":
                 logger.debug("🔄 Dispatching to parallel execution")
                 return await self._execute_tools_in_parallel(tool_calls)
+            elif execution_strategy == "scheduled":
+                logger.debug("🔄 Dispatching to scheduled execution")
+                return await self._execute_tools_scheduled(tool_calls)
             else:
                 logger.warning(f"⚠️ Unknown execution strategy: {execution_strategy}, falling back to sequential")
                 return await self._execute_tools_sequentially(tool_calls)
@@ -2106,14 +2141,14 @@ class ResponseProcessor:
         try:
             tool_names = [t.get('function_name', 'unknown') for t in tool_calls]
             logger.debug(f"🔄 EXECUTING {len(tool_calls)} TOOLS SEQUENTIALLY: {tool_names}")
-            logger.debug(f"📋 Tool calls data: {tool_calls}")
+            logger.debug("📋 Tool calls data: %s", tool_calls)
             self.trace.event(name="executing_tools_sequentially", level="DEFAULT", status_message=(f"Executing {len(tool_calls)} tools sequentially: {tool_names}"))
 
             results = []
             for index, tool_call in enumerate(tool_calls):
                 tool_name = tool_call.get('function_name', 'unknown')
                 logger.debug(f"🔧 Executing tool {index+1}/{len(tool_calls)}: {tool_name}")
-                logger.debug(f"📝 Tool call data: {tool_call}")
+                logger.debug("📝 Tool call data: %s", tool_call)
 
                 try:
                     logger.debug(f"🚀 Calling _execute_tool for {tool_name}")
@@ -2199,7 +2234,7 @@ class ResponseProcessor:
         try:
             tool_names = [t.get('function_name', 'unknown') for t in tool_calls]
             logger.debug(f"🔄 EXECUTING {len(tool_calls)} TOOLS IN PARALLEL: {tool_names}")
-            logger.debug(f"📋 Tool calls data: {tool_calls}")
+            logger.debug("📋 Tool calls data: %s", tool_calls)
             self.trace.event(name="executing_tools_in_parallel", level="DEFAULT", status_message=(f"Executing {len(tool_calls)} tools in parallel: {tool_names}"))
 
             # Create tasks for all tool calls
@@ -2274,6 +2309,36 @@ class ResponseProcessor:
 
             return error_results
 
+    async def _execute_tools_scheduled(self, tool_calls: List[Dict[str, Any]]) -> List[Tuple[Dict[str, Any], ToolResult]]:
+        """Execute tool calls concurrently, ordering only calls that touch the same resources.
+
+        Calls after 'ask' or 'complete' are not executed, as in sequential execution.
+
+        Args:
+            tool_calls: List of tool calls to execute
+
+        Returns:
+            List of tuples containing the original tool call and its result
+        """
+        if not tool_calls:
+            logger.debug("🚫 No tool calls to execute")
+            return []
+
+        tool_names = [t.get('function_name', 'unknown') for t in tool_calls]
+        logger.debug(f"🔄 EXECUTING {len(tool_calls)} TOOLS WITH DEPENDENCY SCHEDULING: {tool_names}")
+        self.trace.event(name="executing_tools_scheduled", level="DEFAULT", status_message=(f"Executing {len(tool_calls)} tools with dependency scheduling: {tool_names}"))
+
+        try:
+            scheduler = ToolCallScheduler(self._execute_tool, self.trace)
+            results = await scheduler.run_batch(tool_calls)
+            if len(results) < len(tool_calls):
+                self.trace.event(name="terminating_tool_executed", level="DEFAULT", status_message=(f"Terminating tool executed. Skipped {len(tool_calls) - len(results)} remaining tools."))
+            return results
+        except Exception as e:
+            logger.error(f"❌ CRITICAL ERROR in scheduled tool execution: {str(e)}", exc_info=True)
+            self.trace.event(name="error_in_scheduled_tool_execution", level="ERROR", status_message=(f"Error in scheduled tool execution: {str(e)}"))
+            return [(tool_call, ToolResult(success=False, output=f"Execution error: {str(e)}")) for tool_call in tool_calls]
+
     async def _add_tool_result(
         self, 
         thread_id: str, 
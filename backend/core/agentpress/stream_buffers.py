@@ -0,0 +1,125 @@
+"""
+Buffers used while consuming a streamed LLM response.
+
+`TextAccumulator` collects content chunks in compacted segments and joins them
+only when the full text is needed, instead of rebuilding an ever-growing string
+on every chunk. `XmlScanWindow` holds only the text that can still become part of a
+`<function_calls>` block: text before an opening tag is dropped as soon as it
+arrives and completed blocks are removed from the window once extracted.
+"""
+from typing import List
+
+from core.agentpress.xml_tool_parser import extract_xml_chunks
+
+FUNCTION_CALLS_START = "<function_calls>"
+FUNCTION_CALLS_END = "</function_calls>"
+
+
+class TextAccumulator:
+    """
+    Append-only text buffer joined on demand.
+
+    Streamed chunks are a few characters each, so they are compacted into
+    segments of about SEGMENT_CHARS to keep per-object overhead from
+    outweighing the text itself.
+    """
+
+    SEGMENT_CHARS = 16 * 1024
+
+    def __init__(self):
+        self._segments: List[str] = []
+        self._pending: List[str] = []
+        self._pending_chars = 0
+        self._length = 0
+
+    def append(self, text: str) -> None:
+        if not text:
+            return
+        self._pending.append(text)
+        self._pending_chars += len(text)
+        self._length += len(text)
+        if self._pending_chars >= self.SEGMENT_CHARS:
+            self._compact()
+
+    def getvalue(self) -> str:
+        self._compact()
+        # Keep the joined value as the only segment so repeated reads don't join again
+        if len(self._segments) > 1:
+            self._segments = ["".join(self._segments)]
+        return self._segments[0] if self._segments else ""
+
+    def _compact(self) -> None:
+        if self._pending:
+            self._segments.append("".join(self._pending))
+            self._pending = []
+            self._pending_chars = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __bool__(self) -> bool:
+        return self._length > 0
+
+
+class XmlScanWindow:
+    """
+    Incremental extractor for complete `<function_calls>` blocks.
+
+    While a block is open the window only grows, and it is joined and scanned
+    only when the newly fed text may have closed the block, so a long tool
+    call is not rescanned on every chunk.
+    """
+
+    def __init__(self):
+        self._parts: List[str] = []
+        self._length = 0
+        self._open = False
+        # Trailing text of the stream, long enough to spot a closing tag split across chunks
+        self._tail = ""
+
+    def feed(self, text: str) -> List[str]:
+        """Add streamed text and return any blocks it completed, in order."""
+        if not text:
+            return []
+        self._parts.append(text)
+        self._length += len(text)
+        probe = self._tail + text
+        self._tail = probe[-(len(FUNCTION_CALLS_END) - 1):]
+
+        if FUNCTION_CALLS_END in probe:
+            return self._extract()
+        if not self._open:
+            self._trim_unopened()
+        return []
+
+    def flush(self) -> List[str]:
+        """Return any complete blocks still held in the window."""
+        return self._extract() if self._parts else []
+
+    def _extract(self) -> List[str]:
+        window = "".join(self._parts)
+        chunks = extract_xml_chunks(window)
+        consumed = 0
+        for chunk in chunks:
+            consumed = window.find(chunk, consumed) + len(chunk)
+        self._reset(window[consumed:])
+        self._trim_unopened()
+        return chunks
+
+    def _trim_unopened(self) -> None:
+        # Without an opening tag only a possible partial tag at the end is worth keeping
+        window = "".join(self._parts)
+        start = window.find(FUNCTION_CALLS_START)
+        if start == -1:
+            window = window[-(len(FUNCTION_CALLS_START) - 1):]
+        else:
+            window = window[start:]
+        self._reset(window)
+        self._open = start != -1
+
+    def _reset(self, window: str) -> None:
+        self._parts = [window] if window else []
+        self._length = len(window)
+
+    def __len__(self) -> int:
+        return self._length
@@ -78,6 +78,10 @@ class ThreadManager:
             if result.data and len(result.data) > 0 and 'thread_id' in result.data[0]:
                 thread_id = result.data[0]['thread_id']
                 logger.info(f"Successfully created thread: {thread_id}")
+                if account_id:
+                    from core.runtime_cache import increment_thread_count_cache, invalidate_thread_list_cache
+                    await invalidate_thread_list_cache(account_id)
+                    asyncio.create_task(increment_thread_count_cache(account_id))
                 return thread_id
             else:
                 raise Exception("Failed to create thread: no thread_id returned")
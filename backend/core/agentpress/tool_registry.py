@@ -4,10 +4,26 @@ from core.utils.logger import logger
 import json
 
 
+class _LazyToolInstance:
+    """Deferred tool construction: the instance is built on first invocation."""
+    __slots__ = ('tool_class', 'kwargs', 'instance')
+
+    def __init__(self, tool_class: Type[Tool], kwargs: Dict[str, Any]):
+        self.tool_class = tool_class
+        self.kwargs = kwargs
+        self.instance = None
+
+    def get(self) -> Tool:
+        if self.instance is None:
+            self.instance = self.tool_class(**self.kwargs)
+        return self.instance
+
+
 class ToolRegistry:
     def __init__(self):
         self.tools = {}
         self._cached_openapi_schemas = None  # ⚡ Cache schemas for repeated calls
+        self._cached_openapi_json = None
         logger.debug("Initialized new ToolRegistry instance")
     
     def register_tool(self, tool_class: Type[Tool], function_names: Optional[List[str]] = None, **kwargs):
@@ -17,24 +33,30 @@ class ToolRegistry:
         from core.utils.tool_discovery import get_cached_schemas, get_cached_tool_instance
         
         tool_instance = None
+        lazy_instance = None
         used_cache = False
         if not kwargs:
             tool_instance = get_cached_tool_instance(tool_class)
             if tool_instance:
                 used_cache = True
         
-        if tool_instance is None:
-            tool_instance = tool_class(**kwargs)
-        
         schemas = get_cached_schemas(tool_class)
         schema_cached = schemas is not None
         
+        if tool_instance is None:
+            if schema_cached:
+                # Schemas come from the worker-level cache, so construction can wait until the tool is called
+                lazy_instance = _LazyToolInstance(tool_class, kwargs)
+            else:
+                tool_instance = tool_class(**kwargs)
+        
         if schemas is None:
             schemas = tool_instance.get_schemas()
         
         registered_openapi = 0
         
         self._cached_openapi_schemas = None
+        self._cached_openapi_json = None
         if hasattr(self, '_cached_functions'):
             self._cached_functions = None
         
@@ -44,15 +66,35 @@ class ToolRegistry:
                     if schema.schema_type == SchemaType.OPENAPI:
                         self.tools[func_name] = {
                             "instance": tool_instance,
-                            "schema": schema
+                            "schema": schema,
+                            "tool_class": tool_class,
+                            "lazy": lazy_instance,
                         }
                         registered_openapi += 1
         
         elapsed = (time.time() - start) * 1000
         if elapsed > 10:
-            cache_info = f"(instance={'cached' if used_cache else 'new'}, schema={'cached' if schema_cached else 'computed'})"
+            instance_info = 'cached' if used_cache else ('lazy' if lazy_instance else 'new')
+            cache_info = f"(instance={instance_info}, schema={'cached' if schema_cached else 'computed'})"
             logger.debug(f"⏱️ [TIMING] register_tool({tool_class.__name__}): {elapsed:.1f}ms {cache_info}")
 
+    def _bind_instance(self, tool_info: Dict[str, Any]) -> Tool:
+        tool_instance = tool_info.get('instance')
+        if tool_instance is None and tool_info.get('lazy') is not None:
+            tool_instance = tool_info['lazy'].get()
+            # Share the bound instance with every function registered from the same class
+            for other in self.tools.values():
+                if other.get('lazy') is tool_info['lazy']:
+                    other['instance'] = tool_instance
+        return tool_instance
+
+    def _lazy_function(self, function_name: str, tool_info: Dict[str, Any]) -> Callable:
+        async def invoke(*args, **kwargs):
+            tool_instance = self._bind_instance(tool_info)
+            return await getattr(tool_instance, function_name)(*args, **kwargs)
+        invoke.__name__ = function_name
+        return invoke
+
     def get_available_functions(self) -> Dict[str, Callable]:
         if hasattr(self, '_cached_functions') and self._cached_functions is not None:
             return self._cached_functions
@@ -61,6 +103,9 @@ class ToolRegistry:
         for tool_name, tool_info in self.tools.items():
             tool_instance = tool_info['instance']
             function_name = tool_name
+            if tool_instance is None and tool_info.get('lazy') is not None:
+                available_functions[function_name] = self._lazy_function(function_name, tool_info)
+                continue
             function = getattr(tool_instance, function_name)
             available_functions[function_name] = function
         
@@ -76,6 +121,8 @@ class ToolRegistry:
         tool = self.tools.get(tool_name, {})
         if not tool:
             logger.warning(f"Tool not found: {tool_name}")
+        elif tool.get('instance') is None and tool.get('lazy') is not None:
+            self._bind_instance(tool)
         return tool
 
     def get_openapi_schemas(self) -> List[Dict[str, Any]]:
@@ -89,6 +136,7 @@ class ToolRegistry:
         for tool_name, tool_info in self.tools.items():
             if tool_info['schema'].schema_type == SchemaType.OPENAPI:
 
+                # Lazily bound tools are never MCP wrappers, which are registered with live instances
                 tool_instance = tool_info.get('instance')
                 is_mcp_by_instance = (tool_instance and 
                                     hasattr(tool_instance, '__class__') and 
@@ -112,6 +160,29 @@ class ToolRegistry:
         logger.info(f"🎯 [HYBRID CACHE] Exposing {native_exposed} native tools, hiding {mcp_hidden} MCP tools (smart separation)")
         return schemas
     
+    def get_openapi_schemas_json(self) -> str:
+        """Same output as json.dumps(self.get_openapi_schemas(), indent=2), built from pre-serialized entries."""
+        if self._cached_openapi_json is not None:
+            return self._cached_openapi_json
+        
+        from core.utils.tool_discovery import get_cached_openapi_json, serialize_openapi_schema
+        
+        exposed = {id(schema) for schema in self.get_openapi_schemas()}
+        entries = []
+        for tool_name, tool_info in self.tools.items():
+            schema = tool_info['schema']
+            if schema.schema_type != SchemaType.OPENAPI or id(schema.schema) not in exposed:
+                continue
+            serialized = None
+            if tool_info.get('tool_class') is not None:
+                serialized = get_cached_openapi_json(tool_info['tool_class'], tool_name)
+            if serialized is None:
+                serialized = serialize_openapi_schema(schema.schema)
+            entries.append(serialized)
+        
+        self._cached_openapi_json = "[\n" + ",\n".join(entries) + "\n]" if entries else "[]"
+        return self._cached_openapi_json
+    
     def get_all_schemas(self) -> List[Dict[str, Any]]:
         return [
             tool_info['schema'].schema 
@@ -121,3 +192,4 @@ class ToolRegistry:
     
     def invalidate_schema_cache(self):
         self._cached_openapi_schemas = None
+        self._cached_openapi_json = None
@@ -0,0 +1,441 @@
+"""
+Dependency-aware scheduling for tool calls.
+
+Each tool call is mapped to the sandbox resources it reads and writes (file
+paths, shell sessions, the browser, the task list, ...). A call starts as soon
+as every earlier call it conflicts with has finished, so independent calls such
+as several web searches run concurrently while two edits of the same file keep
+their submission order. Shell commands are ordered per session only; like the
+parallel strategy, they are not ordered against file tools. Calls the scheduler
+knows nothing about (MCP tools, agent builder tools, ...) are treated as
+exclusive and run alone.
+
+`ask` and `complete` are barriers: they wait for every earlier call, and in a
+batch nothing after them is executed.
+"""
+
+import asyncio
+import json
+import posixpath
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, List, Optional, Tuple
+
+from core.agentpress.tool import ToolResult
+from core.utils.logger import logger
+
+TERMINATING_TOOLS = frozenset({"ask", "complete"})
+
+WHOLE_FS = "fs:*"
+
+# Tools with no sandbox side effects
+_STATELESS_TOOLS = frozenset({
+    "web_search",
+    "image_search",
+    "people_search",
+    "company_search",
+    "paper_search",
+    "get_paper_details",
+    "get_author_details",
+    "get_author_papers",
+    "search_authors",
+    "get_data_provider_endpoints",
+    "execute_data_provider_call",
+    "expand_message",
+    "expose_port",
+    "wait",
+})
+
+# tool -> argument holding the file it modifies
+_FILE_WRITE_TOOLS = {
+    "create_file": "file_path",
+    "str_replace": "file_path",
+    "full_file_rewrite": "file_path",
+    "delete_file": "file_path",
+    "edit_file": "target_file",
+}
+
+# tool -> argument holding the file it only reads
+_FILE_READ_TOOLS = {
+    "upload_file": "file_path",
+    "global_kb_upload_file": "sandbox_file_path",
+}
+
+# Tools that can touch anything in the workspace
+_WHOLE_FS_WRITE_TOOLS = frozenset({
+    "git_commit",
+    "init_kb",
+    "cleanup_kb",
+    "global_kb_sync",
+})
+
+_SHELL_SESSION_TOOLS = frozenset({"execute_command", "check_command_output", "terminate_command"})
+
+_PRESENTATION_WRITE_TOOLS = frozenset({
+    "create_slide",
+    "delete_slide",
+    "delete_presentation",
+    "load_template_design",
+    "export_presentation",
+})
+_PRESENTATION_READ_TOOLS = frozenset({"list_presentations", "list_slides", "list_templates", "validate_slide"})
+
+_TASK_LIST_WRITE_TOOLS = frozenset({"create_tasks", "update_tasks", "delete_tasks", "clear_all"})
+
+_KB_WRITE_TOOLS = frozenset({
+    "global_kb_create_folder",
+    "global_kb_upload_file",
+    "global_kb_delete_item",
+    "global_kb_enable_item",
+    "init_kb",
+    "cleanup_kb",
+    "global_kb_sync",
+})
+_KB_READ_TOOLS = frozenset({"ls_kb", "search_files", "global_kb_list_contents"})
+
+# Maximum concurrent executions per tool, on top of resource conflicts
+DEFAULT_CONCURRENCY_LIMITS = {
+    "web_search": 4,
+    "image_search": 4,
+    "scrape_webpage": 3,
+    "people_search": 2,
+    "company_search": 2,
+    "paper_search": 3,
+    "execute_data_provider_call": 4,
+    "execute_command": 4,
+}
+
+# Per-tool timeout in seconds; tools not listed run without a scheduler timeout
+DEFAULT_TIMEOUTS = {
+    "web_search": 90,
+    "image_search": 90,
+    "scrape_webpage": 180,
+    "people_search": 180,
+    "company_search": 180,
+    "paper_search": 120,
+    "get_paper_details": 120,
+    "get_author_details": 120,
+    "get_author_papers": 120,
+    "search_authors": 120,
+    "execute_data_provider_call": 120,
+    "get_data_provider_endpoints": 60,
+}
+
+
+@dataclass(frozen=True)
+class ToolResources:
+    """Resource keys a tool call reads and writes. Keys ending in '*' cover every key with that prefix."""
+    reads: FrozenSet[str] = frozenset()
+    writes: FrozenSet[str] = frozenset()
+    exclusive: bool = False
+
+    def conflicts_with(self, other: "ToolResources") -> bool:
+        if self.exclusive or other.exclusive:
+            return True
+        return (
+            _any_overlap(self.writes, other.writes | other.reads)
+            or _any_overlap(other.writes, self.reads)
+        )
+
+
+EXCLUSIVE = ToolResources(exclusive=True)
+
+
+def _keys_overlap(a: str, b: str) -> bool:
+    if a == b:
+        return True
+    if a.endswith("*") and b.startswith(a[:-1]):
+        return True
+    return b.endswith("*") and a.startswith(b[:-1])
+
+
+def _any_overlap(left: FrozenSet[str], right: FrozenSet[str]) -> bool:
+    return any(_keys_overlap(a, b) for a in left for b in right)
+
+
+def _normalize_path(path: Any) -> str:
+    path = str(path).strip().replace("\\", "/")
+    for prefix in ("/workspace/", "workspace/"):
+        if path.startswith(prefix):
+            path = path[len(prefix):]
+            break
+    return posixpath.normpath(path.lstrip("/"))
+
+
+def _file_key(arguments: Dict[str, Any], name: str) -> str:
+    path = arguments.get(name)
+    # Without a path we cannot tell which file is touched
+    return f"fs:{_normalize_path(path)}" if path else WHOLE_FS
+
+
+def _parse_arguments(arguments: Any) -> Dict[str, Any]:
+    if isinstance(arguments, dict):
+        return arguments
+    if isinstance(arguments, str):
+        try:
+            parsed = json.loads(arguments)
+            return parsed if isinstance(parsed, dict) else {}
+        except (json.JSONDecodeError, ValueError):
+            return {}
+    return {}
+
+
+def resources_for_call(tool_call: Dict[str, Any]) -> ToolResources:
+    """
+    Derive the resources a tool call reads and writes.
+
+    Args:
+        tool_call: Tool call with 'function_name' and 'arguments'
+
+    Returns:
+        ToolResources for the call; EXCLUSIVE for terminating and unknown tools
+    """
+    name = tool_call.get("function_name") or ""
+    arguments = _parse_arguments(tool_call.get("arguments"))
+
+    if name in TERMINATING_TOOLS:
+        return EXCLUSIVE
+    if name in _STATELESS_TOOLS:
+        return ToolResources()
+
+    reads, writes = set(), set()
+
+    if name in _FILE_WRITE_TOOLS:
+        writes.add(_file_key(arguments, _FILE_WRITE_TOOLS[name]))
+    if name in _FILE_READ_TOOLS:
+        reads.add(_file_key(arguments, _FILE_READ_TOOLS[name]))
+    if name in _WHOLE_FS_WRITE_TOOLS:
+        writes.add(WHOLE_FS)
+
+    if name in _SHELL_SESSION_TOOLS:
+        session = arguments.get("session_name")
+        if session:
+            writes.add(f"session:{session}")
+        elif name == "execute_command":
+            # Without a session name the command gets a fresh session of its own
+            return ToolResources()
+        else:
+            writes.add("session:*")
+    elif name == "list_commands":
+        reads.add("session:*")
+
+    if name.startswith("browser_"):
+        writes.add("browser")
+
+    if name == "scrape_webpage":
+        writes.add("fs:scrape/*")
+
+    if name == "load_image":
+        reads.add(_file_key(arguments, "file_path"))
+        writes.add("image_context")
+    elif name == "list_images_in_context":
+        reads.add("image_context")
+
+    if name in _PRESENTATION_WRITE_TOOLS:
+        writes.add("fs:presentations/*")
+    elif name in _PRESENTATION_READ_TOOLS:
+        reads.add("fs:presentations/*")
+
+    if name in _TASK_LIST_WRITE_TOOLS:
+        writes.add("task_list")
+    elif name == "view_tasks":
+        reads.add("task_list")
+
+    if name in _KB_WRITE_TOOLS:
+        writes.add("kb")
+    elif name in _KB_READ_TOOLS:
+        reads.add("kb")
+        if name == "search_files":
+            reads.add(_file_key(arguments, "path"))
+
+    if not reads and not writes:
+        return EXCLUSIVE
+    return ToolResources(reads=frozenset(reads), writes=frozenset(writes))
+
+
+@dataclass
+class _ScheduledCall:
+    index: int
+    name: str
+    tool_call: Dict[str, Any]
+    resources: ToolResources
+    depends_on: List["_ScheduledCall"]
+    task: Optional[asyncio.Task] = None
+    submitted_at: float = field(default_factory=time.perf_counter)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    timed_out: bool = False
+
+    @property
+    def duration(self) -> float:
+        if self.started_at is None or self.finished_at is None:
+            return 0.0
+        return self.finished_at - self.started_at
+
+
+class ToolCallScheduler:
+    """Runs tool calls concurrently while ordering calls that touch the same resources."""
+
+    def __init__(
+        self,
+        execute: Callable[[Dict[str, Any]], Awaitable[ToolResult]],
+        trace=None,
+        concurrency_limits: Optional[Dict[str, int]] = None,
+        timeouts: Optional[Dict[str, float]] = None,
+    ):
+        """
+        Args:
+            execute: Coroutine function that executes a single tool call
+            trace: Optional Langfuse trace for batch timing events
+            concurrency_limits: Per-tool concurrency caps (defaults to DEFAULT_CONCURRENCY_LIMITS)
+            timeouts: Per-tool timeouts in seconds (defaults to DEFAULT_TIMEOUTS)
+        """
+        self._execute = execute
+        self._trace = trace
+        self._limits = DEFAULT_CONCURRENCY_LIMITS if concurrency_limits is None else concurrency_limits
+        self._timeouts = DEFAULT_TIMEOUTS if timeouts is None else timeouts
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._calls: List[_ScheduledCall] = []
+
+    def submit(self, tool_call: Dict[str, Any]) -> asyncio.Task:
+        """
+        Schedule a tool call behind every earlier call it conflicts with.
+
+        Returns:
+            Task resolving to the call's ToolResult
+        """
+        name = tool_call.get("function_name", "unknown")
+        resources = resources_for_call(tool_call)
+        depends_on = [call for call in self._calls if call.resources.conflicts_with(resources)]
+
+        call = _ScheduledCall(
+            index=len(self._calls),
+            name=name,
+            tool_call=tool_call,
+            resources=resources,
+            depends_on=depends_on,
+        )
+        call.task = asyncio.create_task(self._run(call))
+        self._calls.append(call)
+
+        if depends_on:
+            logger.debug(f"🧩 Tool {name} (#{call.index}) waits for {[d.index for d in depends_on]}")
+        return call.task
+
+    async def run_batch(self, tool_calls: List[Dict[str, Any]]) -> List[Tuple[Dict[str, Any], ToolResult]]:
+        """
+        Execute a batch of tool calls and return results in submission order.
+
+        Calls after the first terminating tool are not executed, matching sequential execution.
+        """
+        batch = []
+        for tool_call in tool_calls:
+            batch.append(tool_call)
+            if tool_call.get("function_name") in TERMINATING_TOOLS:
+                break
+        if len(batch) < len(tool_calls):
+            logger.debug(f"🛑 Skipping {len(tool_calls) - len(batch)} tool calls after terminating tool")
+
+        tasks = [self.submit(tool_call) for tool_call in batch]
+        outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+
+        results = []
+        for tool_call, outcome in zip(batch, outcomes):
+            if isinstance(outcome, BaseException):
+                logger.error(f"❌ Scheduled tool {tool_call.get('function_name', 'unknown')} failed: {outcome}")
+                outcome = ToolResult(success=False, output=f"Error executing tool: {str(outcome)}")
+            elif not isinstance(outcome, ToolResult):
+                outcome = ToolResult(success=False, output=f"Invalid result type from tool: {type(outcome)}")
+            results.append((tool_call, outcome))
+
+        self.report_timing()
+        return results
+
+    def timing_summary(self) -> Dict[str, Any]:
+        """
+        Wall time, serial time and critical path of the calls submitted so far.
+
+        The critical path is the longest chain of dependent call durations, i.e. the
+        best wall time any schedule could reach with these dependencies.
+        """
+        finished = [c for c in self._calls if c.finished_at is not None]
+        if not finished:
+            return {"calls": 0}
+
+        path_length: Dict[int, float] = {}
+        path_prev: Dict[int, Optional[int]] = {}
+        for call in self._calls:
+            best_dep = max(call.depends_on, key=lambda d: path_length[d.index], default=None)
+            path_length[call.index] = call.duration + (path_length[best_dep.index] if best_dep else 0.0)
+            path_prev[call.index] = best_dep.index if best_dep else None
+
+        tail = max(path_length, key=path_length.get)
+        chain = []
+        while tail is not None:
+            chain.append(self._calls[tail].name)
+            tail = path_prev[tail]
+
+        wall = max(c.finished_at for c in finished) - min(c.submitted_at for c in self._calls)
+        serial = sum(c.duration for c in self._calls)
+        queued = sum(
+            (c.started_at - c.submitted_at) for c in self._calls if c.started_at is not None
+        )
+        return {
+            "calls": len(self._calls),
+            "wall_ms": round(wall * 1000, 1),
+            "serial_ms": round(serial * 1000, 1),
+            "critical_path_ms": round(max(path_length.values()) * 1000, 1),
+            "critical_path": list(reversed(chain)),
+            "queued_ms": round(queued * 1000, 1),
+            "timeouts": sum(1 for c in self._calls if c.timed_out),
+        }
+
+    def report_timing(self) -> None:
+        summary = self.timing_summary()
+        if not summary.get("calls"):
+            return
+        message = (
+            f"{summary['calls']} tools: wall={summary['wall_ms']}ms serial={summary['serial_ms']}ms "
+            f"critical_path={summary['critical_path_ms']}ms ({' -> '.join(summary['critical_path'])})"
+        )
+        logger.info(f"⏱️ [TIMING] Tool batch {message}")
+        if self._trace:
+            try:
+                self._trace.event(name="tool_batch_timing", level="DEFAULT", status_message=message, metadata=summary)
+            except Exception as e:
+                logger.debug(f"Failed to record tool batch timing: {e}")
+
+    def _semaphore(self, name: str) -> Optional[asyncio.Semaphore]:
+        limit = self._limits.get(name)
+        if not limit:
+            return None
+        semaphore = self._semaphores.get(name)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(limit)
+            self._semaphores[name] = semaphore
+        return semaphore
+
+    async def _run(self, call: _ScheduledCall) -> ToolResult:
+        if call.depends_on:
+            # Wait for completion only; a failed dependency does not cancel its dependents
+            await asyncio.wait([d.task for d in call.depends_on])
+
+        semaphore = self._semaphore(call.name)
+        if semaphore is None:
+            return await self._invoke(call)
+        async with semaphore:
+            return await self._invoke(call)
+
+    async def _invoke(self, call: _ScheduledCall) -> ToolResult:
+        timeout = self._timeouts.get(call.name)
+        call.started_at = time.perf_counter()
+        try:
+            if timeout is None:
+                return await self._execute(call.tool_call)
+            return await asyncio.wait_for(self._execute(call.tool_call), timeout=timeout)
+        except asyncio.TimeoutError:
+            call.timed_out = True
+            logger.warning(f"⏱️ Tool {call.name} timed out after {timeout}s")
+            return ToolResult(success=False, output=f"Tool '{call.name}' timed out after {timeout} seconds")
+        finally:
+            call.finished_at = time.perf_counter()
@@ -13,6 +13,7 @@ from .account_deletion import router as account_deletion_router
 from .accounts_api import router as accounts_router
 from .user_roles_api import router as user_roles_router
 from .feedback import router as feedback_router
+from .services.image_store_api import router as image_store_router
 router = APIRouter()
 
 # Include all sub-routers
@@ -29,6 +30,7 @@ router.include_router(account_deletion_router)
 router.include_router(accounts_router)
 router.include_router(user_roles_router)
 router.include_router(feedback_router)
+router.include_router(image_store_router)
 
 # Re-export the initialize and cleanup functions
 __all__ = ['router', 'initialize', 'cleanup']
\ No newline at end of file
@@ -4,10 +4,10 @@ from dataclasses import dataclass
 from datetime import datetime, timezone
 from typing import List, Optional, Dict, Any
 from uuid import uuid4
-from cryptography.fernet import Fernet
 import os
 
 from core.services.supabase import DBConnection
+from core.utils.encryption import decrypted_config_cache, get_fernet
 from core.utils.logger import logger
 
 
@@ -43,13 +43,24 @@ class ComposioProfileService:
         return key.encode()
 
     def _encrypt_config(self, config_json: str) -> str:
-        fernet = Fernet(self._get_encryption_key())
+        fernet = get_fernet(self._get_encryption_key())
         return fernet.encrypt(config_json.encode()).decode()
 
-    def _decrypt_config(self, encrypted_config: str) -> Dict[str, Any]:
-        fernet = Fernet(self._get_encryption_key())
+    def _decrypt_config(self, encrypted_config: str, profile_data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        cache_key = f"composio:{profile_data['profile_id']}" if profile_data and profile_data.get('profile_id') else None
+        config_hash = profile_data.get('config_hash') if profile_data else None
+        if cache_key and config_hash:
+            cached = decrypted_config_cache.get(cache_key, config_hash)
+            if cached is not None:
+                return cached
+        
+        fernet = get_fernet(self._get_encryption_key())
         decrypted = fernet.decrypt(encrypted_config.encode()).decode()
-        return json.loads(decrypted)
+        config = json.loads(decrypted)
+        
+        if cache_key and config_hash:
+            decrypted_config_cache.put(cache_key, config_hash, config)
+        return config
 
     def _generate_config_hash(self, config_json: str) -> str:
         return hashlib.sha256(config_json.encode()).hexdigest()
@@ -186,7 +197,7 @@ class ComposioProfileService:
             
             profile_data = result.data[0]
 
-            config = self._decrypt_config(profile_data['encrypted_config'])
+            config = self._decrypt_config(profile_data['encrypted_config'], profile_data)
             
             if config.get('type') != 'composio':
                 raise ValueError(f"Profile {profile_id} is not a Composio profile")
@@ -219,7 +230,7 @@ class ComposioProfileService:
             
             profile_data = result.data[0]
             
-            config = self._decrypt_config(profile_data['encrypted_config'])
+            config = self._decrypt_config(profile_data['encrypted_config'], profile_data)
             
             if config.get('type') != 'composio':
                 raise ValueError(f"Profile {profile_id} is not a Composio profile")
@@ -235,18 +246,51 @@ class ComposioProfileService:
             logger.error(f"Failed to get MCP URL for profile {profile_id}: {e}", exc_info=True)
             raise
 
+    async def get_mcp_urls_for_runtime(self, profile_ids: List[str]) -> Dict[str, str]:
+        """
+        Resolve the MCP URLs of several Composio profiles with a single query.
+        
+        Args:
+            profile_ids: Profiles to resolve
+            
+        Returns:
+            Mapping of profile id to MCP URL. Profiles that are missing, not
+            Composio profiles or fail to decrypt are left out.
+        """
+        unique_ids = list(dict.fromkeys(pid for pid in profile_ids if pid))
+        if not unique_ids:
+            return {}
+        
+        client = await self.db.client
+        result = await client.table('user_mcp_credential_profiles').select(
+            'profile_id, encrypted_config, config_hash'
+        ).in_('profile_id', unique_ids).execute()
+        
+        urls = {}
+        for row in result.data or []:
+            try:
+                config = self._decrypt_config(row['encrypted_config'], row)
+            except Exception as e:
+                logger.error(f"Failed to decrypt Composio profile {row['profile_id']}: {e}")
+                continue
+            if config.get('type') == 'composio' and config.get('mcp_url'):
+                urls[row['profile_id']] = config['mcp_url']
+        
+        logger.debug(f"Retrieved {len(urls)}/{len(unique_ids)} MCP URLs in one query")
+        return urls
+
     async def get_profile_config(self, profile_id: str) -> Dict[str, Any]:
         try:
             client = await self.db.client
             
-            result = await client.table('user_mcp_credential_profiles').select('encrypted_config').eq(
+            result = await client.table('user_mcp_credential_profiles').select('profile_id, encrypted_config, config_hash').eq(
                 'profile_id', profile_id
             ).execute()
             
             if not result.data:
                 raise ValueError(f"Profile {profile_id} not found")
             
-            return self._decrypt_config(result.data[0]['encrypted_config'])
+            return self._decrypt_config(result.data[0]['encrypted_config'], result.data[0])
             
         except Exception as e:
             logger.error(f"Failed to get config for profile {profile_id}: {e}", exc_info=True)
@@ -267,7 +311,7 @@ class ComposioProfileService:
             
             profiles = []
             for row in result.data:
-                config = self._decrypt_config(row['encrypted_config'])
+                config = self._decrypt_config(row['encrypted_config'], row)
                 
                 profile = ComposioProfile(
                     profile_id=row['profile_id'],
@@ -7,9 +7,8 @@ from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from typing import Dict, List, Any, Optional, Tuple
 
-from cryptography.fernet import Fernet
-
 from core.services.supabase import DBConnection
+from core.utils.encryption import decrypted_config_cache, get_fernet
 from core.utils.logger import logger
 
 
@@ -54,7 +53,7 @@ class CredentialAccessDeniedError(Exception):
 class EncryptionService:
     def __init__(self):
         self._encryption_key = self._get_or_create_encryption_key()
-        self._cipher = Fernet(self._encryption_key)
+        self._cipher = get_fernet(self._encryption_key)
     
     def _get_or_create_encryption_key(self) -> bytes:
         # Try MCP_CREDENTIAL_ENCRYPTION_KEY first, then fall back to ENCRYPTION_KEY
@@ -83,7 +82,17 @@ class EncryptionService:
         
         return encrypted_config, config_hash
     
-    def decrypt_config(self, encrypted_config: bytes, expected_hash: str) -> Dict[str, Any]:
+    def decrypt_config(
+        self,
+        encrypted_config: bytes,
+        expected_hash: str,
+        cache_key: Optional[str] = None
+    ) -> Dict[str, Any]:
+        if cache_key:
+            cached = decrypted_config_cache.get(cache_key, expected_hash)
+            if cached is not None:
+                return cached
+        
         try:
             decrypted_bytes = self._cipher.decrypt(encrypted_config)
             
@@ -92,11 +101,15 @@ class EncryptionService:
                 raise ValueError("Credential integrity check failed")
             
             config_json = decrypted_bytes.decode('utf-8')
-            return json.loads(config_json)
+            config = json.loads(config_json)
             
         except Exception as e:
             logger.error(f"Failed to decrypt credential: {e}")
             raise ValueError("Failed to decrypt credential")
+        
+        if cache_key:
+            decrypted_config_cache.put(cache_key, expected_hash, config)
+        return config
 
 
 class CredentialService:
@@ -216,10 +229,17 @@ class CredentialService:
         requirements: List[MCPRequirement]
     ) -> Dict[str, str]:
         mappings = {}
+        if not requirements:
+            return mappings
+        
+        # One query for all requirements; decrypted configs come from the cache
+        user_credentials = await self.get_user_credentials(account_id)
+        credentials_by_name = {}
+        for cred in user_credentials:
+            credentials_by_name.setdefault(cred.mcp_qualified_name, cred)
         
         for req in requirements:
             if req.custom_type:
-                user_credentials = await self.get_user_credentials(account_id)
                 custom_pattern = f"custom_{req.custom_type}_"
                 
                 for cred in user_credentials:
@@ -228,7 +248,7 @@ class CredentialService:
                         mappings[req.qualified_name] = cred.credential_id
                         break
             else:
-                credential = await self.get_credential(account_id, req.qualified_name)
+                credential = credentials_by_name.get(req.qualified_name)
                 if credential:
                     mappings[req.qualified_name] = credential.credential_id
         
@@ -241,7 +261,9 @@ class CredentialService:
     def _map_to_credential(self, data: Dict[str, Any]) -> MCPCredential:
         try:
             encrypted_config = base64.b64decode(data['encrypted_config'])
-            config = self._encryption.decrypt_config(encrypted_config, data['config_hash'])
+            config = self._encryption.decrypt_config(
+                encrypted_config, data['config_hash'], cache_key=f"credential:{data['credential_id']}"
+            )
         except Exception as e:
             logger.error(f"Failed to decrypt credential {data['credential_id']}: {e}")
             config = {}
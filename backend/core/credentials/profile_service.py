@@ -232,7 +232,9 @@ class ProfileService:
     def _map_to_profile(self, data: Dict[str, Any]) -> MCPCredentialProfile:
         try:
             encrypted_config = base64.b64decode(data['encrypted_config'])
-            config = self._encryption.decrypt_config(encrypted_config, data['config_hash'])
+            config = self._encryption.decrypt_config(
+                encrypted_config, data['config_hash'], cache_key=f"profile:{data['profile_id']}"
+            )
         except Exception as e:
             logger.error(f"Failed to decrypt profile {data['profile_id']}: {e}")
             config = {}
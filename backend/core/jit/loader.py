@@ -247,7 +247,7 @@ class JITLoader:
                 self.tool_name = tool_name
                 self.schema = schema
                 self.tool_info = tool_info
-                self._executor = MCPToolExecutor(tool_info.mcp_config)
+                self._executor = MCPToolExecutor(tool_info.mcp_config, account_id=tool_info.account_id)
             
             def __getattr__(self, method_name: str):
                 """Handle dynamic method calls for MCP tools (same pattern as legacy MCPToolWrapper)"""
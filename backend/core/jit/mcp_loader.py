@@ -12,6 +12,7 @@ class MCPToolInfo:
     tool_name: str
     toolkit_slug: str
     mcp_config: Dict[str, Any]
+    account_id: Optional[str] = None
     loaded: bool = False
     schema: Optional[Dict[str, Any]] = None
     load_time_ms: Optional[float] = None
@@ -109,7 +110,8 @@ class MCPJITLoader:
             self.tool_map[tool_name] = MCPToolInfo(
                 tool_name=tool_name,
                 toolkit_slug=toolkit_slug,
-                mcp_config=mcp_config
+                mcp_config=mcp_config,
+                account_id=self.agent_config.get('account_id')
             )
     
     def _extract_toolkit_slug(self, mcp_config: Dict[str, Any]) -> Optional[str]:
@@ -287,15 +289,21 @@ class MCPJITLoader:
             from core.mcp_module import mcp_service
             
             qualified_name = mcp_config.get("qualifiedName")
-            if not mcp_service.is_connected(qualified_name):
-                await mcp_service.connect_server(mcp_config)
+            account_id = self.agent_config.get('account_id')
+            if not mcp_service.is_connected(qualified_name, account_id):
+                await mcp_service.connect_server(mcp_config, account_id=account_id)
             
-            all_tools = mcp_service.get_all_tools_openapi()
+            all_tools = mcp_service.get_all_tools_openapi(account_id=account_id, qualified_name=qualified_name)
             
             for tool in all_tools:
-                if tool.get("name") == tool_name:
+                function = tool.get("function", {})
+                if function.get("name") == tool_name:
                     logger.debug(f"⚡ [MCP JIT] Loaded standard MCP schema for {tool_name}")
-                    return tool
+                    return {
+                        "name": function["name"],
+                        "description": function.get("description"),
+                        "input_schema": function.get("parameters")
+                    }
             
             raise ValueError(f"Tool '{tool_name}' not found in MCP server response")
             
@@ -1,11 +1,12 @@
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from core.utils.logger import logger
 
 
 class MCPToolExecutor:
 
-    def __init__(self, mcp_config: Dict[str, Any]):
+    def __init__(self, mcp_config: Dict[str, Any], account_id: Optional[str] = None):
         self.mcp_config = mcp_config
+        self.account_id = account_id
         self.server_type = mcp_config.get("type", "standard")
         
         self.tool_info = {
@@ -66,10 +67,10 @@ class MCPToolExecutor:
         
         try:
             qualified_name = self.mcp_config.get("qualifiedName")
-            if not mcp_service.is_connected(qualified_name):
-                await mcp_service.connect_server(self.mcp_config)
+            if not mcp_service.is_connected(qualified_name, self.account_id):
+                await mcp_service.connect_server(self.mcp_config, account_id=self.account_id)
             
-            result = await mcp_service.call_tool(qualified_name, tool_name, args)
+            result = await mcp_service.call_tool(qualified_name, tool_name, args, account_id=self.account_id)
             logger.info(f"✅ [MCP EXEC] {tool_name} executed successfully")
             
             content = self._extract_result_content(result)
@@ -0,0 +1,351 @@
+import asyncio
+import hashlib
+import json
+from collections import OrderedDict, deque
+from contextlib import AsyncExitStack, asynccontextmanager
+from dataclasses import dataclass, field
+from time import monotonic
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from core.utils.logger import logger
+
+
+@dataclass
+class PooledSession:
+    key: str
+    qualified_name: str
+    account_id: Optional[str]
+    connection: Any
+    owner_task: asyncio.Task
+    close_event: asyncio.Event
+    created_at: float
+    last_used: float
+    last_health_check: float
+    in_use: int = 0
+    tool_names: List[str] = field(default_factory=list)
+
+
+class MCPConnectionPool:
+    """Process-wide pool of live MCP sessions, scoped per account.
+
+    Each session is owned by a dedicated task that enters the transport and
+    ClientSession contexts and keeps them open until the session is evicted,
+    so anyio cancel scopes are always exited from the task that entered them.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = 100,
+        idle_ttl: float = 300,
+        max_lifetime: float = 3600,
+        health_check_interval: float = 60,
+        ping_timeout: float = 5,
+        connect_timeout: float = 30,
+        max_concurrency_per_server: int = 4,
+    ):
+        self._sessions: "OrderedDict[str, PooledSession]" = OrderedDict()
+        self._tool_index: Dict[Tuple[Optional[str], str], str] = {}
+        self._connect_locks: Dict[str, asyncio.Lock] = {}
+        self._server_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+        self._max_sessions = max_sessions
+        self._idle_ttl = idle_ttl
+        self._max_lifetime = max_lifetime
+        self._health_check_interval = health_check_interval
+        self._ping_timeout = ping_timeout
+        self._connect_timeout = connect_timeout
+        self._max_concurrency_per_server = max_concurrency_per_server
+
+        self._stats = {
+            "sessions_created": 0,
+            "sessions_reused": 0,
+            "sessions_evicted": 0,
+            "connect_failures": 0,
+            "health_check_failures": 0,
+        }
+        self._handshake_latencies_ms: deque = deque(maxlen=500)
+
+    @staticmethod
+    def make_key(
+        account_id: Optional[str],
+        qualified_name: str,
+        provider: str,
+        config: Dict[str, Any],
+        external_user_id: Optional[str] = None,
+    ) -> str:
+        payload = json.dumps(
+            {
+                "account_id": account_id,
+                "qualified_name": qualified_name,
+                "provider": provider,
+                "config": config,
+                "external_user_id": external_user_id,
+            },
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def get_or_connect(
+        self,
+        key: str,
+        qualified_name: str,
+        account_id: Optional[str],
+        connect: Callable[[AsyncExitStack], Awaitable[Any]],
+    ) -> Any:
+        await self.evict_idle()
+
+        pooled = self._sessions.get(key)
+        if pooled and await self._ensure_healthy(pooled):
+            return self._mark_reused(pooled)
+
+        lock = self._connect_locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            # Another caller may have connected while we waited on the lock
+            pooled = self._sessions.get(key)
+            if pooled and await self._ensure_healthy(pooled):
+                return self._mark_reused(pooled)
+
+            return await self._open(key, qualified_name, account_id, connect)
+
+    def find_by_tool(self, tool_name: str, account_id: Optional[str] = None) -> Optional[Any]:
+        key = self._tool_index.get((account_id, tool_name))
+        if key is None:
+            return None
+        pooled = self._sessions.get(key)
+        if pooled is None:
+            return None
+        pooled.last_used = monotonic()
+        self._sessions.move_to_end(key)
+        return pooled.connection
+
+    def find_by_name(self, qualified_name: str, account_id: Optional[str] = None) -> Optional[Any]:
+        for key in reversed(self._sessions):
+            pooled = self._sessions[key]
+            if pooled.qualified_name == qualified_name and pooled.account_id == account_id:
+                pooled.last_used = monotonic()
+                self._sessions.move_to_end(key)
+                return pooled.connection
+        return None
+
+    def connections(
+        self,
+        account_id: Optional[str] = None,
+        qualified_name: Optional[str] = None,
+        all_accounts: bool = False,
+    ) -> List[Any]:
+        return [
+            pooled.connection
+            for pooled in self._sessions.values()
+            if (all_accounts or pooled.account_id == account_id)
+            and (qualified_name is None or pooled.qualified_name == qualified_name)
+        ]
+
+    @asynccontextmanager
+    async def use(self, connection: Any):
+        """Bound concurrent calls per server and keep the session out of idle eviction while in use."""
+        pooled = self._find_pooled(connection)
+        semaphore = self._server_semaphores.setdefault(
+            connection.qualified_name, asyncio.Semaphore(self._max_concurrency_per_server)
+        )
+        async with semaphore:
+            if pooled:
+                pooled.in_use += 1
+            try:
+                yield connection
+            finally:
+                if pooled:
+                    pooled.in_use -= 1
+                    pooled.last_used = monotonic()
+
+    async def evict_idle(self) -> None:
+        now = monotonic()
+        expired = [
+            key
+            for key, pooled in self._sessions.items()
+            if pooled.in_use == 0
+            and (now - pooled.last_used > self._idle_ttl or now - pooled.created_at > self._max_lifetime)
+        ]
+        for key in expired:
+            await self.close(key)
+
+        while len(self._sessions) > self._max_sessions:
+            oldest_key = next(iter(self._sessions))
+            await self.close(oldest_key)
+
+    async def close(self, key: str) -> None:
+        pooled = self._sessions.pop(key, None)
+        if pooled is None:
+            return
+
+        for tool_name in pooled.tool_names:
+            if self._tool_index.get((pooled.account_id, tool_name)) == key:
+                self._tool_index.pop((pooled.account_id, tool_name), None)
+                # Hand the name over to another of the account's servers that exposes it
+                for other in self._sessions.values():
+                    if other.account_id == pooled.account_id and tool_name in other.tool_names:
+                        self._tool_index[(pooled.account_id, tool_name)] = other.key
+                        break
+
+        self._connect_locks.pop(key, None)
+        self._stats["sessions_evicted"] += 1
+
+        pooled.close_event.set()
+        try:
+            await asyncio.wait_for(pooled.owner_task, timeout=5)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            pooled.owner_task.cancel()
+        except Exception as e:
+            logger.warning(f"Error closing MCP session {pooled.qualified_name}: {str(e)}")
+
+        logger.debug(f"Closed pooled MCP session {pooled.qualified_name} (account={pooled.account_id})")
+
+    async def close_by_name(self, qualified_name: str) -> None:
+        for key in [k for k, p in self._sessions.items() if p.qualified_name == qualified_name]:
+            await self.close(key)
+
+    async def close_all(self) -> None:
+        for key in list(self._sessions.keys()):
+            await self.close(key)
+
+    def get_stats(self) -> Dict[str, Any]:
+        latencies = sorted(self._handshake_latencies_ms)
+        created = self._stats["sessions_created"]
+        reused = self._stats["sessions_reused"]
+
+        def percentile(p: float) -> Optional[float]:
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(len(latencies) * p))], 1)
+
+        return {
+            **self._stats,
+            "active_sessions": len(self._sessions),
+            "in_use_sessions": sum(1 for p in self._sessions.values() if p.in_use),
+            "indexed_tools": len(self._tool_index),
+            "reuse_ratio": round(reused / (created + reused), 3) if created + reused else 0.0,
+            "handshake_ms_p50": percentile(0.50),
+            "handshake_ms_p95": percentile(0.95),
+            "handshake_ms_max": round(latencies[-1], 1) if latencies else None,
+        }
+
+    async def _open(
+        self,
+        key: str,
+        qualified_name: str,
+        account_id: Optional[str],
+        connect: Callable[[AsyncExitStack], Awaitable[Any]],
+    ) -> Any:
+        stale = self._sessions.get(key)
+        if stale:
+            await self.close(key)
+
+        loop = asyncio.get_running_loop()
+        ready: asyncio.Future = loop.create_future()
+        close_event = asyncio.Event()
+
+        start = monotonic()
+        owner_task = asyncio.create_task(
+            self._own_session(qualified_name, connect, ready, close_event),
+            name=f"mcp-session:{qualified_name}",
+        )
+
+        try:
+            connection = await asyncio.wait_for(asyncio.shield(ready), timeout=self._connect_timeout)
+        except BaseException:
+            self._stats["connect_failures"] += 1
+            close_event.set()
+            owner_task.cancel()
+            raise
+
+        elapsed_ms = (monotonic() - start) * 1000
+        self._handshake_latencies_ms.append(elapsed_ms)
+        self._stats["sessions_created"] += 1
+
+        now = monotonic()
+        tool_names = [tool.name for tool in (connection.tools or [])]
+        self._sessions[key] = PooledSession(
+            key=key,
+            qualified_name=qualified_name,
+            account_id=account_id,
+            connection=connection,
+            owner_task=owner_task,
+            close_event=close_event,
+            created_at=now,
+            last_used=now,
+            last_health_check=now,
+            tool_names=tool_names,
+        )
+        for tool_name in tool_names:
+            existing = self._tool_index.get((account_id, tool_name))
+            if existing is not None and existing != key and existing in self._sessions:
+                # Keep the first server; lookups by name alone cannot tell the two apart
+                logger.warning(
+                    f"MCP tool '{tool_name}' from {qualified_name} is also exposed by "
+                    f"{self._sessions[existing].qualified_name} (account={account_id}); "
+                    f"name lookups keep using {self._sessions[existing].qualified_name}"
+                )
+                continue
+            self._tool_index[(account_id, tool_name)] = key
+
+        logger.debug(
+            f"Pooled MCP session {qualified_name} (account={account_id}, {len(tool_names)} tools, handshake {elapsed_ms:.1f}ms)"
+        )
+
+        await self.evict_idle()
+        return connection
+
+    async def _own_session(
+        self,
+        qualified_name: str,
+        connect: Callable[[AsyncExitStack], Awaitable[Any]],
+        ready: asyncio.Future,
+        close_event: asyncio.Event,
+    ) -> None:
+        try:
+            async with AsyncExitStack() as stack:
+                connection = await connect(stack)
+                if not ready.done():
+                    ready.set_result(connection)
+                await close_event.wait()
+        except asyncio.CancelledError:
+            if not ready.done():
+                ready.cancel()
+        except Exception as e:
+            if not ready.done():
+                ready.set_exception(e)
+            else:
+                logger.warning(f"MCP session {qualified_name} terminated: {str(e)}")
+
+    async def _ensure_healthy(self, pooled: PooledSession) -> bool:
+        if pooled.owner_task.done():
+            self._stats["health_check_failures"] += 1
+            await self.close(pooled.key)
+            return False
+
+        now = monotonic()
+        if now - pooled.last_health_check < self._health_check_interval:
+            return True
+
+        session = getattr(pooled.connection, "session", None)
+        try:
+            await asyncio.wait_for(session.send_ping(), timeout=self._ping_timeout)
+            pooled.last_health_check = now
+            return True
+        except Exception as e:
+            logger.debug(f"MCP session {pooled.qualified_name} failed health ping: {str(e)}")
+            self._stats["health_check_failures"] += 1
+            await self.close(pooled.key)
+            return False
+
+    def _mark_reused(self, pooled: PooledSession) -> Any:
+        pooled.last_used = monotonic()
+        self._sessions.move_to_end(pooled.key)
+        self._stats["sessions_reused"] += 1
+        return pooled.connection
+
+    def _find_pooled(self, connection: Any) -> Optional[PooledSession]:
+        for pooled in self._sessions.values():
+            if pooled.connection is connection:
+                return pooled
+        return None
@@ -4,10 +4,9 @@ import base64
 import asyncio
 import logging
 from typing import Dict, List, Any, Optional, Tuple
+from contextlib import AsyncExitStack
 from dataclasses import dataclass, field
 from datetime import datetime
-from collections import OrderedDict
-from time import time
 
 from mcp import ClientSession
 from mcp.client.sse import sse_client
@@ -17,6 +16,7 @@ from core.utils.logger import logger
 from core.credentials import EncryptionService
 from core.utils.config import config as app_config, EnvMode
 from core.tools.utils.mcp_tool_executor import is_safe_url
+from core.mcp_module.connection_pool import MCPConnectionPool
 
 
 class MCPException(Exception):
@@ -49,7 +49,6 @@ class MCPConnection:
     qualified_name: str
     name: str
     config: Dict[str, Any]
-    enabled_tools: List[str]
     provider: str = 'custom'
     external_user_id: Optional[str] = None
     session: Optional[ClientSession] = field(default=None, compare=False)
@@ -79,7 +78,6 @@ class MCPConnectionRequest:
     qualified_name: str
     name: str
     config: Dict[str, Any]
-    enabled_tools: List[str]
     provider: str = 'custom'
     external_user_id: Optional[str] = None
 
@@ -101,198 +99,219 @@ class ToolExecutionResult:
 class MCPService:
     def __init__(self):
         self._logger = logger
-        # LRU cache: Dict[name, (connection, created_at_timestamp)]
-        self._connections: OrderedDict[str, Tuple[MCPConnection, float]] = OrderedDict()
+        # Process-wide, account-scoped session pool shared across agent runs
+        self._pool = MCPConnectionPool(
+            max_sessions=100,
+            idle_ttl=300,
+            max_lifetime=3600,
+        )
         self._encryption_service = EncryptionService()
-        self._max_connections = 100  # Maximum connections to keep in memory
-        self._connection_ttl = 3600  # 1 hour TTL for connections
 
-    async def connect_server(self, mcp_config: Dict[str, Any], external_user_id: Optional[str] = None) -> MCPConnection:
+    async def connect_server(self, mcp_config: Dict[str, Any], external_user_id: Optional[str] = None, account_id: Optional[str] = None) -> MCPConnection:
+        request = self._build_request(mcp_config, external_user_id)
+        return await self._connect_server_internal(request, account_id)
+    
+    @staticmethod
+    def get_enabled_tools(mcp_config: Dict[str, Any]) -> List[str]:
+        """Tools an agent's MCP config enables. Pooled sessions are shared across agents and
+        runs, so this is always read from the caller's config, never from the session."""
+        return mcp_config.get('enabledTools', mcp_config.get('enabled_tools', []))
+    
+    def _build_request(self, mcp_config: Dict[str, Any], external_user_id: Optional[str] = None) -> MCPConnectionRequest:
         # Determine provider from type field
         provider = mcp_config.get('type', mcp_config.get('provider', 'custom'))
         
-        request = MCPConnectionRequest(
+        return MCPConnectionRequest(
             qualified_name=mcp_config.get('qualifiedName', mcp_config.get('name', '')),
             name=mcp_config.get('name', ''),
             config=mcp_config.get('config', {}),
-            enabled_tools=mcp_config.get('enabledTools', mcp_config.get('enabled_tools', [])),
             provider=provider,  # Use the determined provider
-            external_user_id=external_user_id
+            external_user_id=external_user_id or mcp_config.get('external_user_id')
         )
-        return await self._connect_server_internal(request)
     
-    async def _connect_server_internal(self, request: MCPConnectionRequest) -> MCPConnection:
-        self._logger.debug(f"Connecting to MCP server: {request.qualified_name}")
+    async def _connect_server_internal(self, request: MCPConnectionRequest, account_id: Optional[str] = None) -> MCPConnection:
+        key = MCPConnectionPool.make_key(
+            account_id, request.qualified_name, request.provider, request.config, request.external_user_id
+        )
         
         try:
-            server_url = await self._get_server_url(request.qualified_name, request.config, request.provider)
-            headers = self._get_headers(request.qualified_name, request.config, request.provider, request.external_user_id)
-            
-            # Add debugging
-            self._logger.debug(f"MCP connection details - Provider: {request.provider}, URL: {server_url}, Headers: {headers}")
-            
-            # Add timeout to prevent hanging
-            async with asyncio.timeout(30):
-                async with streamablehttp_client(server_url, headers=headers) as (
-                    read_stream, write_stream, _
-                ):
-                    session = ClientSession(read_stream, write_stream)
-                    await session.initialize()
-                    
-                    tool_result = await session.list_tools()
-                    tools = tool_result.tools if tool_result else []
-                    
-                    connection = MCPConnection(
-                        qualified_name=request.qualified_name,
-                        name=request.name,
-                        config=request.config,
-                        enabled_tools=request.enabled_tools,
-                        provider=request.provider,
-                        external_user_id=request.external_user_id,
-                        session=session,
-                        tools=tools
-                    )
-                    
-                    # Store with timestamp for TTL tracking
-                    self._connections[request.qualified_name] = (connection, time())
-                    # Move to end (most recently used)
-                    self._connections.move_to_end(request.qualified_name)
-                    self._logger.debug(f"Connected to {request.qualified_name} ({len(tools)} tools available)")
-                    
-                    # Cleanup old connections
-                    await self._cleanup_old_connections()
-                    
-                    return connection
-                    
+            return await self._pool.get_or_connect(
+                key,
+                request.qualified_name,
+                account_id,
+                lambda stack: self._open_connection(request, stack),
+            )
         except asyncio.TimeoutError:
             error_msg = f"Connection timeout for {request.qualified_name} after 30 seconds"
             self._logger.error(error_msg)
             raise MCPConnectionError(error_msg)
+        except MCPConnectionError:
+            raise
         except Exception as e:
             self._logger.error(f"Failed to connect to {request.qualified_name}: {str(e)}")
             raise MCPConnectionError(f"Failed to connect to MCP server: {str(e)}")
     
-    async def connect_all(self, mcp_configs: List[Dict[str, Any]]) -> None:
-        requests = []
-        for config in mcp_configs:
-            # Determine provider from type field
-            provider = config.get('type', config.get('provider', 'custom'))
-            
-            request = MCPConnectionRequest(
-                qualified_name=config.get('qualifiedName', config.get('name', '')),
-                name=config.get('name', ''),
-                config=config.get('config', {}),
-                enabled_tools=config.get('enabledTools', config.get('enabled_tools', [])),
-                provider=provider,  # Use the determined provider
-                external_user_id=config.get('external_user_id')
-            )
-            requests.append(request)
+    async def _open_connection(self, request: MCPConnectionRequest, stack: AsyncExitStack) -> MCPConnection:
+        self._logger.debug(f"Connecting to MCP server: {request.qualified_name}")
         
-        for request in requests:
-            try:
-                await self._connect_server_internal(request)
-            except MCPConnectionError as e:
-                self._logger.error(f"Failed to connect to {request.qualified_name}: {str(e)}")
-                continue
+        server_url = await self._get_server_url(request.qualified_name, request.config, request.provider)
+        headers = self._get_headers(request.qualified_name, request.config, request.provider, request.external_user_id)
+        
+        self._logger.debug(f"MCP connection details - Provider: {request.provider}, URL: {server_url}")
+        
+        read_stream, write_stream, _ = await stack.enter_async_context(
+            streamablehttp_client(server_url, headers=headers)
+        )
+        session = await stack.enter_async_context(ClientSession(read_stream, write_stream))
+        await session.initialize()
+        
+        tool_result = await session.list_tools()
+        tools = tool_result.tools if tool_result else []
+        
+        self._logger.debug(f"Connected to {request.qualified_name} ({len(tools)} tools available)")
+        
+        return MCPConnection(
+            qualified_name=request.qualified_name,
+            name=request.name,
+            config=request.config,
+            provider=request.provider,
+            external_user_id=request.external_user_id,
+            session=session,
+            tools=tools
+        )
+    
+    async def connect_all(self, mcp_configs: List[Dict[str, Any]], account_id: Optional[str] = None) -> None:
+        requests = [self._build_request(config) for config in mcp_configs]
+        
+        results = await asyncio.gather(
+            *(self._connect_server_internal(request, account_id) for request in requests),
+            return_exceptions=True
+        )
+        for request, result in zip(requests, results):
+            if isinstance(result, MCPConnectionError):
+                self._logger.error(f"Failed to connect to {request.qualified_name}: {str(result)}")
+            elif isinstance(result, BaseException):
+                raise result
     
-    async def _cleanup_old_connections(self) -> None:
-        """Remove connections older than TTL or if over limit (LRU eviction)"""
-        now = time()
-        expired_names = []
-        
-        # Find expired connections
-        for name, (conn, created_at) in self._connections.items():
-            if now - created_at > self._connection_ttl:
-                expired_names.append(name)
-        
-        # Remove expired connections
-        for name in expired_names:
-            await self.disconnect_server(name)
-        
-        # Enforce LRU limit (remove oldest if over limit)
-        while len(self._connections) > self._max_connections:
-            oldest_name = next(iter(self._connections))
-            await self.disconnect_server(oldest_name)
+    async def evict_idle(self) -> None:
+        """Close pooled sessions that have been idle longer than the pool TTL"""
+        await self._pool.evict_idle()
     
     async def disconnect_server(self, qualified_name: str) -> None:
-        connection_data = self._connections.get(qualified_name)
-        if connection_data:
-            connection, _ = connection_data
-            if connection and connection.session:
-                try:
-                    await connection.session.close()
-                    self._logger.debug(f"Disconnected from {qualified_name}")
-                except Exception as e:
-                    self._logger.warning(f"Error disconnecting from {qualified_name}: {str(e)}")
-        
-        self._connections.pop(qualified_name, None)
+        await self._pool.close_by_name(qualified_name)
+        self._logger.debug(f"Disconnected from {qualified_name}")
     
     async def disconnect_all(self) -> None:
-        for qualified_name in list(self._connections.keys()):
-            await self.disconnect_server(qualified_name)
-        self._connections.clear()
+        await self._pool.close_all()
         self._logger.debug("Disconnected from all MCP servers")
     
-    def get_connection(self, qualified_name: str) -> Optional[MCPConnection]:
-        """Get connection, moving it to end (most recently used) for LRU"""
-        if qualified_name in self._connections:
-            connection_data = self._connections[qualified_name]
-            self._connections.move_to_end(qualified_name)  # Mark as recently used
-            return connection_data[0]  # Return connection, not tuple
-        return None
+    def is_connected(self, qualified_name: str, account_id: Optional[str] = None) -> bool:
+        return self._pool.find_by_name(qualified_name, account_id) is not None
+    
+    def get_connection(self, qualified_name: str, account_id: Optional[str] = None) -> Optional[MCPConnection]:
+        """Get a pooled connection, marking it as recently used"""
+        return self._pool.find_by_name(qualified_name, account_id)
     
-    def get_all_connections(self) -> List[MCPConnection]:
-        """Get all connections (without timestamps)"""
-        return [conn for conn, _ in self._connections.values()]
+    def get_all_connections(self, account_id: Optional[str] = None, qualified_name: Optional[str] = None) -> List[MCPConnection]:
+        """Get pooled connections visible to the given account"""
+        return self._pool.connections(account_id=account_id, qualified_name=qualified_name)
+
+    def get_pool_stats(self) -> Dict[str, Any]:
+        return self._pool.get_stats()
 
-    def get_all_tools_openapi(self) -> List[Dict[str, Any]]:
+    def get_all_tools_openapi(
+        self,
+        account_id: Optional[str] = None,
+        qualified_name: Optional[str] = None,
+        enabled_tools: Optional[List[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        tools = []
+        
+        for connection in self.get_all_connections(account_id, qualified_name):
+            tools.extend(self._tools_openapi(connection, enabled_tools))
+        
+        return tools
+    
+    def get_tools_openapi_for_configs(self, mcp_configs: List[Dict[str, Any]], account_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """OpenAPI schemas for the tools an agent's MCP configs enable, from its own servers only"""
+        tools = []
+        seen = set()
+        
+        for mcp_config in mcp_configs:
+            qualified_name = mcp_config.get('qualifiedName')
+            if not qualified_name or qualified_name in seen:
+                continue
+            seen.add(qualified_name)
+            
+            connection = self.get_connection(qualified_name, account_id)
+            if connection:
+                tools.extend(self._tools_openapi(connection, self.get_enabled_tools(mcp_config)))
+        
+        return tools
+    
+    def _tools_openapi(self, connection: MCPConnection, enabled_tools: Optional[List[str]]) -> List[Dict[str, Any]]:
         tools = []
         
-        for connection in self.get_all_connections():
-            if not connection.tools:
+        for tool in connection.tools or []:
+            if enabled_tools is not None and tool.name not in enabled_tools:
                 continue
             
-            for tool in connection.tools:
-                if tool.name not in connection.enabled_tools:
-                    continue
-                
-                openapi_tool = {
-                    "type": "function",
-                    "function": {
-                        "name": tool.name,
-                        "description": tool.description,
-                        "parameters": tool.inputSchema
-                    }
+            openapi_tool = {
+                "type": "function",
+                "function": {
+                    "name": tool.name,
+                    "description": tool.description,
+                    "parameters": tool.inputSchema
                 }
-                tools.append(openapi_tool)
+            }
+            tools.append(openapi_tool)
         
         return tools
     
-    async def execute_tool(self, tool_name: str, arguments: Dict[str, Any], external_user_id: Optional[str] = None) -> ToolExecutionResult:
+    async def call_tool(self, qualified_name: str, tool_name: str, arguments: Dict[str, Any], account_id: Optional[str] = None) -> Any:
+        connection = self.get_connection(qualified_name, account_id)
+        if not connection or not connection.session:
+            raise MCPToolExecutionError(f"No active session for MCP server: {qualified_name}")
+        
+        async with self._pool.use(connection):
+            return await connection.session.call_tool(tool_name, arguments)
+    
+    async def execute_tool(
+        self,
+        tool_name: str,
+        arguments: Dict[str, Any],
+        external_user_id: Optional[str] = None,
+        account_id: Optional[str] = None,
+        mcp_configs: Optional[List[Dict[str, Any]]] = None,
+    ) -> ToolExecutionResult:
         request = ToolExecutionRequest(
             tool_name=tool_name,
             arguments=arguments,
             external_user_id=external_user_id
         )
-        return await self._execute_tool_internal(request)
+        return await self._execute_tool_internal(request, account_id, mcp_configs or [])
     
-    async def _execute_tool_internal(self, request: ToolExecutionRequest) -> ToolExecutionResult:
+    async def _execute_tool_internal(self, request: ToolExecutionRequest, account_id: Optional[str], mcp_configs: List[Dict[str, Any]]) -> ToolExecutionResult:
         self._logger.debug(f"Executing tool: {request.tool_name}")
         
-        connection = self._find_tool_connection(request.tool_name)
+        allowed_servers = [
+            mcp_config.get('qualifiedName')
+            for mcp_config in mcp_configs
+            if request.tool_name in self.get_enabled_tools(mcp_config)
+        ]
+        if not allowed_servers:
+            raise MCPToolExecutionError(f"Tool not enabled: {request.tool_name}")
+        
+        connection = self._find_tool_connection(request.tool_name, account_id, allowed_servers)
         if not connection:
             raise MCPToolNotFoundError(f"Tool not found: {request.tool_name}")
         
         if not connection.session:
             raise MCPToolExecutionError(f"No active session for tool: {request.tool_name}")
         
-        # Note: _find_tool_connection already marks connection as recently used (LRU)
-        
-        if request.tool_name not in connection.enabled_tools:
-            raise MCPToolExecutionError(f"Tool not enabled: {request.tool_name}")
-        
         try:
-            result = await connection.session.call_tool(request.tool_name, request.arguments)
+            async with self._pool.use(connection):
+                result = await connection.session.call_tool(request.tool_name, request.arguments)
             
             self._logger.debug(f"Tool {request.tool_name} executed successfully")
             
@@ -323,15 +342,17 @@ class MCPService:
                 error=error_msg
             )
     
-    def _find_tool_connection(self, tool_name: str) -> Optional[MCPConnection]:
-        for connection in self.get_all_connections():
-            if not connection.tools:
-                continue
-            
-            for tool in connection.tools:
-                if tool.name == tool_name:
-                    return connection
+    def _find_tool_connection(self, tool_name: str, account_id: Optional[str], allowed_servers: List[str]) -> Optional[MCPConnection]:
+        # O(1) lookup via the tool-name index built when the session was pooled
+        connection = self._pool.find_by_tool(tool_name, account_id)
+        if connection and connection.qualified_name in allowed_servers:
+            return connection
         
+        # The index names another of the account's servers (e.g. one used by a different agent)
+        for qualified_name in allowed_servers:
+            connection = self.get_connection(qualified_name, account_id)
+            if connection and any(tool.name == tool_name for tool in connection.tools or []):
+                return connection
         return None
 
     async def discover_custom_tools(self, request_type: str, config: Dict[str, Any]) -> CustomMCPConnectionResult:
@@ -87,7 +87,7 @@ class NotificationService:
                 "task_url": task_url
             }
             
-            result = await self.novu.trigger_workflow(
+            queued = self.novu.enqueue_workflow(
                 workflow_id="task-completed",
                 subscriber_id=account_id,
                 payload=payload,
@@ -95,8 +95,8 @@ class NotificationService:
                 subscriber_name=account_info.get("name")
             )
             
-            logger.info(f"Task completion workflow triggered for account {account_id}: {result}")
-            return {"success": True, "result": result}
+            logger.info(f"Task completion workflow queued for account {account_id}: {queued}")
+            return {"success": queued, "queued": queued}
             
         except Exception as e:
             logger.error(f"Error triggering task completion notification: {str(e)}")
@@ -134,7 +134,7 @@ class NotificationService:
                 "failure_reason": failure_reason
             }
             
-            result = await self.novu.trigger_workflow(
+            queued = self.novu.enqueue_workflow(
                 workflow_id="task-failed",
                 subscriber_id=account_id,
                 payload=payload,
@@ -142,8 +142,8 @@ class NotificationService:
                 subscriber_name=account_info.get("name")
             )
             
-            logger.info(f"Task failed workflow triggered for account {account_id}: {result}")
-            return {"success": True, "result": result}
+            logger.info(f"Task failed workflow queued for account {account_id}: {queued}")
+            return {"success": queued, "queued": queued}
             
         except Exception as e:
             logger.error(f"Error triggering task failed notification: {str(e)}")
@@ -0,0 +1,140 @@
+"""
+Background dispatch of Novu workflow triggers.
+
+Callers enqueue a trigger and return immediately. A task on the running event
+loop drains the queue, waits up to FLUSH_INTERVAL for more events to arrive,
+drops duplicates (same workflow, subscriber and payload) and sends the batch
+with a single bulk trigger request.
+"""
+import asyncio
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, TYPE_CHECKING
+
+from core.utils.logger import logger
+
+if TYPE_CHECKING:
+    from .novu_service import NovuService
+
+# Novu accepts at most 100 events per bulk trigger
+BATCH_SIZE = 100
+FLUSH_INTERVAL = 0.25  # seconds
+MAX_QUEUED = 10000
+FLUSH_TIMEOUT = 10  # seconds
+
+
+@dataclass
+class QueuedTrigger:
+    workflow_id: str
+    subscriber_id: str
+    to: Dict[str, Any]
+    payload: Dict[str, Any]
+    overrides: Optional[Dict[str, Any]] = None
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+    def dedupe_key(self) -> str:
+        return json.dumps([self.workflow_id, self.subscriber_id, self.payload, self.overrides], sort_keys=True, default=str)
+
+
+class NovuDispatcher:
+    def __init__(self, novu: "NovuService"):
+        self._novu = novu
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stats = {
+            "enqueued": 0,
+            "dropped": 0,
+            "coalesced": 0,
+            "sent": 0,
+            "failed": 0,
+            "batches": 0,
+            "last_flush_latency_ms": None,
+            "max_flush_latency_ms": 0.0,
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self._stats, "queued": self._queue.qsize() if self._queue else 0}
+
+    def _ensure_worker(self) -> asyncio.Queue:
+        loop = asyncio.get_running_loop()
+        if self._queue is None or self._loop is not loop:
+            if self._queue is not None and not self._queue.empty():
+                logger.warning(f"Dropping {self._queue.qsize()} Novu triggers queued on a previous event loop")
+            self._queue = asyncio.Queue(maxsize=MAX_QUEUED)
+            self._loop = loop
+            self._worker = None
+        if self._worker is None or self._worker.done():
+            self._worker = loop.create_task(self._run())
+        return self._queue
+
+    def enqueue(self, trigger: QueuedTrigger) -> bool:
+        """Queue a trigger without waiting on the network. Must be called from the event loop."""
+        queue = self._ensure_worker()
+        try:
+            queue.put_nowait(trigger)
+        except asyncio.QueueFull:
+            self._stats["dropped"] += 1
+            logger.error(f"Novu dispatch queue full, dropping {trigger.workflow_id} for {trigger.subscriber_id}")
+            return False
+        self._stats["enqueued"] += 1
+        return True
+
+    async def flush(self, timeout: float = FLUSH_TIMEOUT) -> None:
+        """Wait until everything queued so far has been sent."""
+        if self._queue is None or self._loop is not asyncio.get_running_loop():
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Timed out flushing Novu dispatch queue ({self._queue.qsize()} pending)")
+
+    async def close(self) -> None:
+        await self.flush()
+        if self._worker is not None and not self._worker.done():
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        self._worker = None
+
+    async def _run(self) -> None:
+        queue = self._queue
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + FLUSH_INTERVAL
+            while len(batch) < BATCH_SIZE:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                await self._send(batch)
+            except Exception as e:
+                self._stats["failed"] += len(batch)
+                logger.error(f"Error dispatching {len(batch)} Novu triggers: {str(e)}")
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    async def _send(self, batch: List[QueuedTrigger]) -> None:
+        unique: Dict[str, QueuedTrigger] = {}
+        for trigger in batch:
+            unique.setdefault(trigger.dedupe_key(), trigger)
+        self._stats["coalesced"] += len(batch) - len(unique)
+        triggers = list(unique.values())
+
+        await self._novu.trigger_bulk(triggers)
+
+        latency_ms = (time.monotonic() - min(t.enqueued_at for t in batch)) * 1000
+        self._stats["sent"] += len(triggers)
+        self._stats["batches"] += 1
+        self._stats["last_flush_latency_ms"] = round(latency_ms, 1)
+        self._stats["max_flush_latency_ms"] = max(self._stats["max_flush_latency_ms"], round(latency_ms, 1))
+        logger.debug(f"Novu bulk trigger sent {len(triggers)} events ({len(batch) - len(triggers)} coalesced) in {latency_ms:.0f}ms")
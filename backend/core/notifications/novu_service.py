@@ -1,10 +1,28 @@
+import asyncio
+import hashlib
+import json
 import os
 from typing import Dict, List, Optional, Any
+import httpx
 import novu_py
 from novu_py import Novu
 from core.utils.logger import logger
 from core.utils.config import config, EnvMode
 from .models import NotificationChannel, NotificationEvent, NotificationPayload
+from .novu_dispatcher import NovuDispatcher, QueuedTrigger
+
+NOVU_TIMEOUT = 10  # seconds
+SUBSCRIBER_CACHE_TTL = 3600 * 24
+SUBSCRIBER_CACHE_PREFIX = "novu:subscriber"
+
+
+def _split_name(name: Optional[str]):
+    if not name:
+        return None, None
+    name_parts = name.split()
+    first_name = name_parts[0] if name_parts else None
+    last_name = " ".join(name_parts[1:]) if len(name_parts) > 1 else None
+    return first_name, last_name
 
 
 class NovuService:
@@ -12,6 +30,12 @@ class NovuService:
         self.enabled = config.ENV_MODE in [EnvMode.STAGING, EnvMode.PRODUCTION]
         self.api_key = os.getenv('NOVU_SECRET_KEY')
         self.backend_url = os.getenv('NOVU_BACKEND_URL', 'https://api.novu.co')
+        self.dispatcher = NovuDispatcher(self)
+        self._client: Optional[Novu] = None
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+        # user_id -> hash of the last profile upserted by this process
+        self._subscriber_hashes: Dict[str, str] = {}
         
         if not self.enabled:
             if self.api_key:
@@ -23,6 +47,33 @@ class NovuService:
         else:
             logger.info(f"Novu service initialized with backend URL: {self.backend_url}")
     
+    def _get_client(self) -> Novu:
+        """Long-lived client whose async HTTP pool is reused across calls on the same event loop."""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            self._http_client = httpx.AsyncClient(
+                timeout=NOVU_TIMEOUT,
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+            )
+            self._client = Novu(
+                server_url=self.backend_url,
+                secret_key=self.api_key,
+                async_client=self._http_client,
+            )
+            self._client_loop = loop
+        return self._client
+    
+    async def close(self) -> None:
+        await self.dispatcher.close()
+        if self._http_client is not None and self._client_loop is asyncio.get_running_loop():
+            await self._http_client.aclose()
+        self._client = None
+        self._http_client = None
+        self._client_loop = None
+    
+    def get_dispatch_stats(self) -> Dict[str, Any]:
+        return self.dispatcher.get_stats()
+    
     async def trigger_notification(
         self,
         event_name: str,
@@ -48,19 +99,6 @@ class NovuService:
                 name=subscriber_name
             )
             
-            to_kwargs = {
-                "subscriber_id": user_id,
-            }
-            
-            if subscriber_email:
-                to_kwargs["email"] = subscriber_email
-            
-            if subscriber_name:
-                name_parts = subscriber_name.split()
-                to_kwargs["first_name"] = name_parts[0] if name_parts else ""
-                if len(name_parts) > 1:
-                    to_kwargs["last_name"] = " ".join(name_parts[1:])
-            
             trigger_request = novu_py.TriggerEventRequestDto(
                 workflow_id=event_name,
                 to=user_id,
@@ -70,11 +108,7 @@ class NovuService:
             if override_channels:
                 trigger_request.overrides = override_channels
             
-            with Novu(
-                server_url=self.backend_url,
-                secret_key=self.api_key,
-            ) as novu:
-                response = novu.trigger(trigger_event_request_dto=trigger_request)
+            response = await self._get_client().trigger_async(trigger_event_request_dto=trigger_request)
             
             logger.info(f"Novu notification triggered: {event_name} for user {user_id}")
             
@@ -99,8 +133,10 @@ class NovuService:
         name: Optional[str] = None,
         phone: Optional[str] = None,
         avatar: Optional[str] = None,
-        data: Optional[Dict[str, Any]] = None
+        data: Optional[Dict[str, Any]] = None,
+        force: bool = False
     ) -> bool:
+        """Create or update a subscriber, skipping the call when the profile is unchanged since the last upsert."""
         if not self.enabled:
             return True
         
@@ -108,41 +144,39 @@ class NovuService:
             logger.error("Cannot upsert subscriber: NOVU_SECRET_KEY not configured")
             return False
         
+        first_name, last_name = _split_name(name)
+        profile_hash = hashlib.sha256(json.dumps(
+            [email, first_name, last_name, phone, avatar, data], sort_keys=True, default=str
+        ).encode()).hexdigest()
+        if not force and await self._get_subscriber_hash(user_id) == profile_hash:
+            logger.debug(f"Subscriber {user_id} unchanged, skipping upsert")
+            return True
+        
         try:
-            with Novu(
-                server_url=self.backend_url,
-                secret_key=self.api_key,
-            ) as novu:
-                first_name = None
-                last_name = None
-                if name:
-                    name_parts = name.split()
-                    first_name = name_parts[0] if name_parts else None
-                    if len(name_parts) > 1:
-                        last_name = " ".join(name_parts[1:])
-                
-                try:
-                    create_dto = novu_py.CreateSubscriberRequestDto(
-                        subscriber_id=user_id,
-                        email=email,
-                        first_name=first_name,
-                        last_name=last_name,
-                        phone=phone,
-                        avatar=avatar,
-                        data=data,
-                    )
-                    novu.subscribers.create(create_subscriber_request_dto=create_dto)
-                except Exception:
-                    patch_dto = novu_py.PatchSubscriberRequestDto(
-                        email=email,
-                        first_name=first_name,
-                        last_name=last_name,
-                        phone=phone,
-                        avatar=avatar,
-                        data=data,
-                    )
-                    novu.subscribers.patch(subscriber_id=user_id, patch_subscriber_request_dto=patch_dto)
+            novu = self._get_client()
+            try:
+                create_dto = novu_py.CreateSubscriberRequestDto(
+                    subscriber_id=user_id,
+                    email=email,
+                    first_name=first_name,
+                    last_name=last_name,
+                    phone=phone,
+                    avatar=avatar,
+                    data=data,
+                )
+                await novu.subscribers.create_async(create_subscriber_request_dto=create_dto)
+            except Exception:
+                patch_dto = novu_py.PatchSubscriberRequestDto(
+                    email=email,
+                    first_name=first_name,
+                    last_name=last_name,
+                    phone=phone,
+                    avatar=avatar,
+                    data=data,
+                )
+                await novu.subscribers.patch_async(subscriber_id=user_id, patch_subscriber_request_dto=patch_dto)
             
+            await self._set_subscriber_hash(user_id, profile_hash)
             logger.debug(f"Subscriber upserted: {user_id}")
             return True
             
@@ -150,6 +184,33 @@ class NovuService:
             logger.error(f"Error upserting subscriber {user_id}: {str(e)}")
             return False
     
+    async def _get_subscriber_hash(self, user_id: str) -> Optional[str]:
+        cached = self._subscriber_hashes.get(user_id)
+        if cached:
+            return cached
+        try:
+            from core.services import redis
+            return await redis.get(f"{SUBSCRIBER_CACHE_PREFIX}:{user_id}")
+        except Exception as e:
+            logger.debug(f"Subscriber cache read failed for {user_id}: {e}")
+            return None
+    
+    async def _set_subscriber_hash(self, user_id: str, profile_hash: str) -> None:
+        self._subscriber_hashes[user_id] = profile_hash
+        try:
+            from core.services import redis
+            await redis.set(f"{SUBSCRIBER_CACHE_PREFIX}:{user_id}", profile_hash, ex=SUBSCRIBER_CACHE_TTL)
+        except Exception as e:
+            logger.debug(f"Subscriber cache write failed for {user_id}: {e}")
+    
+    async def _forget_subscriber(self, user_id: str) -> None:
+        self._subscriber_hashes.pop(user_id, None)
+        try:
+            from core.services import redis
+            await redis.delete(f"{SUBSCRIBER_CACHE_PREFIX}:{user_id}")
+        except Exception as e:
+            logger.debug(f"Subscriber cache delete failed for {user_id}: {e}")
+    
     async def update_subscriber_credentials(
         self,
         user_id: str,
@@ -208,21 +269,17 @@ class NovuService:
             return False
         
         try:
-            with Novu(
-                server_url=self.backend_url,
-                secret_key=self.api_key,
-            ) as novu:
-                update_data = {}
-                if channel:
-                     update_data = {"channel": {channel: enabled}}
-                else:
-                     update_data = {"enabled": enabled}
+            update_data = {}
+            if channel:
+                 update_data = {"channel": {channel: enabled}}
+            else:
+                 update_data = {"enabled": enabled}
 
-                novu.subscribers.preferences.update(
-                    subscriber_id=user_id,
-                    workflow_id=template_id,
-                    update_subscriber_preference_request_dto=update_data
-                )
+            await self._get_client().subscribers.preferences.update_async(
+                subscriber_id=user_id,
+                workflow_id=template_id,
+                update_subscriber_preference_request_dto=update_data
+            )
             logger.info(f"Updated preference for subscriber {user_id}, template {template_id}")
             return True
             
@@ -239,11 +296,8 @@ class NovuService:
             return False
         
         try:
-            with Novu(
-                server_url=self.backend_url,
-                secret_key=self.api_key,
-            ) as novu:
-                novu.subscribers.delete(subscriber_id=user_id)
+            await self._get_client().subscribers.delete_async(subscriber_id=user_id)
+            await self._forget_subscriber(user_id)
             logger.info(f"Subscriber deleted: {user_id}")
             return True
             
@@ -260,12 +314,7 @@ class NovuService:
             return None
         
         try:
-            with Novu(
-                server_url=self.backend_url,
-                secret_key=self.api_key,
-            ) as novu:
-                response = novu.subscribers.retrieve(subscriber_id=user_id)
-            return response
+            return await self._get_client().subscribers.retrieve_async(subscriber_id=user_id)
             
         except Exception as e:
             logger.error(f"Error getting subscriber {user_id}: {str(e)}")
@@ -290,29 +339,82 @@ class NovuService:
             return False
         
         try:
-            with Novu(
-                server_url=self.backend_url,
-                secret_key=self.api_key,
-            ) as novu:
-                response = novu.trigger(
-                    trigger_event_request_dto=novu_py.TriggerEventRequestDto(
-                        workflow_id=workflow_id,
-                        to={
-                            "subscriber_id": subscriber_id,
-                            "email": subscriber_email,
-                            "name": subscriber_name,
-                            "avatar": avatar
-                        },
-                        payload=payload,
-                        overrides=overrides
-                    )
+            return await self._get_client().trigger_async(
+                trigger_event_request_dto=novu_py.TriggerEventRequestDto(
+                    workflow_id=workflow_id,
+                    to=self._subscriber_to(subscriber_id, subscriber_email, subscriber_name, avatar),
+                    payload=payload,
+                    overrides=overrides
                 )
-
-            return response
+            )
             
         except Exception as e:
             logger.error(f"Error triggering workflow {workflow_id}: {str(e)}")
             return False
+    
+    def enqueue_workflow(
+        self,
+        workflow_id: str,
+        subscriber_id: str,
+        payload: Optional[Dict[str, Any]] = None,
+        subscriber_email: Optional[str] = None,
+        subscriber_name: Optional[str] = None,
+        avatar: Optional[str] = None,
+        overrides: Optional[Dict[str, Any]] = None,
+    ) -> bool:
+        """
+        Queue a workflow trigger for the background dispatcher and return immediately.
+        
+        Triggers are coalesced and sent in bulk; use trigger_workflow when the
+        caller needs Novu's response.
+        
+        Returns:
+            True if the trigger was queued
+        """
+        if not self.enabled:
+            logger.error(f"❌ Workflow skipped (Novu disabled in {config.ENV_MODE.value} mode): {workflow_id} - Set ENV_MODE to 'staging' or 'production' to enable")
+            return False
+        
+        if not self.api_key:
+            logger.error("❌ Cannot trigger workflow: NOVU_SECRET_KEY not configured")
+            return False
+        
+        return self.dispatcher.enqueue(QueuedTrigger(
+            workflow_id=workflow_id,
+            subscriber_id=subscriber_id,
+            to=self._subscriber_to(subscriber_id, subscriber_email, subscriber_name, avatar),
+            payload=payload or {},
+            overrides=overrides,
+        ))
+    
+    async def trigger_bulk(self, triggers: List[QueuedTrigger]) -> Any:
+        return await self._get_client().trigger_bulk_async(
+            bulk_trigger_event_dto=novu_py.BulkTriggerEventDto(
+                events=[
+                    novu_py.TriggerEventRequestDto(
+                        workflow_id=trigger.workflow_id,
+                        to=trigger.to,
+                        payload=trigger.payload,
+                        overrides=trigger.overrides
+                    )
+                    for trigger in triggers
+                ]
+            )
+        )
+    
+    @staticmethod
+    def _subscriber_to(
+        subscriber_id: str,
+        subscriber_email: Optional[str],
+        subscriber_name: Optional[str],
+        avatar: Optional[str],
+    ) -> Dict[str, Any]:
+        return {
+            "subscriber_id": subscriber_id,
+            "email": subscriber_email,
+            "name": subscriber_name,
+            "avatar": avatar
+        }
 
     async def register_push_token(
         self,
@@ -1,61 +1,130 @@
-from datetime import datetime, timezone, timedelta
-from typing import Optional, Tuple, Any, Dict, List
+import json
+import time
+from datetime import datetime, timezone
+from typing import Optional, Any, Dict, List
 from core.utils.logger import logger
 from core.utils.config import config
-from core.services.supabase import DBConnection
+
+SESSION_KEY_PREFIX = "presence:session"
+ACCOUNT_KEY_PREFIX = "presence:account"
+THREAD_KEY_PREFIX = "presence:thread"
+
+# Every key a script touches is declared in KEYS. The session's previous thread lives
+# inside the session hash, so callers read it first and pass its set as a key; if the
+# session moved threads in between, the script changes nothing and returns
+# _THREAD_CHANGED so the caller can re-read and retry.
+_THREAD_CHANGED = -1
+_THREAD_MOVE_ATTEMPTS = 3
+
+# Records a heartbeat atomically. Rejects updates older than the session's last
+# client timestamp, moves the session between thread sets when the active thread
+# changes, and prunes expired members from the sets it touches.
+# KEYS: session, account set, new thread set, previous thread set
+# ARGV: session_id, account_id, thread_id, platform, client_ts (epoch, "" if unknown),
+#       client_timestamp, now (epoch), device_info (JSON), session TTL,
+#       previous thread_id ("" if none)
+_HEARTBEAT_SCRIPT = """
+local existing = redis.call('HMGET', KEYS[1], 'active_thread_id', 'client_ts')
+local client_ts = tonumber(ARGV[5])
+local existing_ts = tonumber(existing[2])
+if client_ts and existing_ts and client_ts < existing_ts then
+    return 0
+end
+
+local old_thread = existing[1] or ''
+if old_thread ~= ARGV[10] then
+    return -1
+end
+
+local now = tonumber(ARGV[7])
+local ttl = tonumber(ARGV[9])
+local member = ARGV[2] .. ':' .. ARGV[1]
+if old_thread ~= '' and old_thread ~= ARGV[3] then
+    redis.call('ZREM', KEYS[4], member)
+end
+
+redis.call('HSET', KEYS[1],
+    'account_id', ARGV[2], 'active_thread_id', ARGV[3], 'platform', ARGV[4],
+    'client_ts', ARGV[5] ~= '' and ARGV[5] or (existing_ts and existing[2] or ''),
+    'client_timestamp', ARGV[6], 'last_seen', ARGV[7], 'device_info', ARGV[8])
+redis.call('EXPIRE', KEYS[1], ttl)
+
+redis.call('ZADD', KEYS[2], now, ARGV[1])
+redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', now - ttl)
+redis.call('EXPIRE', KEYS[2], ttl)
+
+if ARGV[3] ~= '' then
+    redis.call('ZADD', KEYS[3], now, member)
+    redis.call('ZREMRANGEBYSCORE', KEYS[3], '-inf', now - ttl)
+    redis.call('EXPIRE', KEYS[3], ttl)
+end
+return 1
+"""
+
+# KEYS: session, account set, current thread set
+# ARGV: session_id, account_id, current thread_id ("" if none)
+_CLEAR_SCRIPT = """
+local thread_id = redis.call('HGET', KEYS[1], 'active_thread_id') or ''
+if thread_id ~= ARGV[3] then
+    return -1
+end
+if thread_id ~= '' then
+    redis.call('ZREM', KEYS[3], ARGV[2] .. ':' .. ARGV[1])
+end
+redis.call('ZREM', KEYS[2], ARGV[1])
+return redis.call('DEL', KEYS[1])
+"""
+
+
+def _session_key(session_id: str) -> str:
+    return f"{SESSION_KEY_PREFIX}:{session_id}"
+
+
+def _account_key(account_id: str) -> str:
+    return f"{ACCOUNT_KEY_PREFIX}:{account_id}"
+
+
+def _thread_key(thread_id: str) -> str:
+    return f"{THREAD_KEY_PREFIX}:{thread_id}"
+
+
+def _to_iso(epoch: float) -> str:
+    return datetime.fromtimestamp(epoch, timezone.utc).isoformat()
+
 
 class PresenceService:
+    """
+    Presence tracking in Redis.
+
+    Each session is a hash that expires after stale_session_threshold_minutes
+    without a heartbeat. Sessions are indexed by last-seen time in a sorted set
+    per account and per thread, so heartbeats and "is viewing thread" checks are
+    single round trips and expired entries age out without sweeps.
+    """
+
     def __init__(self):
-        self.db = DBConnection()
         self.activity_threshold_minutes = 2
         self.stale_session_threshold_minutes = 5
-    
-    async def _fetch_session(self, session_id: str):
-        client = await self.db.client
-        return await client.table('user_presence_sessions').select('*').eq(
-            'session_id', session_id
-        ).maybe_single().execute()
 
-    async def _upsert_session(
-        self,
-        session_id: str,
-        account_id: str,
-        active_thread_id: Optional[str],
-        platform: str,
-        client_timestamp: Optional[str],
-        device_info: Optional[Dict] = None
-    ) -> Tuple[Any, str]:
-        client = await self.db.client
-        now = datetime.now(timezone.utc).isoformat()
-        payload = {
-            'session_id': session_id,
-            'account_id': account_id,
-            'active_thread_id': active_thread_id,
-            'last_seen': now,
-            'platform': platform,
-            'device_info': device_info or {},
-            'client_timestamp': client_timestamp or now,
-            'updated_at': now
-        }
-        result = await client.table('user_presence_sessions').upsert(payload).execute()
-        return result, now
-
-    async def _delete_session(self, session_id: str):
-        client = await self.db.client
-        await client.table('user_presence_sessions').delete().eq(
-            'session_id', session_id
-        ).execute()
-
-    def _is_stale(self, client_timestamp: Optional[str], existing_timestamp: Optional[str]) -> bool:
-        if not client_timestamp or not existing_timestamp:
-            return False
+    @property
+    def _session_ttl(self) -> int:
+        return self.stale_session_threshold_minutes * 60
+
+    async def _get_client(self):
+        from core.services import redis
+        return await redis.get_client()
+
+    async def _get_active_thread(self, client, session_id: str) -> str:
+        return await client.hget(_session_key(session_id), 'active_thread_id') or ""
+
+    def _parse_client_timestamp(self, client_timestamp: Optional[str]) -> str:
+        if not client_timestamp:
+            return ""
         try:
-            existing_dt = datetime.fromisoformat(existing_timestamp.replace('Z', '+00:00'))
-            client_dt = datetime.fromisoformat(client_timestamp.replace('Z', '+00:00'))
-            return client_dt < existing_dt
+            return repr(datetime.fromisoformat(client_timestamp.replace('Z', '+00:00')).timestamp())
         except Exception as e:
-            logger.error(f"Presence timestamp compare error: {str(e)}")
-            return False
+            logger.error(f"Presence timestamp parse error: {str(e)}")
+            return ""
 
     async def update_presence(
         self,
@@ -70,35 +139,35 @@ class PresenceService:
             return True
         
         try:
-            existing = await self._fetch_session(session_id)
-            existing_data = existing.data if existing and existing.data else None
-            
-            is_new_session = not existing_data
+            now = time.time()
+            client = await self._get_client()
+            client_ts = self._parse_client_timestamp(client_timestamp)
+            for _ in range(_THREAD_MOVE_ATTEMPTS):
+                previous_thread_id = await self._get_active_thread(client, session_id)
+                accepted = await client.eval(
+                    _HEARTBEAT_SCRIPT, 4,
+                    _session_key(session_id), _account_key(account_id),
+                    _thread_key(active_thread_id or ""), _thread_key(previous_thread_id),
+                    session_id, account_id, active_thread_id or "", platform or "",
+                    client_ts, client_timestamp or _to_iso(now),
+                    repr(now), json.dumps(device_info or {}), self._session_ttl, previous_thread_id
+                )
+                if accepted != _THREAD_CHANGED:
+                    break
+            else:
+                logger.warning(f"Presence for session {session_id} kept changing threads, dropping heartbeat")
+                return False
 
-            if existing_data and self._is_stale(client_timestamp, existing_data.get('client_timestamp')):
+            if not accepted:
                 logger.warning(
-                    f"Rejecting stale presence update for session {session_id}: "
-                    f"client={client_timestamp}, existing={existing_data.get('client_timestamp')}"
+                    f"Rejecting stale presence update for session {session_id}: client={client_timestamp}"
                 )
                 return True
 
-            result, last_seen = await self._upsert_session(
-                session_id=session_id,
-                account_id=account_id,
-                active_thread_id=active_thread_id,
-                platform=platform,
-                client_timestamp=client_timestamp,
-                device_info=device_info
-            )
-
             logger.debug(
-                f"Presence upserted for session {session_id}, "
+                f"Presence updated for session {session_id}, "
                 f"account {account_id}, thread {active_thread_id}"
             )
-            
-            if is_new_session:
-                await self.cleanup_stale_sessions(account_id)
-
             return True
             
         except Exception as e:
@@ -110,7 +179,19 @@ class PresenceService:
             return True
         
         try:
-            await self._delete_session(session_id)
+            client = await self._get_client()
+            for _ in range(_THREAD_MOVE_ATTEMPTS):
+                thread_id = await self._get_active_thread(client, session_id)
+                cleared = await client.eval(
+                    _CLEAR_SCRIPT, 3,
+                    _session_key(session_id), _account_key(account_id), _thread_key(thread_id),
+                    session_id, account_id, thread_id
+                )
+                if cleared != _THREAD_CHANGED:
+                    break
+            else:
+                logger.warning(f"Presence for session {session_id} kept changing threads, not cleared")
+                return False
             logger.debug(f"Presence cleared for session {session_id}, account {account_id}")
             return True
         except Exception as e:
@@ -118,23 +199,14 @@ class PresenceService:
             return False
     
     async def cleanup_stale_sessions(self, account_id: Optional[str] = None) -> int:
-        if config.DISABLE_PRESENCE:
+        """Drop expired sessions from an account's index. Session keys expire on their own."""
+        if config.DISABLE_PRESENCE or not account_id:
             return 0
         
         try:
-            client = await self.db.client
-            threshold = datetime.now(timezone.utc) - timedelta(minutes=self.stale_session_threshold_minutes)
-            
-            query = client.table('user_presence_sessions').delete().lt('last_seen', threshold.isoformat())
-            
-            if account_id:
-                query = query.eq('account_id', account_id)
-                logger.debug(f"Cleaning up stale sessions for account {account_id}")
-            else:
-                logger.debug("Cleaning up all stale sessions")
-            
-            result = await query.execute()
-            count = len(result.data) if result.data else 0
+            client = await self._get_client()
+            threshold = time.time() - self._session_ttl
+            count = await client.zremrangebyscore(_account_key(account_id), '-inf', threshold)
             
             if count > 0:
                 logger.info(f"Cleaned up {count} stale presence sessions")
@@ -150,19 +222,11 @@ class PresenceService:
             return False
         
         try:
-            client = await self.db.client
-            result = await client.table('user_presence_sessions').select('*').eq(
-                'account_id', account_id
-            ).eq('active_thread_id', thread_id).execute()
-            
-            if not result.data:
-                return False
-            
-            threshold = datetime.now(timezone.utc) - timedelta(minutes=self.activity_threshold_minutes)
-            return any(
-                datetime.fromisoformat(session['last_seen'].replace('Z', '+00:00')) > threshold
-                for session in result.data
-            )
+            client = await self._get_client()
+            threshold = time.time() - self.activity_threshold_minutes * 60
+            members = await client.zrangebyscore(_thread_key(thread_id), f"({threshold}", '+inf')
+            prefix = f"{account_id}:"
+            return any(member.startswith(prefix) for member in members)
         except Exception as e:
             logger.error(f"Error checking account presence: {str(e)}")
             return False
@@ -172,9 +236,30 @@ class PresenceService:
             return []
         
         try:
-            client = await self.db.client
-            result = await client.rpc('get_thread_viewers', {'thread_id_param': thread_id}).execute()
-            return result.data if result.data else []
+            client = await self._get_client()
+            threshold = time.time() - self.activity_threshold_minutes * 60
+            members = await client.zrangebyscore(_thread_key(thread_id), f"({threshold}", '+inf', withscores=True)
+            if not members:
+                return []
+
+            async with client.pipeline(transaction=False) as pipe:
+                for member, _ in members:
+                    pipe.hget(_session_key(member.split(':', 1)[1]), 'platform')
+                platforms = await pipe.execute()
+
+            viewers: Dict[str, Dict[str, Any]] = {}
+            for (member, last_seen), platform in zip(members, platforms):
+                account_id = member.split(':', 1)[0]
+                viewer = viewers.setdefault(account_id, {
+                    "account_id": account_id, "last_seen": last_seen, "platform": platform, "session_count": 0
+                })
+                viewer["session_count"] += 1
+                viewer["last_seen"] = max(viewer["last_seen"], last_seen)
+                viewer["platform"] = max(filter(None, [viewer["platform"], platform]), default=None)
+
+            for viewer in viewers.values():
+                viewer["last_seen"] = _to_iso(viewer["last_seen"])
+            return list(viewers.values())
         except Exception as e:
             logger.error(f"Error getting thread viewers: {str(e)}")
             return []
@@ -184,9 +269,28 @@ class PresenceService:
             return []
         
         try:
-            client = await self.db.client
-            result = await client.rpc('get_account_active_threads', {'account_id_param': account_id}).execute()
-            return result.data if result.data else []
+            client = await self._get_client()
+            threshold = time.time() - self.activity_threshold_minutes * 60
+            sessions = await client.zrangebyscore(_account_key(account_id), f"({threshold}", '+inf', withscores=True)
+            if not sessions:
+                return []
+
+            async with client.pipeline(transaction=False) as pipe:
+                for session_id, _ in sessions:
+                    pipe.hget(_session_key(session_id), 'active_thread_id')
+                thread_ids = await pipe.execute()
+
+            threads: Dict[str, Dict[str, Any]] = {}
+            for (_, last_seen), thread_id in zip(sessions, thread_ids):
+                if not thread_id:
+                    continue
+                thread = threads.setdefault(thread_id, {"thread_id": thread_id, "session_count": 0, "last_seen": last_seen})
+                thread["session_count"] += 1
+                thread["last_seen"] = max(thread["last_seen"], last_seen)
+
+            for thread in threads.values():
+                thread["last_seen"] = _to_iso(thread["last_seen"])
+            return list(threads.values())
         except Exception as e:
             logger.error(f"Error getting account active threads: {str(e)}")
             return []
@@ -1,3 +1,5 @@
+import sys
+
 CORE_SYSTEM_PROMPT = """
 You are Prophet, an autonomous AI Worker created by the Milo team (prophet.build).
 
@@ -138,12 +140,12 @@ Style: Conversational and natural. Ask for clarification when needed. No permiss
 
 
 def get_core_system_prompt() -> str:
-    try:
-        import run_agent_background
-        if run_agent_background._STATIC_CORE_PROMPT:
-            return run_agent_background._STATIC_CORE_PROMPT
-    except (ImportError, AttributeError):
-        pass
+    # Only reuse the worker's boot-time copy if the worker module is already loaded;
+    # importing it here would pull the whole agent runtime into the caller
+    worker_module = sys.modules.get("run_agent_background")
+    static_prompt = getattr(worker_module, "_STATIC_CORE_PROMPT", None)
+    if static_prompt:
+        return static_prompt
     
     return CORE_SYSTEM_PROMPT
 
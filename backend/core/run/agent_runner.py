@@ -95,13 +95,12 @@ class AgentRunner:
                 logger.info("⚠️ [ENRICHMENT] Cancelled before starting")
                 return
             
-            from core.runtime_cache import get_cached_project_metadata, set_cached_project_metadata
+            from core.runtime_cache import get_or_load_project_metadata
             
-            cached_project = await get_cached_project_metadata(self.config.project_id)
-            if not cached_project:
-                project = await self.client.table('projects').select('project_id, sandbox').eq('project_id', self.config.project_id).execute()
-                if project.data:
-                    await set_cached_project_metadata(self.config.project_id, project.data[0].get('sandbox', {}))
+            try:
+                await get_or_load_project_metadata(self.config.project_id, self._load_project_sandbox)
+            except ValueError as e:
+                logger.warning(f"⚠️ [ENRICHMENT] {e}")
             
             if hasattr(self.thread_manager, 'mcp_loader') and self.thread_manager.mcp_loader:
                 if len(self.thread_manager.mcp_loader.tool_map) == 0:
@@ -189,26 +188,14 @@ class AgentRunner:
             self.account_id = self.config.account_id
             
             q_start = time.time()
-            from core.runtime_cache import get_cached_project_metadata, set_cached_project_metadata
+            from core.runtime_cache import get_or_load_project_metadata
             
-            cached_project = await get_cached_project_metadata(self.config.project_id)
-            if cached_project:
-                project_data = cached_project
-                logger.debug(f"⏱️ [TIMING] ⚡ Project from cache: {(time.time() - q_start) * 1000:.1f}ms")
-            else:
-                project = await self.client.table('projects').select('project_id, sandbox').eq('project_id', self.config.project_id).execute()
-                
-                if not project.data or len(project.data) == 0:
-                    raise ValueError(f"Project {self.config.project_id} not found")
-                
-                project_data = project.data[0]
-                
-                await set_cached_project_metadata(self.config.project_id, project_data.get('sandbox', {}))
-                logger.debug(f"⏱️ [TIMING] Project query + cache set: {(time.time() - q_start) * 1000:.1f}ms")
+            project_data = await get_or_load_project_metadata(self.config.project_id, self._load_project_sandbox)
+            logger.debug(f"⏱️ [TIMING] Project metadata: {(time.time() - q_start) * 1000:.1f}ms")
         else:
             parallel_start = time.time()
             
-            from core.runtime_cache import get_cached_project_metadata, set_cached_project_metadata
+            from core.runtime_cache import set_cached_project_metadata
             
             thread_query = self.client.table('threads').select('account_id').eq('thread_id', self.config.thread_id).execute()
             project_query = self.client.table('projects').select('project_id, sandbox').eq('project_id', self.config.project_id).execute()
@@ -237,6 +224,14 @@ class AgentRunner:
         
         logger.debug(f"⏱️ [TIMING] setup() total: {(time.time() - setup_start) * 1000:.1f}ms")
     
+    async def _load_project_sandbox(self) -> Dict[str, Any]:
+        project = await self.client.table('projects').select('project_id, sandbox').eq('project_id', self.config.project_id).execute()
+        
+        if not project.data or len(project.data) == 0:
+            raise ValueError(f"Project {self.config.project_id} not found")
+        
+        return project.data[0].get('sandbox', {})
+    
     def setup_tools(self):
         start = time.time()
         
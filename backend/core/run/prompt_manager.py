@@ -1,8 +1,10 @@
 import os
 import json
 import asyncio
+import hashlib
 import datetime
-from typing import Optional
+from collections import OrderedDict
+from typing import Optional, Tuple
 from core.tools.mcp_tool_wrapper import MCPToolWrapper
 from core.agentpress.tool import SchemaType
 from core.prompts.agent_builder_prompt import get_agent_builder_prompt
@@ -11,6 +13,31 @@ from core.prompts.core_prompt import get_dynamic_system_prompt
 from core.tools.tool_guide_registry import get_minimal_tool_index
 from core.utils.logger import logger
 
+# Static prompt prefixes keyed by a hash of everything that feeds them
+# (agent version, prompt text, tool set, MCP tool schemas). Volatile segments are never cached.
+_STATIC_PREFIX_CACHE_MAX = 256
+_static_prefix_cache: "OrderedDict[str, Tuple[str, str]]" = OrderedDict()
+_static_prefix_stats = {"hits": 0, "misses": 0}
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def get_prompt_cache_stats() -> dict:
+    return {
+        "entries": len(_static_prefix_cache),
+        "hits": _static_prefix_stats["hits"],
+        "misses": _static_prefix_stats["misses"],
+    }
+
+
+def clear_prompt_cache():
+    _static_prefix_cache.clear()
+    _static_prefix_stats["hits"] = 0
+    _static_prefix_stats["misses"] = 0
+
+
 class PromptManager:
     @staticmethod
     async def build_minimal_prompt(agent_config: Optional[dict], tool_registry=None, mcp_loader=None) -> dict:
@@ -22,11 +49,6 @@ class PromptManager:
             from core.prompts.core_prompt import get_core_system_prompt
             content = get_core_system_prompt()
         
-        now = datetime.datetime.now(datetime.timezone.utc)
-        content += f"\n\n=== CURRENT DATE/TIME ===\n"
-        content += f"Today's date: {now.strftime('%A, %B %d, %Y')}\n"
-        content += f"Current time: {now.strftime('%H:%M UTC')}\n"
-        
         content += """
 
 ⚠️ BOOTSTRAP MODE - FAST START:
@@ -52,6 +74,12 @@ If relevant context seems missing, ask a clarifying question.
         
         content = await PromptManager._append_jit_mcp_info(content, mcp_loader)
         
+        # Keep the time last so the bootstrap text and tool index stay a stable cacheable prefix
+        now = datetime.datetime.now(datetime.timezone.utc)
+        content += f"\n\n=== CURRENT DATE/TIME ===\n"
+        content += f"Today's date: {now.strftime('%A, %B %d, %Y')}\n"
+        content += f"Current time: {now.strftime('%H:%M UTC')}\n"
+        
         return {"role": "system", "content": content}
     
     @staticmethod
@@ -65,30 +93,115 @@ If relevant context seems missing, ask a clarifying question.
                                   use_dynamic_tools: bool = True,
                                   mcp_loader=None) -> dict:
         
-        system_content = PromptManager._build_base_prompt(use_dynamic_tools)
-        system_content = PromptManager._append_agent_system_prompt(system_content, agent_config, use_dynamic_tools)
-        system_content = await PromptManager._append_builder_tools_prompt(system_content, agent_config)
+        kb_task = asyncio.create_task(PromptManager._fetch_knowledge_base(agent_config, client))
+        user_context_task = asyncio.create_task(PromptManager._fetch_user_context_data(user_id, client))
         
-        kb_task = PromptManager._fetch_knowledge_base(agent_config, client)
-        user_context_task = PromptManager._fetch_user_context_data(user_id, client)
-        
-        system_content = PromptManager._append_mcp_tools_info(system_content, agent_config, mcp_wrapper_instance)
-        system_content = await PromptManager._append_jit_mcp_info(system_content, mcp_loader)
-        system_content = PromptManager._append_xml_tool_calling_instructions(system_content, xml_tool_calling, tool_registry)
-        system_content = PromptManager._append_datetime_info(system_content)
+        system_content, prefix_hash = await PromptManager._get_static_prefix(
+            agent_config, mcp_wrapper_instance, tool_registry,
+            xml_tool_calling, use_dynamic_tools, mcp_loader
+        )
         
         kb_data, user_context_data = await asyncio.gather(kb_task, user_context_task)
         
+        # Volatile segments go after the static prefix, most volatile last
         if kb_data:
             system_content += kb_data
         
         if user_context_data:
             system_content += user_context_data
         
+        system_content = PromptManager._append_datetime_info(system_content)
+        
+        logger.info(f"🔑 [PROMPT PREFIX] thread={thread_id} model={model_name} prefix_hash={prefix_hash[:16]}")
         PromptManager._log_prompt_stats(system_content, use_dynamic_tools)
         
         return {"role": "system", "content": system_content}
     
+    @staticmethod
+    async def _get_static_prefix(agent_config: Optional[dict],
+                                 mcp_wrapper_instance: Optional[MCPToolWrapper],
+                                 tool_registry,
+                                 xml_tool_calling: bool,
+                                 use_dynamic_tools: bool,
+                                 mcp_loader) -> Tuple[str, str]:
+        cache_key = await PromptManager._static_prefix_key(
+            agent_config, mcp_wrapper_instance, tool_registry,
+            xml_tool_calling, use_dynamic_tools, mcp_loader
+        )
+        
+        cached = _static_prefix_cache.get(cache_key)
+        if cached is not None:
+            _static_prefix_cache.move_to_end(cache_key)
+            _static_prefix_stats["hits"] += 1
+            logger.debug(f"⚡ [PROMPT PREFIX] Cache hit for key {cache_key[:16]}")
+            return cached
+        
+        _static_prefix_stats["misses"] += 1
+        
+        system_content = PromptManager._build_base_prompt(use_dynamic_tools)
+        system_content = PromptManager._append_agent_system_prompt(system_content, agent_config, use_dynamic_tools)
+        system_content = await PromptManager._append_builder_tools_prompt(system_content, agent_config)
+        system_content = PromptManager._append_mcp_tools_info(system_content, agent_config, mcp_wrapper_instance)
+        system_content = await PromptManager._append_jit_mcp_info(system_content, mcp_loader)
+        system_content = PromptManager._append_xml_tool_calling_instructions(system_content, xml_tool_calling, tool_registry)
+        
+        entry = (system_content, _sha256(system_content))
+        _static_prefix_cache[cache_key] = entry
+        while len(_static_prefix_cache) > _STATIC_PREFIX_CACHE_MAX:
+            _static_prefix_cache.popitem(last=False)
+        
+        logger.debug(f"📦 [PROMPT PREFIX] Built static prefix for key {cache_key[:16]} ({len(system_content):,} chars)")
+        return entry
+    
+    @staticmethod
+    async def _static_prefix_key(agent_config: Optional[dict],
+                                 mcp_wrapper_instance: Optional[MCPToolWrapper],
+                                 tool_registry,
+                                 xml_tool_calling: bool,
+                                 use_dynamic_tools: bool,
+                                 mcp_loader) -> str:
+        agent_config = agent_config or {}
+        agentpress_tools = agent_config.get('agentpress_tools') or {}
+        
+        key_parts = {
+            "dynamic_tools": use_dynamic_tools,
+            "agent_id": agent_config.get('agent_id'),
+            "version_id": agent_config.get('current_version_id'),
+            "system_prompt": _sha256(agent_config.get('system_prompt') or ''),
+            "builder_tools": sorted(
+                tool for tool in ['agent_config_tool', 'mcp_search_tool', 'credential_profile_tool', 'trigger_tool']
+                if agentpress_tools.get(tool, False)
+            ),
+            "has_mcps": bool(agent_config.get('configured_mcps') or agent_config.get('custom_mcps')),
+        }
+        
+        if mcp_wrapper_instance and mcp_wrapper_instance._initialized:
+            try:
+                # Descriptions and parameters are rendered into the prompt, so a server-side
+                # schema change must produce a new key even when the tool names are unchanged
+                schemas = {
+                    name: [schema.schema for schema in schema_list]
+                    for name, schema_list in mcp_wrapper_instance.get_schemas().items()
+                }
+                key_parts["mcp_tools"] = _sha256(json.dumps(schemas, sort_keys=True, default=str))
+            except Exception:
+                key_parts["mcp_tools"] = None
+        
+        if mcp_loader:
+            try:
+                jit_tools = {}
+                for tool_name in await mcp_loader.get_available_tools() or []:
+                    tool_info = await mcp_loader.get_tool_info(tool_name)
+                    jit_tools[tool_name] = tool_info.toolkit_slug if tool_info else None
+                key_parts["jit_tools"] = jit_tools
+            except Exception:
+                key_parts["jit_tools"] = None
+        
+        if xml_tool_calling and tool_registry:
+            key_parts["xml_tools"] = sorted(tool_registry.tools.keys())
+        
+        return _sha256(json.dumps(key_parts, sort_keys=True, default=str))
+    
     @staticmethod
     def _build_base_prompt(use_dynamic_tools: bool) -> str:
         if use_dynamic_tools:
@@ -289,7 +402,7 @@ If relevant context seems missing, ask a clarifying question.
         if not openapi_schemas:
             return system_content
         
-        schemas_json = json.dumps(openapi_schemas, indent=2)
+        schemas_json = tool_registry.get_openapi_schemas_json()
         
         examples_content = f"""
 
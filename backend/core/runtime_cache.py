@@ -8,12 +8,285 @@ This module provides Redis-based caching for frequently accessed data:
 - Thread count (thread limit checks)
 
 All caches use explicit invalidation on data changes, with TTL as safety net.
+
+Agent configs, user MCPs and project metadata are read through get_or_load(),
+which protects Supabase from cache stampedes: concurrent misses share one
+in-flight load per process and one Redis lock across processes, entries are
+refreshed probabilistically before they expire, and recently expired values
+are served while a single caller revalidates them in the background.
 """
+import asyncio
+import copy
 import json
+import math
+import random
 import time
-from typing import Dict, Any, Optional
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional
 from core.utils.logger import logger
 
+# ============================================================================
+# SINGLE-FLIGHT LOADER - Stampede protection for expensive cache misses
+# ============================================================================
+_ENVELOPE_MARKER = "__rc"
+LOAD_LOCK_TTL = 30  # seconds - upper bound on a single load
+LOAD_LOCK_WAIT = 5.0  # seconds to wait for another process's load before loading ourselves
+EARLY_REFRESH_BETA = 1.0  # >1 refreshes earlier, <1 later (XFetch)
+
+_inflight: Dict[str, asyncio.Task] = {}
+_background_refreshes: set = set()
+
+_cache_stats = {
+    "hits": 0,
+    "misses": 0,
+    "stale_served": 0,
+    "early_refreshes": 0,
+    "loads": 0,
+    "load_errors": 0,
+    "coalesced_local": 0,
+    "coalesced_remote": 0,
+    "lock_wait_timeouts": 0,
+}
+
+
+def get_runtime_cache_stats() -> Dict[str, Any]:
+    """Hit/miss/stampede counters for this process."""
+    lookups = _cache_stats["hits"] + _cache_stats["stale_served"] + _cache_stats["misses"]
+    served_cached = _cache_stats["hits"] + _cache_stats["stale_served"]
+    return {
+        **_cache_stats,
+        "inflight_loads": len(_inflight),
+        "hit_ratio": round(served_cached / lookups, 3) if lookups else 0.0,
+    }
+
+
+def _wrap(value: Any, ttl: int, load_seconds: float) -> str:
+    return json.dumps({
+        _ENVELOPE_MARKER: 1,
+        "value": value,
+        "expires_at": time.time() + ttl,
+        "delta": load_seconds,
+    })
+
+
+def _unwrap(cached: Any):
+    """Return (value, expires_at, delta). Entries written before envelopes existed never expire early."""
+    data = json.loads(cached) if isinstance(cached, (str, bytes)) else cached
+    if isinstance(data, dict) and data.get(_ENVELOPE_MARKER) == 1:
+        return data.get("value"), data.get("expires_at") or 0, data.get("delta") or 0
+    return data, math.inf, 0
+
+
+async def _read_entry(cache_key: str):
+    from core.services import redis as redis_service
+
+    cached = await redis_service.get(cache_key)
+    if not cached:
+        return None
+    return _unwrap(cached)
+
+
+async def _read_fresh(cache_key: str) -> Optional[Any]:
+    """Plain cache read: the value if present and not logically expired."""
+    entry = await _read_entry(cache_key)
+    if entry is None:
+        return None
+    value, expires_at, _ = entry
+    return value if time.time() < expires_at else None
+
+
+async def _write_entry(cache_key: str, value: Any, ttl: int, stale_ttl: int, load_seconds: float = 0) -> None:
+    from core.services import redis as redis_service
+    await redis_service.set(cache_key, _wrap(value, ttl, load_seconds), ex=ttl + stale_ttl)
+
+
+def _should_refresh_early(expires_at: float, delta: float, now: float) -> bool:
+    # XFetch: the closer to expiry and the slower the load, the likelier a refresh
+    if delta <= 0 or expires_at == math.inf:
+        return False
+    return now - delta * EARLY_REFRESH_BETA * math.log(1.0 - random.random()) >= expires_at
+
+
+async def get_or_load(
+    cache_key: str,
+    loader: Callable[[], Awaitable[Any]],
+    ttl: int,
+    stale_ttl: int = 0,
+    cache_if: Optional[Callable[[Any], bool]] = None,
+    scope: Optional[str] = None,
+) -> Any:
+    """
+    Read a value through the cache, loading it at most once across concurrent callers.
+
+    Args:
+        cache_key: Redis key holding the value
+        loader: Coroutine function returning the JSON-serializable value
+        ttl: Seconds the value is considered fresh
+        stale_ttl: Extra seconds an expired value may be served while one caller revalidates it
+        cache_if: Predicate deciding whether a loaded value is written to Redis (default: not None)
+        scope: Extra in-process coalescing key, for loaders whose result depends on the caller
+
+    Returns:
+        The cached or freshly loaded value. Loader exceptions propagate to every coalesced caller.
+    """
+    try:
+        entry = await _read_entry(cache_key)
+    except Exception as e:
+        logger.warning(f"Failed to read {cache_key} from cache: {e}")
+        entry = None
+
+    if entry is not None:
+        value, expires_at, delta = entry
+        now = time.time()
+        if now < expires_at:
+            _cache_stats["hits"] += 1
+            if _should_refresh_early(expires_at, delta, now):
+                _cache_stats["early_refreshes"] += 1
+                _refresh_in_background(cache_key, loader, ttl, stale_ttl, cache_if, scope)
+            return value
+
+        _cache_stats["stale_served"] += 1
+        _refresh_in_background(cache_key, loader, ttl, stale_ttl, cache_if, scope)
+        logger.debug(f"⚡ Serving stale {cache_key} while revalidating")
+        return value
+
+    _cache_stats["misses"] += 1
+    flight_key = f"{cache_key}|{scope}" if scope else cache_key
+    task = _inflight.get(flight_key)
+    if task is not None:
+        _cache_stats["coalesced_local"] += 1
+        value = await asyncio.shield(task)
+        return copy.deepcopy(value)
+
+    task = _start_flight(flight_key, cache_key, loader, ttl, stale_ttl, cache_if, wait_for_holder=True)
+    return await asyncio.shield(task)
+
+
+def _start_flight(
+    flight_key: str,
+    cache_key: str,
+    loader: Callable[[], Awaitable[Any]],
+    ttl: int,
+    stale_ttl: int,
+    cache_if: Optional[Callable[[Any], bool]],
+    wait_for_holder: bool,
+) -> asyncio.Task:
+    # The load runs in its own task so a cancelled caller does not cancel it for the others
+    task = asyncio.create_task(_load_with_lock(cache_key, loader, ttl, stale_ttl, cache_if, wait_for_holder))
+    _inflight[flight_key] = task
+
+    def _done(t: asyncio.Task):
+        _inflight.pop(flight_key, None)
+        if not t.cancelled() and t.exception() is not None:
+            _cache_stats["load_errors"] += 1
+
+    task.add_done_callback(_done)
+    return task
+
+
+def _refresh_in_background(
+    cache_key: str,
+    loader: Callable[[], Awaitable[Any]],
+    ttl: int,
+    stale_ttl: int,
+    cache_if: Optional[Callable[[Any], bool]],
+    scope: Optional[str],
+) -> None:
+    # Refreshes get their own flight key so a caller that misses never joins a refresh that may skip loading
+    flight_key = f"{cache_key}|{scope}|refresh" if scope else f"{cache_key}|refresh"
+    if flight_key in _inflight:
+        return
+    task = _start_flight(flight_key, cache_key, loader, ttl, stale_ttl, cache_if, wait_for_holder=False)
+    _background_refreshes.add(task)
+
+    def _log_failure(t: asyncio.Task):
+        _background_refreshes.discard(t)
+        if not t.cancelled() and t.exception() is not None:
+            logger.warning(f"Background refresh of {cache_key} failed: {t.exception()}")
+
+    task.add_done_callback(_log_failure)
+
+
+async def _load_with_lock(
+    cache_key: str,
+    loader: Callable[[], Awaitable[Any]],
+    ttl: int,
+    stale_ttl: int,
+    cache_if: Optional[Callable[[Any], bool]],
+    wait_for_holder: bool,
+) -> Any:
+    from core.services import redis as redis_service
+
+    lock_key = f"{cache_key}:loading"
+    token = str(uuid.uuid4())
+    try:
+        acquired = await redis_service.set(lock_key, token, ex=LOAD_LOCK_TTL, nx=True)
+    except Exception as e:
+        logger.warning(f"Failed to acquire load lock for {cache_key}: {e}")
+        acquired = True
+
+    if not acquired:
+        if not wait_for_holder:
+            # Another process is already revalidating; keep serving what we have
+            return None
+        _cache_stats["coalesced_remote"] += 1
+        value = await _wait_for_holder(cache_key, lock_key)
+        if value is not None:
+            return value
+        _cache_stats["lock_wait_timeouts"] += 1
+
+    try:
+        return await _load_and_store(cache_key, loader, ttl, stale_ttl, cache_if)
+    finally:
+        if acquired:
+            try:
+                if await redis_service.get(lock_key) == token:
+                    await redis_service.delete(lock_key)
+            except Exception:
+                pass
+
+
+async def _wait_for_holder(cache_key: str, lock_key: str) -> Optional[Any]:
+    from core.services import redis as redis_service
+
+    deadline = time.monotonic() + LOAD_LOCK_WAIT
+    delay = 0.05
+    while time.monotonic() < deadline:
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, 0.5)
+        try:
+            value = await _read_fresh(cache_key)
+            if value is not None:
+                return value
+            if not await redis_service.get(lock_key):
+                # Holder finished without caching (error or uncacheable value)
+                return None
+        except Exception:
+            return None
+    return None
+
+
+async def _load_and_store(
+    cache_key: str,
+    loader: Callable[[], Awaitable[Any]],
+    ttl: int,
+    stale_ttl: int,
+    cache_if: Optional[Callable[[Any], bool]],
+) -> Any:
+    _cache_stats["loads"] += 1
+    start = time.time()
+    value = await loader()
+    load_seconds = time.time() - start
+
+    cacheable = cache_if(value) if cache_if else value is not None
+    if cacheable:
+        try:
+            await _write_entry(cache_key, value, ttl, stale_ttl, load_seconds)
+        except Exception as e:
+            logger.warning(f"Failed to cache {cache_key}: {e}")
+    logger.debug(f"⏱️ Loaded {cache_key} in {load_seconds * 1000:.1f}ms (cached={bool(cacheable)})")
+    return value
+
 # ============================================================================
 # STATIC SUNA CONFIG - Loaded once at startup, never expires
 # This is Python code that's identical across all workers - safe to keep in memory
@@ -63,6 +336,9 @@ def load_static_suna_config() -> Dict[str, Any]:
 # AGENT CONFIG CACHE - Redis, invalidated on version changes
 # ============================================================================
 AGENT_CONFIG_TTL = 3600  # 1 hour (was 24h - reduced to save Redis memory)
+AGENT_CONFIG_STALE_TTL = 300  # served while revalidating after expiry
+# Outlives any config entry written before the pointer last moved
+AGENT_VERSION_POINTER_TTL = 2 * (AGENT_CONFIG_TTL + AGENT_CONFIG_STALE_TTL)
 
 def _get_cache_key(agent_id: str, version_id: Optional[str] = None) -> str:
     """Generate Redis cache key for agent config."""
@@ -70,6 +346,10 @@ def _get_cache_key(agent_id: str, version_id: Optional[str] = None) -> str:
         return f"agent_config:{agent_id}:{version_id}"
     return f"agent_config:{agent_id}:current"
 
+def _get_agent_version_key(agent_id: str) -> str:
+    """Generate cache key for an agent's current version pointer."""
+    return f"agent_current_version:{agent_id}"
+
 def _get_user_mcps_key(agent_id: str) -> str:
     """Generate cache key for user-specific MCPs."""
     return f"agent_mcps:{agent_id}"
@@ -84,11 +364,8 @@ async def get_cached_user_mcps(agent_id: str) -> Optional[Dict[str, Any]]:
     cache_key = _get_user_mcps_key(agent_id)
     
     try:
-        from core.services import redis as redis_service
-        
-        cached = await redis_service.get(cache_key)
-        if cached:
-            data = json.loads(cached) if isinstance(cached, (str, bytes)) else cached
+        data = await _read_fresh(cache_key)
+        if data is not None:
             logger.debug(f"⚡ Redis cache hit for user MCPs: {agent_id}")
             return data
     except Exception as e:
@@ -112,13 +389,29 @@ async def set_cached_user_mcps(
     }
     
     try:
-        from core.services import redis as redis_service
-        await redis_service.set(cache_key, json.dumps(data), ex=AGENT_CONFIG_TTL)
+        await _write_entry(cache_key, data, AGENT_CONFIG_TTL, AGENT_CONFIG_STALE_TTL)
         logger.debug(f"✅ Cached user MCPs in Redis: {agent_id}")
     except Exception as e:
         logger.warning(f"Failed to cache user MCPs: {e}")
 
 
+async def get_or_load_user_mcps(
+    agent_id: str,
+    loader: Callable[[], Awaitable[Dict[str, Any]]]
+) -> Dict[str, Any]:
+    """
+    Get user-specific MCPs, loading them once across concurrent callers on a miss.
+    
+    The loader returns a dict with configured_mcps, custom_mcps, triggers.
+    """
+    return await get_or_load(
+        _get_user_mcps_key(agent_id),
+        loader,
+        ttl=AGENT_CONFIG_TTL,
+        stale_ttl=AGENT_CONFIG_STALE_TTL,
+    )
+
+
 async def get_cached_agent_config(
     agent_id: str,
     version_id: Optional[str] = None
@@ -131,11 +424,8 @@ async def get_cached_agent_config(
     cache_key = _get_cache_key(agent_id, version_id)
     
     try:
-        from core.services import redis as redis_service
-        
-        cached = await redis_service.get(cache_key)
-        if cached:
-            data = json.loads(cached) if isinstance(cached, (str, bytes)) else cached
+        data = await _read_fresh(cache_key)
+        if data is not None:
             logger.debug(f"⚡ Redis cache hit for agent config: {agent_id}")
             return data
     except Exception as e:
@@ -164,13 +454,79 @@ async def set_cached_agent_config(
     cache_key = _get_cache_key(agent_id, version_id)
     
     try:
-        from core.services import redis as redis_service
-        await redis_service.set(cache_key, json.dumps(config), ex=AGENT_CONFIG_TTL)
+        await _write_entry(cache_key, config, AGENT_CONFIG_TTL, AGENT_CONFIG_STALE_TTL)
         logger.debug(f"✅ Cached custom agent config in Redis: {agent_id}")
     except Exception as e:
         logger.warning(f"Failed to cache agent config: {e}")
 
 
+async def set_cached_agent_configs(configs: Dict[str, Dict[str, Any]]) -> None:
+    """
+    Cache several custom agent configs (keyed by agent_id) in one Redis round trip.
+    
+    Each config carries the current_version_id it was built from; load_agent
+    rejects entries whose version no longer matches set_current_agent_version.
+    """
+    if not configs:
+        return
+
+    try:
+        from core.services import redis as redis_service
+        client = await redis_service.get_client()
+        pipe = client.pipeline()
+        for agent_id, config in configs.items():
+            pipe.set(
+                _get_cache_key(agent_id),
+                _wrap(config, AGENT_CONFIG_TTL, 0),
+                ex=AGENT_CONFIG_TTL + AGENT_CONFIG_STALE_TTL
+            )
+        await pipe.execute()
+        logger.debug(f"✅ Cached {len(configs)} custom agent configs in Redis")
+    except Exception as e:
+        logger.warning(f"Failed to cache agent configs: {e}")
+
+
+async def set_current_agent_version(agent_id: str, version_id: str) -> None:
+    """Record an agent's current version after its current_version_id changes."""
+    try:
+        from core.services import redis as redis_service
+        await redis_service.set(_get_agent_version_key(agent_id), version_id, ex=AGENT_VERSION_POINTER_TTL)
+    except Exception as e:
+        logger.warning(f"Failed to record current version for agent {agent_id}: {e}")
+
+
+async def get_current_agent_version(agent_id: str) -> Optional[str]:
+    """Current version recorded by set_current_agent_version, or None if unknown."""
+    try:
+        from core.services import redis as redis_service
+        return await redis_service.get(_get_agent_version_key(agent_id))
+    except Exception as e:
+        logger.warning(f"Failed to read current version for agent {agent_id}: {e}")
+        return None
+
+
+async def get_or_load_agent_config(
+    agent_id: str,
+    loader: Callable[[], Awaitable[Dict[str, Any]]],
+    cache_if: Optional[Callable[[Dict[str, Any]], bool]] = None,
+    scope: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Get agent config, loading it once across concurrent callers on a miss.
+    
+    Only values accepted by cache_if are written to Redis; scope keeps callers
+    whose load result differs (e.g. access checks per user) from sharing a load.
+    """
+    return await get_or_load(
+        _get_cache_key(agent_id),
+        loader,
+        ttl=AGENT_CONFIG_TTL,
+        stale_ttl=AGENT_CONFIG_STALE_TTL,
+        cache_if=cache_if,
+        scope=scope,
+    )
+
+
 async def invalidate_agent_config_cache(agent_id: str) -> None:
     """Invalidate cached configs for an agent in Redis."""
     try:
@@ -202,6 +558,7 @@ async def warm_up_suna_config_cache() -> None:
 # PROJECT METADATA CACHE - Invalidated on sandbox changes
 # ============================================================================
 PROJECT_CACHE_TTL = 300  # 5 minutes (invalidated on sandbox change)
+PROJECT_CACHE_STALE_TTL = 60  # served while revalidating after expiry
 
 def _get_project_cache_key(project_id: str) -> str:
     """Generate Redis cache key for project metadata."""
@@ -216,11 +573,8 @@ async def get_cached_project_metadata(project_id: str) -> Optional[Dict[str, Any
     cache_key = _get_project_cache_key(project_id)
     
     try:
-        from core.services import redis as redis_service
-        
-        cached = await redis_service.get(cache_key)
-        if cached:
-            data = json.loads(cached) if isinstance(cached, (str, bytes)) else cached
+        data = await _read_fresh(cache_key)
+        if data is not None:
             logger.debug(f"⚡ Redis cache hit for project metadata: {project_id}")
             return data
     except Exception as e:
@@ -235,13 +589,32 @@ async def set_cached_project_metadata(project_id: str, sandbox: Dict[str, Any])
     data = {'project_id': project_id, 'sandbox': sandbox}
     
     try:
-        from core.services import redis as redis_service
-        await redis_service.set(cache_key, json.dumps(data), ex=PROJECT_CACHE_TTL)
+        await _write_entry(cache_key, data, PROJECT_CACHE_TTL, PROJECT_CACHE_STALE_TTL)
         logger.debug(f"✅ Cached project metadata in Redis: {project_id}")
     except Exception as e:
         logger.warning(f"Failed to cache project metadata: {e}")
 
 
+async def get_or_load_project_metadata(
+    project_id: str,
+    loader: Callable[[], Awaitable[Dict[str, Any]]]
+) -> Dict[str, Any]:
+    """
+    Get project metadata, loading it once across concurrent callers on a miss.
+    
+    The loader returns the project's sandbox dict; raise if the project does not exist.
+    """
+    async def load_metadata() -> Dict[str, Any]:
+        return {'project_id': project_id, 'sandbox': await loader()}
+    
+    return await get_or_load(
+        _get_project_cache_key(project_id),
+        load_metadata,
+        ttl=PROJECT_CACHE_TTL,
+        stale_ttl=PROJECT_CACHE_STALE_TTL,
+    )
+
+
 async def invalidate_project_cache(project_id: str) -> None:
     """Invalidate cached project metadata."""
     try:
@@ -315,9 +688,20 @@ async def invalidate_running_runs_cache(account_id: str) -> None:
 
 
 # ============================================================================
-# THREAD COUNT CACHE - Invalidated on thread create/delete
+# THREAD COUNT CACHE - Maintained on thread create/delete
 # ============================================================================
-THREAD_COUNT_TTL = 300  # 5 minutes (invalidated on create/delete)
+# Create/delete adjust the cached count, but a thread created or deleted between a
+# recount and its SET is missed (adjustments skip a missing key), so the count can
+# drift by a few until the key expires and is recounted.
+THREAD_COUNT_TTL = 300
+
+# Only adjust a counter that is already cached; a missing key means "recount"
+_ADJUST_IF_EXISTS_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return redis.call('INCRBY', KEYS[1], ARGV[1])
+end
+return nil
+"""
 
 def _get_thread_count_key(account_id: str) -> str:
     """Generate Redis cache key for thread count."""
@@ -348,29 +732,39 @@ async def set_cached_thread_count(account_id: str, count: int) -> None:
     
     try:
         from core.services import redis as redis_service
-        await redis_service.set(cache_key, str(count), ex=THREAD_COUNT_TTL)
+        # NX: never overwrite a count another recount already stored and adjustments have since updated
+        await redis_service.set(cache_key, str(count), ex=THREAD_COUNT_TTL, nx=True)
         logger.debug(f"✅ Cached thread count in Redis: {account_id} ({count} threads)")
     except Exception as e:
         logger.warning(f"Failed to cache thread count: {e}")
 
 
+async def _adjust_thread_count_cache(account_id: str, delta: int) -> None:
+    from core.services import redis as redis_service
+    client = await redis_service.get_client()
+    await client.eval(_ADJUST_IF_EXISTS_SCRIPT, 1, _get_thread_count_key(account_id), delta)
+
+
 async def increment_thread_count_cache(account_id: str) -> None:
     """Increment cached thread count when a new thread is created."""
-    cache_key = _get_thread_count_key(account_id)
-    
     try:
-        from core.services import redis as redis_service
-        # Use INCR for atomic increment, but only if key exists
-        current = await redis_service.get(cache_key)
-        if current is not None:
-            await redis_service.incr(cache_key)
-            logger.debug(f"✅ Incremented thread count cache: {account_id}")
+        await _adjust_thread_count_cache(account_id, 1)
+        logger.debug(f"✅ Incremented thread count cache: {account_id}")
     except Exception as e:
         logger.warning(f"Failed to increment thread count cache: {e}")
 
 
+async def decrement_thread_count_cache(account_id: str) -> None:
+    """Decrement cached thread count when a thread is deleted."""
+    try:
+        await _adjust_thread_count_cache(account_id, -1)
+        logger.debug(f"✅ Decremented thread count cache: {account_id}")
+    except Exception as e:
+        logger.warning(f"Failed to decrement thread count cache: {e}")
+
+
 async def invalidate_thread_count_cache(account_id: str) -> None:
-    """Invalidate cached thread count when thread is deleted."""
+    """Drop the cached thread count so the next read recounts."""
     try:
         from core.services import redis as redis_service
         await redis_service.delete(_get_thread_count_key(account_id))
@@ -378,3 +772,50 @@ async def invalidate_thread_count_cache(account_id: str) -> None:
     except Exception as e:
         logger.warning(f"Failed to invalidate thread count cache: {e}")
 
+
+# ============================================================================
+# THREAD LIST CACHE - First page of the sidebar, invalidated on thread writes
+# ============================================================================
+THREAD_LIST_TTL = 30  # seconds; covers writes that do not invalidate (e.g. agent-set titles)
+
+def _get_thread_list_key(account_id: str) -> str:
+    """Hash of cached first pages for an account, one field per page size."""
+    return f"thread_list:{account_id}"
+
+
+async def get_cached_thread_list_page(account_id: str, limit: int) -> Optional[Dict[str, Any]]:
+    """Get the cached first page of an account's thread list."""
+    try:
+        from core.services import redis as redis_service
+        client = await redis_service.get_client()
+        cached = await client.hget(_get_thread_list_key(account_id), str(limit))
+        if cached:
+            logger.debug(f"⚡ Redis cache hit for thread list: {account_id} (limit={limit})")
+            return json.loads(cached)
+    except Exception as e:
+        logger.warning(f"Failed to get thread list from cache: {e}")
+    return None
+
+
+async def set_cached_thread_list_page(account_id: str, limit: int, page: Dict[str, Any]) -> None:
+    """Cache the first page of an account's thread list."""
+    try:
+        from core.services import redis as redis_service
+        client = await redis_service.get_client()
+        key = _get_thread_list_key(account_id)
+        pipe = client.pipeline()
+        pipe.hset(key, str(limit), json.dumps(page, default=str))
+        pipe.expire(key, THREAD_LIST_TTL)
+        await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Failed to cache thread list: {e}")
+
+
+async def invalidate_thread_list_cache(account_id: str) -> None:
+    """Invalidate cached thread list pages after a thread is created, updated or deleted."""
+    try:
+        from core.services import redis as redis_service
+        await redis_service.delete(_get_thread_list_key(account_id))
+        logger.debug(f"🗑️ Invalidated thread list cache: {account_id}")
+    except Exception as e:
+        logger.warning(f"Failed to invalidate thread list cache: {e}")
@@ -0,0 +1,142 @@
+"""
+Batched sandbox filesystem reads and a per-run file content cache.
+
+`read_files` fetches many files with a single sandbox command by streaming a
+base64-encoded tar archive, instead of one `fs.download_file` round trip per
+file. `SandboxFileCache` keeps the content of files a tool has read or written
+keyed by path and validated against the file's size and modification time, so
+chains of reads and edits on the same file skip re-downloading it.
+"""
+import base64
+import io
+import shlex
+import tarfile
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from core.utils.logger import logger
+
+# Raw bytes fetched per tar command; base64 inflates the command output by a third
+BATCH_MAX_BYTES = 4 * 1024 * 1024
+BATCH_MAX_FILES = 200
+# Files above this size are downloaded on their own
+SINGLE_DOWNLOAD_THRESHOLD = 1024 * 1024
+BATCH_TIMEOUT = 60  # seconds
+
+# Per-run cache bound; entries beyond it are evicted oldest first
+CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+
+def _chunk_paths(files: List[Tuple[str, int]]) -> Iterable[List[str]]:
+    batch, batch_bytes = [], 0
+    for path, size in files:
+        if batch and (batch_bytes + size > BATCH_MAX_BYTES or len(batch) >= BATCH_MAX_FILES):
+            yield batch
+            batch, batch_bytes = [], 0
+        batch.append(path)
+        batch_bytes += size
+    if batch:
+        yield batch
+
+
+async def _read_tar_batch(sandbox, paths: List[str]) -> Dict[str, bytes]:
+    # Paths are absolute; strip the leading slash so tar stores them relative to /
+    members = " ".join(shlex.quote(p.lstrip("/")) for p in paths)
+    command = f"tar -cf - -C / -- {members} 2>/dev/null | base64 -w 0"
+    response = await sandbox.process.exec(f"/bin/sh -c {shlex.quote(command)}", timeout=BATCH_TIMEOUT)
+    output = (getattr(response, "result", None) or "").strip()
+    if not output:
+        return {}
+
+    contents = {}
+    with tarfile.open(fileobj=io.BytesIO(base64.b64decode(output)), mode="r:") as archive:
+        for member in archive:
+            if not member.isfile():
+                continue
+            extracted = archive.extractfile(member)
+            if extracted is not None:
+                contents["/" + member.name] = extracted.read()
+    return contents
+
+
+async def read_files(sandbox, files: List[Tuple[str, int]]) -> Dict[str, bytes]:
+    """
+    Read many sandbox files with as few sandbox round trips as possible.
+
+    Args:
+        sandbox: AsyncSandbox to read from
+        files: (absolute path, size in bytes) pairs; size drives batching
+
+    Returns:
+        Mapping of path to content for every file that could be read
+    """
+    small = [(path, size) for path, size in files if size <= SINGLE_DOWNLOAD_THRESHOLD]
+    large = [path for path, size in files if size > SINGLE_DOWNLOAD_THRESHOLD]
+
+    contents: Dict[str, bytes] = {}
+    for batch in _chunk_paths(small):
+        try:
+            contents.update(await _read_tar_batch(sandbox, batch))
+        except Exception as e:
+            logger.warning(f"Batched read of {len(batch)} files failed, downloading individually: {e}")
+        large.extend(path for path in batch if path not in contents)
+
+    for path in large:
+        try:
+            contents[path] = await sandbox.fs.download_file(path)
+        except Exception as e:
+            logger.debug(f"Failed to download {path}: {e}")
+    return contents
+
+
+@dataclass
+class _CacheEntry:
+    content: str
+    size: int
+    mod_time: Any
+
+
+class SandboxFileCache:
+    """
+    Write-through cache of decoded file contents for one sandbox.
+
+    Entries are validated against the size and modification time reported by
+    `fs.get_file_info`, so callers must stat a file (after writing it, too)
+    before storing its content.
+    """
+
+    def __init__(self, max_bytes: int = CACHE_MAX_BYTES):
+        self._entries: Dict[str, _CacheEntry] = {}
+        self._bytes = 0
+        self._max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path: str, file_info) -> Optional[str]:
+        entry = self._entries.get(path)
+        if entry is None or entry.size != file_info.size or entry.mod_time != file_info.mod_time:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry.content
+
+    def put(self, path: str, content: str, size: int, mod_time: Any) -> None:
+        self.invalidate(path)
+        if mod_time is None:
+            return
+        if size > self._max_bytes:
+            return
+        self._entries[path] = _CacheEntry(content=content, size=size, mod_time=mod_time)
+        self._bytes += size
+        while self._bytes > self._max_bytes and self._entries:
+            oldest = next(iter(self._entries))
+            self.invalidate(oldest)
+
+    def invalidate(self, path: str) -> None:
+        entry = self._entries.pop(path, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
@@ -0,0 +1,155 @@
+"""
+Background teardown of a deleted account's sandboxes.
+
+Sandboxes are recorded in sandbox_teardown_queue (one row per sandbox) before
+the account's projects are deleted. The teardown_account_sandboxes actor then
+deletes them with bounded concurrency and marks each row as soon as its
+sandbox is gone, so a crashed or retried job only works through the rows that
+are still pending.
+"""
+import asyncio
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+import dramatiq
+
+from core.services.supabase import DBConnection
+from core.utils.logger import logger, structlog
+
+TEARDOWN_CONCURRENCY = 8
+MAX_ATTEMPTS = 3
+CLAIM_BATCH_SIZE = 100
+RESUME_BATCH_SIZE = 1000
+
+db = DBConnection()
+
+
+def _is_already_deleted(error: Exception) -> bool:
+    return "not found" in str(error).lower()
+
+
+async def delete_sandboxes(
+    sandbox_ids: Iterable[str],
+    delete_fn: Callable[[str], Awaitable[object]],
+    concurrency: int = TEARDOWN_CONCURRENCY,
+    on_result: Optional[Callable[[str, Optional[Exception]], Awaitable[None]]] = None,
+) -> Dict[str, Optional[Exception]]:
+    """
+    Delete sandboxes with at most `concurrency` deletions in flight.
+
+    Args:
+        sandbox_ids: Sandboxes to delete
+        delete_fn: Deletes one sandbox by id, raising on failure
+        concurrency: Maximum concurrent deletions
+        on_result: Awaited after each deletion with the sandbox id and the error, if any
+
+    Returns:
+        Mapping of sandbox id to the error it failed with, or None when deleted
+    """
+    slots = asyncio.Semaphore(concurrency)
+    results: Dict[str, Optional[Exception]] = {}
+
+    async def delete_one(sandbox_id: str) -> None:
+        async with slots:
+            error = None
+            try:
+                await delete_fn(sandbox_id)
+            except Exception as e:
+                error = None if _is_already_deleted(e) else e
+            results[sandbox_id] = error
+            if on_result is not None:
+                await on_result(sandbox_id, error)
+
+    await asyncio.gather(*(delete_one(sandbox_id) for sandbox_id in sandbox_ids))
+    return results
+
+
+async def record_account_sandbox_teardown(account_id: str, client) -> int:
+    """Record an account's sandboxes for teardown. Must run before its projects are deleted."""
+    result = await client.rpc('enqueue_account_sandbox_teardown', {'p_account_id': account_id}).execute()
+    return result.data or 0
+
+
+def dispatch_account_sandbox_teardown(account_id: str) -> None:
+    teardown_account_sandboxes.send(account_id)
+
+
+async def get_account_teardown_progress(account_id: str, client) -> Dict[str, int]:
+    result = await client.table('sandbox_teardown_queue').select('status').eq('account_id', account_id).execute()
+    progress = {"pending": 0, "deleted": 0, "failed": 0}
+    for row in result.data or []:
+        progress[row['status']] = progress.get(row['status'], 0) + 1
+    return progress
+
+
+async def _mark_result(client, sandbox_id: str, attempts: int, error: Optional[Exception]) -> None:
+    now = datetime.now(timezone.utc).isoformat()
+    if error is None:
+        update = {"status": "deleted", "attempts": attempts + 1, "last_error": None, "updated_at": now}
+    else:
+        update = {
+            "status": "failed" if attempts + 1 >= MAX_ATTEMPTS else "pending",
+            "attempts": attempts + 1,
+            "last_error": str(error)[:1000],
+            "updated_at": now,
+        }
+    await client.table('sandbox_teardown_queue').update(update).eq('sandbox_id', sandbox_id).execute()
+
+
+async def run_account_sandbox_teardown(
+    account_id: str,
+    client,
+    delete_fn: Optional[Callable[[str], Awaitable[object]]] = None,
+    concurrency: int = TEARDOWN_CONCURRENCY,
+) -> Dict[str, int]:
+    """
+    Delete every pending sandbox recorded for an account.
+
+    Returns:
+        Final progress counts for the account
+    """
+    if delete_fn is None:
+        from core.sandbox.sandbox import delete_sandbox
+        delete_fn = delete_sandbox
+
+    while True:
+        pending = await client.table('sandbox_teardown_queue').select(
+            'sandbox_id, attempts'
+        ).eq('account_id', account_id).eq('status', 'pending').order('created_at').limit(CLAIM_BATCH_SIZE).execute()
+        rows: List[Tuple[str, int]] = [(row['sandbox_id'], row['attempts']) for row in pending.data or []]
+        if not rows:
+            break
+
+        attempts = dict(rows)
+
+        async def on_result(sandbox_id: str, error: Optional[Exception]) -> None:
+            if error is not None:
+                logger.warning(f"Failed to delete sandbox {sandbox_id} (attempt {attempts[sandbox_id] + 1}/{MAX_ATTEMPTS}): {str(error)}")
+            await _mark_result(client, sandbox_id, attempts[sandbox_id], error)
+
+        await delete_sandboxes(attempts.keys(), delete_fn, concurrency, on_result)
+
+    progress = await get_account_teardown_progress(account_id, client)
+    logger.info(f"🗑️ Sandbox teardown for account {account_id}: {progress}")
+    return progress
+
+
+async def resume_pending_teardowns(client) -> int:
+    """Re-dispatch teardown for every account that still has pending sandboxes."""
+    result = await client.table('sandbox_teardown_queue').select('account_id').eq(
+        'status', 'pending'
+    ).limit(RESUME_BATCH_SIZE).execute()
+    account_ids = {row['account_id'] for row in result.data or []}
+    for account_id in account_ids:
+        dispatch_account_sandbox_teardown(account_id)
+    return len(account_ids)
+
+
+@dramatiq.actor
+async def teardown_account_sandboxes(account_id: str):
+    structlog.contextvars.clear_contextvars()
+    structlog.contextvars.bind_contextvars(account_id=account_id)
+
+    await db.initialize()
+    client = await db.client
+    await run_account_sandbox_teardown(account_id, client)
@@ -0,0 +1,204 @@
+"""
+Image pipeline for tools that load images into context.
+
+- download_image: async download over a shared, pooled HTTP client with a hard size cap
+- encode: runs CPU-bound encoders from core.utils.image_encoding in a bounded
+  process pool so resizing large screenshots never blocks the event loop
+- content-hash cache: compressed outputs (public URL, mime type, sizes) keyed by
+  the SHA-256 of the original bytes, plus a source index (sandbox path + size
+  + mtime -> content hash) so a repeated load of a sandbox file can skip the
+  download too; URLs are always fetched, since their content can change
+"""
+import asyncio
+import hashlib
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import httpx
+
+from core.services import redis_worker as redis
+from core.utils.logger import logger
+
+ENCODER_WORKERS = int(os.getenv("IMAGE_ENCODER_WORKERS", "2"))
+# Jobs allowed to wait for an encoder before callers queue on the event loop
+MAX_PENDING_ENCODES = ENCODER_WORKERS * 4
+
+DOWNLOAD_TIMEOUT = 10  # seconds
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+OUTPUT_CACHE_TTL = 3600 * 24 * 7
+SOURCE_CACHE_TTL = 3600
+_OUTPUT_PREFIX = "image_pipeline:out"
+_SOURCE_PREFIX = "image_pipeline:src"
+
+_http_client: Optional[httpx.AsyncClient] = None
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_pid: Optional[int] = None
+_encode_slots: Optional[asyncio.Semaphore] = None
+_encode_slots_loop: Optional[asyncio.AbstractEventLoop] = None
+
+_stats = {
+    "downloads": 0,
+    "encodes": 0,
+    "encode_fallbacks": 0,
+    "output_hits": 0,
+    "source_hits": 0,
+    "misses": 0,
+}
+
+
+class ImageDownloadError(Exception):
+    pass
+
+
+def get_image_pipeline_stats() -> Dict[str, Any]:
+    return {**_stats, "encoder_workers": ENCODER_WORKERS}
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=DOWNLOAD_TIMEOUT,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+            headers={"User-Agent": "Mozilla/5.0"},  # Some servers block default clients
+        )
+    return _http_client
+
+
+async def download_image(url: str, max_bytes: int) -> Tuple[bytes, str]:
+    """
+    Download an image, aborting as soon as it exceeds max_bytes.
+
+    Returns:
+        Tuple of (image_bytes, mime_type)
+
+    Raises:
+        ImageDownloadError: On HTTP errors, oversized bodies or non-image content
+    """
+    max_mb = max_bytes / (1024 * 1024)
+    try:
+        async with _get_http_client().stream("GET", url) as response:
+            response.raise_for_status()
+
+            mime_type = (response.headers.get("Content-Type") or "").split(";")[0].strip()
+            if not mime_type.startswith("image/"):
+                raise ImageDownloadError(f"URL does not point to an image (Content-Type: {mime_type or None}): {url}")
+
+            content_length = int(response.headers.get("Content-Length") or 0)
+            if content_length > max_bytes:
+                raise ImageDownloadError(f"Image is too large ({content_length / (1024 * 1024):.2f}MB) for the maximum allowed size of {max_mb:.2f}MB")
+
+            chunks, received = [], 0
+            async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                received += len(chunk)
+                if received > max_bytes:
+                    raise ImageDownloadError(f"Downloaded image is too large (over {max_mb:.2f}MB). Maximum allowed size of {max_mb:.2f}MB")
+                chunks.append(chunk)
+    except httpx.HTTPError as e:
+        raise ImageDownloadError(str(e)) from e
+
+    _stats["downloads"] += 1
+    return b"".join(chunks), mime_type
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor, _executor_pid
+    # A pool inherited through fork belongs to the parent; start a fresh one
+    if _executor is None or _executor_pid != os.getpid():
+        _executor = ProcessPoolExecutor(
+            max_workers=ENCODER_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        _executor_pid = os.getpid()
+    return _executor
+
+
+def _get_encode_slots() -> asyncio.Semaphore:
+    global _encode_slots, _encode_slots_loop
+    loop = asyncio.get_running_loop()
+    if _encode_slots is None or _encode_slots_loop is not loop:
+        _encode_slots = asyncio.Semaphore(MAX_PENDING_ENCODES)
+        _encode_slots_loop = loop
+    return _encode_slots
+
+
+async def encode(fn: Callable, *args):
+    """
+    Run a CPU-bound encoder from core.utils.image_encoding off the event loop.
+
+    Falls back to a thread when the process pool cannot be created or used
+    (e.g. in daemonic worker processes, which may not start children).
+    """
+    global _executor
+    async with _get_encode_slots():
+        _stats["encodes"] += 1
+        try:
+            future = asyncio.get_running_loop().run_in_executor(_get_executor(), fn, *args)
+        except Exception as e:
+            logger.warning(f"Image encoder pool unavailable, encoding in a thread: {e}")
+            _executor = None
+            _stats["encode_fallbacks"] += 1
+            return await asyncio.to_thread(fn, *args)
+        try:
+            return await future
+        except (BrokenProcessPool, OSError) as e:
+            logger.warning(f"Image encoder pool unavailable, encoding in a thread: {e}")
+            _executor = None
+            _stats["encode_fallbacks"] += 1
+            return await asyncio.to_thread(fn, *args)
+
+
+def source_key(*parts: Any) -> str:
+    """
+    Stable key for an image source whose content is pinned by the key itself,
+    e.g. source_key("sandbox", id, path, size, mtime). Not for URLs, whose content can change.
+    """
+    return hashlib.sha256("|".join(str(p) for p in parts).encode()).hexdigest()
+
+
+async def get_cached_output(digest: str) -> Optional[Dict[str, Any]]:
+    try:
+        raw = await redis.get(f"{_OUTPUT_PREFIX}:{digest}")
+    except Exception as e:
+        logger.debug(f"Image cache read failed: {e}")
+        return None
+    if not raw:
+        _stats["misses"] += 1
+        return None
+    _stats["output_hits"] += 1
+    return json.loads(raw)
+
+
+async def set_cached_output(digest: str, entry: Dict[str, Any]) -> None:
+    try:
+        await redis.set(f"{_OUTPUT_PREFIX}:{digest}", json.dumps(entry), ex=OUTPUT_CACHE_TTL)
+    except Exception as e:
+        logger.debug(f"Image cache write failed: {e}")
+
+
+async def get_source_digest(key: str) -> Optional[str]:
+    try:
+        digest = await redis.get(f"{_SOURCE_PREFIX}:{key}")
+    except Exception as e:
+        logger.debug(f"Image source cache read failed: {e}")
+        return None
+    if digest:
+        _stats["source_hits"] += 1
+    return digest
+
+
+async def set_source_digest(key: str, digest: str, ttl: int = SOURCE_CACHE_TTL) -> None:
+    try:
+        await redis.set(f"{_SOURCE_PREFIX}:{key}", digest, ex=ttl)
+    except Exception as e:
+        logger.debug(f"Image source cache write failed: {e}")
@@ -0,0 +1,148 @@
+"""
+Content-addressed storage for images loaded into conversation context.
+
+Each distinct image is uploaded once to the image-uploads bucket and recorded in
+image_blobs keyed by the SHA-256 of its bytes. image_context messages reference
+a blob through metadata.content_hash; a database trigger keeps the blob's
+ref_count and the thread's image_context_count in sync as messages are inserted
+and deleted. Blobs that stay unreferenced past a grace period are removed by
+garbage_collect_image_blobs.
+"""
+import hashlib
+import uuid
+from typing import Any, Dict, Optional
+
+from core.utils.logger import logger
+
+BUCKET = "image-uploads"
+BLOB_PREFIX = "loaded_images/sha256"
+GC_GRACE_SECONDS = 3600 * 24
+GC_BATCH_SIZE = 500
+
+_EXTENSIONS = {
+    "image/jpeg": "jpg",
+    "image/png": "png",
+    "image/gif": "gif",
+    "image/webp": "webp",
+}
+
+
+def blob_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+async def get_blob(client, content_hash: str) -> Optional[Dict[str, Any]]:
+    result = await client.table("image_blobs").select(
+        "content_hash, storage_path, mime_type, size_bytes"
+    ).eq("content_hash", content_hash).limit(1).execute()
+    return result.data[0] if result.data else None
+
+
+async def public_url(client, storage_path: str) -> str:
+    return await client.storage.from_(BUCKET).get_public_url(storage_path)
+
+
+async def store_image(client, data: bytes, mime_type: str) -> Dict[str, Any]:
+    """
+    Store image bytes once per distinct content.
+
+    Args:
+        client: Supabase client
+        data: Image bytes to store
+        mime_type: MIME type of the bytes
+
+    Returns:
+        Dict with content_hash, storage_path and public_url. Reference the image by
+        putting content_hash in the image_context message metadata.
+    """
+    content_hash = blob_hash(data)
+    blob = await get_blob(client, content_hash)
+    if blob:
+        logger.debug(f"Image blob {content_hash[:12]} already stored, skipping upload")
+        return {
+            "content_hash": content_hash,
+            "storage_path": blob["storage_path"],
+            "public_url": await public_url(client, blob["storage_path"]),
+        }
+
+    # A unique suffix keeps a re-upload from colliding with an object that GC is deleting
+    ext = _EXTENSIONS.get(mime_type, "jpg")
+    storage_path = f"{BLOB_PREFIX}/{content_hash[:2]}/{content_hash}-{uuid.uuid4().hex[:8]}.{ext}"
+    await client.storage.from_(BUCKET).upload(storage_path, data, {"content-type": mime_type})
+
+    try:
+        await client.table("image_blobs").insert({
+            "content_hash": content_hash,
+            "storage_path": storage_path,
+            "mime_type": mime_type,
+            "size_bytes": len(data),
+        }).execute()
+    except Exception as e:
+        # Another writer stored the same content first; use theirs and drop ours
+        blob = await get_blob(client, content_hash)
+        if not blob:
+            raise
+        logger.debug(f"Image blob {content_hash[:12]} stored concurrently: {e}")
+        try:
+            await client.storage.from_(BUCKET).remove([storage_path])
+        except Exception:
+            pass
+        storage_path = blob["storage_path"]
+
+    return {
+        "content_hash": content_hash,
+        "storage_path": storage_path,
+        "public_url": await public_url(client, storage_path),
+    }
+
+
+async def count_thread_images(client, thread_id: str) -> int:
+    """Number of image_context messages in a thread, from the trigger-maintained counter."""
+    try:
+        result = await client.table("threads").select("image_context_count").eq("thread_id", thread_id).limit(1).execute()
+        if result.data and result.data[0].get("image_context_count") is not None:
+            return int(result.data[0]["image_context_count"])
+    except Exception as e:
+        logger.debug(f"image_context_count unavailable for {thread_id}, counting rows: {e}")
+
+    result = await client.table("messages").select(
+        "message_id", count="exact", head=True
+    ).eq("thread_id", thread_id).eq("type", "image_context").execute()
+    return result.count or 0
+
+
+async def garbage_collect_image_blobs(
+    client,
+    grace_seconds: int = GC_GRACE_SECONDS,
+    batch_size: int = GC_BATCH_SIZE,
+) -> Dict[str, int]:
+    """
+    Delete blobs that have had no references for grace_seconds, rows first and then objects.
+
+    Returns:
+        Counts of removed blobs and of storage objects that failed to delete
+    """
+    removed = 0
+    failed = 0
+    while True:
+        result = await client.rpc("claim_unreferenced_image_blobs", {
+            "p_grace_seconds": grace_seconds,
+            "p_limit": batch_size,
+        }).execute()
+        claimed = result.data or []
+        if not claimed:
+            break
+
+        paths = [row["storage_path"] for row in claimed]
+        try:
+            await client.storage.from_(BUCKET).remove(paths)
+            removed += len(paths)
+        except Exception as e:
+            failed += len(paths)
+            logger.warning(f"Failed to delete {len(paths)} unreferenced image objects: {e}")
+
+        if len(claimed) < batch_size:
+            break
+
+    logger.info(f"🧹 Image blob GC removed {removed} blobs ({failed} object deletions failed)")
+    return {"removed": removed, "failed": failed}
@@ -0,0 +1,20 @@
+from fastapi import APIRouter, HTTPException, Depends
+from core.services.supabase import DBConnection
+from core.services.image_store import garbage_collect_image_blobs
+from core.utils.auth_utils import verify_admin_api_key
+from core.utils.logger import logger
+
+router = APIRouter(tags=["internal"])
+
+
+@router.post("/internal/gc-image-blobs")
+async def gc_image_blobs_endpoint(_: bool = Depends(verify_admin_api_key)):
+    """Internal endpoint to delete unreferenced image blobs. Called by a daily cron job. Protected by admin API key."""
+    try:
+        db = DBConnection()
+        client = await db.client
+        result = await garbage_collect_image_blobs(client)
+        return {"success": True, **result}
+    except Exception as e:
+        logger.error(f"Error in gc_image_blobs_endpoint: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to collect image blobs: {str(e)}")
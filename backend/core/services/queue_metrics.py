@@ -39,21 +39,30 @@ async def get_queue_metrics() -> dict:
     """
     Get Dramatiq queue metrics from Redis.
     
+    queue_depth covers the default queue plus every fair-scheduling lane, so
+    auto-scaling keeps working when AGENT_RUN_FAIR_SCHEDULING is enabled.
+    
     Returns:
-        dict with queue_depth, delay_queue_depth, dead_letter_depth, timestamp
+        dict with queue_depth, delay_queue_depth, dead_letter_depth, lanes, timestamp
     """
     from core.services import redis
+    from core.services import run_scheduler
     
     try:
         client = await redis.get_client()
-        queue_depth = await client.llen("dramatiq:default")
+        default_depth = await client.llen("dramatiq:default")
         delay_queue_depth = await client.llen("dramatiq:default.DQ")
         dead_letter_depth = await client.llen("dramatiq:default.XQ")
         
+        lanes = await run_scheduler.get_lane_metrics(client)
+        lane_depth = sum(lane["queue_depth"] for lane in lanes.values())
+        
         return {
-            "queue_depth": queue_depth,
+            "queue_depth": default_depth + lane_depth,
+            "default_queue_depth": default_depth,
             "delay_queue_depth": delay_queue_depth,
             "dead_letter_depth": dead_letter_depth,
+            "lanes": lanes,
             "timestamp": datetime.now(timezone.utc).isoformat()
         }
     except Exception as e:
@@ -0,0 +1,192 @@
+"""
+Per-worker control plane for agent runs.
+
+A single pattern subscription per worker process receives the control
+channels of every run (agent_run:{id}:control and
+agent_run:{id}:control:{instance}) and dispatches STOP signals to the
+cancellation event of the matching local run. A single heartbeat task keeps
+the instance_active keys of all local runs alive with one pipelined call,
+instead of every run polling its own pub/sub connection.
+"""
+import asyncio
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+from core.services import redis_worker as redis
+from core.utils.logger import logger
+
+CONTROL_PATTERN = "agent_run:*:control*"
+HEARTBEAT_INTERVAL = 30  # seconds
+RECONNECT_BACKOFF_MAX = 10  # seconds
+
+
+@dataclass
+class RunControl:
+    agent_run_id: str
+    instance_id: str
+    active_key: str
+    cancellation_event: asyncio.Event
+    on_stop: Optional[Callable[[str], None]] = None
+    stop_reason: Optional[str] = None
+
+
+class RunControlListener:
+    def __init__(self):
+        self._runs: Dict[str, RunControl] = {}
+        self._listener_task: Optional[asyncio.Task] = None
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._subscribed = asyncio.Event()
+        self._stats = {
+            "signals_received": 0,
+            "stops_dispatched": 0,
+            "heartbeats": 0,
+            "reconnects": 0,
+        }
+
+    async def register(
+        self,
+        agent_run_id: str,
+        instance_id: str,
+        active_key: str,
+        cancellation_event: asyncio.Event,
+        on_stop: Optional[Callable[[str], None]] = None,
+        subscribe_timeout: float = 5.0,
+    ) -> RunControl:
+        """
+        Route control signals for a run to its cancellation event.
+
+        Args:
+            agent_run_id: Run to register
+            instance_id: Worker instance running it (for instance-scoped channels)
+            active_key: instance_active key refreshed by the shared heartbeat
+            cancellation_event: Set when a STOP signal arrives
+            on_stop: Optional callback invoked with the stop reason before the event is set
+            subscribe_timeout: How long to wait for the shared subscription on first use
+
+        Returns:
+            The registered RunControl entry
+        """
+        self._ensure_started()
+        entry = RunControl(
+            agent_run_id=agent_run_id,
+            instance_id=instance_id,
+            active_key=active_key,
+            cancellation_event=cancellation_event,
+            on_stop=on_stop,
+        )
+        self._runs[agent_run_id] = entry
+
+        if not self._subscribed.is_set():
+            try:
+                await asyncio.wait_for(self._subscribed.wait(), timeout=subscribe_timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"Control subscription not ready for {agent_run_id} - stop signals may be delayed")
+        return entry
+
+    def unregister(self, agent_run_id: str) -> None:
+        self._runs.pop(agent_run_id, None)
+
+    def get_stats(self) -> Dict[str, int]:
+        return {**self._stats, "active_runs": len(self._runs), "subscribed": self._subscribed.is_set()}
+
+    def _ensure_started(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Tasks and events are bound to the loop that created them
+            self._loop = loop
+            self._subscribed = asyncio.Event()
+            self._listener_task = None
+            self._heartbeat_task = None
+
+        if self._listener_task is None or self._listener_task.done():
+            self._listener_task = asyncio.create_task(self._listen(), name="run-control-listener")
+        if self._heartbeat_task is None or self._heartbeat_task.done():
+            self._heartbeat_task = asyncio.create_task(self._heartbeat(), name="run-control-heartbeat")
+
+    async def _listen(self) -> None:
+        backoff = 0.5
+        while True:
+            pubsub = None
+            try:
+                pubsub = await redis.create_pubsub()
+                await pubsub.psubscribe(CONTROL_PATTERN)
+                self._subscribed.set()
+                backoff = 0.5
+                logger.info(f"📡 Control listener subscribed to {CONTROL_PATTERN}")
+
+                async for message in pubsub.listen():
+                    if message.get("type") == "pmessage":
+                        self._dispatch(message.get("channel"), message.get("data"))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._subscribed.clear()
+                self._stats["reconnects"] += 1
+                logger.warning(f"Control listener disconnected: {e} - reconnecting in {backoff:.1f}s")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, RECONNECT_BACKOFF_MAX)
+            finally:
+                if pubsub is not None:
+                    try:
+                        await pubsub.punsubscribe()
+                        await pubsub.close()
+                    except Exception:
+                        pass
+
+    def _dispatch(self, channel, data) -> None:
+        if isinstance(channel, bytes):
+            channel = channel.decode("utf-8")
+        if isinstance(data, bytes):
+            data = data.decode("utf-8")
+
+        self._stats["signals_received"] += 1
+        if data != "STOP":
+            return
+
+        # agent_run:{id}:control or agent_run:{id}:control:{instance_id}
+        parts = channel.split(":")
+        if len(parts) < 3:
+            return
+        entry = self._runs.get(parts[1])
+        if entry is None or entry.cancellation_event.is_set():
+            return
+
+        if len(parts) > 3:
+            if parts[3] != entry.instance_id:
+                return
+            stop_reason = "instance_control_channel"
+        else:
+            stop_reason = "global_control_channel"
+
+        logger.warning(f"🛑 Received STOP signal for agent run {entry.agent_run_id} via {stop_reason} (Instance: {entry.instance_id}, Channel: {channel})")
+        entry.stop_reason = stop_reason
+        self._stats["stops_dispatched"] += 1
+        if entry.on_stop:
+            try:
+                entry.on_stop(stop_reason)
+            except Exception as e:
+                logger.warning(f"Stop callback failed for {entry.agent_run_id}: {e}")
+        entry.cancellation_event.set()
+
+    async def _heartbeat(self) -> None:
+        while True:
+            try:
+                await asyncio.sleep(HEARTBEAT_INTERVAL)
+                keys = [entry.active_key for entry in self._runs.values()]
+                if not keys:
+                    continue
+                client = await redis.get_client()
+                pipe = client.pipeline(transaction=False)
+                for key in keys:
+                    pipe.expire(key, redis.REDIS_KEY_TTL)
+                await asyncio.wait_for(pipe.execute(), timeout=5.0)
+                self._stats["heartbeats"] += 1
+                logger.debug(f"Refreshed {len(keys)} instance_active keys")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Failed to refresh instance_active keys: {e}")
+
+
+run_control = RunControlListener()
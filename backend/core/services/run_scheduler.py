@@ -0,0 +1,353 @@
+"""
+Tier-aware, fair scheduling for agent runs.
+
+Runs are not sent to Dramatiq directly. Each run is appended to a per-account
+queue inside its tier lane, and a dispatch token is sent to the lane's
+Dramatiq queue. When a worker takes a token it claims the next run with
+deficit round-robin across the lane's accounts, skipping accounts already at
+their in-flight cap. One heavy account therefore cannot push everyone else's
+runs back, and higher lanes are consumed first via actor priority.
+
+Redis layout (per lane):
+- run_sched:{lane}:ring          round-robin list of accounts with queued runs
+- run_sched:{lane}:active        set mirror of the ring for O(1) membership
+- run_sched:{lane}:q:{account}   queued run payloads (JSON)
+- run_sched:{lane}:deficit       DRR deficit per account
+- run_sched:{lane}:wait          queue wait histogram
+- run_sched:weights / :caps      per-account DRR weight and in-flight cap
+- run_sched:inflight:{account}   zset of running agent_run_ids scored by start time
+"""
+import json
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.utils.logger import logger
+
+LANES = ("priority", "standard", "free")
+
+# Dramatiq actor priority per lane (lower runs first within a worker)
+LANE_ACTOR_PRIORITY = {
+    "priority": 0,
+    "standard": 10,
+    "free": 20,
+}
+
+_TIER_LANES = {
+    "none": "free",
+    "free": "free",
+    "tier_2_20": "standard",
+    "tier_6_50": "standard",
+    "tier_12_100": "standard",
+    "tier_25_200": "priority",
+    "tier_50_400": "priority",
+    "tier_125_800": "priority",
+    "tier_200_1000": "priority",
+    "tier_150_1200": "priority",
+}
+
+# Bounds a dead worker's in-flight entries; matches the run lock TTL
+INFLIGHT_LEASE_SECONDS = 3600 * 2
+# Delay before a token retries when every queued account is at its cap
+CAPPED_RETRY_DELAY_MS = 2000
+
+WAIT_BUCKETS_SECONDS = (0.1, 0.5, 1, 2, 5, 10, 30, 60, 300)
+
+_PREFIX = "run_sched"
+_WEIGHTS_KEY = f"{_PREFIX}:weights"
+_CAPS_KEY = f"{_PREFIX}:caps"
+
+CLAIMED = 1
+EMPTY = 0
+ALL_CAPPED = 2
+# Internal: the ring head moved outside the caller's snapshot, retry with a fresh one
+_STALE_SNAPSHOT = 3
+
+# Accounts from the head of the ring passed to one claim attempt (two KEYS each)
+CLAIM_SNAPSHOT_SIZE = 64
+# Fresh snapshots taken before a claim gives up and lets the token retry later
+CLAIM_SNAPSHOT_ATTEMPTS = 3
+
+_ENQUEUE_SCRIPT = """
+redis.call('RPUSH', KEYS[1], ARGV[2])
+if redis.call('SADD', KEYS[3], ARGV[1]) == 1 then
+    redis.call('RPUSH', KEYS[2], ARGV[1])
+end
+redis.call('HSET', KEYS[4], ARGV[1], ARGV[3])
+redis.call('HSET', KEYS[5], ARGV[1], ARGV[4])
+return redis.call('LLEN', KEYS[1])
+"""
+
+# KEYS: ring, active, deficit, weights, caps, then a (queue, inflight) pair per snapshot account
+# ARGV: now, lease seconds, snapshot accounts (in ring order)
+#
+# Every key the script touches is declared in KEYS, so callers snapshot the head of the
+# ring first. If the head of the ring is an account outside the snapshot (it joined after
+# the snapshot, or the ring is longer than the snapshot), the script returns {3} and the
+# caller retries with a fresh snapshot.
+_CLAIM_SCRIPT = """
+local ring, active, deficits, weights, caps = KEYS[1], KEYS[2], KEYS[3], KEYS[4], KEYS[5]
+local now = tonumber(ARGV[1])
+local lease = tonumber(ARGV[2])
+
+local slots = {}
+for i = 3, #ARGV do
+    slots[ARGV[i]] = 6 + (i - 3) * 2
+end
+local snapshot_size = #ARGV - 2
+
+local function drop(account)
+    redis.call('LPOP', ring)
+    redis.call('SREM', active, account)
+    redis.call('HDEL', deficits, account)
+end
+
+local function rotate()
+    redis.call('RPUSH', ring, redis.call('LPOP', ring))
+end
+
+if redis.call('LLEN', ring) == 0 then
+    return {0}
+end
+
+-- Two passes give every account the chance to accumulate at least one quantum
+for _ = 1, math.max(snapshot_size, 1) * 2 do
+    local account = redis.call('LINDEX', ring, 0)
+    if not account then
+        return {0}
+    end
+
+    local slot = slots[account]
+    if not slot then
+        return {3}
+    end
+
+    local queue, inflight = KEYS[slot], KEYS[slot + 1]
+    if redis.call('LLEN', queue) == 0 then
+        drop(account)
+    else
+        redis.call('ZREMRANGEBYSCORE', inflight, '-inf', now - lease)
+        local cap = tonumber(redis.call('HGET', caps, account) or '1')
+
+        if redis.call('ZCARD', inflight) >= cap then
+            rotate()
+        else
+            local deficit = tonumber(redis.call('HGET', deficits, account) or '0')
+            if deficit < 1 then
+                deficit = deficit + tonumber(redis.call('HGET', weights, account) or '1')
+            end
+
+            if deficit >= 1 then
+                local payload = redis.call('LPOP', queue)
+                local run = cjson.decode(payload)
+                redis.call('ZADD', inflight, now, run['agent_run_id'])
+                redis.call('EXPIRE', inflight, lease)
+
+                deficit = deficit - 1
+                if redis.call('LLEN', queue) == 0 then
+                    drop(account)
+                else
+                    redis.call('HSET', deficits, account, deficit)
+                    if deficit < 1 then
+                        rotate()
+                    end
+                end
+                return {1, payload}
+            end
+
+            redis.call('HSET', deficits, account, deficit)
+            rotate()
+        end
+    end
+
+    if redis.call('LLEN', ring) == 0 then
+        return {0}
+    end
+end
+
+return {2}
+"""
+
+_scripts: Dict[Tuple[int, str], Any] = {}
+
+
+def _lane_key(lane: str, suffix: str) -> str:
+    return f"{_PREFIX}:{lane}:{suffix}"
+
+
+def _inflight_key(account_id: str) -> str:
+    return f"{_PREFIX}:inflight:{account_id}"
+
+
+def lane_for_tier(tier_name: Optional[str]) -> str:
+    return _TIER_LANES.get(tier_name or "none", "standard")
+
+
+def dramatiq_queue_name(lane: str) -> str:
+    return f"agent_runs_{lane}"
+
+
+async def _get_client(client=None):
+    if client is not None:
+        return client
+    from core.services import redis
+    return await redis.get_client()
+
+
+def _script(client, source: str):
+    # Scripts are bound to a client, and the API and worker use separate pools
+    key = (id(client), source)
+    script = _scripts.get(key)
+    if script is None:
+        script = client.register_script(source)
+        _scripts[key] = script
+    return script
+
+
+async def resolve_account_lane(account_id: Optional[str]) -> Tuple[str, int, int]:
+    """
+    Look up an account's lane, DRR weight and in-flight cap from its subscription tier.
+
+    Returns:
+        (lane, weight, cap). Falls back to the standard lane when the tier is unavailable.
+    """
+    from core.utils.config import config
+
+    if not account_id:
+        return "standard", 1, config.MAX_PARALLEL_AGENT_RUNS
+
+    try:
+        from core.billing import subscription_service
+        tier_info = await subscription_service.get_user_subscription_tier(account_id, skip_cache=False)
+        concurrent_runs = max(1, tier_info.get('concurrent_runs', 1))
+        # Accounts that pay for more parallelism get proportionally more turns per round
+        return lane_for_tier(tier_info.get('name')), concurrent_runs, concurrent_runs
+    except Exception as e:
+        logger.warning(f"Could not resolve run lane for {account_id}, using standard: {e}")
+        return "standard", 1, config.MAX_PARALLEL_AGENT_RUNS
+
+
+async def enqueue_run(lane: str, account_id: str, run: Dict[str, Any], weight: int, cap: int, client=None) -> int:
+    """
+    Queue a run payload for an account in a lane.
+
+    Args:
+        lane: One of LANES
+        account_id: Account that owns the run
+        run: Actor kwargs for the run; must include agent_run_id
+        weight: DRR quantum for the account
+        cap: Maximum runs the account may have in flight
+
+    Returns:
+        Number of runs now queued for the account in this lane
+    """
+    client = await _get_client(client)
+    payload = json.dumps({**run, "enqueued_at": time.time()})
+    return await _script(client, _ENQUEUE_SCRIPT)(
+        keys=[
+            _lane_key(lane, f"q:{account_id}"),
+            _lane_key(lane, "ring"),
+            _lane_key(lane, "active"),
+            _WEIGHTS_KEY,
+            _CAPS_KEY,
+        ],
+        args=[account_id, payload, weight, cap],
+    )
+
+
+async def claim_next_run(lane: str, client=None) -> Tuple[int, Optional[Dict[str, Any]]]:
+    """
+    Claim the next run in a lane using deficit round-robin across accounts.
+
+    Returns:
+        (CLAIMED, run), (EMPTY, None) when the lane has nothing queued, or
+        (ALL_CAPPED, None) when every queued account is at its in-flight cap
+    """
+    client = await _get_client(client)
+    ring_key = _lane_key(lane, "ring")
+    for _ in range(CLAIM_SNAPSHOT_ATTEMPTS):
+        accounts: List[str] = await client.lrange(ring_key, 0, CLAIM_SNAPSHOT_SIZE - 1)
+        account_keys = []
+        for account in accounts:
+            account_keys.extend([_lane_key(lane, f"q:{account}"), _inflight_key(account)])
+
+        result = await _script(client, _CLAIM_SCRIPT)(
+            keys=[
+                ring_key,
+                _lane_key(lane, "active"),
+                _lane_key(lane, "deficit"),
+                _WEIGHTS_KEY,
+                _CAPS_KEY,
+                *account_keys,
+            ],
+            args=[time.time(), INFLIGHT_LEASE_SECONDS, *accounts],
+        )
+        status = int(result[0])
+        if status == _STALE_SNAPSHOT:
+            continue
+        if status != CLAIMED:
+            return status, None
+        return CLAIMED, json.loads(result[1])
+
+    # The ring kept moving past our snapshots (heavy churn, or a long ring of capped
+    # accounts); let the token retry after the capped delay instead of spinning here
+    logger.debug(f"Run claim in lane {lane} gave up after {CLAIM_SNAPSHOT_ATTEMPTS} snapshots")
+    return ALL_CAPPED, None
+
+
+async def release_run(account_id: str, agent_run_id: str, client=None) -> None:
+    """Free the account's in-flight slot once a run finishes."""
+    client = await _get_client(client)
+    await client.zrem(_inflight_key(account_id), agent_run_id)
+
+
+async def record_queue_wait(lane: str, wait_seconds: float, client=None) -> None:
+    client = await _get_client(client)
+    bucket = next((f"le_{b}" for b in WAIT_BUCKETS_SECONDS if wait_seconds <= b), "le_inf")
+    key = _lane_key(lane, "wait")
+    pipe = client.pipeline()
+    pipe.hincrby(key, bucket, 1)
+    pipe.hincrby(key, "count", 1)
+    pipe.hincrbyfloat(key, "sum_seconds", wait_seconds)
+    await pipe.execute()
+
+
+async def get_lane_metrics(client=None) -> Dict[str, Any]:
+    """
+    Per-lane Dramatiq depth, queued runs, active accounts and queue wait histogram.
+
+    Histogram buckets are cumulative, Prometheus style.
+    """
+    client = await _get_client(client)
+    metrics = {}
+    for lane in LANES:
+        accounts: List[str] = await client.lrange(_lane_key(lane, "ring"), 0, -1)
+        pipe = client.pipeline()
+        pipe.llen(f"dramatiq:{dramatiq_queue_name(lane)}")
+        pipe.hgetall(_lane_key(lane, "wait"))
+        for account in accounts:
+            pipe.llen(_lane_key(lane, f"q:{account}"))
+        results = await pipe.execute()
+
+        dramatiq_depth, wait_raw = results[0], results[1] or {}
+        cumulative = 0
+        buckets = {}
+        for bound in WAIT_BUCKETS_SECONDS:
+            cumulative += int(wait_raw.get(f"le_{bound}", 0))
+            buckets[str(bound)] = cumulative
+        cumulative += int(wait_raw.get("le_inf", 0))
+        buckets["+Inf"] = cumulative
+
+        count = int(wait_raw.get("count", 0))
+        sum_seconds = float(wait_raw.get("sum_seconds", 0))
+        metrics[lane] = {
+            "queue_depth": dramatiq_depth,
+            "queued_runs": sum(results[2:]),
+            "active_accounts": len(accounts),
+            "wait_seconds": {
+                "buckets": buckets,
+                "count": count,
+                "sum": round(sum_seconds, 3),
+                "mean": round(sum_seconds / count, 3) if count else None,
+            },
+        }
+    return metrics
@@ -1,17 +1,110 @@
+"""
+Audio transcription endpoint.
+
+Uploads are handed to the provider straight from the spooled file Starlette
+parsed the multipart body into (no extra in-memory copy or temp file), through
+one shared AsyncOpenAI client. A semaphore bounds how many transcriptions run
+at once per process; requests that cannot get a slot in time are rejected
+with 503 instead of piling up.
+"""
+import asyncio
 import os
+from typing import BinaryIO, Optional
+
 import openai
-import tempfile
 from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
 from pydantic import BaseModel
-from typing import Optional
 from core.utils.logger import logger
 from core.utils.auth_utils import verify_and_get_user_id_from_jwt
 
 router = APIRouter(tags=["transcription"])
 
+TRANSCRIPTION_MODEL = "gpt-4o-mini-transcribe"
+MAX_FILE_SIZE = 25 * 1024 * 1024  # OpenAI's upload limit
+TRANSCRIPTION_CONCURRENCY = int(os.getenv("TRANSCRIPTION_CONCURRENCY", "8"))
+TRANSCRIPTION_QUEUE_TIMEOUT = float(os.getenv("TRANSCRIPTION_QUEUE_TIMEOUT", "30"))
+TRANSCRIPTION_TIMEOUT = 120.0  # seconds for the upstream call
+
+# OpenAI supports these formats
+ALLOWED_TYPES = [
+    'audio/mp3', 'audio/mpeg', 'audio/mp4', 'audio/m4a',
+    'audio/wav', 'audio/webm', 'audio/mpga',
+    'audio/x-m4a', 'audio/x-mp4', 'audio/x-wav', 'audio/x-webm'
+]
+
+_client: Optional[openai.AsyncOpenAI] = None
+_gate: Optional[asyncio.Semaphore] = None
+
+
 class TranscriptionResponse(BaseModel):
     text: str
 
+
+class TranscriptionBusyError(Exception):
+    pass
+
+
+def _get_client() -> openai.AsyncOpenAI:
+    global _client
+    if _client is None:
+        # OPENAI_BASE_URL is honoured by the SDK, which is how benchmarks point it at a stub server
+        _client = openai.AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), timeout=TRANSCRIPTION_TIMEOUT)
+    return _client
+
+
+def _get_gate() -> asyncio.Semaphore:
+    global _gate
+    if _gate is None:
+        _gate = asyncio.Semaphore(TRANSCRIPTION_CONCURRENCY)
+    return _gate
+
+
+async def close_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
+
+
+def _upload_size(file: BinaryIO) -> int:
+    position = file.tell()
+    file.seek(0, os.SEEK_END)
+    size = file.tell()
+    file.seek(position)
+    return size
+
+
+async def transcribe(file: BinaryIO, filename: str, content_type: str) -> str:
+    """
+    Transcribe an audio file object without reading it into memory first.
+
+    Args:
+        file: Seekable binary file positioned at the start of the audio
+        filename: Name sent to the provider (its extension selects the decoder)
+        content_type: MIME type of the audio
+
+    Returns:
+        The transcribed text
+
+    Raises:
+        TranscriptionBusyError: If no transcription slot frees up in time
+    """
+    gate = _get_gate()
+    try:
+        await asyncio.wait_for(gate.acquire(), timeout=TRANSCRIPTION_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise TranscriptionBusyError("Too many transcriptions in progress")
+
+    try:
+        return await _get_client().audio.transcriptions.create(
+            model=TRANSCRIPTION_MODEL,
+            file=(filename, file, content_type),
+            response_format="text"
+        )
+    finally:
+        gate.release()
+
+
 @router.post("/transcription", response_model=TranscriptionResponse)
 async def transcribe_audio(
     audio_file: UploadFile = File(...),
@@ -19,59 +112,34 @@ async def transcribe_audio(
 ):
     """Transcribe audio file to text using OpenAI Whisper."""
     try:
-        # Validate file type - OpenAI supports these formats
-        allowed_types = [
-            'audio/mp3', 'audio/mpeg', 'audio/mp4', 'audio/m4a', 
-            'audio/wav', 'audio/webm', 'audio/mpga',
-            'audio/x-m4a', 'audio/x-mp4', 'audio/x-wav', 'audio/x-webm'
-        ]
-        
         logger.debug(f"Received audio file: {audio_file.filename}, content_type: {audio_file.content_type}")
-        
-        if audio_file.content_type not in allowed_types:
+
+        if audio_file.content_type not in ALLOWED_TYPES:
             raise HTTPException(
-                status_code=400, 
-                detail=f"Unsupported file type: {audio_file.content_type}. Supported types: {', '.join(allowed_types)}"
+                status_code=400,
+                detail=f"Unsupported file type: {audio_file.content_type}. Supported types: {', '.join(ALLOWED_TYPES)}"
             )
-        
-        # Check file size (25MB limit)
-        content = await audio_file.read()
-        if len(content) > 25 * 1024 * 1024:  # 25MB
+
+        # The multipart body is already spooled; check its size without reading it
+        size = audio_file.size if audio_file.size is not None else _upload_size(audio_file.file)
+        if size > MAX_FILE_SIZE:
             raise HTTPException(status_code=400, detail="File size exceeds 25MB limit")
-        
-        # Reset file pointer
-        await audio_file.seek(0)
-        
-        # Initialize OpenAI client
-        client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-        
-        # Create a temporary file with the correct extension
+
         file_extension = audio_file.filename.split('.')[-1] if audio_file.filename and '.' in audio_file.filename else 'webm'
-        
-        with tempfile.NamedTemporaryFile(delete=False, suffix=f'.{file_extension}') as temp_file:
-            temp_file.write(content)
-            temp_file_path = temp_file.name
-        
-        try:
-            # Transcribe audio using the temporary file
-            # OpenAI Whisper API has built-in limits: 25MB file size and handles duration limits internally
-            with open(temp_file_path, 'rb') as f:
-                transcription = client.audio.transcriptions.create(
-                    model="gpt-4o-mini-transcribe",
-                    file=f,
-                    response_format="text"
-                )
-            
-            logger.debug(f"Successfully transcribed audio for user {user_id}")
-            return TranscriptionResponse(text=transcription)
-            
-        finally:
-            # Clean up temporary file
-            try:
-                os.unlink(temp_file_path)
-            except Exception as e:
-                logger.warning(f"Failed to delete temporary file {temp_file_path}: {e}")
-        
+
+        audio_file.file.seek(0)
+        text = await transcribe(audio_file.file, f"audio.{file_extension}", audio_file.content_type)
+
+        logger.debug(f"Successfully transcribed audio for user {user_id}")
+        return TranscriptionResponse(text=text)
+
+    except HTTPException:
+        raise
+    except TranscriptionBusyError as e:
+        logger.warning(f"Transcription rejected for user {user_id}: {str(e)}")
+        raise HTTPException(status_code=503, detail="Transcription service is busy, please try again")
     except Exception as e:
         logger.error(f"Error transcribing audio for user {user_id}: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Transcription failed: {str(e)}") 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Transcription failed: {str(e)}")
+    finally:
+        await audio_file.close()
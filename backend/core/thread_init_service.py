@@ -44,7 +44,8 @@ async def initialize_thread_background(
         await asyncio.sleep(0.1)
         
         from core.ai_models import model_manager
-        from run_agent_background import run_agent_background
+        from run_agent_background import run_agent_background, schedule_agent_run
+        from core.utils.config import config
         
         if model_name is None:
             model_name = await model_manager.get_default_model_for_user(client, account_id)
@@ -66,7 +67,7 @@ async def initialize_thread_background(
         
         worker_instance_id = str(uuid.uuid4())[:8]
         
-        run_agent_background.send(
+        run_kwargs = dict(
             agent_run_id=agent_run_id,
             thread_id=thread_id,
             instance_id=worker_instance_id,
@@ -75,6 +76,10 @@ async def initialize_thread_background(
             agent_id=agent_id,
             account_id=account_id,
         )
+        if config.AGENT_RUN_FAIR_SCHEDULING:
+            await schedule_agent_run(**run_kwargs)
+        else:
+            run_agent_background.send(**run_kwargs)
         
         logger.info(f"Thread {thread_id} initialization completed and agent dispatched: {agent_run_id}")
         
@@ -155,6 +160,13 @@ async def create_thread_optimistically(
         
         logger.debug(f"Created thread {thread_id} with status=pending")
         
+        try:
+            from core.runtime_cache import increment_thread_count_cache, invalidate_thread_list_cache
+            await invalidate_thread_list_cache(account_id)
+            asyncio.create_task(increment_thread_count_cache(account_id))
+        except Exception:
+            pass
+        
     except Exception as e:
         logger.error(f"Failed to create thread optimistically: {str(e)}")
         
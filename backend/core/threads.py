@@ -1,14 +1,17 @@
 import asyncio
+import hashlib
 import json
 import traceback
 import uuid
 from datetime import datetime, timezone
 from typing import Optional
-from fastapi import APIRouter, HTTPException, Depends, Form, Query, Body, Request
+from fastapi import APIRouter, HTTPException, Depends, Form, Query, Body, Request, Response
+from fastapi.responses import JSONResponse
 from core.utils.auth_utils import verify_and_get_user_id_from_jwt, verify_and_authorize_thread_access, require_thread_access, AuthorizedThreadAccess, get_optional_user_id
 from core.utils.logger import logger
 from core.sandbox.sandbox import create_sandbox, delete_sandbox
 from core.utils.config import config, EnvMode
+from core.utils.pagination import PaginationService
 
 from .api_models import CreateThreadResponse, MessageCreateRequest
 from . import core_utils as utils
@@ -25,65 +28,49 @@ async def get_user_threads(
     logger.debug(f"Fetching threads with project data for user: {user_id} (page={page}, limit={limit})")
     client = await utils.db.client
     try:
+        from core.runtime_cache import (
+            get_cached_thread_count, set_cached_thread_count,
+            get_cached_thread_list_page, set_cached_thread_list_page,
+        )
+
+        # The sidebar mostly asks for the first page; serve it from a short-lived cache
+        if page == 1:
+            cached_page = await get_cached_thread_list_page(user_id, limit)
+            if cached_page is not None:
+                return cached_page
+
         offset = (page - 1) * limit
-        
-        # Optimized count query - only count, don't select columns
-        count_result = await client.table('threads').select('thread_id', count='exact').eq('account_id', user_id).execute()
-        total_count = count_result.count or 0
-        
-        if total_count == 0:
-            logger.debug(f"No threads found for user: {user_id}")
-            return {
-                "threads": [],
-                "pagination": {
-                    "page": page,
-                    "limit": limit,
-                    "total": 0,
-                    "pages": 0
-                }
-            }
-        
-        # Optimized: Select only needed columns from threads table
-        threads_result = await client.table('threads')\
-            .select('thread_id,project_id,metadata,is_public,created_at,updated_at')\
-            .eq('account_id', user_id)\
-            .order('created_at', desc=True)\
-            .range(offset, offset + limit - 1)\
-            .execute()
-        
-        paginated_threads = threads_result.data
-        
-        project_ids = [
-            thread['project_id'] for thread in paginated_threads 
-            if thread.get('project_id')
-        ]
-        unique_project_ids = list(set(project_ids)) if project_ids else []
-        
-        projects_by_id = {}
-        if unique_project_ids:
-            from core.utils.query_utils import batch_query_in
-            
-            # Optimized: Select only needed columns from projects table (exclude sandbox, description - they're large and only needed when viewing specific project)
-            projects_data = await batch_query_in(
-                client=client,
-                table_name='projects',
-                select_fields='project_id,name,icon_name,is_public,created_at,updated_at',
-                in_field='project_id',
-                in_values=unique_project_ids
-            )
-            
-            projects_by_id = {
-                project['project_id']: project 
-                for project in projects_data
-            }
+
+        async def count_threads():
+            # Maintained counter; only recount on a cache miss
+            cached_count = await get_cached_thread_count(user_id)
+            if cached_count is not None:
+                return cached_count
+            count_result = await client.table('threads').select('thread_id', count='exact', head=True).eq('account_id', user_id).execute()
+            count = count_result.count or 0
+            await set_cached_thread_count(user_id, count)
+            return count
+
+        async def fetch_threads():
+            # Single query: threads with their project embedded through the project_id foreign key
+            # (exclude sandbox, description - they're large and only needed when viewing specific project)
+            threads_result = await client.table('threads')\
+                .select('thread_id,project_id,metadata,is_public,created_at,updated_at,'
+                        'project:projects(project_id,name,icon_name,is_public,created_at,updated_at)')\
+                .eq('account_id', user_id)\
+                .order('created_at', desc=True)\
+                .range(offset, offset + limit - 1)\
+                .execute()
+            return threads_result.data or []
+
+        total_count, paginated_threads = await asyncio.gather(count_threads(), fetch_threads())
         
         mapped_threads = []
         for thread in paginated_threads:
             project_data = None
-            if thread.get('project_id') and thread['project_id'] in projects_by_id:
-                project = projects_by_id[thread['project_id']]
-                
-                # Optimized: Only include fields needed for list view (exclude sandbox, description - they're large and only needed when viewing specific project)
+            project = thread.get('project')
+            if project:
+                # Optimized: Only include fields needed for list view
                 project_data = {
                     "project_id": project['project_id'],
                     "name": project.get('name', ''),
@@ -106,7 +93,7 @@ async def get_user_threads(
         
         total_pages = (total_count + limit - 1) // limit if total_count else 0
         
-        return {
+        response = {
             "threads": mapped_threads,
             "pagination": {
                 "page": page,
@@ -115,6 +102,9 @@ async def get_user_threads(
                 "pages": total_pages
             }
         }
+        if page == 1:
+            await set_cached_thread_list_page(user_id, limit, response)
+        return response
         
     except Exception as e:
         logger.error(f"Error fetching threads for user {user_id}: {str(e)}")
@@ -411,9 +401,11 @@ async def create_thread(
         thread_id = thread.data[0]['thread_id']
         logger.debug(f"Created new thread: {thread_id}")
 
-        # Increment thread count cache (fire-and-forget)
+        # The sidebar refetches right after a create, so drop its cached first page before returning;
+        # only the counter adjustment is fire-and-forget
         try:
-            from core.runtime_cache import increment_thread_count_cache
+            from core.runtime_cache import increment_thread_count_cache, invalidate_thread_list_cache
+            await invalidate_thread_list_cache(account_id)
             asyncio.create_task(increment_thread_count_cache(account_id))
         except Exception:
             pass
@@ -425,47 +417,151 @@ async def create_thread(
         logger.error(f"Error creating thread: {str(e)}\n{traceback.format_exc()}")
         raise HTTPException(status_code=500, detail=f"Failed to create thread: {str(e)}")
 
+_MESSAGE_BATCH_SIZE = 1000
+_OPTIMIZED_MESSAGE_TYPES = ['user', 'tool', 'assistant']
+_OPTIMIZED_MESSAGE_COLUMNS = 'message_id,thread_id,type,is_llm_message,metadata,created_at,updated_at,agent_id'
+
+
+def _keyset_filter(cursor: dict, op: str) -> str:
+    """PostgREST or-filter for rows strictly after ('gt') or before ('lt') a (created_at, message_id) cursor."""
+    created_at = cursor['sort_value']
+    message_id = cursor['id']
+    return f'created_at.{op}."{created_at}",and(created_at.eq."{created_at}",message_id.{op}.{message_id})'
+
+
+def _parse_message_cursor(cursor: Optional[str], name: str) -> Optional[dict]:
+    if not cursor:
+        return None
+    parsed = PaginationService.parse_cursor(cursor)
+    if not parsed or parsed.get('sort_field') != 'created_at' or not parsed.get('id'):
+        raise HTTPException(status_code=400, detail=f"Invalid '{name}' cursor")
+    return parsed
+
+
+def _message_cursor(message: dict) -> str:
+    return PaginationService.create_cursor(message['message_id'], 'created_at', message['created_at'])
+
+
+async def _fetch_messages_keyset(client, thread_id: str, columns: str, types: Optional[list],
+                                 ascending: bool, after: Optional[dict] = None, before: Optional[dict] = None,
+                                 limit: Optional[int] = None) -> list:
+    """Fetch messages in (created_at, message_id) order using keyset pagination for every batch."""
+    messages = []
+    position = after if ascending else before
+    bound = before if ascending else after
+    while True:
+        batch_size = _MESSAGE_BATCH_SIZE if limit is None else min(_MESSAGE_BATCH_SIZE, limit - len(messages))
+        query = client.table('messages').select(columns).eq('thread_id', thread_id)
+        if types:
+            query = query.in_('type', types)
+        filters = []
+        if position:
+            filters.append(_keyset_filter(position, 'gt' if ascending else 'lt'))
+        if bound:
+            filters.append(_keyset_filter(bound, 'lt' if ascending else 'gt'))
+        if len(filters) == 1:
+            query = query.or_(filters[0])
+        elif filters:
+            # PostgREST takes a single or= parameter; nest both ranges under one and()
+            query = query.or_(f"and(or({filters[0]}),or({filters[1]}))")
+        query = query.order('created_at', desc=not ascending).order('message_id', desc=not ascending)
+        result = await query.limit(batch_size).execute()
+        batch = result.data or []
+        messages.extend(batch)
+        if len(batch) < batch_size or (limit is not None and len(messages) >= limit):
+            return messages
+        last = batch[-1]
+        position = {'id': last['message_id'], 'sort_value': last['created_at']}
+
+
+def _may_need_migration(message: dict) -> bool:
+    """Metadata-only pre-check; only candidates need their content fetched for needs_migration."""
+    metadata = message.get('metadata') or {}
+    if isinstance(metadata, str):
+        try:
+            metadata = json.loads(metadata)
+        except json.JSONDecodeError:
+            return True
+    if message.get('type') == 'assistant':
+        return 'tool_calls' not in metadata or 'text_content' not in metadata
+    if message.get('type') == 'tool':
+        return 'result' not in metadata
+    return False
+
+
+async def _fetch_message_contents(client, message_ids: list) -> dict:
+    contents = {}
+    # Keep the in() filter well within URL length limits
+    for i in range(0, len(message_ids), 200):
+        chunk = message_ids[i:i + 200]
+        result = await client.table('messages').select('message_id,content').in_('message_id', chunk).execute()
+        for row in result.data or []:
+            contents[row['message_id']] = row.get('content')
+    return contents
+
+
+async def _thread_messages_etag(client, thread_id: str, variant: str) -> str:
+    """Weak ETag from the message count and latest change, without reading message bodies."""
+    result = await client.table('messages').select(
+        'message_id,updated_at', count='exact'
+    ).eq('thread_id', thread_id).order('updated_at', desc=True).limit(1).execute()
+    latest = result.data[0] if result.data else {}
+    fingerprint = f"{thread_id}|{result.count or 0}|{latest.get('updated_at')}|{latest.get('message_id')}|{variant}"
+    return f'W/"{hashlib.sha1(fingerprint.encode()).hexdigest()}"'
+
+
 @router.get("/threads/{thread_id}/messages", summary="Get Thread Messages", operation_id="get_thread_messages")
 async def get_thread_messages(
     thread_id: str,
     request: Request,
     order: str = Query("desc", description="Order by created_at: 'asc' or 'desc'"),
     optimized: bool = Query(True, description="Return optimized messages (filtered types, minimal fields) or full messages (all types, all fields)"),
+    since: Optional[str] = Query(None, description="Cursor: only return messages newer than this one (delta sync)"),
+    before: Optional[str] = Query(None, description="Cursor: only return messages older than this one (backwards scrolling)"),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Maximum number of messages to return (default: all)"),
 ):
-    logger.debug(f"Fetching all messages for thread: {thread_id}, order={order}")
+    logger.debug(f"Fetching messages for thread: {thread_id}, order={order}, since={since}, before={before}, limit={limit}")
     client = await utils.db.client
     
     from core.utils.auth_utils import get_optional_user_id
     user_id = await get_optional_user_id(request)
     
     await verify_and_authorize_thread_access(client, thread_id, user_id)
+
+    since_cursor = _parse_message_cursor(since, 'since')
+    before_cursor = _parse_message_cursor(before, 'before')
+
     try:
+        etag = await _thread_messages_etag(client, thread_id, f"{order}|{optimized}|{since}|{before}|{limit}")
+        if etag in request.headers.get('if-none-match', ''):
+            return Response(status_code=304, headers={"ETag": etag})
+
         from core.utils.message_migration import migrate_thread_messages, needs_migration
-        
-        # Helper to fetch all messages (with content for migration check)
-        async def fetch_all_messages_raw():
-            batch_size = 1000
-            offset = 0
-            messages = []
-            allowed_types = ['user', 'tool', 'assistant']
-            while True:
-                if optimized:
-                    # Need content for migration check, will strip later
-                    query = client.table('messages').select(
-                        'message_id,thread_id,type,is_llm_message,content,metadata,created_at,updated_at,agent_id'
-                    ).eq('thread_id', thread_id).in_('type', allowed_types)
-                else:
-                    query = client.table('messages').select('*').eq('thread_id', thread_id)
-                
-                query = query.order('created_at', desc=(order == "desc"))
-                query = query.range(offset, offset + batch_size - 1)
-                result = await query.execute()
-                batch = result.data or []
-                messages.extend(batch)
-                if len(batch) < batch_size:
-                    break
-                offset += batch_size
-            return messages
+
+        # Deltas read forward from `since`; backwards scrolling and "latest N" read back from the newest
+        ascending = since_cursor is not None or limit is None
+        fetch_limit = limit + 1 if limit is not None else None
+        
+        async def fetch_page():
+            columns = _OPTIMIZED_MESSAGE_COLUMNS if optimized else '*'
+            types = _OPTIMIZED_MESSAGE_TYPES if optimized else None
+            page = await _fetch_messages_keyset(
+                client, thread_id, columns, types, ascending,
+                after=since_cursor, before=before_cursor, limit=fetch_limit,
+            )
+            has_more = limit is not None and len(page) > limit
+            page = page[:limit] if limit is not None else page
+            if optimized:
+                # Content is only returned for user messages, and only read for migration candidates
+                content_ids = [
+                    m['message_id'] for m in page
+                    if m.get('type') == 'user' or _may_need_migration(m)
+                ]
+                contents = await _fetch_message_contents(client, content_ids) if content_ids else {}
+                for m in page:
+                    if m['message_id'] in contents:
+                        m['content'] = contents[m['message_id']]
+            return page, has_more
         
         # Helper to optimize messages (strip content for non-user messages)
         def optimize_messages(raw_messages):
@@ -490,14 +586,14 @@ async def get_thread_messages(
                 optimized_list.append(optimized_msg)
             return optimized_list
         
-        # STEP 1: Fetch messages ONCE
-        raw_messages = await fetch_all_messages_raw()
+        # STEP 1: Fetch the requested page ONCE
+        raw_messages, has_more = await fetch_page()
         
         # STEP 2: Check in-memory if any messages need migration
         migration_needed = any(
             needs_migration(msg) 
             for msg in raw_messages 
-            if msg.get('type') in ['assistant', 'tool']
+            if msg.get('type') in ['assistant', 'tool'] and (not optimized or 'content' in msg)
         )
         
         # STEP 3: If migration needed, migrate and re-fetch fresh data
@@ -506,12 +602,29 @@ async def get_thread_messages(
             if stats['migrated'] > 0:
                 logger.info(f"Migrated {stats['migrated']} messages for thread {thread_id}")
                 # Re-fetch to get fresh migrated data
-                raw_messages = await fetch_all_messages_raw()
+                raw_messages, has_more = await fetch_page()
+                etag = await _thread_messages_etag(client, thread_id, f"{order}|{optimized}|{since}|{before}|{limit}")
         
-        # STEP 4: Apply optimization and return
+        # STEP 4: Apply optimization and return in the requested order
+        if ascending != (order == "asc"):
+            raw_messages.reverse()
         all_messages = optimize_messages(raw_messages)
-        
-        return {"messages": all_messages}
+
+        oldest = min(raw_messages, key=lambda m: (m['created_at'], m['message_id']), default=None)
+        newest = max(raw_messages, key=lambda m: (m['created_at'], m['message_id']), default=None)
+        return JSONResponse(
+            content={
+                "messages": all_messages,
+                "has_more": has_more,
+                "cursors": {
+                    "oldest": _message_cursor(oldest) if oldest else before,
+                    "newest": _message_cursor(newest) if newest else since,
+                },
+            },
+            headers={"ETag": etag},
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching messages for thread {thread_id}: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to fetch messages: {str(e)}")
@@ -633,7 +746,7 @@ async def update_thread(
         if title is None and is_public is None:
             raise HTTPException(status_code=400, detail="No update data provided")
         
-        thread_result = await client.table('threads').select('project_id, metadata').eq('thread_id', thread_id).execute()
+        thread_result = await client.table('threads').select('project_id, account_id, metadata').eq('thread_id', thread_id).execute()
         if not thread_result.data:
             raise HTTPException(status_code=404, detail="Thread not found")
         
@@ -648,6 +761,10 @@ async def update_thread(
             
             if not project_result.data:
                 raise HTTPException(status_code=500, detail="Failed to update project name")
+            
+            # The sidebar shows the project name; clear it now in case the thread update below fails
+            from core.runtime_cache import invalidate_thread_list_cache
+            await invalidate_thread_list_cache(thread.get('account_id') or auth.user_id)
         
         thread_update_data = {}
         
@@ -672,6 +789,12 @@ async def update_thread(
             if not thread_update.data:
                 raise HTTPException(status_code=500, detail="Failed to update thread")
         
+        try:
+            from core.runtime_cache import invalidate_thread_list_cache
+            await invalidate_thread_list_cache(thread.get('account_id') or auth.user_id)
+        except Exception:
+            pass
+        
         logger.debug(f"Successfully updated thread: {thread_id}")
         
         return await get_thread(thread_id, request)
@@ -691,7 +814,7 @@ async def delete_thread(
     client = await utils.db.client
     
     try:
-        thread_result = await client.table('threads').select('project_id').eq('thread_id', thread_id).execute()
+        thread_result = await client.table('threads').select('project_id, account_id').eq('thread_id', thread_id).execute()
         if not thread_result.data:
             raise HTTPException(status_code=404, detail="Thread not found")
         
@@ -725,10 +848,12 @@ async def delete_thread(
         if not thread_delete_result.data:
             raise HTTPException(status_code=500, detail="Failed to delete thread")
         
-        # Invalidate thread count cache for this user
+        # Keep the thread count and list caches for the owning account in sync
         try:
-            from core.runtime_cache import invalidate_thread_count_cache
-            await invalidate_thread_count_cache(auth.user_id)
+            from core.runtime_cache import decrement_thread_count_cache, invalidate_thread_list_cache
+            owner_id = thread.get('account_id') or auth.user_id
+            await invalidate_thread_list_cache(owner_id)
+            await decrement_thread_count_cache(owner_id)
         except Exception:
             pass
         
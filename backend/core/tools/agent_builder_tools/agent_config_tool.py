@@ -127,6 +127,8 @@ class AgentConfigTool(AgentBuilderBaseTool):
             
             if agent_update_fields:
                 result = await client.table('agents').update(agent_update_fields).eq('agent_id', self.agent_id).execute()
+                from core.runtime_cache import invalidate_agent_config_cache
+                await invalidate_agent_config_cache(self.agent_id)
                 if not result.data:
                     return self.fail_response("Failed to update agent")
             
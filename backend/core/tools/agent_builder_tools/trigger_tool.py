@@ -96,6 +96,8 @@ class TriggerTool(AgentBuilderBaseTool):
             config['triggers'] = triggers
             
             await client.table('agent_versions').update({'config': config}).eq('version_id', current_version_id).execute()
+            from core.runtime_cache import invalidate_agent_config_cache
+            await invalidate_agent_config_cache(self.agent_id)
             
             logger.debug(f"Synced {len(triggers)} triggers to version config for agent {self.agent_id}")
             
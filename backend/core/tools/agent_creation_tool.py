@@ -212,6 +212,8 @@ class AgentCreationTool(Tool):
                 await client.table('agents').update({
                     "current_version_id": version.version_id
                 }).eq("agent_id", agent_id).execute()
+                from core.runtime_cache import invalidate_agent_config_cache
+                await invalidate_agent_config_cache(agent_id)
 
                 success_message = f"✅ Successfully created agent '{name}'!\n\n"
                 success_message += f"**Icon**: {icon_name} ({icon_color} on {icon_background})\n"
@@ -664,6 +666,9 @@ class AgentCreationTool(Tool):
                 'current_version_id': new_version.version_id,
                 'version_count': agent_data['version_count'] + 1
             }).eq('agent_id', agent_id).execute()
+            from core.runtime_cache import invalidate_agent_config_cache, set_current_agent_version
+            await set_current_agent_version(agent_id, new_version.version_id)
+            await invalidate_agent_config_cache(agent_id)
             
             try:
                 from core.tools.mcp_tool_wrapper import MCPToolWrapper
@@ -1161,6 +1166,8 @@ class AgentCreationTool(Tool):
             
             if agent_updates:
                 await client.table('agents').update(agent_updates).eq('agent_id', agent_id).execute()
+                from core.runtime_cache import invalidate_agent_config_cache
+                await invalidate_agent_config_cache(agent_id)
             
             version_changes = False
             new_system_prompt = system_prompt if system_prompt is not None else current_config.get('system_prompt', '')
@@ -1203,6 +1210,9 @@ class AgentCreationTool(Tool):
                     'current_version_id': new_version.version_id,
                     'version_count': agent_data['version_count'] + 1
                 }).eq('agent_id', agent_id).execute()
+                from core.runtime_cache import invalidate_agent_config_cache, set_current_agent_version
+                await set_current_agent_version(agent_id, new_version.version_id)
+                await invalidate_agent_config_cache(agent_id)
                 
                 try:
                     await self._sync_triggers_to_version_config(agent_id)
@@ -1280,6 +1290,8 @@ class AgentCreationTool(Tool):
             config['triggers'] = triggers
             
             await client.table('agent_versions').update({'config': config}).eq('version_id', current_version_id).execute()
+            from core.runtime_cache import invalidate_agent_config_cache
+            await invalidate_agent_config_cache(agent_id)
             
             logger.debug(f"Synced {len(triggers)} triggers to version config for agent {agent_id}")
             
@@ -117,9 +117,10 @@ _redis_cache = MCPSchemaRedisCache(ttl_seconds=3600)
     visible=False
 )
 class MCPToolWrapper(Tool):
-    def __init__(self, mcp_configs: Optional[List[Dict[str, Any]]] = None, use_cache: bool = True):
+    def __init__(self, mcp_configs: Optional[List[Dict[str, Any]]] = None, use_cache: bool = True, account_id: Optional[str] = None):
         self.mcp_manager = mcp_service
         self.mcp_configs = mcp_configs or []
+        self.account_id = account_id
         self._initialized = False
         self._schemas: Dict[str, List[ToolSchema]] = {}
         self._dynamic_tools = {}
@@ -240,10 +241,14 @@ class MCPToolWrapper(Tool):
     async def _initialize_single_standard_server(self, config: Dict[str, Any]):
         try:
             logger.debug(f"Connecting to standard MCP server: {config['qualifiedName']}")
-            await self.mcp_manager.connect_server(config)
+            await self.mcp_manager.connect_server(config, account_id=self.account_id)
             logger.debug(f"✓ Connected to MCP server: {config['qualifiedName']}")
             
-            tools_info = self.mcp_manager.get_all_tools_openapi()
+            tools_info = self.mcp_manager.get_all_tools_openapi(
+                account_id=self.account_id,
+                qualified_name=config['qualifiedName'],
+                enabled_tools=self.mcp_manager.get_enabled_tools(config),
+            )
             return {'tools': tools_info, 'type': 'standard', 'timestamp': time.time(), 'success': True}
         except Exception as e:
             config_name = config.get('qualifiedName', config.get('name', 'Unknown'))
@@ -270,7 +275,7 @@ class MCPToolWrapper(Tool):
     
     async def _create_dynamic_tools(self):
         try:
-            available_tools = self.mcp_manager.get_all_tools_openapi()
+            available_tools = self._get_standard_tools_openapi()
             custom_tools = self.custom_handler.get_custom_tools()
             
             logger.debug(f"MCPManager returned {len(available_tools)} standard tools, Custom handler returned {len(custom_tools)} custom tools")
@@ -426,7 +431,12 @@ class MCPToolWrapper(Tool):
     async def get_available_tools(self) -> List[Dict[str, Any]]:
         """Get list of available MCP tools in OpenAPI format."""
         await self._ensure_initialized()
-        return self.mcp_manager.get_all_tools_openapi()
+        return self._get_standard_tools_openapi()
+    
+    def _get_standard_tools_openapi(self) -> List[Dict[str, Any]]:
+        # The account's pooled sessions include other agents' servers; only expose this agent's
+        standard_configs = [cfg for cfg in self.mcp_configs if not cfg.get('isCustom', False)]
+        return self.mcp_manager.get_tools_openapi_for_configs(standard_configs, account_id=self.account_id)
     
     async def _execute_mcp_tool(self, tool_name: str, arguments: Dict[str, Any]) -> ToolResult:
         """Execute an MCP tool by its original tool name.
@@ -492,10 +502,12 @@ class MCPToolWrapper(Tool):
         return validation_result
     
     async def cleanup(self):
-        """Clean up MCP connections and release memory."""
+        """Release MCP connections back to the shared pool and free memory."""
         if self._initialized:
             try:
-                await self.mcp_manager.disconnect_all()
+                # Sessions are pooled across runs; only sweep the ones that went idle
+                await self.mcp_manager.evict_idle()
+                logger.debug(f"MCP pool stats: {self.mcp_manager.get_pool_stats()}")
             except Exception as e:
                 logger.error(f"Error during MCP cleanup: {str(e)}")
             finally:
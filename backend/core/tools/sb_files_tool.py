@@ -1,5 +1,6 @@
 from core.agentpress.tool import ToolResult, openapi_schema, tool_metadata
 from core.sandbox.tool_base import SandboxToolsBase
+from core.sandbox.fs_batch import SandboxFileCache, read_files
 from core.utils.files_utils import should_exclude_file, clean_path
 from core.agentpress.thread_manager import ThreadManager
 from core.utils.logger import logger
@@ -63,6 +64,7 @@ class SandboxFilesTool(SandboxToolsBase):
     def __init__(self, project_id: str, thread_manager: ThreadManager):
         super().__init__(project_id, thread_manager)
         self.SNIPPET_LINES = 4  # Number of context lines to show around edits
+        self._file_cache = SandboxFileCache()
 
     def clean_path(self, path: str) -> str:
         """Clean and normalize a path to be relative to /workspace"""
@@ -72,13 +74,36 @@ class SandboxFilesTool(SandboxToolsBase):
         """Check if a file should be excluded based on path, name, or extension"""
         return should_exclude_file(rel_path)
 
-    async def _file_exists(self, path: str) -> bool:
-        """Check if a file exists in the sandbox"""
+    async def _get_file_info(self, path: str):
+        """Get file info from the sandbox, or None if the file does not exist"""
         try:
-            await self.sandbox.fs.get_file_info(path)
-            return True
+            return await self.sandbox.fs.get_file_info(path)
         except Exception:
-            return False
+            return None
+
+    async def _file_exists(self, path: str) -> bool:
+        """Check if a file exists in the sandbox"""
+        return await self._get_file_info(path) is not None
+
+    async def _read_file(self, path: str, file_info=None) -> str:
+        """Read a file's text, reusing the cached copy while its size and mtime are unchanged"""
+        if file_info is not None:
+            cached = self._file_cache.get(path, file_info)
+            if cached is not None:
+                return cached
+        content = (await self.sandbox.fs.download_file(path)).decode()
+        if file_info is not None:
+            self._file_cache.put(path, content, size=file_info.size, mod_time=file_info.mod_time)
+        return content
+
+    async def _write_file(self, path: str, content: str) -> None:
+        """Upload a file and cache its new content under the size and mtime the sandbox reports"""
+        await self.sandbox.fs.upload_file(content.encode(), path)
+        file_info = await self._get_file_info(path)
+        if file_info is None:
+            self._file_cache.invalidate(path)
+            return
+        self._file_cache.put(path, content, size=file_info.size, mod_time=file_info.mod_time)
 
     async def get_workspace_state(self) -> dict:
         """Get the current workspace state by reading all files"""
@@ -88,31 +113,48 @@ class SandboxFilesTool(SandboxToolsBase):
             await self._ensure_sandbox()
             
             files = await self.sandbox.fs.list_files(self.workspace_path)
-            for file_info in files:
-                rel_path = file_info.name
-                
+            wanted = {
+                f"{self.workspace_path}/{file_info.name}": file_info
+                for file_info in files
                 # Skip excluded files and directories
-                if self._should_exclude_file(rel_path) or file_info.is_dir:
-                    continue
+                if not (self._should_exclude_file(file_info.name) or file_info.is_dir)
+            }
 
-                try:
-                    full_path = f"{self.workspace_path}/{rel_path}"
-                    content = (await self.sandbox.fs.download_file(full_path)).decode()
-                    files_state[rel_path] = {
-                        "content": content,
-                        "is_dir": file_info.is_dir,
-                        "size": file_info.size,
-                        "modified": file_info.mod_time
-                    }
-                except Exception as e:
-                    print(f"Error reading file {rel_path}: {e}")
-                except UnicodeDecodeError:
-                    print(f"Skipping binary file: {rel_path}")
+            # Serve unchanged files from the cache and fetch the rest in one batched command
+            contents = {}
+            to_fetch = []
+            for full_path, file_info in wanted.items():
+                cached = self._file_cache.get(full_path, file_info)
+                if cached is not None:
+                    contents[full_path] = cached
+                else:
+                    to_fetch.append((full_path, file_info.size or 0))
+            contents.update(await read_files(self.sandbox, to_fetch))
+
+            for full_path, file_info in wanted.items():
+                rel_path = file_info.name
+                content = contents.get(full_path)
+                if content is None:
+                    logger.warning(f"Error reading file {rel_path}")
+                    continue
+                if isinstance(content, bytes):
+                    try:
+                        content = content.decode()
+                    except UnicodeDecodeError:
+                        logger.debug(f"Skipping binary file: {rel_path}")
+                        continue
+                    self._file_cache.put(full_path, content, size=file_info.size, mod_time=file_info.mod_time)
+                files_state[rel_path] = {
+                    "content": content,
+                    "is_dir": file_info.is_dir,
+                    "size": file_info.size,
+                    "modified": file_info.mod_time
+                }
 
             return files_state
         
         except Exception as e:
-            print(f"Error getting workspace state: {str(e)}")
+            logger.error(f"Error getting workspace state: {str(e)}")
             return {}
 
     # def _get_preview_url(self, file_path: str) -> Optional[str]:
@@ -167,7 +209,7 @@ class SandboxFilesTool(SandboxToolsBase):
                 file_contents = json.dumps(file_contents, indent=4)
 
             # Write the file content
-            await self.sandbox.fs.upload_file(file_contents.encode(), full_path)
+            await self._write_file(full_path, file_contents)
             await self.sandbox.fs.set_file_permissions(full_path, permissions)
             
             message = f"File '{file_path}' created successfully."
@@ -218,10 +260,11 @@ class SandboxFilesTool(SandboxToolsBase):
             
             file_path = self.clean_path(file_path)
             full_path = f"{self.workspace_path}/{file_path}"
-            if not await self._file_exists(full_path):
+            file_info = await self._get_file_info(full_path)
+            if file_info is None:
                 return self.fail_response(f"File '{file_path}' does not exist")
             
-            content = (await self.sandbox.fs.download_file(full_path)).decode()
+            content = await self._read_file(full_path, file_info)
             old_str = old_str.expandtabs()
             new_str = new_str.expandtabs()
             
@@ -234,7 +277,7 @@ class SandboxFilesTool(SandboxToolsBase):
             
             # Perform replacement
             new_content = content.replace(old_str, new_str)
-            await self.sandbox.fs.upload_file(new_content.encode(), full_path)
+            await self._write_file(full_path, new_content)
             
             # Show snippet around the edit
             replacement_line = content.split(old_str)[0].count('\n')
@@ -289,7 +332,7 @@ class SandboxFilesTool(SandboxToolsBase):
             if not await self._file_exists(full_path):
                 return self.fail_response(f"File '{file_path}' does not exist. Use create_file to create a new file.")
 
-            await self.sandbox.fs.upload_file(file_contents.encode(), full_path)
+            await self._write_file(full_path, file_contents)
             await self.sandbox.fs.set_file_permissions(full_path, permissions)
             
             message = f"File '{file_path}' completely rewritten successfully."
@@ -370,6 +413,7 @@ class SandboxFilesTool(SandboxToolsBase):
                 return self.fail_response(f"File '{file_path}' does not exist")
             
             await self.sandbox.fs.delete_file(full_path)
+            self._file_cache.invalidate(full_path)
             return self.success_response(f"File '{file_path}' deleted successfully.")
         except Exception as e:
             return self.fail_response(f"Error deleting file: {str(e)}")
@@ -474,10 +518,11 @@ class SandboxFilesTool(SandboxToolsBase):
             
             target_file = self.clean_path(target_file)
             full_path = f"{self.workspace_path}/{target_file}"
-            if not await self._file_exists(full_path):
+            file_info = await self._get_file_info(full_path)
+            if file_info is None:
                 return self.fail_response(f"File '{target_file}' does not exist")
             
-            original_content = (await self.sandbox.fs.download_file(full_path)).decode()
+            original_content = await self._read_file(full_path, file_info)
             
             is_tiptap_doc = False
             original_wrapper = None
@@ -549,7 +594,7 @@ class SandboxFilesTool(SandboxToolsBase):
                     "updated_content": original_content
                 }))
 
-            await self.sandbox.fs.upload_file(new_content.encode(), full_path)
+            await self._write_file(full_path, new_content)
             
             return ToolResult(success=True, output=json.dumps({
                 "message": f"File '{target_file}' edited successfully.",
@@ -564,8 +609,9 @@ class SandboxFilesTool(SandboxToolsBase):
             original_content_on_error = None
             try:
                 full_path_on_error = f"{self.workspace_path}/{self.clean_path(target_file)}"
-                if await self._file_exists(full_path_on_error):
-                    original_content_on_error = (await self.sandbox.fs.download_file(full_path_on_error)).decode()
+                file_info_on_error = await self._get_file_info(full_path_on_error)
+                if file_info_on_error is not None:
+                    original_content_on_error = await self._read_file(full_path_on_error, file_info_on_error)
             except:
                 pass
             
@@ -1,21 +1,15 @@
 import os
 import base64
 import mimetypes
-import uuid
-from datetime import datetime
 from typing import Optional, Tuple
-from io import BytesIO
-from PIL import Image
 from urllib.parse import urlparse
 from core.agentpress.tool import ToolResult, openapi_schema, tool_metadata
 from core.sandbox.tool_base import SandboxToolsBase
 from core.agentpress.thread_manager import ThreadManager
 from core.services.supabase import DBConnection
+from core.services import image_pipeline, image_store
+from core.utils.image_encoding import compress_image_bytes, svg_to_png
 import json
-from svglib.svglib import svg2rlg
-from reportlab.graphics import renderPM
-import tempfile
-import requests
 from core.utils.config import config
 from core.utils.logger import logger
 # Add common image MIME types if mimetypes module is limited
@@ -29,12 +23,6 @@ mimetypes.add_type("image/gif", ".gif")
 MAX_IMAGE_SIZE = 10 * 1024 * 1024
 MAX_COMPRESSED_SIZE = 5 * 1024 * 1024
 
-# Compression settings
-DEFAULT_MAX_WIDTH = 1920
-DEFAULT_MAX_HEIGHT = 1080
-DEFAULT_JPEG_QUALITY = 85
-DEFAULT_PNG_COMPRESS_LEVEL = 6
-
 @tool_metadata(
     display_name="Image Vision",
     description="View and analyze images to understand their content",
@@ -146,7 +134,7 @@ class SandboxVisionTool(SandboxToolsBase):
                         screenshot_base64 = response_data.get("screenshot_base64")
                         if screenshot_base64:
                             png_bytes = base64.b64decode(screenshot_base64)
-                            print(f"[SeeImage] Converted SVG '{os.path.basename(svg_full_path)}' to PNG using sandbox browser")
+                            logger.debug(f"[SeeImage] Converted SVG '{os.path.basename(svg_full_path)}' to PNG using sandbox browser")
                             return png_bytes, 'image/png'
                         else:
                             raise Exception("No screenshot data in browser response")
@@ -164,6 +152,8 @@ class SandboxVisionTool(SandboxToolsBase):
     
     async def compress_image(self, image_bytes: bytes, mime_type: str, file_path: str) -> Tuple[bytes, str]:
         """Compress an image to reduce its size while maintaining reasonable quality.
+
+        Decoding, resizing and encoding run in the image pipeline's process pool.
         
         Args:
             image_bytes: Original image bytes
@@ -184,81 +174,27 @@ class SandboxVisionTool(SandboxToolsBase):
                     image_bytes = png_bytes
                     mime_type = png_mime
                 except Exception as browser_error:
-                    print(f"[SeeImage] Browser-based SVG conversion failed: {browser_error}")
+                    logger.warning(f"[SeeImage] Browser-based SVG conversion failed: {browser_error}")
                     
                     # Fallback to svglib approach
                     try:
-                        
-                        # Create temporary SVG file for svglib
-                        with tempfile.NamedTemporaryFile(suffix='.svg', delete=False) as temp_svg:
-                            temp_svg.write(image_bytes)
-                            temp_svg_path = temp_svg.name
-                        
-                        try:
-                            # Convert SVG to PNG using svglib + reportlab
-                            drawing = svg2rlg(temp_svg_path)
-                            png_buffer = BytesIO()
-                            renderPM.drawToFile(drawing, png_buffer, fmt='PNG')
-                            png_bytes = png_buffer.getvalue()
-                            
-                            print(f"[SeeImage] Converted SVG '{file_path}' to PNG using fallback method (svglib)")
-                            # Update for PIL processing
-                            image_bytes = png_bytes
-                            mime_type = 'image/png'
-                        finally:
-                            # Clean up temporary file
-                            os.unlink(temp_svg_path)
-                            
+                        image_bytes = await image_pipeline.encode(svg_to_png, image_bytes)
+                        mime_type = 'image/png'
+                        logger.debug(f"[SeeImage] Converted SVG '{file_path}' to PNG using fallback method (svglib)")
                     except ImportError:
                         raise Exception(f"SVG conversion libraries not available. Cannot display SVG file '{file_path}'. Please convert to PNG manually.")
                     except Exception as e:
                         raise Exception(f"SVG conversion failed for '{file_path}': {str(e)}. Please convert to PNG manually.")
             
-            # Open image from bytes
-            img = Image.open(BytesIO(image_bytes))
-            
-            # Convert RGBA to RGB if necessary (for JPEG)
-            if img.mode in ('RGBA', 'LA', 'P'):
-                # Create a white background
-                background = Image.new('RGB', img.size, (255, 255, 255))
-                if img.mode == 'P':
-                    img = img.convert('RGBA')
-                background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
-                img = background
-            
-            # Calculate new dimensions while maintaining aspect ratio
-            width, height = img.size
-            if width > DEFAULT_MAX_WIDTH or height > DEFAULT_MAX_HEIGHT:
-                ratio = min(DEFAULT_MAX_WIDTH / width, DEFAULT_MAX_HEIGHT / height)
-                new_width = int(width * ratio)
-                new_height = int(height * ratio)
-                img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-                print(f"[SeeImage] Resized image from {width}x{height} to {new_width}x{new_height}")
-            
-            # Save to bytes with compression
-            output = BytesIO()
-            
-            # Determine output format based on original mime type
-            if mime_type == 'image/gif':
-                # Keep GIFs as GIFs to preserve animation
-                img.save(output, format='GIF', optimize=True)
-                output_mime = 'image/gif'
-            elif mime_type == 'image/png':
-                # Compress PNG
-                img.save(output, format='PNG', optimize=True, compress_level=DEFAULT_PNG_COMPRESS_LEVEL)
-                output_mime = 'image/png'
-            else:
-                # Convert everything else to JPEG for better compression (converted SVGs stay PNG above)
-                img.save(output, format='JPEG', quality=DEFAULT_JPEG_QUALITY, optimize=True)
-                output_mime = 'image/jpeg'
-            
-            compressed_bytes = output.getvalue()
+            compressed_bytes, output_mime, resize = await image_pipeline.encode(compress_image_bytes, image_bytes, mime_type)
+            if resize:
+                logger.debug(f"[SeeImage] Resized image from {resize[0]}x{resize[1]} to {resize[2]}x{resize[3]}")
             
             # Log compression results
             original_size = len(image_bytes)
             compressed_size = len(compressed_bytes)
             compression_ratio = (1 - compressed_size / original_size) * 100
-            print(f"[SeeImage] Compressed '{file_path}' from {original_size / 1024:.1f}KB to {compressed_size / 1024:.1f}KB ({compression_ratio:.1f}% reduction)")
+            logger.debug(f"[SeeImage] Compressed '{file_path}' from {original_size / 1024:.1f}KB to {compressed_size / 1024:.1f}KB ({compression_ratio:.1f}% reduction)")
             
             return compressed_bytes, output_mime
             
@@ -266,7 +202,7 @@ class SandboxVisionTool(SandboxToolsBase):
             # CRITICAL: Never return unsupported formats
             # If compression fails, we need to ensure we still return a supported format
             if mime_type in ['image/jpeg', 'image/png', 'image/gif', 'image/webp']:
-                print(f"[SeeImage] Failed to compress image: {str(e)}. Using original (format is supported).")
+                logger.warning(f"[SeeImage] Failed to compress image: {str(e)}. Using original (format is supported).")
                 return image_bytes, mime_type
             else:
                 # Unsupported format and compression failed - must fail
@@ -277,38 +213,12 @@ class SandboxVisionTool(SandboxToolsBase):
         parsed_url = urlparse(file_path)
         return parsed_url.scheme in ('http', 'https')
     
-    def download_image_from_url(self, url: str) -> Tuple[bytes, str]:
+    async def download_image_from_url(self, url: str) -> Tuple[bytes, str]:
         """Download image from a URL"""
         try:
-            headers = {
-                "User-Agent": "Mozilla/5.0"  # Some servers block default Python
-            }
-
-            # HEAD request to get the image size
-            head_response = requests.head(url, timeout=10, headers=headers, stream=True)
-            head_response.raise_for_status()
-            
-            # Check content length
-            content_length = int(head_response.headers.get('Content-Length'))
-            if content_length and content_length > MAX_IMAGE_SIZE:
-                raise Exception(f"Image is too large ({(content_length)/(1024*1024):.2f}MB) for the maximum allowed size of {MAX_IMAGE_SIZE/(1024*1024):.2f}MB")
-            
-            # Download the image
-            response = requests.get(url, timeout=10, headers=headers, stream=True)
-            response.raise_for_status()
-
-            image_bytes = response.content
-            if len(image_bytes) > MAX_IMAGE_SIZE:
-                raise Exception(f"Downloaded image is too large ({(len(image_bytes))/(1024*1024):.2f}MB). Maximum allowed size of {MAX_IMAGE_SIZE/(1024*1024):.2f}MB")
-
-            # Get MIME type
-            mime_type = response.headers.get('Content-Type')
-            if not mime_type or not mime_type.startswith('image/'):
-                raise Exception(f"URL does not point to an image (Content-Type: {mime_type}): {url}")
-            
-            return image_bytes, mime_type
+            return await image_pipeline.download_image(url, MAX_IMAGE_SIZE)
         except Exception as e:
-            return self.fail_response(f"Failed to download image from URL: {str(e)}")
+            raise Exception(f"Failed to download image from URL: {str(e)}")
     
     @openapi_schema({
         "type": "function",
@@ -332,14 +242,20 @@ Images remain in the sandbox and can be loaded again anytime. SVG files are auto
         }
     })
     async def load_image(self, file_path: str) -> ToolResult:
-        """Loads an image file from local file system or from a URL, compresses it, uploads to cloud storage, and returns the public URL."""
+        """Loads an image file from local file system or from a URL, compresses it, uploads to cloud storage, and returns the public URL.
+
+        Outputs are cached by content hash, so re-loading an unchanged image skips
+        the download, the compression and the storage upload.
+        """
         try:
             is_url = self.is_url(file_path)
             if is_url:
+                cleaned_path = file_path
+                # Content behind a URL can change, so URLs are always fetched and matched by content hash
+                source = None
                 try:
-                    image_bytes, mime_type = self.download_image_from_url(file_path)
+                    image_bytes, mime_type = await self.download_image_from_url(file_path)
                     original_size = len(image_bytes)
-                    cleaned_path = file_path
                 except Exception as e:
                     return self.fail_response(f"Failed to download image from URL: {str(e)}")
             else:
@@ -362,6 +278,11 @@ Images remain in the sandbox and can be loaded again anytime. SVG files are auto
                 if file_info.size > MAX_IMAGE_SIZE:
                     return self.fail_response(f"Image file '{cleaned_path}' is too large ({file_info.size / (1024*1024):.2f}MB). Maximum size is {MAX_IMAGE_SIZE / (1024*1024)}MB.")
 
+                source = image_pipeline.source_key("sandbox", self.sandbox_id, full_path, file_info.size, file_info.mod_time)
+                cached = await self._get_cached_image(source, cleaned_path)
+                if cached:
+                    return await self._add_image_to_context(cached)
+
                 # Read image file content
                 try:
                     image_bytes = await self.sandbox.fs.download_file(full_path)
@@ -382,7 +303,14 @@ Images remain in the sandbox and can be loaded again anytime. SVG files are auto
                         return self.fail_response(f"Unsupported or unknown image format for file: '{cleaned_path}'. Supported: JPG, PNG, GIF, WEBP, SVG.")
                 
                 original_size = file_info.size
-            
+
+            # Same bytes loaded from another source or path reuse the stored output
+            digest = image_pipeline.content_hash(image_bytes)
+            if source:
+                await image_pipeline.set_source_digest(source, digest)
+            cached = await self._get_cached_image(None, cleaned_path, digest=digest)
+            if cached:
+                return await self._add_image_to_context(cached)
 
             # Compress the image
             compressed_bytes, compressed_mime_type = await self.compress_image(image_bytes, mime_type, cleaned_path)
@@ -392,6 +320,7 @@ Images remain in the sandbox and can be loaded again anytime. SVG files are auto
                 return self.fail_response(f"Image file '{cleaned_path}' is still too large after compression ({len(compressed_bytes) / (1024*1024):.2f}MB). Maximum compressed size is {MAX_COMPRESSED_SIZE / (1024*1024)}MB.")
 
             # For SVG files that were converted to PNG, save the converted PNG to sandbox
+            converted_path = None
             if (mime_type == 'image/svg+xml' or cleaned_path.lower().endswith('.svg')) and compressed_mime_type == 'image/png':
                 # Create PNG filename by replacing .svg extension
                 png_filename = cleaned_path.rsplit('.', 1)[0] + '_converted.png'
@@ -401,9 +330,10 @@ Images remain in the sandbox and can be loaded again anytime. SVG files are auto
                     # Save converted PNG to sandbox
                     await self.sandbox.fs.upload_file(compressed_bytes, png_full_path)
                     cleaned_path = png_filename
-                    print(f"[SeeImage] Saved converted PNG to sandbox as '{png_filename}' for frontend display")
+                    converted_path = png_filename
+                    logger.info(f"[SeeImage] Saved converted PNG to sandbox as '{png_filename}' for frontend display")
                 except Exception as e:
-                    print(f"[SeeImage] Warning: Could not save converted PNG to sandbox: {e}")
+                    logger.warning(f"[SeeImage] Could not save converted PNG to sandbox: {e}")
                     # Continue with original path if save fails
 
             # CRITICAL: Validate MIME type before upload - Anthropic only accepts 4 formats
@@ -417,94 +347,125 @@ Images remain in the sandbox and can be loaded again anytime. SVG files are auto
 
             # Upload to Supabase Storage instead of base64
             try:
-                # Generate unique filename
-                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                unique_id = str(uuid.uuid4())[:8]
-                
-                # Determine file extension from mime type
-                ext_map = {
-                    'image/jpeg': 'jpg',
-                    'image/png': 'png',
-                    'image/gif': 'gif',
-                    'image/webp': 'webp'
-                }
-                ext = ext_map.get(compressed_mime_type, 'jpg')
-                
-                # Create filename from original path
-                base_filename = os.path.splitext(os.path.basename(cleaned_path))[0]
-                storage_filename = f"loaded_images/{base_filename}_{timestamp}_{unique_id}.{ext}"
-                
-                # Upload to Supabase storage (public bucket for LLM access)
-                client = await self.db.client
-                storage_response = await client.storage.from_('image-uploads').upload(
-                    storage_filename,
-                    compressed_bytes,
-                    {"content-type": compressed_mime_type}
-                )
-                
-                # Get public URL
-                public_url = await client.storage.from_('image-uploads').get_public_url(storage_filename)
-                
-                print(f"[LoadImage] Uploaded image to cloud storage: {public_url}")
-                
+                public_url, content_hash = await self._upload_to_storage(compressed_bytes, compressed_mime_type)
             except Exception as upload_error:
-                print(f"[LoadImage] Failed to upload to cloud storage: {upload_error}")
+                logger.error(f"[LoadImage] Failed to upload to cloud storage: {upload_error}")
                 return self.fail_response(f"Failed to upload image to cloud storage: {str(upload_error)}")
 
-            # Check current image count in context (enforce 3-image limit)
-            current_image_count = await self._count_images_in_context()
-            if current_image_count >= 3:
-                # Auto-clear all images to make room for new ones
-                cleared = await self._clear_all_images()
-                logger.info(f"[LoadImage] Auto-cleared {cleared} image(s) to make room (was {current_image_count}/3)")
-                current_image_count = 0
-            
-            # Add the image to the thread as an image_context message with multi-modal content
-            # This allows the LLM to actually "see" the image
-            message_content = {
-                "role": "user",
-                "content": [
-                    {"type": "text", "text": f"[Image loaded from '{cleaned_path}']"},
-                    {"type": "image_url", "image_url": {"url": public_url}}
-                ]
-            }
-            
-            await self.thread_manager.add_message(
-                thread_id=self.thread_id,
-                type="image_context",
-                content=message_content,
-                is_llm_message=True,
-                metadata={
-                    "file_path": cleaned_path,
-                    "mime_type": compressed_mime_type,
-                    "original_size": original_size,
-                    "compressed_size": len(compressed_bytes)
-                }
-            )
-            
-            logger.info(f"[LoadImage] Added '{cleaned_path}' to context")
-            
-            # Return structured output
-            result_data = {
-                "message": f"Successfully loaded image '{cleaned_path}' into context (reduced from {original_size/1024:.1f}KB to {len(compressed_bytes)/1024:.1f}KB).",
+            image = {
                 "file_path": cleaned_path,
-                "image_url": public_url
+                "converted_path": converted_path,
+                "public_url": public_url,
+                "content_hash": content_hash,
+                "mime_type": compressed_mime_type,
+                "original_size": original_size,
+                "compressed_size": len(compressed_bytes),
             }
-            
-            return self.success_response(result_data)
+            await image_pipeline.set_cached_output(digest, image)
+            return await self._add_image_to_context(image)
 
         except Exception as e:
             return self.fail_response(f"An unexpected error occurred while trying to see the image: {str(e)}")
+
+    async def _get_cached_image(self, source: Optional[str], file_path: str, digest: Optional[str] = None) -> Optional[dict]:
+        """Look up a previously processed image by source key or content hash."""
+        if digest is None:
+            digest = await image_pipeline.get_source_digest(source)
+            if not digest:
+                return None
+
+        cached = await image_pipeline.get_cached_output(digest)
+        if not cached:
+            return None
+
+        if cached.get("content_hash"):
+            # The blob may have been garbage-collected since the output was cached
+            client = await self.db.client
+            if not await image_store.get_blob(client, cached["content_hash"]):
+                return None
+
+        cached = {**cached, "file_path": file_path}
+        if cached.get("converted_path"):
+            # The converted PNG is what the frontend displays; make sure it still exists
+            converted_path = file_path.rsplit('.', 1)[0] + '_converted.png'
+            try:
+                await self.sandbox.fs.get_file_info(f"{self.workspace_path}/{converted_path}")
+            except Exception:
+                return None
+            cached["file_path"] = converted_path
+
+        logger.info(f"[LoadImage] Reusing processed image for '{file_path}' (content hash {digest[:12]})")
+        return cached
+
+    async def _upload_to_storage(self, compressed_bytes: bytes, mime_type: str) -> Tuple[str, str]:
+        """Store a compressed image in the content-addressed image store.
+
+        Returns:
+            Tuple of (public_url, content_hash). Identical images share one object.
+        """
+        client = await self.db.client
+        stored = await image_store.store_image(client, compressed_bytes, mime_type)
+        logger.info(f"[LoadImage] Stored image in cloud storage: {stored['public_url']}")
+        return stored["public_url"], stored["content_hash"]
+
+    async def _add_image_to_context(self, image: dict) -> ToolResult:
+        """Add a processed image to the thread as an image_context message."""
+        cleaned_path = image["file_path"]
+        public_url = image["public_url"]
+        original_size = image["original_size"]
+        compressed_size = image["compressed_size"]
+
+        # Check current image count in context (enforce 3-image limit)
+        current_image_count = await self._count_images_in_context()
+        if current_image_count >= 3:
+            # Auto-clear all images to make room for new ones
+            cleared = await self._clear_all_images()
+            logger.info(f"[LoadImage] Auto-cleared {cleared} image(s) to make room (was {current_image_count}/3)")
+            current_image_count = 0
+        
+        # Add the image to the thread as an image_context message with multi-modal content
+        # This allows the LLM to actually "see" the image
+        message_content = {
+            "role": "user",
+            "content": [
+                {"type": "text", "text": f"[Image loaded from '{cleaned_path}']"},
+                {"type": "image_url", "image_url": {"url": public_url}}
+            ]
+        }
+        
+        await self.thread_manager.add_message(
+            thread_id=self.thread_id,
+            type="image_context",
+            content=message_content,
+            is_llm_message=True,
+            metadata={
+                "file_path": cleaned_path,
+                "mime_type": image["mime_type"],
+                "original_size": original_size,
+                "compressed_size": compressed_size,
+                # Counted by the image_blobs reference trigger
+                "content_hash": image.get("content_hash")
+            }
+        )
+        
+        logger.info(f"[LoadImage] Added '{cleaned_path}' to context")
+        
+        # Return structured output
+        result_data = {
+            "message": f"Successfully loaded image '{cleaned_path}' into context (reduced from {original_size/1024:.1f}KB to {compressed_size/1024:.1f}KB).",
+            "file_path": cleaned_path,
+            "image_url": public_url
+        }
+        
+        return self.success_response(result_data)
     
     async def _count_images_in_context(self) -> int:
         """Count how many image_context messages are currently in the conversation."""
         try:
             client = await self.db.client
-            result = await client.table('messages').select('message_id').eq('thread_id', self.thread_id).eq('type', 'image_context').execute()
-            
-            return len(result.data) if result.data else 0
+            return await image_store.count_thread_images(client, self.thread_id)
         except Exception as e:
-            print(f"[LoadImage] Error counting images in context: {e}")
+            logger.error(f"[LoadImage] Error counting images in context: {e}")
             return 0
     
     async def _clear_all_images(self) -> int:
@@ -514,7 +475,7 @@ Images remain in the sandbox and can be loaded again anytime. SVG files are auto
             result = await client.table('messages').delete().eq('thread_id', self.thread_id).eq('type', 'image_context').execute()
             return len(result.data) if result.data else 0
         except Exception as e:
-            print(f"[LoadImage] Error clearing images: {e}")
+            logger.error(f"[LoadImage] Error clearing images: {e}")
             return 0
 
     # @openapi_schema({
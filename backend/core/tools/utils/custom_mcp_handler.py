@@ -13,8 +13,10 @@ class CustomMCPHandler:
     def __init__(self, connection_manager: MCPConnectionManager):
         self.connection_manager = connection_manager
         self.custom_tools = {}
+        self._composio_urls: Dict[str, str] = {}
     
     async def initialize_custom_mcps(self, custom_configs: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        await self._prefetch_composio_urls(custom_configs)
         initialization_tasks = []
         
         for config in custom_configs:
@@ -32,6 +34,25 @@ class CustomMCPHandler:
         
         return self.custom_tools
     
+    async def _prefetch_composio_urls(self, custom_configs: List[Dict[str, Any]]) -> None:
+        profile_ids = [
+            config.get('config', {}).get('profile_id')
+            for config in custom_configs
+            if config.get('customType') == 'composio'
+        ]
+        profile_ids = [profile_id for profile_id in profile_ids if profile_id]
+        if not profile_ids:
+            return
+        
+        try:
+            from core.composio_integration.composio_profile_service import ComposioProfileService
+            from core.services.supabase import DBConnection
+            
+            profile_service = ComposioProfileService(DBConnection())
+            self._composio_urls.update(await profile_service.get_mcp_urls_for_runtime(profile_ids))
+        except Exception as e:
+            logger.warning(f"Failed to prefetch Composio MCP URLs, resolving individually: {e}")
+    
     async def _initialize_single_custom_mcp_safe(self, config: Dict[str, Any]):
         try:
             await self._initialize_single_custom_mcp(config)
@@ -65,12 +86,14 @@ class CustomMCPHandler:
             return
         
         try:
-            from core.composio_integration.composio_profile_service import ComposioProfileService
-            from core.services.supabase import DBConnection
-            
-            db = DBConnection()
-            profile_service = ComposioProfileService(db)
-            mcp_url = await profile_service.get_mcp_url_for_runtime(profile_id)
+            mcp_url = self._composio_urls.get(profile_id)
+            if not mcp_url:
+                from core.composio_integration.composio_profile_service import ComposioProfileService
+                from core.services.supabase import DBConnection
+                
+                db = DBConnection()
+                profile_service = ComposioProfileService(db)
+                mcp_url = await profile_service.get_mcp_url_for_runtime(profile_id)
             
             logger.debug(f"Resolved Composio profile {profile_id} to MCP URL")
 
@@ -114,7 +114,12 @@ class MCPToolExecutor:
             return self._create_error_result(f"Error executing tool: {str(e)}")
     
     async def _execute_standard_tool(self, tool_name: str, arguments: Dict[str, Any]) -> ToolResult:
-        result = await self.mcp_manager.execute_tool(tool_name, arguments)
+        account_id = getattr(self.tool_wrapper, 'account_id', None)
+        mcp_configs = [
+            cfg for cfg in getattr(self.tool_wrapper, 'mcp_configs', None) or []
+            if not cfg.get('isCustom', False)
+        ]
+        result = await self.mcp_manager.execute_tool(tool_name, arguments, account_id=account_id, mcp_configs=mcp_configs)
         if isinstance(result, dict):
             if result.get('isError', False):
                 return self._create_error_result(result.get('content', 'Tool execution failed'))
@@ -5,33 +5,38 @@ Provides endpoints to get all available tools and their metadata.
 """
 
 from typing import Dict, Any
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
 
 from core.utils.auth_utils import verify_and_get_user_id_from_jwt
 from core.utils.logger import logger
-from core.utils.tool_discovery import get_tools_metadata
+from core.utils.tool_discovery import get_tool_catalog, get_tool_group
 
 router = APIRouter(tags=["tools"])
 
 
 @router.get("/tools", summary="Get All Tools", operation_id="get_all_tools")
 async def get_all_tools(
+    request: Request,
     user_id: str = Depends(verify_and_get_user_id_from_jwt)
-) -> Dict[str, Any]:
+) -> Response:
     """Get metadata for all available tools.
     
+    The body is serialized once per process; clients that send the catalog's
+    ETag back in If-None-Match get a 304.
+    
     Returns:
         Dict containing all tool metadata with methods
     """
     try:
         logger.debug(f"Fetching all tools metadata for user {user_id}")
         
-        tools_metadata = get_tools_metadata()
+        catalog = get_tool_catalog()
+        headers = {"ETag": catalog.etag, "Cache-Control": "private, no-cache"}
         
-        return {
-            "success": True,
-            "tools": tools_metadata
-        }
+        if catalog.etag in request.headers.get('if-none-match', ''):
+            return Response(status_code=304, headers=headers)
+        
+        return Response(content=catalog.response_json, media_type="application/json", headers=headers)
         
     except Exception as e:
         logger.error(f"Error fetching tools metadata: {e}", exc_info=True)
@@ -54,10 +59,7 @@ async def get_tool_details(
     try:
         logger.debug(f"Fetching metadata for tool {tool_name} for user {user_id}")
         
-        from core.utils.tool_discovery import get_tool_discovery
-        discovery = get_tool_discovery()
-        
-        metadata = discovery.get_tool_metadata(tool_name)
+        metadata = get_tool_group(tool_name)
         
         if not metadata:
             raise HTTPException(status_code=404, detail=f"Tool {tool_name} not found")
@@ -136,6 +136,8 @@ async def sync_triggers_to_version_config(agent_id: str):
         config['triggers'] = triggers
         
         await client.table('agent_versions').update({'config': config}).eq('version_id', current_version_id).execute()
+        from core.runtime_cache import invalidate_agent_config_cache
+        await invalidate_agent_config_cache(agent_id)
         
         logger.debug(f"Synced {len(triggers)} triggers to version config for agent {agent_id}")
         
@@ -87,7 +87,7 @@ class Configuration:
     AGENT_XML_TOOL_CALLING: bool = False      # Enable XML-based tool calls (<function_calls>)
     AGENT_NATIVE_TOOL_CALLING: bool = True  # Enable OpenAI-style native function calling
     AGENT_EXECUTE_ON_STREAM: bool = True     # Execute tools as they stream (vs. at end)
-    AGENT_TOOL_EXECUTION_STRATEGY: str = "parallel"  # "parallel" or "sequential"
+    AGENT_TOOL_EXECUTION_STRATEGY: str = "parallel"  # "parallel", "sequential" or "scheduled" (dependency-aware)
     # ============================================
     
 
@@ -101,6 +101,14 @@ class Configuration:
     DISABLE_PRESENCE: bool = False  # Disable presence tracking entirely
     # ==================================
     
+    # ===== STARTUP CONFIGURATION =====
+    LAZY_ROUTER_REGISTRATION: bool = False  # Import rarely used API routers on first request instead of at startup
+    # =================================
+    
+    # ===== RUN SCHEDULING CONFIGURATION =====
+    AGENT_RUN_FAIR_SCHEDULING: bool = False  # Queue runs per tier lane with per-account fair dispatch (workers must consume agent_runs_* queues)
+    # ========================================
+    
     SYSTEM_ADMIN_USER_ID: Optional[str] = None  # User ID that owns shared/fallback agents
 
     # Subscription tier IDs - Production
@@ -1,68 +1,154 @@
+"""
+Distributed locks and webhook idempotency for billing.
+
+DistributedLock runs on Redis: acquire and release are single Lua scripts,
+each successful acquire returns a fencing token (monotonic per lock key) and
+waiters block on a per-lock notification list that release pushes to, instead
+of polling. Redis is the only backend, so two holders can never hold the same
+lock through different stores; if Redis is unavailable, acquire fails closed.
+
+WebhookLock claims an event with the claim_webhook_event function, a single
+INSERT ... ON CONFLICT DO UPDATE that decides atomically whether this delivery
+may process the event.
+"""
 import asyncio
+import time
 import uuid
-from typing import Optional
-from datetime import datetime, timezone, timedelta
+from typing import Dict, Optional, Tuple
+from datetime import datetime, timezone
 from contextlib import asynccontextmanager
 from core.utils.logger import logger
 from core.services.supabase import DBConnection
 
+LOCK_KEY_PREFIX = "lock:"
+FENCE_KEY_PREFIX = "lock:fence:"
+NOTIFY_KEY_PREFIX = "lock:notify:"
+NOTIFY_TTL_MS = 10_000
+MAX_BLOCK_SECONDS = 5.0  # must stay below the Redis client's socket timeout
+MAX_BLOCKING_WAITERS = 8  # per process; each blocked waiter holds a pooled connection
+POLL_INTERVAL = 0.25
+FENCE_TTL_SECONDS = 7 * 24 * 3600
+WEBHOOK_STALE_AFTER_SECONDS = 300
+
+# Returns {fencing_token, 0} on success, {0, pttl_ms} when the lock is held
+_ACQUIRE_SCRIPT = """
+if redis.call('SET', KEYS[1], ARGV[1], 'NX', 'PX', ARGV[2]) then
+    local token = redis.call('INCR', KEYS[2])
+    redis.call('EXPIRE', KEYS[2], ARGV[3])
+    return {token, 0}
+end
+return {0, redis.call('PTTL', KEYS[1])}
+"""
+
+# Deletes the lock only for its holder and wakes one waiter
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    redis.call('DEL', KEYS[1])
+    redis.call('DEL', KEYS[2])
+    redis.call('RPUSH', KEYS[2], '1')
+    redis.call('PEXPIRE', KEYS[2], ARGV[2])
+    return 1
+end
+return 0
+"""
+
+_scripts: Dict[Tuple[int, str], object] = {}
+_waiter_slots: Optional[asyncio.Semaphore] = None
+
+
+def _script(client, source: str):
+    key = (id(client), source)
+    script = _scripts.get(key)
+    if script is None:
+        script = client.register_script(source)
+        _scripts[key] = script
+    return script
+
+
+def _get_waiter_slots() -> asyncio.Semaphore:
+    global _waiter_slots
+    if _waiter_slots is None:
+        _waiter_slots = asyncio.Semaphore(MAX_BLOCKING_WAITERS)
+    return _waiter_slots
+
+
 class DistributedLock:
     def __init__(self, lock_key: str, timeout_seconds: int = 300, holder_id: Optional[str] = None):
         self.lock_key = lock_key
         self.timeout_seconds = timeout_seconds
         self.holder_id = holder_id or f"{uuid.uuid4()}"
-        self.db = DBConnection()
+        self.fencing_token: Optional[int] = None
         self._acquired = False
     
     async def acquire(self, wait: bool = False, wait_timeout: int = 30) -> bool:
-        client = await self.db.client
-        
-        start_time = datetime.now(timezone.utc)
+        # Fails closed: without Redis nobody can hold the lock, so never report it as acquired
+        try:
+            from core.services import redis as redis_service
+            client = await redis_service.get_client()
+            return await self._acquire(client, wait, wait_timeout)
+        except Exception as e:
+            logger.error(f"[LOCK] Error acquiring lock {self.lock_key}: {e}")
+            return False
+    
+    async def _acquire(self, client, wait: bool, wait_timeout: float) -> bool:
+        acquire_script = _script(client, _ACQUIRE_SCRIPT)
+        lock_key = f"{LOCK_KEY_PREFIX}{self.lock_key}"
+        notify_key = f"{NOTIFY_KEY_PREFIX}{self.lock_key}"
+        deadline = time.monotonic() + wait_timeout
         
         while True:
-            try:
-                result = await client.rpc('acquire_distributed_lock', {
-                    'p_lock_key': self.lock_key,
-                    'p_holder_id': self.holder_id,
-                    'p_timeout_seconds': self.timeout_seconds
-                }).execute()
-                
-                if result.data:
-                    self._acquired = True
-                    logger.info(f"[LOCK] Acquired lock: {self.lock_key} by {self.holder_id}")
-                    return True
-                
-                if not wait:
-                    logger.warning(f"[LOCK] Failed to acquire lock (no wait): {self.lock_key}")
-                    return False
-                
-                elapsed = (datetime.now(timezone.utc) - start_time).total_seconds()
-                if elapsed >= wait_timeout:
-                    logger.warning(f"[LOCK] Lock acquisition timeout after {elapsed}s: {self.lock_key}")
-                    return False
-                
-                await asyncio.sleep(0.5)
-                
-            except Exception as e:
-                logger.error(f"[LOCK] Error acquiring lock {self.lock_key}: {e}")
-                if not wait:
-                    return False
-                await asyncio.sleep(1)
+            token, pttl = await acquire_script(
+                keys=[lock_key, f"{FENCE_KEY_PREFIX}{self.lock_key}"],
+                args=[self.holder_id, int(self.timeout_seconds * 1000), FENCE_TTL_SECONDS]
+            )
+            token, pttl = int(token), int(pttl)
+            
+            if token:
+                self._acquired = True
+                self.fencing_token = token
+                logger.info(f"[LOCK] Acquired lock: {self.lock_key} by {self.holder_id} (token {token})")
+                return True
+            
+            if not wait:
+                logger.warning(f"[LOCK] Failed to acquire lock (no wait): {self.lock_key}")
+                return False
+            
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                logger.warning(f"[LOCK] Lock acquisition timeout after {wait_timeout}s: {self.lock_key}")
+                return False
+            
+            # Wake on release, or when the holder's lease runs out without one
+            block = min(remaining, MAX_BLOCK_SECONDS)
+            if pttl > 0:
+                block = min(block, pttl / 1000)
+            
+            # BLPOP pins a pooled connection while it blocks; waiters beyond the cap poll instead
+            slots = _get_waiter_slots()
+            if slots.locked():
+                await asyncio.sleep(min(block, POLL_INTERVAL))
+                continue
+            async with slots:
+                await client.blpop([notify_key], timeout=max(block, 0.01))
     
     async def release(self) -> bool:
         if not self._acquired:
             return True
         
         try:
-            client = await self.db.client
-            result = await client.rpc('release_distributed_lock', {
-                'p_lock_key': self.lock_key,
-                'p_holder_id': self.holder_id
-            }).execute()
+            from core.services import redis as redis_service
+            client = await redis_service.get_client()
+            released = bool(await _script(client, _RELEASE_SCRIPT)(
+                keys=[f"{LOCK_KEY_PREFIX}{self.lock_key}", f"{NOTIFY_KEY_PREFIX}{self.lock_key}"],
+                args=[self.holder_id, NOTIFY_TTL_MS]
+            ))
             
             self._acquired = False
-            logger.info(f"[LOCK] Released lock: {self.lock_key} by {self.holder_id}")
-            return result.data if result.data is not None else False
+            if released:
+                logger.info(f"[LOCK] Released lock: {self.lock_key} by {self.holder_id}")
+            else:
+                logger.warning(f"[LOCK] Lock {self.lock_key} expired before release by {self.holder_id}")
+            return released
             
         except Exception as e:
             logger.error(f"[LOCK] Error releasing lock {self.lock_key}: {e}")
@@ -151,134 +237,38 @@ class WebhookLock:
         payload: dict = None,
         force_reprocess: bool = False
     ) -> tuple[bool, Optional[str]]:
+        """
+        Claim a webhook event for processing in one round trip.
+        
+        Returns:
+            (True, None) when this delivery should process the event, otherwise
+            (False, 'already_completed' | 'in_progress')
+        """
         db = DBConnection()
         client = await db.client
         
-        existing = await client.from_('webhook_events').select('id, status, processed_at, processing_started_at, retry_count').eq(
-            'event_id', event_id
-        ).execute()
+        result = await client.rpc('claim_webhook_event', {
+            'p_event_id': event_id,
+            'p_event_type': event_type,
+            'p_payload': payload,
+            'p_force_reprocess': force_reprocess,
+            'p_stale_after_seconds': WEBHOOK_STALE_AFTER_SECONDS
+        }).execute()
         
-        if existing.data:
-            event = existing.data[0]
-            if event['status'] == 'completed':
-                if force_reprocess:
-                    logger.warning(f"[WEBHOOK] Event {event_id} marked as completed but force_reprocess=True - resetting to processing")
-                    await client.from_('webhook_events').update({
-                        'status': 'processing',
-                        'processing_started_at': datetime.now(timezone.utc).isoformat(),
-                        'retry_count': event.get('retry_count', 0) + 1,
-                        'error_message': None  # Clear any previous error
-                    }).eq('id', event['id']).execute()
-                    return True, None
-                logger.info(f"[WEBHOOK] Event {event_id} already completed at {event['processed_at']}")
-                return False, 'already_completed'
-            elif event['status'] == 'processing':
-                # Check if webhook is stuck (processing for more than 5 minutes)
-                processing_started = event.get('processing_started_at')
-                if processing_started:
-                    try:
-                        started_at = datetime.fromisoformat(processing_started.replace('Z', '+00:00'))
-                        timeout_threshold = datetime.now(timezone.utc) - timedelta(minutes=5)
-                        if started_at < timeout_threshold:
-                            logger.warning(
-                                f"[WEBHOOK] Event {event_id} stuck in processing since {processing_started}, "
-                                f"resetting to allow retry"
-                            )
-                            await client.from_('webhook_events').update({
-                                'status': 'failed',
-                                'error_message': 'Webhook processing timeout - stuck in processing for >5 minutes',
-                                'retry_count': event.get('retry_count', 0) + 1
-                            }).eq('id', event['id']).execute()
-                            # Now retry it
-                            await client.from_('webhook_events').update({
-                                'status': 'processing',
-                                'processing_started_at': datetime.now(timezone.utc).isoformat(),
-                                'retry_count': event.get('retry_count', 0) + 1
-                            }).eq('id', event['id']).execute()
-                            return True, None
-                    except Exception as e:
-                        logger.error(f"[WEBHOOK] Error checking timeout for event {event_id}: {e}")
-                
-                logger.warning(f"[WEBHOOK] Event {event_id} is currently being processed")
-                return False, 'in_progress'
-            elif event['status'] == 'failed':
-                logger.info(f"[WEBHOOK] Retrying previously failed event {event_id}")
-                await client.from_('webhook_events').update({
-                    'status': 'processing',
-                    'processing_started_at': datetime.now(timezone.utc).isoformat(),
-                    'retry_count': event.get('retry_count', 0) + 1
-                }).eq('id', event['id']).execute()
-                return True, None
-        else:
-            try:
-                await client.from_('webhook_events').insert({
-                    'event_id': event_id,
-                    'event_type': event_type,
-                    'status': 'processing',
-                    'processing_started_at': datetime.now(timezone.utc).isoformat(),
-                    'payload': payload
-                }).execute()
+        row = result.data[0] if isinstance(result.data, list) and result.data else result.data or {}
+        if row.get('claimed'):
+            if row.get('reason'):
+                logger.info(f"[WEBHOOK] Claimed event {event_id} ({row['reason']})")
+            else:
                 logger.info(f"[WEBHOOK] Started processing new event {event_id}")
-                return True, None
-            except Exception as e:
-                if 'duplicate key' in str(e).lower() or 'unique' in str(e).lower():
-                    logger.warning(f"[WEBHOOK] Race condition detected for event {event_id}, checking if existing event is stuck...")
-                    # Race condition - another process inserted first, check if it's stuck
-                    existing_after_race = await client.from_('webhook_events').select(
-                        'id, status, processing_started_at, retry_count'
-                    ).eq('event_id', event_id).execute()
-                    
-                    if existing_after_race.data:
-                        race_event = existing_after_race.data[0]
-                        
-                        # If the winner already completed, we're done
-                        if race_event['status'] == 'completed':
-                            logger.info(f"[WEBHOOK] Race condition resolved - event {event_id} already completed")
-                            return False, 'already_completed'
-                        
-                        # If the winner already failed, we can retry
-                        if race_event['status'] == 'failed':
-                            logger.info(f"[WEBHOOK] Race condition resolved - event {event_id} failed, retrying")
-                            await client.from_('webhook_events').update({
-                                'status': 'processing',
-                                'processing_started_at': datetime.now(timezone.utc).isoformat(),
-                                'retry_count': race_event.get('retry_count', 0) + 1
-                            }).eq('id', race_event['id']).execute()
-                            return True, None
-                        
-                        # Winner is still processing - wait briefly and check again
-                        if race_event['status'] == 'processing':
-                            logger.info(f"[WEBHOOK] Race condition - event {event_id} being processed, waiting to verify...")
-                            await asyncio.sleep(3)  # Wait 3 seconds for the other process
-                            
-                            # Re-check status
-                            recheck = await client.from_('webhook_events').select(
-                                'id, status, processing_started_at, retry_count'
-                            ).eq('event_id', event_id).execute()
-                            
-                            if recheck.data:
-                                final_status = recheck.data[0]['status']
-                                if final_status == 'completed':
-                                    logger.info(f"[WEBHOOK] Race condition resolved - event {event_id} completed while waiting")
-                                    return False, 'already_completed'
-                                elif final_status == 'failed':
-                                    logger.info(f"[WEBHOOK] Race condition resolved - event {event_id} failed, retrying")
-                                    await client.from_('webhook_events').update({
-                                        'status': 'processing',
-                                        'processing_started_at': datetime.now(timezone.utc).isoformat(),
-                                        'retry_count': recheck.data[0].get('retry_count', 0) + 1
-                                    }).eq('id', recheck.data[0]['id']).execute()
-                                    return True, None
-                            
-                            # Still processing after wait - tell caller to signal retry
-                            logger.warning(f"[WEBHOOK] Event {event_id} still processing after wait, signaling retry needed")
-                            return False, 'processing_retry_later'
-                    
-                    logger.warning(f"[WEBHOOK] Race condition detected for event {event_id}, signaling retry needed")
-                    return False, 'processing_retry_later'
-                raise
+            return True, None
         
-        return True, None
+        reason = row.get('reason') or 'in_progress'
+        if reason == 'already_completed':
+            logger.info(f"[WEBHOOK] Event {event_id} already completed")
+        else:
+            logger.warning(f"[WEBHOOK] Event {event_id} is currently being processed")
+        return False, reason
     
     @staticmethod
     async def mark_webhook_completed(event_id: str):
@@ -1,12 +1,89 @@
 """
 Simple encryption utilities for credential profiles.
+
+Ciphers are built once per key and process. DecryptedConfigCache keeps recently
+decrypted credential configs in memory so repeated reads of the same credential
+skip decryption; entries are keyed by record id and config_hash, so a changed
+credential never hits a stale entry.
 """
 
 import os
 import base64
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
 from cryptography.fernet import Fernet
 from core.utils.logger import logger
 
+DECRYPTED_CONFIG_CACHE_TTL = 300  # seconds
+DECRYPTED_CONFIG_CACHE_MAX_ENTRIES = 2048
+
+_ciphers: Dict[bytes, Fernet] = {}
+_default_cipher: Optional[Fernet] = None
+
+
+def get_fernet(key: bytes) -> Fernet:
+    """Return the process-wide Fernet cipher for a key."""
+    cipher = _ciphers.get(key)
+    if cipher is None:
+        cipher = _ciphers[key] = Fernet(key)
+    return cipher
+
+
+def get_cipher() -> Fernet:
+    """Return the cipher for MCP_CREDENTIAL_ENCRYPTION_KEY, built on first use."""
+    global _default_cipher
+    if _default_cipher is None:
+        _default_cipher = get_fernet(get_encryption_key())
+    return _default_cipher
+
+
+class DecryptedConfigCache:
+    """Bounded, memory-only TTL cache of decrypted configs keyed by (record id, config_hash)."""
+
+    def __init__(self, ttl: float = DECRYPTED_CONFIG_CACHE_TTL, max_entries: int = DECRYPTED_CONFIG_CACHE_MAX_ENTRIES):
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, record_id: str, config_hash: str) -> Optional[Dict[str, Any]]:
+        key = (record_id, config_hash)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, config = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        # Callers may mutate what they get back
+        return copy.deepcopy(config)
+
+    def put(self, record_id: str, config_hash: str, config: Dict[str, Any]) -> None:
+        if not record_id or not config_hash:
+            return
+        with self._lock:
+            self._entries[(record_id, config_hash)] = (time.monotonic() + self._ttl, copy.deepcopy(config))
+            self._entries.move_to_end((record_id, config_hash))
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, record_id: str) -> None:
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == record_id]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+decrypted_config_cache = DecryptedConfigCache()
+
 
 def get_encryption_key() -> bytes:
     """Get or create encryption key for credentials."""
@@ -39,8 +116,7 @@ def encrypt_data(data: str) -> str:
     Returns:
         Base64 encoded encrypted string
     """
-    encryption_key = get_encryption_key()
-    cipher = Fernet(encryption_key)
+    cipher = get_cipher()
     
     # Convert string to bytes
     data_bytes = data.encode('utf-8')
@@ -62,8 +138,7 @@ def decrypt_data(encrypted_data: str) -> str:
     Returns:
         Decrypted string
     """
-    encryption_key = get_encryption_key()
-    cipher = Fernet(encryption_key)
+    cipher = get_cipher()
     
     # Decode base64 to get encrypted bytes
     encrypted_bytes = base64.b64decode(encrypted_data.encode('utf-8'))
@@ -1,12 +1,62 @@
 """
 Icon and color generation utilities for agents and projects.
+
+Results are cached by normalized name/description (in process, then in Redis)
+and concurrent requests for the same input share one LLM call. When the LLM
+call fails, a style is picked deterministically from a precomputed palette so
+the same input always gets the same fallback.
 """
+import asyncio
+import hashlib
 import json
+import re
+import time
 import traceback
-from typing import Dict
+from collections import OrderedDict, deque
+from typing import Any, Dict, Optional
 from core.utils.logger import logger
 from core.services.llm import make_llm_api_call
 
+ICON_MODEL = "openai/gpt-5-nano-2025-08-07"
+ICON_CACHE_TTL = 3600 * 24 * 30
+ICON_CACHE_PREFIX = "icon_gen:v1:"
+LOCAL_CACHE_MAX_ENTRIES = 1024
+LATENCY_SAMPLES = 512
+
+DEFAULT_STYLE = {
+    "icon_name": "bot",
+    "icon_color": "#FFFFFF",
+    "icon_background": "#6366F1"
+}
+
+FRONTEND_COLORS = [
+    "#000000", "#FFFFFF", "#6366F1", "#10B981", "#F59E0B",
+    "#EF4444", "#8B5CF6", "#EC4899", "#14B8A6", "#F97316",
+    "#06B6D4", "#84CC16", "#F43F5E", "#A855F7", "#3B82F6"
+]
+
+# (background, text) pairs from FRONTEND_COLORS with readable contrast
+FALLBACK_PALETTE = [
+    ("#6366F1", "#FFFFFF"), ("#10B981", "#FFFFFF"), ("#F59E0B", "#000000"),
+    ("#EF4444", "#FFFFFF"), ("#8B5CF6", "#FFFFFF"), ("#EC4899", "#FFFFFF"),
+    ("#14B8A6", "#FFFFFF"), ("#F97316", "#000000"), ("#06B6D4", "#000000"),
+    ("#84CC16", "#000000"), ("#F43F5E", "#FFFFFF"), ("#A855F7", "#FFFFFF"),
+    ("#3B82F6", "#FFFFFF"), ("#000000", "#FFFFFF"),
+]
+
+_local_cache: "OrderedDict[str, Dict[str, str]]" = OrderedDict()
+_inflight: Dict[str, asyncio.Task] = {}
+_latencies: deque = deque(maxlen=LATENCY_SAMPLES)
+
+_stats = {
+    "local_hits": 0,
+    "redis_hits": 0,
+    "misses": 0,
+    "coalesced": 0,
+    "llm_calls": 0,
+    "fallbacks": 0,
+}
+
 # Lucide React icons (hardcoded for performance)
 RELEVANT_ICONS = [
     "accessibility", "activity", "air-vent", "airplay", "alarm-clock", "album",
@@ -117,10 +167,93 @@ RELEVANT_ICONS = [
 ]
 
 
+_ICON_SET = frozenset(RELEVANT_ICONS)
+
+
+def get_icon_generation_stats() -> Dict[str, Any]:
+    """Cache and latency counters for this process."""
+    # Coalesced requests count as hits: they did not start an LLM call of their own
+    hits = _stats["local_hits"] + _stats["redis_hits"] + _stats["coalesced"]
+    lookups = hits + _stats["misses"]
+    samples = sorted(_latencies)
+    return {
+        **_stats,
+        "inflight": len(_inflight),
+        "local_entries": len(_local_cache),
+        "hit_ratio": round(hits / lookups, 3) if lookups else 0.0,
+        "p50_ms": round(samples[len(samples) // 2] * 1000, 1) if samples else 0.0,
+        "p95_ms": round(samples[max(int(len(samples) * 0.95) - 1, 0)] * 1000, 1) if samples else 0.0,
+    }
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def _cache_key(name: str, description: str) -> str:
+    normalized = f"{_normalize(name)}\x00{_normalize(description)}"
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def _local_get(key: str) -> Optional[Dict[str, str]]:
+    style = _local_cache.get(key)
+    if style is not None:
+        _local_cache.move_to_end(key)
+        return dict(style)
+    return None
+
+
+def _local_put(key: str, style: Dict[str, str]) -> None:
+    _local_cache[key] = dict(style)
+    _local_cache.move_to_end(key)
+    while len(_local_cache) > LOCAL_CACHE_MAX_ENTRIES:
+        _local_cache.popitem(last=False)
+
+
+def fallback_style(name: str, description: str = "") -> Dict[str, str]:
+    """
+    Deterministic style used when the LLM is unavailable.
+
+    The icon is the first word of the name or description that is itself an
+    icon name (e.g. "Calendar assistant" -> calendar), otherwise "bot"; the
+    colors come from FALLBACK_PALETTE, indexed by the input's hash.
+    """
+    icon = DEFAULT_STYLE["icon_name"]
+    for word in re.findall(r"[a-z0-9-]+", f"{name} {description}".lower()):
+        if word in _ICON_SET:
+            icon = word
+            break
+    background, text = FALLBACK_PALETTE[int(_cache_key(name, description)[:8], 16) % len(FALLBACK_PALETTE)]
+    return {"icon_name": icon, "icon_color": text, "icon_background": background}
+
+
+async def _redis_get(key: str) -> Optional[Dict[str, str]]:
+    try:
+        from core.services import redis as redis_service
+        client = await redis_service.get_client()
+        raw = await client.get(f"{ICON_CACHE_PREFIX}{key}")
+        return json.loads(raw) if raw else None
+    except Exception as e:
+        logger.warning(f"Icon cache read failed: {e}")
+        return None
+
+
+async def _redis_put(key: str, style: Dict[str, str]) -> None:
+    try:
+        from core.services import redis as redis_service
+        client = await redis_service.get_client()
+        await client.set(f"{ICON_CACHE_PREFIX}{key}", json.dumps(style), ex=ICON_CACHE_TTL)
+    except Exception as e:
+        logger.warning(f"Icon cache write failed: {e}")
+
+
 async def generate_icon_and_colors(name: str, description: str = "") -> Dict[str, str]:
     """
     Generate appropriate icon and color scheme for an agent or project.
     
+    Inputs that normalize to the same text (case and whitespace) share a cached
+    result, and concurrent calls for the same input share one LLM call.
+    
     Args:
         name: The name of the agent/project
         description: Optional description for better context
@@ -128,16 +261,57 @@ async def generate_icon_and_colors(name: str, description: str = "") -> Dict[str
     Returns:
         Dict with keys: icon_name, icon_color, icon_background
     """
-    logger.debug(f"Generating icon and colors for: {name}")
+    start = time.monotonic()
     try:
-        model_name = "openai/gpt-5-nano-2025-08-07"
+        key = _cache_key(name, description)
         
-        frontend_colors = [
-            "#000000", "#FFFFFF", "#6366F1", "#10B981", "#F59E0B", 
-            "#EF4444", "#8B5CF6", "#EC4899", "#14B8A6", "#F97316",
-            "#06B6D4", "#84CC16", "#F43F5E", "#A855F7", "#3B82F6"
-        ]
+        style = _local_get(key)
+        if style is not None:
+            _stats["local_hits"] += 1
+            return style
         
+        task = _inflight.get(key)
+        if task is not None:
+            _stats["coalesced"] += 1
+            return dict(await asyncio.shield(task))
+        
+        # The lookup runs in its own task so a cancelled caller does not cancel it for the others
+        task = asyncio.create_task(_resolve(key, name, description))
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+        return dict(await asyncio.shield(task))
+    finally:
+        _latencies.append(time.monotonic() - start)
+
+
+async def _resolve(key: str, name: str, description: str) -> Dict[str, str]:
+    style = await _redis_get(key)
+    if style is not None:
+        _stats["redis_hits"] += 1
+        _local_put(key, style)
+        return style
+    
+    _stats["misses"] += 1
+    style = await _generate_with_llm(name, description)
+    if style is None:
+        # Failed or unusable LLM output is not cached, so the next request for this input retries
+        _stats["fallbacks"] += 1
+        return fallback_style(name, description)
+    
+    _local_put(key, style)
+    await _redis_put(key, style)
+    return style
+
+
+async def _generate_with_llm(name: str, description: str) -> Optional[Dict[str, str]]:
+    """
+    Ask the LLM for a style.
+
+    Returns None, so the caller serves the fallback style and caches nothing,
+    if the call fails or any field of the response is missing or invalid.
+    """
+    logger.debug(f"Generating icon and colors for: {name}")
+    try:
         context = f"Name: {name}"
         if description:
             context += f"\nDescription: {description}"
@@ -148,7 +322,7 @@ Available Lucide React icons to choose from:
 {', '.join(RELEVANT_ICONS)}
 
 Available colors (hex codes):
-{', '.join(frontend_colors)}
+{', '.join(FRONTEND_COLORS)}
 
 Respond with a JSON object containing:
 - "icon": The most appropriate icon name from the available icons
@@ -161,22 +335,19 @@ Example response:
         user_message = f"Select the most appropriate icon and color scheme for this AI agent:\n{context}"
         messages = [{"role": "system", "content": system_prompt}, {"role": "user", "content": user_message}]
 
-        logger.debug(f"Calling LLM ({model_name}) for icon and color generation.")
+        logger.debug(f"Calling LLM ({ICON_MODEL}) for icon and color generation.")
+        _stats["llm_calls"] += 1
         response = await make_llm_api_call(
             messages=messages, 
-            model_name=model_name, 
+            model_name=ICON_MODEL, 
             max_tokens=4000, 
             temperature=0.7,
             response_format={"type": "json_object"},
             stream=False
         )
 
-        # Default fallback values
-        result = {
-            "icon_name": "bot",
-            "icon_color": "#FFFFFF", 
-            "icon_background": "#6366F1"
-        }
+        result = dict(DEFAULT_STYLE)
+        usable = False
         
         if response and response.get('choices') and response['choices'][0].get('message'):
             raw_content = response['choices'][0]['message'].get('content', '').strip()
@@ -184,47 +355,51 @@ Example response:
                 parsed_response = json.loads(raw_content)
                 
                 if isinstance(parsed_response, dict):
+                    usable = True
+                    
                     # Extract and validate icon
                     icon = parsed_response.get('icon', '').strip()
-                    if icon and icon in RELEVANT_ICONS:
+                    if icon and icon in _ICON_SET:
                         result["icon_name"] = icon
                         logger.debug(f"LLM selected icon: '{icon}'")
                     else:
-                        logger.warning(f"LLM selected invalid icon '{icon}', using default 'bot'")
+                        logger.warning(f"LLM selected invalid icon '{icon}'")
+                        usable = False
                     
                     # Extract and validate colors
                     bg_color = parsed_response.get('background_color', '').strip()
                     text_color = parsed_response.get('text_color', '').strip()
                     
-                    if bg_color in frontend_colors:
+                    if bg_color in FRONTEND_COLORS:
                         result["icon_background"] = bg_color
                         logger.debug(f"LLM selected background color: '{bg_color}'")
                     else:
-                        logger.warning(f"LLM selected invalid background color '{bg_color}', using default")
+                        logger.warning(f"LLM selected invalid background color '{bg_color}'")
+                        usable = False
                     
-                    if text_color in frontend_colors:
+                    if text_color in FRONTEND_COLORS:
                         result["icon_color"] = text_color
                         logger.debug(f"LLM selected text color: '{text_color}'")
                     else:
-                        logger.warning(f"LLM selected invalid text color '{text_color}', using default")
+                        logger.warning(f"LLM selected invalid text color '{text_color}'")
+                        usable = False
                         
                 else:
                     logger.warning(f"LLM returned non-dict JSON: {parsed_response}")
                     
             except json.JSONDecodeError as e:
                 logger.warning(f"Failed to parse LLM JSON response: {e}. Raw content: {raw_content}")
+                return None
         else:
             logger.warning(f"Failed to get valid response from LLM for icon generation. Response: {response}")
+            return None
+
+        if not usable:
+            return None
 
         logger.debug(f"Generated styling: icon={result['icon_name']}, bg={result['icon_background']}, color={result['icon_color']}")
         return result
 
     except Exception as e:
         logger.error(f"Error in icon generation: {str(e)}\n{traceback.format_exc()}")
-        # Return safe defaults on error (using Indigo theme)
-        return {
-            "icon_name": "bot",
-            "icon_color": "#FFFFFF", 
-            "icon_background": "#6366F1"
-        }
-
+        return None
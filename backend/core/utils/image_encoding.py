@@ -0,0 +1,80 @@
+"""
+CPU-bound image encoding helpers.
+
+These functions run in the image pipeline's process pool, so they only take
+and return picklable values and import nothing beyond PIL and svglib.
+"""
+import os
+import tempfile
+from io import BytesIO
+from typing import Optional, Tuple
+
+from PIL import Image
+
+DEFAULT_MAX_WIDTH = 1920
+DEFAULT_MAX_HEIGHT = 1080
+DEFAULT_JPEG_QUALITY = 85
+DEFAULT_PNG_COMPRESS_LEVEL = 6
+
+
+def compress_image_bytes(image_bytes: bytes, mime_type: str) -> Tuple[bytes, str, Optional[Tuple[int, int, int, int]]]:
+    """Resize and re-encode an image.
+
+    GIFs stay GIF, PNGs stay PNG and everything else becomes JPEG.
+
+    Returns:
+        Tuple of (compressed_bytes, output_mime, resize) where resize is
+        (width, height, new_width, new_height) or None when not resized
+    """
+    img = Image.open(BytesIO(image_bytes))
+
+    # Convert RGBA to RGB if necessary (for JPEG)
+    if img.mode in ('RGBA', 'LA', 'P'):
+        # Create a white background
+        background = Image.new('RGB', img.size, (255, 255, 255))
+        if img.mode == 'P':
+            img = img.convert('RGBA')
+        background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
+        img = background
+
+    # Calculate new dimensions while maintaining aspect ratio
+    resize = None
+    width, height = img.size
+    if width > DEFAULT_MAX_WIDTH or height > DEFAULT_MAX_HEIGHT:
+        ratio = min(DEFAULT_MAX_WIDTH / width, DEFAULT_MAX_HEIGHT / height)
+        new_width = int(width * ratio)
+        new_height = int(height * ratio)
+        img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
+        resize = (width, height, new_width, new_height)
+
+    output = BytesIO()
+    if mime_type == 'image/gif':
+        # Keep GIFs as GIFs to preserve animation
+        img.save(output, format='GIF', optimize=True)
+        output_mime = 'image/gif'
+    elif mime_type == 'image/png':
+        img.save(output, format='PNG', optimize=True, compress_level=DEFAULT_PNG_COMPRESS_LEVEL)
+        output_mime = 'image/png'
+    else:
+        # Convert everything else to JPEG for better compression
+        img.save(output, format='JPEG', quality=DEFAULT_JPEG_QUALITY, optimize=True)
+        output_mime = 'image/jpeg'
+
+    return output.getvalue(), output_mime, resize
+
+
+def svg_to_png(svg_bytes: bytes) -> bytes:
+    """Render an SVG to PNG with svglib + reportlab."""
+    from svglib.svglib import svg2rlg
+    from reportlab.graphics import renderPM
+
+    with tempfile.NamedTemporaryFile(suffix='.svg', delete=False) as temp_svg:
+        temp_svg.write(svg_bytes)
+        temp_svg_path = temp_svg.name
+    try:
+        drawing = svg2rlg(temp_svg_path)
+        png_buffer = BytesIO()
+        renderPM.drawToFile(drawing, png_buffer, fmt='PNG')
+        return png_buffer.getvalue()
+    finally:
+        os.unlink(temp_svg_path)
@@ -0,0 +1,72 @@
+"""Deferred imports for heavy optional subsystems.
+
+Modules such as litellm, langfuse, stripe or composio take hundreds of
+milliseconds to import. Entry points that only need them on some code paths
+can bind a lazy proxy at module level instead, so the real import happens on
+first attribute access rather than at process start.
+"""
+import importlib
+import sys
+import threading
+import types
+from typing import Any, Dict, Optional
+
+_lock = threading.RLock()
+
+
+class LazyModule(types.ModuleType):
+    """Module proxy that imports the target module on first attribute access."""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_lazy_target"] = name
+        self.__dict__["_lazy_module"] = None
+
+    def _load(self) -> types.ModuleType:
+        module = self.__dict__["_lazy_module"]
+        if module is None:
+            with _lock:
+                module = self.__dict__["_lazy_module"]
+                if module is None:
+                    module = importlib.import_module(self.__dict__["_lazy_target"])
+                    self.__dict__["_lazy_module"] = module
+        return module
+
+    def __getattr__(self, item: str) -> Any:
+        return getattr(self._load(), item)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.__dict__["_lazy_module"] is not None else "deferred"
+        return f"<lazy module '{self.__dict__['_lazy_target']}' ({state})>"
+
+
+def lazy_import(name: str) -> types.ModuleType:
+    """Return the module if it is already imported, otherwise a lazy proxy for it.
+
+    Args:
+        name: Fully qualified module name, e.g. "litellm" or "core.run"
+
+    Returns:
+        The real module or a LazyModule that imports it on first use
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    return LazyModule(name)
+
+
+def is_loaded(name: str) -> bool:
+    """Whether a module has actually been imported in this process."""
+    return name in sys.modules
+
+
+def loaded_modules(prefixes: tuple) -> Dict[str, Optional[str]]:
+    """List imported modules under the given package prefixes (for startup diagnostics)."""
+    return {
+        name: getattr(module, "__file__", None)
+        for name, module in list(sys.modules.items())
+        if module is not None and name.startswith(prefixes)
+    }
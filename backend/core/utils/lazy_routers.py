@@ -0,0 +1,96 @@
+"""Lazy router registration for the API process.
+
+When LAZY_ROUTER_REGISTRATION is enabled, rarely used routers (admin,
+Google integrations, presentation templates, transcription, referrals) are
+not imported at startup. The owning module is imported and its router is
+mounted on the first request that hits the router's path prefix. With the
+flag disabled every router is included eagerly, exactly as before.
+"""
+import asyncio
+import importlib
+from dataclasses import dataclass
+from typing import Callable, List, Tuple
+
+from fastapi import APIRouter, FastAPI, Request
+
+from core.utils.logger import logger
+
+
+@dataclass
+class _LazyRoute:
+    path_prefixes: Tuple[str, ...]
+    module_path: str
+    attribute: str = "router"
+    include_prefix: str = ""
+    loaded: bool = False
+
+
+class LazyRouterRegistry:
+    def __init__(self, api_prefix: str = "/v1", lazy: bool = False):
+        self._api_prefix = api_prefix
+        self._lazy = lazy
+        self._routes: List[_LazyRoute] = []
+        self._lock = asyncio.Lock()
+
+    @property
+    def lazy(self) -> bool:
+        return self._lazy
+
+    def register(self, path_prefixes: Tuple[str, ...], module_path: str, attribute: str = "router", include_prefix: str = ""):
+        """Register a router by module path.
+
+        Args:
+            path_prefixes: Path prefixes (below the API and include prefix) served by the router
+            module_path: Module that defines the router
+            attribute: Name of the router attribute in the module
+            include_prefix: Prefix passed to include_router, if any
+        """
+        self._routes.append(_LazyRoute(tuple(path_prefixes), module_path, attribute, include_prefix))
+
+    def include_eager(self, api_router: APIRouter):
+        """Include every registered router immediately (lazy mode disabled)."""
+        for route in self._routes:
+            router = self._import_router(route)
+            api_router.include_router(router, prefix=route.include_prefix)
+            route.loaded = True
+
+    def install(self, app: FastAPI):
+        """Add the middleware that mounts lazy routers on first use."""
+
+        @app.middleware("http")
+        async def lazy_router_middleware(request: Request, call_next: Callable):
+            for route in self._match(request.url.path):
+                await self._mount(app, route)
+            return await call_next(request)
+
+    def pending(self) -> List[str]:
+        return [route.module_path for route in self._routes if not route.loaded]
+
+    def _match(self, path: str) -> List[_LazyRoute]:
+        # Several routers can share a prefix (e.g. /admin and /admin/billing), so mount every match
+        matches = []
+        for route in self._routes:
+            if route.loaded:
+                continue
+            for path_prefix in route.path_prefixes:
+                full_prefix = f"{self._api_prefix}{route.include_prefix}{path_prefix}"
+                if path == full_prefix or path.startswith(full_prefix.rstrip("/") + "/"):
+                    matches.append(route)
+                    break
+        return matches
+
+    async def _mount(self, app: FastAPI, route: _LazyRoute):
+        async with self._lock:
+            if route.loaded:
+                return
+            router = self._import_router(route)
+            app.include_router(router, prefix=f"{self._api_prefix}{route.include_prefix}")
+            # Regenerate the OpenAPI schema so newly mounted routes show up in /docs
+            app.openapi_schema = None
+            route.loaded = True
+            logger.info(f"⚡ [LAZY ROUTERS] Mounted {route.module_path} on first request")
+
+    @staticmethod
+    def _import_router(route: _LazyRoute) -> APIRouter:
+        module = importlib.import_module(route.module_path)
+        return getattr(module, route.attribute)
@@ -1,19 +1,164 @@
-import structlog, logging, os
+import structlog, logging, os, sys, queue, random, threading, atexit
 
 ENV_MODE = os.getenv("ENV_MODE", "LOCAL")
 
-# Set default logging level based on environment
-if ENV_MODE.upper() == "PRODUCTION":
-    default_level = "DEBUG"
+# Logging profile:
+# - "verbose": DEBUG by default, callsite info on every line, synchronous stdout
+# - "production": INFO by default, callsite info only at WARNING+, queue-backed
+#   non-blocking sink and per-module sampling of DEBUG/INFO (LOG_SAMPLE_RATES)
+LOGGING_PROFILE = os.getenv(
+    "LOGGING_PROFILE",
+    "production" if ENV_MODE.upper() == "PRODUCTION" else "verbose"
+).lower()
+HOT_PATH_PROFILE = LOGGING_PROFILE == "production"
+
+# Set default logging level based on profile
+if HOT_PATH_PROFILE:
+    default_level = "INFO"
 else:
-    default_level = "DEBUG" 
-    # default_level = "INFO"
+    default_level = "DEBUG"
 
 LOGGING_LEVEL = logging.getLevelNamesMapping().get(
-    os.getenv("LOGGING_LEVEL", default_level).upper(), 
-    logging.DEBUG  
+    os.getenv("LOGGING_LEVEL", default_level).upper(),
+    logging.DEBUG
 )
 
+
+def log_enabled(level: int) -> bool:
+    """Whether a level passes the filter; guard expensive log arguments with it."""
+    return level >= LOGGING_LEVEL
+
+
+_stats = {"sampled_out": 0, "sink_dropped": 0}
+
+
+def get_logging_stats() -> dict:
+    return {**_stats, "profile": LOGGING_PROFILE, "level": logging.getLevelName(LOGGING_LEVEL)}
+
+
+def _parse_sample_rates(raw: str) -> dict:
+    """Parse "core.agentpress.response_processor=0.1,core.services.llm=0.05"."""
+    rates = {}
+    for item in raw.split(","):
+        if "=" not in item:
+            continue
+        module, rate = item.split("=", 1)
+        try:
+            rates[module.strip()] = max(0.0, min(1.0, float(rate)))
+        except ValueError:
+            continue
+    return rates
+
+
+_SAMPLE_RATES = _parse_sample_rates(os.getenv("LOG_SAMPLE_RATES", "")) if HOT_PATH_PROFILE else {}
+_WARNING_METHODS = frozenset({"warning", "warn", "error", "exception", "critical", "fatal"})
+
+
+def _sample_by_module(logger, method_name, event_dict):
+    # Runs first so sampled-out events skip every other processor
+    if _SAMPLE_RATES and method_name not in _WARNING_METHODS:
+        module = event_dict.get("module")
+        if module:
+            rate = _SAMPLE_RATES.get(module)
+            if rate is not None and random.random() >= rate:
+                _stats["sampled_out"] += 1
+                raise structlog.DropEvent
+    return event_dict
+
+
+class _WarningCallsiteAdder:
+    """Add filename/function/line only for WARNING and above; frame inspection is the costly part."""
+
+    def __init__(self, parameters):
+        self._adder = structlog.processors.CallsiteParameterAdder(parameters)
+
+    def __call__(self, logger, method_name, event_dict):
+        if method_name in _WARNING_METHODS:
+            return self._adder(logger, method_name, event_dict)
+        return event_dict
+
+
+class _QueueWriter:
+    """Hand rendered lines to a background thread so log calls never block on stdout."""
+
+    def __init__(self, stream, maxsize: int = 10000, batch_size: int = 256):
+        self._stream = stream
+        self._maxsize = maxsize
+        self._batch_size = batch_size
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def put(self, line: str):
+        # Workers fork after import; restart the writer thread in each child
+        if self._pid != os.getpid():
+            self._start()
+        try:
+            self._queue.put_nowait(line)
+        except queue.Full:
+            _stats["sink_dropped"] += 1
+
+    def flush(self, timeout: float = 2.0):
+        if self._thread is None or self._pid != os.getpid():
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+            self._thread.join(timeout)
+        except queue.Full:
+            pass
+
+    def _start(self):
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._queue = queue.Queue(maxsize=self._maxsize)
+            self._thread = threading.Thread(target=self._run, args=(self._queue,), name="log-writer", daemon=True)
+            self._pid = os.getpid()
+            self._thread.start()
+
+    def _run(self, q):
+        while True:
+            line = q.get()
+            batch = []
+            while line is not None:
+                batch.append(line)
+                if len(batch) >= self._batch_size:
+                    break
+                try:
+                    line = q.get_nowait()
+                except queue.Empty:
+                    break
+            if batch:
+                try:
+                    self._stream.write("\n".join(batch) + "\n")
+                    self._stream.flush()
+                except Exception:
+                    pass
+            if line is None:
+                return
+
+
+class _QueueLogger:
+    def __init__(self, writer: _QueueWriter):
+        self._writer = writer
+
+    def msg(self, message: str):
+        self._writer.put(message)
+
+    log = debug = info = warn = warning = msg
+    fatal = failure = err = error = critical = exception = msg
+
+
+class _QueueLoggerFactory:
+    def __init__(self, stream):
+        self._writer = _QueueWriter(stream)
+        atexit.register(self._writer.flush)
+
+    def __call__(self, *args):
+        return _QueueLogger(self._writer)
+
+
 # Use different exception formatting based on output mode
 # dict_tracebacks works with JSONRenderer, format_exc_info works with ConsoleRenderer
 if ENV_MODE.lower() == "local".lower() or ENV_MODE.lower() == "staging".lower():
@@ -23,24 +168,43 @@ else:
     exception_processor = structlog.processors.dict_tracebacks
     renderer = [structlog.processors.JSONRenderer()]
 
+_callsite_parameters = {
+    structlog.processors.CallsiteParameter.FILENAME,
+    structlog.processors.CallsiteParameter.FUNC_NAME,
+    structlog.processors.CallsiteParameter.LINENO,
+}
+
+if HOT_PATH_PROFILE:
+    callsite_processor = _WarningCallsiteAdder(_callsite_parameters)
+    logger_factory = (
+        _QueueLoggerFactory(sys.stdout)
+        if os.getenv("LOG_ASYNC_SINK", "true").lower() in ("true", "1")
+        else structlog.PrintLoggerFactory()
+    )
+else:
+    callsite_processor = structlog.processors.CallsiteParameterAdder(_callsite_parameters)
+    logger_factory = structlog.PrintLoggerFactory()
+
 structlog.configure(
     processors=[
+        _sample_by_module,
         structlog.stdlib.add_log_level,
+        # Formats logger.debug("... %s", value) only for events that pass the level filter
         structlog.stdlib.PositionalArgumentsFormatter(),
         exception_processor,
-        structlog.processors.CallsiteParameterAdder(
-            {
-                structlog.processors.CallsiteParameter.FILENAME,
-                structlog.processors.CallsiteParameter.FUNC_NAME,
-                structlog.processors.CallsiteParameter.LINENO,
-            }
-        ),
+        callsite_processor,
         structlog.processors.TimeStamper(fmt="iso"),
         structlog.contextvars.merge_contextvars,
         *renderer,
     ],
+    logger_factory=logger_factory,
     cache_logger_on_first_use=True,
     wrapper_class=structlog.make_filtering_bound_logger(LOGGING_LEVEL),
 )
 
 logger: structlog.stdlib.BoundLogger = structlog.get_logger()
+
+
+def get_module_logger(module: str) -> structlog.stdlib.BoundLogger:
+    """Logger tagged with its module so LOG_SAMPLE_RATES can sample its DEBUG/INFO events."""
+    return logger.bind(module=module)
@@ -128,6 +128,11 @@ async def generate_and_update_project_name(project_id: str, prompt: str):
             update_result = await client.table('projects').update(update_data).eq("project_id", project_id).execute()
             if hasattr(update_result, 'data') and update_result.data:
                 logger.debug(f"Successfully updated project {project_id} with title, icon, and category")
+                # The sidebar shows the project name and icon
+                account_id = update_result.data[0].get('account_id')
+                if account_id:
+                    from core.runtime_cache import invalidate_thread_list_cache
+                    await invalidate_thread_list_cache(account_id)
             else:
                 logger.error(f"Failed to update project {project_id} in database. Update result: {update_result}")
         else:
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark icon/color generation for a burst of agent creations.
+
+Replaces the LLM call with a stub that answers after a configurable delay and
+replays a template-install style burst: N requests drawn from K distinct
+names, with case and whitespace variants. Runs it once calling the LLM for
+every request (the previous behavior), then twice through
+generate_icon_and_colors (cold, then warm), and reports LLM calls, hit ratio
+and latency for each run.
+
+By default the Redis tier is used (REDIS_HOST/REDIS_PORT); pass --local-only
+to measure the in-process cache and coalescing alone.
+
+Usage:
+    python -m core.utils.scripts.benchmark_icon_generation [--requests 200] [--distinct 20] [--latency-ms 1500]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+import uuid
+
+
+def _install_stub_llm(icon_generator, latency: float) -> None:
+    async def stub_llm_api_call(**kwargs):
+        await asyncio.sleep(latency)
+        content = json.dumps({"icon": "bot", "background_color": "#10B981", "text_color": "#FFFFFF"})
+        return {"choices": [{"message": {"content": content}}]}
+
+    icon_generator.make_llm_api_call = stub_llm_api_call
+
+
+def _workload(requests: int, distinct: int) -> list:
+    run_id = uuid.uuid4().hex[:6]
+    names = [f"Template agent {run_id} {i}" for i in range(distinct)]
+    rng = random.Random(42)
+    variants = [str, str.lower, str.upper, lambda s: f"  {s} ", lambda s: s.replace(" ", "  ")]
+    return [rng.choice(variants)(rng.choice(names)) for _ in range(requests)]
+
+
+async def _timed(fn, name: str) -> float:
+    start = time.perf_counter()
+    await fn(name, "Installed from the marketplace")
+    return time.perf_counter() - start
+
+
+def _report(label: str, latencies: list, total: float, llm_calls: int, hit_ratio: str) -> None:
+    latencies_ms = sorted(l * 1000 for l in latencies)
+    p95 = latencies_ms[int(len(latencies_ms) * 0.95) - 1] if len(latencies_ms) > 1 else latencies_ms[0]
+    print(f"{label:<9} total={total * 1000:7.0f}ms  llm_calls={llm_calls:4d}  hit_ratio={hit_ratio:>5}  "
+          f"latency p50={statistics.median(latencies_ms):7.1f}ms p95={p95:7.1f}ms")
+
+
+async def _run(requests: int, distinct: int, latency: float, local_only: bool) -> None:
+    from core.utils import icon_generator
+
+    _install_stub_llm(icon_generator, latency)
+    if local_only:
+        async def no_redis_get(key):
+            return None
+
+        async def no_redis_put(key, style):
+            return None
+
+        icon_generator._redis_get = no_redis_get
+        icon_generator._redis_put = no_redis_put
+
+    names = _workload(requests, distinct)
+
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(_timed(icon_generator._generate_with_llm, n) for n in names))
+    _report("uncached", latencies, time.perf_counter() - start, icon_generator._stats["llm_calls"], "-")
+
+    icon_generator._stats["llm_calls"] = 0
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(_timed(icon_generator.generate_icon_and_colors, n) for n in names))
+    stats = icon_generator.get_icon_generation_stats()
+    _report("cold", latencies, time.perf_counter() - start, stats["llm_calls"], f"{stats['hit_ratio']:.2f}")
+
+    # Same burst again, e.g. the next install of the same template
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(_timed(icon_generator.generate_icon_and_colors, n) for n in names))
+    stats = icon_generator.get_icon_generation_stats()
+    _report("warm", latencies, time.perf_counter() - start, stats["llm_calls"], f"{stats['hit_ratio']:.2f}")
+    print(f"\n{json.dumps(stats)}")
+
+    if not local_only:
+        from core.services import redis as redis_service
+        await redis_service.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark icon/color generation caching and coalescing")
+    parser.add_argument("--requests", type=int, default=200, help="Requests in the burst")
+    parser.add_argument("--distinct", type=int, default=20, help="Distinct names in the burst")
+    parser.add_argument("--latency-ms", type=float, default=1500, help="Simulated LLM latency")
+    parser.add_argument("--local-only", action="store_true", help="Skip the Redis tier")
+    args = parser.parse_args()
+
+    print(f"{args.requests} requests over {args.distinct} names, stub LLM latency {args.latency_ms:.0f}ms\n")
+    asyncio.run(_run(args.requests, args.distinct, args.latency_ms / 1000, args.local_only))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark distributed lock acquisition under contention against Redis.
+
+Runs N concurrent "deliveries" that each take the same lock, hold it for a
+short critical section and release it, two ways: a SET NX loop that retries
+every 0.5s (how the previous Postgres RPC lock waited) and DistributedLock,
+whose waiters block on the release notification (up to MAX_BLOCKING_WAITERS
+per process; the rest poll). Reports how long each delivery
+waited for the lock and the total wall time.
+
+Requires REDIS_HOST/REDIS_PORT (and credentials, if any) for a disposable Redis.
+
+Usage:
+    python -m core.utils.scripts.benchmark_lock_contention [--deliveries 20] [--hold-ms 20]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+POLL_INTERVAL = 0.5
+
+
+async def _polling_delivery(client, lock_key: str, hold: float) -> float:
+    holder = str(uuid.uuid4())
+    start = time.perf_counter()
+    while not await client.set(lock_key, holder, nx=True, px=30_000):
+        await asyncio.sleep(POLL_INTERVAL)
+    waited = time.perf_counter() - start
+    await asyncio.sleep(hold)
+    if await client.get(lock_key) == holder:
+        await client.delete(lock_key)
+    return waited
+
+
+async def _notify_delivery(lock_key: str, hold: float) -> float:
+    from core.utils.distributed_lock import DistributedLock
+
+    lock = DistributedLock(lock_key, timeout_seconds=30)
+    start = time.perf_counter()
+    if not await lock.acquire(wait=True, wait_timeout=120):
+        raise RuntimeError(f"Failed to acquire {lock_key}")
+    waited = time.perf_counter() - start
+    await asyncio.sleep(hold)
+    await lock.release()
+    return waited
+
+
+def _report(label: str, waits: list, total: float) -> None:
+    waits_ms = sorted(w * 1000 for w in waits)
+    p95 = waits_ms[int(len(waits_ms) * 0.95) - 1] if len(waits_ms) > 1 else waits_ms[0]
+    print(f"{label:<8} total={total * 1000:8.0f}ms  wait p50={statistics.median(waits_ms):7.0f}ms "
+          f"p95={p95:7.0f}ms  max={waits_ms[-1]:7.0f}ms")
+
+
+async def _run(deliveries: int, hold: float) -> None:
+    from core.services import redis as redis_service
+
+    client = await redis_service.get_client()
+    run_id = uuid.uuid4().hex[:8]
+
+    start = time.perf_counter()
+    waits = await asyncio.gather(*(
+        _polling_delivery(client, f"lock:bench-poll-{run_id}", hold) for _ in range(deliveries)
+    ))
+    _report("polling", waits, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    waits = await asyncio.gather(*(
+        _notify_delivery(f"bench-notify-{run_id}", hold) for _ in range(deliveries)
+    ))
+    _report("notify", waits, time.perf_counter() - start)
+
+    await client.delete(f"lock:fence:bench-notify-{run_id}", f"lock:notify:bench-notify-{run_id}")
+    await redis_service.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark distributed lock acquisition under contention")
+    parser.add_argument("--deliveries", type=int, default=20, help="Concurrent deliveries contending for one lock")
+    parser.add_argument("--hold-ms", type=float, default=20, help="Time each delivery holds the lock")
+    args = parser.parse_args()
+
+    print(f"{args.deliveries} deliveries contending for one lock, {args.hold_ms:.0f}ms critical section\n")
+    asyncio.run(_run(args.deliveries, args.hold_ms / 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Benchmark Novu notification dispatch against a local stub Novu server.
+
+Starts a threaded HTTP server that answers the trigger, bulk trigger and
+subscriber endpoints after a configurable delay, points NovuService at it and
+compares awaiting trigger_workflow per notification with enqueue_workflow plus
+the background bulk dispatcher. Reports the time callers spend blocked and
+the enqueue-to-sent flush latency.
+
+Usage:
+    python -m core.utils.scripts.benchmark_notification_dispatch [--events 200] [--latency-ms 80]
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _StubNovuHandler(BaseHTTPRequestHandler):
+    latency = 0.0
+    requests = {}
+
+    def log_message(self, format, *args):
+        pass
+
+    def _respond(self, body: dict, status: int = 201):
+        time.sleep(self.latency)
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+        path = self.path.split("?")[0]
+        type(self).requests[path] = type(self).requests.get(path, 0) + 1
+        ack = {"acknowledged": True, "status": "processed", "transactionId": "stub"}
+        if path.endswith("/events/trigger/bulk"):
+            self._respond({"data": [ack for _ in body.get("events", [])]})
+        elif path.endswith("/events/trigger"):
+            self._respond({"data": ack})
+        else:
+            self._respond({"data": {"subscriberId": body.get("subscriberId", "stub")}})
+
+    do_PATCH = do_POST
+
+
+def _start_stub(latency_ms: float) -> ThreadingHTTPServer:
+    _StubNovuHandler.latency = latency_ms / 1000
+    _StubNovuHandler.requests = {}
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubNovuHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _new_service(server_url: str):
+    from core.notifications.novu_service import NovuService
+
+    service = NovuService()
+    service.enabled = True
+    service.api_key = "stub"
+    service.backend_url = server_url
+    return service
+
+
+def _events(count: int, subscribers: int):
+    for i in range(count):
+        yield {
+            "workflow_id": "task-completed",
+            "subscriber_id": f"user-{i % subscribers}",
+            "payload": {"task_name": f"Task {i}", "task_url": f"/thread/{i}"},
+            "subscriber_email": f"user-{i % subscribers}@example.com",
+            "subscriber_name": "Benchmark User",
+        }
+
+
+async def _run_direct(server_url: str, count: int, subscribers: int) -> dict:
+    service = _new_service(server_url)
+    stalls = []
+    start = time.perf_counter()
+    for event in _events(count, subscribers):
+        call_start = time.perf_counter()
+        await service.trigger_workflow(**event)
+        stalls.append(time.perf_counter() - call_start)
+    total = time.perf_counter() - start
+    await service.close()
+    return {"stalls": stalls, "total": total}
+
+
+async def _run_queued(server_url: str, count: int, subscribers: int) -> dict:
+    service = _new_service(server_url)
+    stalls = []
+    start = time.perf_counter()
+    for event in _events(count, subscribers):
+        call_start = time.perf_counter()
+        service.enqueue_workflow(**event)
+        stalls.append(time.perf_counter() - call_start)
+        # Yield like a real caller would between notifications
+        await asyncio.sleep(0)
+    await service.dispatcher.flush()
+    total = time.perf_counter() - start
+    stats = service.get_dispatch_stats()
+    await service.close()
+    return {"stalls": stalls, "total": total, "stats": stats}
+
+
+def _report(label: str, result: dict) -> None:
+    stalls_ms = [s * 1000 for s in result["stalls"]]
+    print(f"{label:<28} caller stall mean={statistics.mean(stalls_ms):8.3f}ms  "
+          f"max={max(stalls_ms):8.3f}ms  total={result['total'] * 1000:8.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Novu dispatch against a local stub server")
+    parser.add_argument("--events", type=int, default=200, help="Notifications to send per mode")
+    parser.add_argument("--subscribers", type=int, default=50, help="Distinct subscribers among the events")
+    parser.add_argument("--latency-ms", type=float, default=80, help="Simulated Novu response latency")
+    args = parser.parse_args()
+
+    server = _start_stub(args.latency_ms)
+    server_url = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        print(f"{args.events} notifications, stub latency {args.latency_ms:.0f}ms\n")
+        _report("awaited trigger_workflow", asyncio.run(_run_direct(server_url, args.events, args.subscribers)))
+        print(f"  stub requests: {dict(_StubNovuHandler.requests)}")
+
+        _StubNovuHandler.requests = {}
+        queued = asyncio.run(_run_queued(server_url, args.events, args.subscribers))
+        _report("enqueue_workflow + bulk", queued)
+        print(f"  stub requests: {dict(_StubNovuHandler.requests)}")
+        stats = queued["stats"]
+        print(f"  batches={stats['batches']} sent={stats['sent']} coalesced={stats['coalesced']} "
+              f"failed={stats['failed']} flush latency last={stats['last_flush_latency_ms']}ms "
+              f"max={stats['max_flush_latency_ms']}ms")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
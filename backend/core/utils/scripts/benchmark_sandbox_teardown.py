@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark sandbox teardown throughput against a fake Daytona client.
+
+The fake client's get/delete calls sleep for a configurable latency and fail
+or report "not found" for a share of sandboxes, so the numbers reflect how
+core.sandbox.teardown.delete_sandboxes overlaps the round trips at different
+concurrency limits. No Daytona or database access is needed.
+
+Usage:
+    python -m core.utils.scripts.benchmark_sandbox_teardown [--sandboxes 300] [--latency-ms 150]
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from types import SimpleNamespace
+
+
+class FakeDaytona:
+    """Mimics the AsyncDaytona calls made by core.sandbox.sandbox.delete_sandbox."""
+
+    def __init__(self, latency: float, failure_rate: float, missing_rate: float, seed: int = 0):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.missing_rate = missing_rate
+        self.random = random.Random(seed)
+        self.deleted = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def _round_trip(self) -> None:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            # Jitter of +/-30% around the configured latency
+            await asyncio.sleep(self.latency * self.random.uniform(0.7, 1.3))
+        finally:
+            self.in_flight -= 1
+
+    async def get(self, sandbox_id: str):
+        await self._round_trip()
+        if self.random.random() < self.missing_rate:
+            raise Exception(f"Sandbox {sandbox_id} not found")
+        return SimpleNamespace(id=sandbox_id)
+
+    async def delete(self, sandbox) -> None:
+        await self._round_trip()
+        if self.random.random() < self.failure_rate:
+            raise Exception("Daytona API error: 502 Bad Gateway")
+        self.deleted += 1
+
+
+async def _run(sandbox_count: int, concurrency: int, args) -> dict:
+    from core.sandbox.teardown import delete_sandboxes
+
+    daytona = FakeDaytona(args.latency_ms / 1000, args.failure_rate, args.missing_rate)
+
+    async def delete_fn(sandbox_id: str) -> None:
+        sandbox = await daytona.get(sandbox_id)
+        await daytona.delete(sandbox)
+
+    start = time.perf_counter()
+    results = await delete_sandboxes([f"sandbox-{i}" for i in range(sandbox_count)], delete_fn, concurrency)
+    elapsed = time.perf_counter() - start
+    return {
+        "elapsed": elapsed,
+        "failed": sum(1 for error in results.values() if error is not None),
+        "deleted": daytona.deleted,
+        "max_in_flight": daytona.max_in_flight,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sandbox teardown against a fake Daytona client")
+    parser.add_argument("--sandboxes", type=int, default=300, help="Sandboxes to delete per run")
+    parser.add_argument("--latency-ms", type=float, default=150, help="Simulated latency of each Daytona call")
+    parser.add_argument("--failure-rate", type=float, default=0.02, help="Share of deletions that fail")
+    parser.add_argument("--missing-rate", type=float, default=0.05, help="Share of sandboxes already gone")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8, 16, 32], help="Concurrency limits to compare")
+    args = parser.parse_args()
+
+    print(f"Tearing down {args.sandboxes} sandboxes, {args.latency_ms:.0f}ms per Daytona call\n")
+    baseline = None
+    for concurrency in args.concurrency:
+        result = asyncio.run(_run(args.sandboxes, concurrency, args))
+        throughput = args.sandboxes / result["elapsed"]
+        baseline = baseline or throughput
+        print(f"concurrency={concurrency:<4} {result['elapsed']:7.2f}s  {throughput:7.1f} sandboxes/s  "
+              f"({throughput / baseline:5.1f}x)  failed={result['failed']}  max_in_flight={result['max_in_flight']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Benchmark ResponseProcessor.process_streaming_response throughput under
+different logging profiles.
+
+Logging is configured at import time, so each profile runs in a fresh
+interpreter. Every run replays the same synthetic LLM stream (text chunks
+with an embedded XML tool call and a final usage chunk) and reports
+chunks per second. Log output from the child processes is discarded.
+
+Usage:
+    python -m core.utils.scripts.benchmark_streaming_logging [--chunks 5000] [--runs 5]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+BACKEND_DIR = Path(__file__).resolve().parents[3]
+
+PROFILES = {
+    "verbose (DEBUG, callsite, sync)": {"LOGGING_PROFILE": "verbose", "LOGGING_LEVEL": "DEBUG"},
+    "production (INFO, async sink)": {"LOGGING_PROFILE": "production", "LOGGING_LEVEL": "INFO"},
+    "production + sampling": {
+        "LOGGING_PROFILE": "production",
+        "LOGGING_LEVEL": "DEBUG",
+        "LOG_SAMPLE_RATES": "core.agentpress.response_processor=0.01",
+    },
+    "logging off": {"LOGGING_PROFILE": "production", "LOGGING_LEVEL": "CRITICAL"},
+}
+
+
+class _NullTrace:
+    """Stands in for the Langfuse trace so the benchmark measures processing, not tracing."""
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+
+def _chunk(content=None, finish_reason=None, usage=None):
+    delta = SimpleNamespace(content=content, reasoning_content=None, tool_calls=None, role="assistant")
+    choice = SimpleNamespace(delta=delta, finish_reason=finish_reason, index=0)
+    chunk = SimpleNamespace(choices=[choice], model="benchmark-model")
+    if usage is not None:
+        chunk.usage = usage
+    return chunk
+
+
+async def _stream(chunk_count: int):
+    words = ["Analyzing ", "the ", "request ", "and ", "preparing ", "a ", "response. "]
+    for i in range(chunk_count):
+        yield _chunk(content=words[i % len(words)])
+    yield _chunk(content="<function_calls><invoke name=\"noop\"></invoke></function_calls>")
+    usage = SimpleNamespace(prompt_tokens=1000, completion_tokens=chunk_count, total_tokens=1000 + chunk_count)
+    yield _chunk(finish_reason="stop", usage=usage)
+
+
+async def _run_child(chunk_count: int, runs: int) -> dict:
+    from core.agentpress.response_processor import ResponseProcessor, ProcessorConfig
+    from core.agentpress.tool_registry import ToolRegistry
+
+    async def add_message(thread_id, type, content, is_llm_message, metadata=None, **kwargs):
+        return {"message_id": "bench", "thread_id": thread_id, "type": type, "content": content,
+                "metadata": metadata or {}, "created_at": "", "updated_at": ""}
+
+    processor = ResponseProcessor(ToolRegistry(), add_message, trace=_NullTrace())
+    config = ProcessorConfig(xml_tool_calling=True, native_tool_calling=False, execute_tools=False)
+
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        async for _ in processor.process_streaming_response(
+            _stream(chunk_count), "bench-thread", [], "benchmark-model", config=config
+        ):
+            pass
+        timings.append(time.perf_counter() - start)
+
+    return {"timings": timings}
+
+
+def _run_profile(env_overrides: dict, chunk_count: int, runs: int) -> dict:
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as out:
+        out_path = out.name
+    env = {**os.environ, **env_overrides}
+    try:
+        result = subprocess.run(
+            [sys.executable, "-m", "core.utils.scripts.benchmark_streaming_logging",
+             "--child", out_path, "--chunks", str(chunk_count), "--runs", str(runs)],
+            cwd=BACKEND_DIR,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        if result.returncode != 0:
+            return {"error": result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "failed"}
+        with open(out_path) as f:
+            return json.load(f)
+    finally:
+        os.unlink(out_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark streaming response processing with logging on and off")
+    parser.add_argument("--chunks", type=int, default=5000, help="Content chunks per simulated LLM response")
+    parser.add_argument("--runs", type=int, default=5, help="Responses processed per profile")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        results = asyncio.run(_run_child(args.chunks, args.runs))
+        with open(args.child, "w") as f:
+            json.dump(results, f)
+        return
+
+    print(f"Processing {args.runs} streamed responses of {args.chunks} chunks per profile\n")
+    baseline = None
+    for label, env_overrides in PROFILES.items():
+        result = _run_profile(env_overrides, args.chunks, args.runs)
+        if "error" in result:
+            print(f"{label:<36} error: {result['error']}")
+            continue
+        best = min(result["timings"])
+        throughput = (args.chunks + 2) / best
+        baseline = baseline or throughput
+        print(f"{label:<36} best={best * 1000:8.1f}ms  {throughput:10.0f} chunks/s  ({throughput / baseline:4.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Measure peak memory allocated by ResponseProcessor.process_streaming_response.
+
+Replays a synthetic LLM stream (one token per chunk, with XML tool calls
+spread through the text, one of them a long file write) under tracemalloc and
+reports peak allocation normalized to a 100k-token response. For reference it
+also measures the buffers on their own against the previous pattern of
+growing immutable strings with `+=`.
+
+Usage:
+    python -m core.utils.scripts.benchmark_streaming_memory [--tokens 100000] [--runs 3]
+"""
+
+import argparse
+import asyncio
+import gc
+import os
+import tracemalloc
+from types import SimpleNamespace
+
+os.environ.setdefault("LOGGING_LEVEL", "CRITICAL")
+
+TOKENS_PER_REPORT = 100_000
+TOOL_CALL_EVERY = 5_000
+LONG_TOOL_CALL_TOKENS = 20_000
+
+WORDS = ["Analyzing ", "the ", "request ", "and ", "preparing ", "a ", "response. "]
+
+
+class _NullTrace:
+    """Stands in for the Langfuse trace so only the processor's allocations are measured."""
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+
+def _chunk(content=None, finish_reason=None, usage=None):
+    delta = SimpleNamespace(content=content, reasoning_content=None, tool_calls=None, role="assistant")
+    choice = SimpleNamespace(delta=delta, finish_reason=finish_reason, index=0)
+    chunk = SimpleNamespace(choices=[choice], model="benchmark-model")
+    if usage is not None:
+        chunk.usage = usage
+    return chunk
+
+
+def _tokens(token_count: int):
+    """Synthetic token stream: prose with a short tool call every TOOL_CALL_EVERY tokens and one long one."""
+    emitted = 0
+    while emitted < token_count:
+        if emitted and emitted % TOOL_CALL_EVERY == 0:
+            yield "<function_calls><invoke name=\"noop\"></invoke></function_calls>"
+        if emitted == token_count // 2:
+            yield "<function_calls><invoke name=\"create_file\"><parameter name=\"file_contents\">"
+            for i in range(min(LONG_TOOL_CALL_TOKENS, token_count - emitted)):
+                yield WORDS[i % len(WORDS)]
+            yield "</parameter></invoke></function_calls>"
+            emitted += LONG_TOOL_CALL_TOKENS
+        yield WORDS[emitted % len(WORDS)]
+        emitted += 1
+
+
+async def _stream(token_count: int):
+    for token in _tokens(token_count):
+        yield _chunk(content=token)
+    usage = SimpleNamespace(prompt_tokens=1000, completion_tokens=token_count, total_tokens=1000 + token_count)
+    yield _chunk(finish_reason="stop", usage=usage)
+
+
+def _measure(fn) -> int:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _consume_processor(token_count: int) -> None:
+    from core.agentpress.response_processor import ResponseProcessor, ProcessorConfig
+    from core.agentpress.tool_registry import ToolRegistry
+
+    async def add_message(thread_id, type, content, is_llm_message, metadata=None, **kwargs):
+        return {"message_id": "bench", "thread_id": thread_id, "type": type, "content": content,
+                "metadata": metadata or {}, "created_at": "", "updated_at": ""}
+
+    async def run():
+        processor = ResponseProcessor(ToolRegistry(), add_message, trace=_NullTrace())
+        config = ProcessorConfig(xml_tool_calling=True, native_tool_calling=False, execute_tools=False)
+        async for _ in processor.process_streaming_response(
+            _stream(token_count), "bench-thread", [], "benchmark-model", config=config
+        ):
+            pass
+
+    asyncio.run(run())
+
+
+def _consume_buffers(token_count: int) -> None:
+    from core.agentpress.stream_buffers import TextAccumulator, XmlScanWindow
+
+    content, window, blocks = TextAccumulator(), XmlScanWindow(), []
+    for token in _tokens(token_count):
+        content.append(token)
+        blocks.extend(window.feed(token))
+    blocks.extend(window.flush())
+    content.getvalue()
+
+
+def _consume_strings(token_count: int) -> None:
+    from core.agentpress.xml_tool_parser import extract_xml_chunks
+
+    content, xml_content, blocks = "", "", []
+    for token in _tokens(token_count):
+        content += token
+        xml_content += token
+        for block in extract_xml_chunks(xml_content):
+            xml_content = xml_content.replace(block, "", 1)
+            blocks.append(block)
+
+
+def _report(label: str, peaks: list, token_count: int) -> None:
+    per_100k = min(peaks) * TOKENS_PER_REPORT / token_count
+    print(f"{label:<40} peak={min(peaks) / 1024 / 1024:8.2f}MB  per 100k tokens={per_100k / 1024 / 1024:8.2f}MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure peak allocation while processing a streamed response")
+    parser.add_argument("--tokens", type=int, default=TOKENS_PER_REPORT, help="Tokens (chunks) per simulated response")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per measurement; the lowest peak is reported")
+    args = parser.parse_args()
+
+    print(f"Peak allocation for a {args.tokens}-token streamed response (tracemalloc, best of {args.runs})\n")
+    for label, fn in (
+        ("process_streaming_response", _consume_processor),
+        ("buffers: TextAccumulator + XmlScanWindow", _consume_buffers),
+        ("buffers: str += (previous pattern)", _consume_strings),
+    ):
+        peaks = [_measure(lambda: fn(args.tokens)) for _ in range(args.runs)]
+        _report(label, peaks, args.tokens)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-run tool registry setup with every registered tool enabled.
+
+Compares the warm worker path (cached schemas, lazily bound instances,
+pre-serialized OpenAPI JSON) against eager instantiation and per-run
+schema serialization.
+
+Usage:
+    python -m core.utils.scripts.benchmark_tool_setup [--runs 200]
+"""
+
+import argparse
+import inspect
+import json
+import statistics
+import time
+
+from core.agentpress.tool_registry import ToolRegistry
+from core.tools.tool_registry import ALL_TOOLS, get_tool_class
+from core.utils.tool_discovery import warm_up_tools_cache
+
+
+def load_tool_classes():
+    classes = []
+    seen = set()
+    for tool_name, module_path, class_name in ALL_TOOLS:
+        if tool_name in seen:
+            continue
+        seen.add(tool_name)
+        try:
+            classes.append(get_tool_class(module_path, class_name))
+        except (ImportError, AttributeError) as e:
+            print(f"Skipping {tool_name}: {e}")
+    return classes
+
+
+def placeholder_kwargs(tool_class):
+    """Fill required constructor args with placeholders, as a run would pass project/thread context."""
+    sig = inspect.signature(tool_class.__init__)
+    return {
+        p.name: None
+        for p in sig.parameters.values()
+        if p.name != 'self'
+        and p.default == inspect.Parameter.empty
+        and p.kind in (inspect.Parameter.POSITIONAL_OR_KEYWORD, inspect.Parameter.KEYWORD_ONLY)
+    }
+
+
+def setup_registry(tool_classes, eager: bool):
+    registry = ToolRegistry()
+    for tool_class in tool_classes:
+        kwargs = placeholder_kwargs(tool_class)
+        if kwargs:
+            registry.register_tool(tool_class, **kwargs)
+        else:
+            registry.register_tool(tool_class)
+
+    if eager:
+        for tool_info in registry.tools.values():
+            try:
+                registry._bind_instance(tool_info)
+            except Exception:
+                pass
+        json.dumps(registry.get_openapi_schemas(), indent=2)
+    else:
+        registry.get_openapi_schemas_json()
+
+    return registry
+
+
+def measure(tool_classes, runs: int, eager: bool):
+    timings = []
+    functions = 0
+    for _ in range(runs):
+        start = time.perf_counter()
+        registry = setup_registry(tool_classes, eager)
+        timings.append((time.perf_counter() - start) * 1000)
+        functions = len(registry.tools)
+    return timings, functions
+
+
+def report(label, timings, functions):
+    timings = sorted(timings)
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    print(f"{label:<28} functions={functions:<4} mean={statistics.mean(timings):7.2f}ms "
+          f"p50={statistics.median(timings):7.2f}ms p95={p95:7.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-run tool registry setup")
+    parser.add_argument("--runs", type=int, default=200, help="Number of simulated run setups")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    warm_up_tools_cache()
+    print(f"Worker warm-up: {(time.perf_counter() - start) * 1000:.1f}ms")
+
+    tool_classes = load_tool_classes()
+    print(f"Benchmarking {len(tool_classes)} tool classes over {args.runs} runs\n")
+
+    timings, functions = measure(tool_classes, args.runs, eager=False)
+    report("lazy + pre-serialized", timings, functions)
+
+    timings, functions = measure(tool_classes, args.runs, eager=True)
+    report("eager instantiate + dumps", timings, functions)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Benchmark transcription latency and event loop lag against a local stub server.
+
+Starts a threaded HTTP server that answers /v1/audio/transcriptions after a
+configurable delay, points the OpenAI SDK at it and runs concurrent uploads
+two ways: the previous handler (sync client built per request, temp file,
+blocking call on the event loop) and core.services.transcription.transcribe
+(shared async client, upload streamed from the file object, concurrency gate).
+A ticker task measures how late the event loop wakes up while they run.
+
+Usage:
+    python -m core.utils.scripts.benchmark_transcription [--requests 16] [--size-mb 5] [--latency-ms 500]
+"""
+
+import argparse
+import asyncio
+import io
+import os
+import statistics
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _StubTranscriptionHandler(BaseHTTPRequestHandler):
+    latency = 0.0
+    bytes_received = 0
+
+    def log_message(self, format, *args):
+        pass
+
+    def _read_body(self) -> int:
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            total = 0
+            while True:
+                size = int(self.rfile.readline().strip(), 16)
+                if size == 0:
+                    self.rfile.readline()
+                    return total
+                self.rfile.read(size)
+                self.rfile.readline()
+                total += size
+        length = int(self.headers.get("Content-Length") or 0)
+        remaining = length
+        while remaining:
+            remaining -= len(self.rfile.read(min(remaining, 1 << 16)))
+        return length
+
+    def do_POST(self):
+        type(self).bytes_received += self._read_body()
+        time.sleep(self.latency)
+        data = b"stub transcription"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def _start_stub(latency_ms: float) -> ThreadingHTTPServer:
+    _StubTranscriptionHandler.latency = latency_ms / 1000
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubTranscriptionHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def _legacy_transcribe(content: bytes) -> str:
+    """The previous handler body: per-request sync client, temp file, blocking call."""
+    import openai
+
+    client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".webm") as temp_file:
+        temp_file.write(content)
+        temp_file_path = temp_file.name
+    try:
+        with open(temp_file_path, "rb") as f:
+            return client.audio.transcriptions.create(
+                model="gpt-4o-mini-transcribe", file=f, response_format="text"
+            )
+    finally:
+        os.unlink(temp_file_path)
+
+
+async def _current_transcribe(content: bytes) -> str:
+    from core.services.transcription import transcribe
+
+    return await transcribe(io.BytesIO(content), "audio.webm", "audio/webm")
+
+
+async def _measure(transcribe_fn, requests: int, content: bytes) -> dict:
+    lags = []
+    stop = asyncio.Event()
+
+    async def ticker():
+        interval = 0.01
+        while not stop.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(interval)
+            lags.append(time.perf_counter() - start - interval)
+
+    async def timed():
+        start = time.perf_counter()
+        await transcribe_fn(content)
+        return time.perf_counter() - start
+
+    ticker_task = asyncio.create_task(ticker())
+    await asyncio.sleep(0.05)
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(timed() for _ in range(requests)))
+    total = time.perf_counter() - start
+    stop.set()
+    await ticker_task
+
+    if transcribe_fn is _current_transcribe:
+        from core.services.transcription import close_client
+        await close_client()
+    return {"latencies": latencies, "total": total, "lags": lags}
+
+
+def _report(label: str, result: dict) -> None:
+    latencies_ms = sorted(l * 1000 for l in result["latencies"])
+    lags_ms = [l * 1000 for l in result["lags"]] or [0.0]
+    p95 = latencies_ms[int(len(latencies_ms) * 0.95) - 1] if len(latencies_ms) > 1 else latencies_ms[0]
+    print(f"{label:<10} total={result['total'] * 1000:8.0f}ms  latency p50={statistics.median(latencies_ms):7.0f}ms "
+          f"p95={p95:7.0f}ms  loop lag max={max(lags_ms):7.1f}ms mean={statistics.mean(lags_ms):6.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark transcription against a local stub server")
+    parser.add_argument("--requests", type=int, default=16, help="Concurrent transcription requests")
+    parser.add_argument("--size-mb", type=float, default=5, help="Size of each uploaded file")
+    parser.add_argument("--latency-ms", type=float, default=500, help="Simulated provider latency")
+    args = parser.parse_args()
+
+    server = _start_stub(args.latency_ms)
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    os.environ.setdefault("OPENAI_API_KEY", "stub")
+    content = os.urandom(int(args.size_mb * 1024 * 1024))
+
+    try:
+        print(f"{args.requests} concurrent uploads of {args.size_mb:g}MB, stub latency {args.latency_ms:.0f}ms\n")
+        _report("legacy", asyncio.run(_measure(_legacy_transcribe, args.requests, content)))
+        _report("async", asyncio.run(_measure(_current_transcribe, args.requests, content)))
+        print(f"\nstub received {_StubTranscriptionHandler.bytes_received / 1024 / 1024:.1f}MB")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Measure cold-start import cost of the API and worker entry points.
+
+Runs each entry point under `python -X importtime` in a fresh interpreter,
+reports total import time and the slowest modules, and checks the result
+against a time budget and a list of modules that entry point must not load.
+Exits non-zero when any check fails, so it can gate CI.
+
+Usage:
+    python -m core.utils.scripts.startup_benchmark [--top 15] [--entry api] [--no-budget]
+
+Run from the backend/ directory.
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+BACKEND_DIR = Path(__file__).resolve().parents[3]
+
+ENTRY_POINTS = {
+    "api": "import api",
+    "worker": "import run_agent_background",
+}
+
+# Cumulative import time budget per entry point, in milliseconds
+BUDGETS_MS = {
+    "api": 4000,
+    "worker": 2500,
+}
+
+# Routers the API mounts on first request when LAZY_ROUTER_REGISTRATION is on
+LAZY_ROUTER_PACKAGES = (
+    "core.admin",
+    "core.google",
+    "core.referrals.api",
+    "core.services.transcription",
+)
+
+# Packages an entry point should never pull in at import time
+FORBIDDEN_PACKAGES = {
+    "api": ("core.run",),
+    "worker": LAZY_ROUTER_PACKAGES,
+}
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def run_importtime(statement: str, lazy_routers: bool) -> Tuple[List[Tuple[str, int, int, int]], str]:
+    env = dict(os.environ)
+    env["LAZY_ROUTER_REGISTRATION"] = "true" if lazy_routers else "false"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append((module, int(self_us), int(cumulative_us), len(indent) // 2))
+    error = result.stderr.strip().splitlines()[-1] if result.returncode != 0 and result.stderr.strip() else ""
+    return rows, error
+
+
+def check_entry(name: str, top: int, lazy_routers: bool, enforce_budget: bool) -> bool:
+    rows, error = run_importtime(ENTRY_POINTS[name], lazy_routers)
+    if not rows:
+        print(f"[{name}] no import timings captured: {error}")
+        return False
+
+    # Top-level imports (depth 0) add up to the entry point's total cold-start cost
+    total_ms = sum(cumulative for _, _, cumulative, depth in rows if depth == 0) / 1000
+    modules = {module for module, _, _, _ in rows}
+
+    print(f"[{name}] {len(modules)} modules, total import time {total_ms:.0f}ms"
+          + (f" (exited with: {error})" if error else ""))
+    print(f"  {'cumulative':>10}  {'self':>8}  module")
+    for module, self_us, cumulative_us, _ in sorted(rows, key=lambda r: r[2], reverse=True)[:top]:
+        print(f"  {cumulative_us / 1000:>8.1f}ms  {self_us / 1000:>6.1f}ms  {module}")
+
+    ok = True
+    budget = BUDGETS_MS.get(name)
+    if enforce_budget and budget is not None and total_ms > budget:
+        print(f"  ❌ over budget: {total_ms:.0f}ms > {budget}ms")
+        ok = False
+
+    packages = FORBIDDEN_PACKAGES.get(name, ())
+    if name == "api" and lazy_routers:
+        packages += LAZY_ROUTER_PACKAGES
+    forbidden = sorted(m for m in modules if any(m == p or m.startswith(p + ".") for p in packages))
+    if forbidden:
+        print(f"  ❌ imports modules it should defer: {', '.join(forbidden[:10])}"
+              + (f" (+{len(forbidden) - 10} more)" if len(forbidden) > 10 else ""))
+        ok = False
+
+    if error:
+        ok = False
+
+    if ok:
+        print("  ✅ within budget")
+    print()
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure API and worker cold-start import cost")
+    parser.add_argument("--entry", choices=sorted(ENTRY_POINTS), action="append",
+                        help="Entry point to measure (default: all)")
+    parser.add_argument("--top", type=int, default=15, help="Number of slowest modules to show")
+    parser.add_argument("--eager-routers", action="store_true",
+                        help="Measure the API with LAZY_ROUTER_REGISTRATION disabled")
+    parser.add_argument("--no-budget", action="store_true", help="Report only, do not enforce time budgets")
+    args = parser.parse_args()
+
+    results: Dict[str, bool] = {}
+    for name in args.entry or sorted(ENTRY_POINTS):
+        results[name] = check_entry(name, args.top, not args.eager_routers, not args.no_budget)
+
+    sys.exit(0 if all(results.values()) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -218,6 +218,8 @@ class SunaDefaultAgentService:
             
             # Delete agent
             result = await client.table('agents').delete().eq('agent_id', agent_id).execute()
+            from core.runtime_cache import invalidate_agent_config_cache
+            await invalidate_agent_config_cache(agent_id)
             return bool(result.data)
             
         except Exception as e:
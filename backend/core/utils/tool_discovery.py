@@ -8,14 +8,23 @@ PERFORMANCE OPTIMIZATION:
 - Tool classes are pre-imported at startup via warm_up_tools_cache()
 - Tool schemas are pre-computed and cached globally to avoid per-request overhead
 - The schema cache uses tool class identity as key for O(1) lookups
+- OpenAPI schemas are pre-serialized once per worker for prompt assembly
+- Tool metadata is extracted once into an immutable ToolCatalog whose version
+  is a hash of its content, so API responses are pre-serialized and carry an ETag
 """
 
+import copy
+import hashlib
 import importlib
 import inspect
-from typing import Dict, List, Any, Optional, Type
+import json
+import textwrap
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, List, Any, Mapping, Optional, Tuple, Type
 from pathlib import Path
 
-from core.agentpress.tool import Tool, ToolMetadata, MethodMetadata, ToolSchema
+from core.agentpress.tool import Tool, ToolMetadata, MethodMetadata, ToolSchema, SchemaType
 from core.utils.logger import logger
 
 
@@ -23,6 +32,9 @@ from core.utils.logger import logger
 # This is populated at startup and reused across all agent runs
 _SCHEMA_CACHE: Dict[Type[Tool], Dict[str, List[ToolSchema]]] = {}
 
+# Pre-serialized OpenAPI JSON per tool method, built once per worker
+_OPENAPI_JSON_CACHE: Dict[Type[Tool], Dict[str, str]] = {}
+
 # Global cache for pre-instantiated stateless tools
 # Tools that don't require per-request state can be reused
 _STATELESS_TOOL_INSTANCES: Dict[Type[Tool], Tool] = {}
@@ -92,6 +104,39 @@ def get_cached_tool_instance(tool_class: Type[Tool]) -> Optional[Tool]:
     return _STATELESS_TOOL_INSTANCES.get(tool_class)
 
 
+def get_cached_openapi_json(tool_class: Type[Tool], method_name: str) -> Optional[str]:
+    """Get the pre-serialized OpenAPI JSON for a tool method.
+    
+    The string is formatted as one element of a ``json.dumps(list, indent=2)``
+    array so callers can join entries without re-serializing the schemas.
+    
+    Args:
+        tool_class: The tool class that owns the method
+        method_name: The method (function) name
+        
+    Returns:
+        Serialized schema, or None if the class was not warmed up
+    """
+    per_class = _OPENAPI_JSON_CACHE.get(tool_class)
+    if per_class is None:
+        return None
+    return per_class.get(method_name)
+
+
+def serialize_openapi_schema(schema: Dict[str, Any]) -> str:
+    """Serialize an OpenAPI schema as an element of an indent=2 JSON array."""
+    return textwrap.indent(json.dumps(schema, indent=2), '  ')
+
+
+def _serialize_openapi_schemas(schemas: Dict[str, List[ToolSchema]]) -> Dict[str, str]:
+    serialized = {}
+    for method_name, schema_list in schemas.items():
+        for schema in schema_list:
+            if schema.schema_type == SchemaType.OPENAPI:
+                serialized[method_name] = serialize_openapi_schema(schema.schema)
+    return serialized
+
+
 def _get_all_tool_subclasses(base_class: Type[Tool] = None) -> List[Type[Tool]]:
     """Get all subclasses of Tool recursively.
     
@@ -144,6 +189,28 @@ _TOOLS_CACHE = None
 _WARMUP_COMPLETE = False
 
 
+@dataclass(frozen=True)
+class ToolCatalog:
+    """Metadata of every discovered tool, extracted once per process.
+    
+    The tool set only changes with a deploy, so the catalog is never rebuilt.
+    Its version is a hash of the serialized metadata: it is the same on every
+    worker running the same code and changes whenever any tool's metadata does.
+    """
+    version: str
+    tools: Mapping[str, Dict[str, Any]]
+    method_names: Mapping[str, Tuple[str, ...]]
+    # Pre-serialized body of GET /tools
+    response_json: str
+    
+    @property
+    def etag(self) -> str:
+        return f'"{self.version}"'
+
+
+_TOOL_CATALOG: Optional[ToolCatalog] = None
+
+
 def warm_up_tools_cache():
     """Pre-load and cache all tool classes, schemas, AND stateless instances on startup.
     
@@ -179,6 +246,7 @@ def warm_up_tools_cache():
             try:
                 schemas = _precompute_schemas_for_class(tool_class)
                 _SCHEMA_CACHE[tool_class] = schemas
+                _OPENAPI_JSON_CACHE[tool_class] = _serialize_openapi_schemas(schemas)
                 schema_count += len(schemas)
             except Exception as e:
                 logger.warning(f"Failed to pre-compute schemas for {tool_name}: {e}")
@@ -199,9 +267,12 @@ def warm_up_tools_cache():
             except Exception as e:
                 logger.debug(f"Could not pre-instantiate {tool_name}: {e}")
     
+    # Step 3: Extract tool metadata into the catalog served by the tools API
+    catalog = get_tool_catalog()
+    
     elapsed = time.time() - start
     _WARMUP_COMPLETE = True
-    logger.info(f"✅ Ready: {len(_TOOLS_CACHE)} tools, {schema_count} methods, {instance_count} instances cached in {elapsed:.2f}s")
+    logger.info(f"✅ Ready: {len(_TOOLS_CACHE)} tools, {schema_count} methods, {instance_count} instances cached in {elapsed:.2f}s (catalog {catalog.version[:12]})")
 
 
 def discover_tools() -> Dict[str, Type[Tool]]:
@@ -319,23 +390,50 @@ def _extract_tool_metadata(tool_name: str, tool_class: Type[Tool]) -> Dict[str,
     return metadata
 
 
-def get_tools_metadata() -> List[Dict[str, Any]]:
-    """Get metadata for all discovered tools.
-    
-    Returns:
-        List of tool metadata dicts
-    """
+def _build_tool_catalog() -> ToolCatalog:
     tools_map = discover_tools()
-    metadata_list = []
+    tools = {}
     
     for tool_name, tool_class in tools_map.items():
         try:
-            metadata = _extract_tool_metadata(tool_name, tool_class)
-            metadata_list.append(metadata)
+            tools[tool_name] = _extract_tool_metadata(tool_name, tool_class)
         except Exception as e:
             logger.warning(f"Failed to extract metadata for {tool_name}: {e}")
     
-    return metadata_list
+    tools_json = json.dumps(list(tools.values()), sort_keys=True)
+    version = hashlib.sha256(tools_json.encode('utf-8')).hexdigest()
+    
+    return ToolCatalog(
+        version=version,
+        tools=MappingProxyType(tools),
+        method_names=MappingProxyType({
+            tool_name: tuple(method['name'] for method in metadata['methods'])
+            for tool_name, metadata in tools.items()
+        }),
+        response_json=f'{{"success": true, "tools": {tools_json}}}'
+    )
+
+
+def get_tool_catalog() -> ToolCatalog:
+    """Get the tool metadata catalog, building it on first use.
+    
+    Returns:
+        The process-wide ToolCatalog
+    """
+    global _TOOL_CATALOG
+    if _TOOL_CATALOG is None:
+        _TOOL_CATALOG = _build_tool_catalog()
+        logger.debug(f"Built tool catalog {_TOOL_CATALOG.version[:12]} with {len(_TOOL_CATALOG.tools)} tools")
+    return _TOOL_CATALOG
+
+
+def get_tools_metadata() -> List[Dict[str, Any]]:
+    """Get metadata for all discovered tools.
+    
+    Returns:
+        List of tool metadata dicts
+    """
+    return copy.deepcopy(list(get_tool_catalog().tools.values()))
 
 
 def get_tool_group(tool_name: str) -> Optional[Dict[str, Any]]:
@@ -347,13 +445,8 @@ def get_tool_group(tool_name: str) -> Optional[Dict[str, Any]]:
     Returns:
         Tool metadata dict or None
     """
-    tools_map = discover_tools()
-    tool_class = tools_map.get(tool_name)
-    
-    if not tool_class:
-        return None
-    
-    return _extract_tool_metadata(tool_name, tool_class)
+    metadata = get_tool_catalog().tools.get(tool_name)
+    return copy.deepcopy(metadata) if metadata is not None else None
 
 
 def get_enabled_methods_for_tool(tool_name: str, config: Dict[str, Any]) -> Optional[List[str]]:
@@ -366,8 +459,8 @@ def get_enabled_methods_for_tool(tool_name: str, config: Dict[str, Any]) -> Opti
     Returns:
         List of enabled method names, or None if all methods should be enabled
     """
-    tool_metadata = get_tool_group(tool_name)
-    if not tool_metadata:
+    method_names = get_tool_catalog().method_names.get(tool_name)
+    if method_names is None:
         return None
     
     tool_config = config.get(tool_name, True)
@@ -392,9 +485,7 @@ def get_enabled_methods_for_tool(tool_name: str, config: Dict[str, Any]) -> Opti
             return None
         
         enabled_methods = []
-        for method in tool_metadata['methods']:
-            method_name = method['name']
-            
+        for method_name in method_names:
             # Check if method has specific config
             if method_name in methods_config:
                 method_config = methods_config[method_name]
@@ -422,9 +513,10 @@ def validate_tool_config(config: Dict[str, Any]) -> Dict[str, Any]:
         Normalized configuration
     """
     normalized_config = {}
+    catalog_tools = get_tool_catalog().tools
     
     for tool_name, tool_config in config.items():
-        tool_metadata = get_tool_group(tool_name)
+        tool_metadata = catalog_tools.get(tool_name)
         if not tool_metadata:
             # Keep unknown tools as-is
             normalized_config[tool_name] = tool_config
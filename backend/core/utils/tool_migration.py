@@ -1,5 +1,5 @@
 from typing import Dict, Any, Optional
-from core.utils.tool_discovery import get_tool_group, get_tools_metadata, get_enabled_methods_for_tool
+from core.utils.tool_discovery import get_tool_catalog, get_tool_group, get_enabled_methods_for_tool
 from core.utils.logger import logger
 
 def migrate_legacy_tool_config(legacy_config: Dict[str, Any]) -> Dict[str, Any]:
@@ -54,7 +54,7 @@ def migrate_legacy_tool_config(legacy_config: Dict[str, Any]) -> Dict[str, Any]:
 def ensure_all_tools_present(config: Dict[str, Any]) -> Dict[str, Any]:
     complete_config = dict(config)
     
-    all_tools = get_tools_metadata()
+    all_tools = get_tool_catalog().tools
     for tool_name, tool_metadata in all_tools.items():
         if tool_name not in complete_config:
             methods = tool_metadata.get('methods', [])
@@ -129,7 +129,7 @@ def is_tool_effectively_enabled(tool_name: str, config: Dict[str, Any]) -> bool:
 def get_tool_configuration_summary(config: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
     summary = {}
     
-    all_tools = get_tools_metadata()
+    all_tools = get_tool_catalog().tools
     for tool_name, tool_metadata in all_tools.items():
         methods = tool_metadata.get('methods', [])
         tool_config = config.get(tool_name, True)
@@ -52,6 +52,20 @@ class VersionResponse(BaseModel):
     previous_version_id: Optional[str] = None
 
 
+class VersionSummaryResponse(BaseModel):
+    version_id: str
+    agent_id: str
+    version_number: int
+    version_name: str
+    is_active: bool
+    status: str
+    created_at: str
+    updated_at: str
+    created_by: Optional[str] = None
+    change_description: Optional[str] = None
+    previous_version_id: Optional[str] = None
+
+
 class VersionComparisonResponse(BaseModel):
     version1: VersionResponse
     version2: VersionResponse
@@ -76,6 +90,24 @@ async def get_versions(
         raise HTTPException(status_code=500, detail="Failed to fetch versions")
 
 
+@router.get("/agents/{agent_id}/versions/summary", response_model=List[VersionSummaryResponse], summary="List Agent Version Summaries", operation_id="list_agent_version_summaries")
+async def get_version_summaries(
+    agent_id: str,
+    user_id: str = Depends(verify_and_get_user_id_from_jwt),
+    version_service: VersionService = Depends(get_version_service)
+):
+    try:
+        summaries = await version_service.get_version_summaries(agent_id, user_id)
+        return [VersionSummaryResponse(**summary) for summary in summaries]
+    except UnauthorizedError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    except AgentNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        logger.error(f"Failed to fetch version summaries: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to fetch versions")
+
+
 @router.post("/agents/{agent_id}/versions", response_model=VersionResponse, summary="Create Agent Version", operation_id="create_agent_version")
 async def create_version(
     agent_id: str,
@@ -0,0 +1,160 @@
+"""
+Content-addressed storage for agent version configs.
+
+A config is split into sections (system_prompt, model, triggers, ... and one
+section per tool group under tools) and each section is stored once in
+agent_config_blobs under the SHA-256 of its canonical JSON. A compacted version
+keeps only the section -> hash map in agent_versions.config_refs, so saving a
+new version that only changes the prompt shares every other section with the
+previous one.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Generic, Hashable, List, Optional, TypeVar
+
+from core.utils.logger import logger
+
+BLOB_CACHE_MAX_ENTRIES = 4096
+_TOOLS_PREFIX = "tools."
+
+V = TypeVar("V")
+
+
+class BoundedCache(Generic[V]):
+    """Small thread-safe LRU map for immutable values."""
+
+    def __init__(self, max_entries: int):
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, V]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[V]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: V) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Blobs never change once written, so they can be cached for the process lifetime
+_blob_cache: BoundedCache[str] = BoundedCache(BLOB_CACHE_MAX_ENTRIES)
+
+
+def _canonical_json(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def hash_section(value: Any) -> str:
+    return hashlib.sha256(_canonical_json(value).encode("utf-8")).hexdigest()
+
+
+def split_config(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Split a version config into independently stored sections."""
+    sections = {}
+    for key, value in config.items():
+        if key == "tools" and isinstance(value, dict):
+            for tool_group, tool_value in value.items():
+                sections[f"{_TOOLS_PREFIX}{tool_group}"] = tool_value
+        else:
+            sections[key] = value
+    return sections
+
+
+def merge_sections(sections: Dict[str, Any]) -> Dict[str, Any]:
+    """Inverse of split_config."""
+    config: Dict[str, Any] = {}
+    for key, value in sections.items():
+        if key.startswith(_TOOLS_PREFIX):
+            config.setdefault("tools", {})[key[len(_TOOLS_PREFIX):]] = value
+        else:
+            config[key] = value
+    return config
+
+
+def config_refs(config: Dict[str, Any]) -> Dict[str, str]:
+    """Section -> content hash for a full config."""
+    return {key: hash_section(value) for key, value in split_config(config).items()}
+
+
+def config_fingerprint(refs: Dict[str, str]) -> str:
+    """Single hash identifying a config's content, computed from its section hashes."""
+    return hash_section(refs)
+
+
+async def store_config(client, config: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Write a config's sections to agent_config_blobs.
+
+    Sections that are already stored are skipped (by the process cache, then by
+    the primary key on conflict).
+
+    Returns:
+        The section -> hash map to keep in agent_versions.config_refs
+    """
+    refs = {}
+    rows = {}
+    for key, value in split_config(config).items():
+        encoded = _canonical_json(value)
+        blob_hash = hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+        refs[key] = blob_hash
+        if blob_hash not in rows and _blob_cache.get(blob_hash) is None:
+            # Wrapped so null sections (e.g. an unset model) stay valid JSONB values
+            rows[blob_hash] = {
+                "blob_hash": blob_hash,
+                "content": {"value": value},
+                "size_bytes": len(encoded),
+            }
+
+    if rows:
+        await client.table("agent_config_blobs").upsert(
+            list(rows.values()), on_conflict="blob_hash", ignore_duplicates=True
+        ).execute()
+        for blob_hash, row in rows.items():
+            _blob_cache.put(blob_hash, _canonical_json(row["content"]["value"]))
+
+    return refs
+
+
+async def load_configs(client, refs_list: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+    """
+    Rebuild full configs from their section hashes with at most one blob query.
+
+    Returns:
+        One config per entry of refs_list, in order
+    """
+    missing = {
+        blob_hash
+        for refs in refs_list
+        for blob_hash in refs.values()
+        if _blob_cache.get(blob_hash) is None
+    }
+    if missing:
+        result = await client.table("agent_config_blobs").select(
+            "blob_hash, content"
+        ).in_("blob_hash", list(missing)).execute()
+        for row in result.data or []:
+            _blob_cache.put(row["blob_hash"], _canonical_json((row.get("content") or {}).get("value")))
+
+    configs = []
+    for refs in refs_list:
+        sections = {}
+        for key, blob_hash in refs.items():
+            encoded = _blob_cache.get(blob_hash)
+            if encoded is None:
+                logger.warning(f"Agent config blob {blob_hash} for section {key} not found")
+                continue
+            sections[key] = json.loads(encoded)
+        configs.append(merge_sections(sections))
+    return configs
@@ -7,6 +7,15 @@ from enum import Enum
 
 from core.services.supabase import DBConnection
 from core.utils.logger import logger
+from .config_blobs import BoundedCache, config_fingerprint, config_refs, load_configs, store_config
+
+DIFF_CACHE_MAX_ENTRIES = 1024
+
+# Columns of the lightweight version list (everything except the config bodies)
+VERSION_SUMMARY_COLUMNS = (
+    'version_id, agent_id, version_number, version_name, is_active, created_at, '
+    'updated_at, created_by, change_description, previous_version_id'
+)
 
 
 class VersionStatus(Enum):
@@ -76,10 +85,70 @@ class VersionConflictError(VersionServiceError):
 class VersionService:
     def __init__(self):
         self.db = DBConnection()
+        # (version1_id, version2_id, fingerprint1, fingerprint2) -> differences
+        self._diff_cache: BoundedCache[List[Dict[str, Any]]] = BoundedCache(DIFF_CACHE_MAX_ENTRIES)
     
     async def _get_client(self):
         return await self.db.client
     
+    def _is_compacted(self, row: Dict[str, Any]) -> bool:
+        return not row.get('config') and bool(row.get('config_refs'))
+    
+    async def _hydrate_rows(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Rebuild the config of compacted version rows in place, with one blob query for all of them."""
+        compacted = [row for row in rows if self._is_compacted(row)]
+        if compacted:
+            client = await self._get_client()
+            configs = await load_configs(client, [row['config_refs'] for row in compacted])
+            for row, config in zip(compacted, configs):
+                row['config'] = config
+        return rows
+    
+    async def _compact_version(self, agent_id: str, version_id: Optional[str]) -> None:
+        """
+        Replace a superseded version's full config with references to shared blobs.
+        
+        The agent's current version keeps its full config, because it is read and
+        edited directly in agent_versions elsewhere. compact_agent_version checks
+        that in the same statement as the update, so a concurrent activation of
+        this version cannot leave the current version compacted.
+        """
+        if not version_id:
+            return
+        
+        try:
+            client = await self._get_client()
+            result = await client.table('agent_versions').select('version_id, config').eq(
+                'version_id', version_id
+            ).execute()
+            if not result.data or not result.data[0].get('config'):
+                return
+            
+            refs = await store_config(client, result.data[0]['config'])
+            compacted = await client.rpc('compact_agent_version', {
+                'p_agent_id': agent_id,
+                'p_version_id': version_id,
+                'p_config_refs': refs
+            }).execute()
+            if not compacted.data:
+                logger.debug(f"Version {version_id} became current again, left uncompacted")
+                return
+            logger.debug(f"Compacted config of version {version_id} into {len(refs)} shared sections")
+        except Exception as e:
+            # The version keeps its full config; nothing is lost
+            logger.warning(f"Failed to compact config of version {version_id}: {e}")
+    
+    async def _restore_full_config(self, version: Dict[str, Any]) -> None:
+        if not self._is_compacted(version):
+            return
+        
+        client = await self._get_client()
+        await self._hydrate_rows([version])
+        await client.table('agent_versions').update({
+            'config': version['config'],
+            'config_refs': None
+        }).eq('version_id', version['version_id']).execute()
+    
     async def _verify_and_authorize_agent_access(self, agent_id: str, user_id: str) -> tuple[bool, bool]:
         if user_id == "system":
             return True, True
@@ -137,6 +206,9 @@ class VersionService:
         
         if not result.data:
             raise Exception("Failed to update agent current version")
+        
+        from core.runtime_cache import set_current_agent_version
+        await set_current_agent_version(agent_id, version_id)
     
     def _version_from_db_row(self, row: Dict[str, Any]) -> AgentVersion:
         config = row.get('config', {})
@@ -283,6 +355,9 @@ class VersionService:
         version_count = await self._count_versions(agent_id)
         await self._update_agent_current_version(agent_id, version.version_id, version_count)
         
+        if previous_version_id and previous_version_id != version.version_id:
+            await self._compact_version(agent_id, previous_version_id)
+        
         # Invalidate agent config cache (MCPs may have changed)
         try:
             from core.runtime_cache import invalidate_agent_config_cache
@@ -308,8 +383,53 @@ class VersionService:
         if not result.data:
             raise VersionNotFoundError(f"Version {version_id} not found")
         
+        await self._hydrate_rows(result.data)
         return self._version_from_db_row(result.data[0])
     
+    async def get_version_rows_batch(self, version_ids: Dict[str, str], user_id: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch the version rows of several agents with one authorization query and one version query.
+
+        Args:
+            version_ids: Mapping of agent_id to the version_id to fetch
+            user_id: User the versions are read for
+
+        Returns:
+            Raw agent_versions rows keyed by agent_id. Agents the user may not
+            view and versions that do not exist are left out.
+        """
+        if not version_ids:
+            return {}
+
+        client = await self._get_client()
+        agent_ids = list(version_ids.keys())
+
+        if user_id == "system":
+            allowed = set(agent_ids)
+        else:
+            access_result = await client.table('agents').select(
+                'agent_id, account_id, is_public'
+            ).in_('agent_id', agent_ids).execute()
+            allowed = {
+                row['agent_id'] for row in access_result.data or []
+                if row['account_id'] == user_id or row.get('is_public', False)
+            }
+
+        requested = {agent_id: version_id for agent_id, version_id in version_ids.items() if agent_id in allowed}
+        if not requested:
+            return {}
+
+        result = await client.table('agent_versions').select('*').in_(
+            'version_id', list(set(requested.values()))
+        ).execute()
+
+        rows = {}
+        for row in result.data or []:
+            if requested.get(row['agent_id']) == row['version_id']:
+                rows[row['agent_id']] = row
+        await self._hydrate_rows(list(rows.values()))
+        return rows
+
     async def get_active_version(self, agent_id: str, user_id: str = "system") -> Optional[AgentVersion]:
         is_owner, is_public = await self._verify_and_authorize_agent_access(agent_id, user_id)
         if not is_owner and not is_public:
@@ -333,6 +453,7 @@ class VersionService:
             logger.warning(f"Current version {current_version_id} not found for agent {agent_id}")
             return None
         
+        await self._hydrate_rows(result.data)
         version = self._version_from_db_row(result.data[0])
         logger.debug(f"Retrieved active version for agent {agent_id}: model='{version.model}', version_name='{version.version_name}'")
         return version
@@ -348,9 +469,30 @@ class VersionService:
             'agent_id', agent_id
         ).order('version_number', desc=True).execute()
         
+        await self._hydrate_rows(result.data)
         versions = [self._version_from_db_row(row) for row in result.data]
         return versions
     
+    async def get_version_summaries(self, agent_id: str, user_id: str) -> List[Dict[str, Any]]:
+        """List an agent's versions without their configs, newest first."""
+        is_owner, is_public = await self._verify_and_authorize_agent_access(agent_id, user_id)
+        if not is_owner and not is_public:
+            raise UnauthorizedError("You don't have permission to view versions")
+        
+        client = await self._get_client()
+        
+        result = await client.table('agent_versions').select(VERSION_SUMMARY_COLUMNS).eq(
+            'agent_id', agent_id
+        ).order('version_number', desc=True).execute()
+        
+        return [
+            {
+                **row,
+                'status': VersionStatus.ACTIVE.value if row.get('is_active') else VersionStatus.INACTIVE.value
+            }
+            for row in result.data or []
+        ]
+    
     async def activate_version(self, agent_id: str, version_id: str, user_id: str) -> None:
         is_owner, _ = await self._verify_and_authorize_agent_access(agent_id, user_id)
         if not is_owner:
@@ -367,6 +509,12 @@ class VersionService:
         
         version = version_result.data[0]
         
+        current_result = await client.table('agents').select('current_version_id').eq('agent_id', agent_id).execute()
+        previous_version_id = current_result.data[0].get('current_version_id') if current_result.data else None
+        
+        # The current version is read directly by other services, so it needs its full config back
+        await self._restore_full_config(version)
+        
         await client.table('agent_versions').update({
             'is_active': False,
             'updated_at': datetime.now(timezone.utc).isoformat()
@@ -380,6 +528,16 @@ class VersionService:
         version_count = await self._count_versions(agent_id)
         await self._update_agent_current_version(agent_id, version_id, version_count)
         
+        # A compaction that started before the pointer moved may have finished since; undo it
+        refreshed = await client.table('agent_versions').select('version_id, config, config_refs').eq(
+            'version_id', version_id
+        ).execute()
+        if refreshed.data:
+            await self._restore_full_config(refreshed.data[0])
+        
+        if previous_version_id and previous_version_id != version_id:
+            await self._compact_version(agent_id, previous_version_id)
+        
         # Invalidate agent config cache (active version changed)
         try:
             from core.runtime_cache import invalidate_agent_config_cache
@@ -397,10 +555,36 @@ class VersionService:
         version2_id: str,
         user_id: str
     ) -> Dict[str, Any]:
-        version1 = await self.get_version(agent_id, version1_id, user_id)
-        version2 = await self.get_version(agent_id, version2_id, user_id)
+        is_owner, is_public = await self._verify_and_authorize_agent_access(agent_id, user_id)
+        if not is_owner and not is_public:
+            raise UnauthorizedError("You don't have permission to view this version")
         
-        differences = self._calculate_differences(version1, version2)
+        client = await self._get_client()
+        result = await client.table('agent_versions').select('*').in_(
+            'version_id', list({version1_id, version2_id})
+        ).eq('agent_id', agent_id).execute()
+        
+        rows = {row['version_id']: row for row in result.data or []}
+        for version_id in (version1_id, version2_id):
+            if version_id not in rows:
+                raise VersionNotFoundError(f"Version {version_id} not found")
+        
+        row1, row2 = rows[version1_id], rows[version2_id]
+        # Compacted rows already carry their section hashes; full ones are hashed here
+        fingerprints = tuple(
+            config_fingerprint(row['config_refs'] if self._is_compacted(row) else config_refs(row.get('config') or {}))
+            for row in (row1, row2)
+        )
+        
+        await self._hydrate_rows([row1, row2])
+        version1 = self._version_from_db_row(row1)
+        version2 = self._version_from_db_row(row2)
+        
+        cache_key = (version1_id, version2_id) + fingerprints
+        differences = self._diff_cache.get(cache_key)
+        if differences is None:
+            differences = self._calculate_differences(version1, version2)
+            self._diff_cache.put(cache_key, differences)
         
         return {
             'version1': version1.to_dict(),
@@ -517,6 +701,10 @@ class VersionService:
         if not result.data:
             raise Exception("Failed to update version")
         
+        from core.runtime_cache import invalidate_agent_config_cache
+        await invalidate_agent_config_cache(agent_id)
+        
+        await self._hydrate_rows(result.data)
         return self._version_from_db_row(result.data[0])
 
 
@@ -8,17 +8,22 @@ import traceback
 from datetime import datetime, timezone
 from typing import Optional, Dict, Any, Tuple
 from core.services import redis_worker as redis
-from core.run import run_agent
 from core.utils.logger import logger, structlog
-from core.utils.tool_discovery import warm_up_tools_cache
+from core.utils.lazy_import import lazy_import
 import dramatiq
 import uuid
 from core.services.supabase import DBConnection
+from core.services import run_scheduler
+from core.services.run_control import run_control
 from dramatiq.brokers.redis import RedisBroker
-from core.services.langfuse import langfuse
 from core.utils.retry import retry
 import time
 
+# The API process imports this module to enqueue runs; defer the agent runtime
+# and tracing client so they only load in the worker
+agent_runtime = lazy_import("core.run")
+langfuse_service = lazy_import("core.services.langfuse")
+
 from core.services.redis import get_redis_config as _get_redis_config
 
 redis_config = _get_redis_config()
@@ -35,10 +40,40 @@ else:
     logger.info(f"🔧 Configuring Dramatiq broker with Redis at {redis_host}:{redis_port}")
     redis_broker = RedisBroker(host=redis_host, port=redis_port, middleware=[dramatiq.middleware.AsyncIO()])
 
-dramatiq.set_broker(redis_broker)
 
-warm_up_tools_cache()
-logger.info("✅ Worker process ready, tool cache warmed")
+class WarmUpToolsCache(dramatiq.Middleware):
+    """Warm the tool schema cache in worker processes only, not when the API imports this module."""
+
+    def after_worker_boot(self, broker, worker):
+        from core.utils.tool_discovery import warm_up_tools_cache
+        warm_up_tools_cache()
+        logger.info("✅ Worker process ready, tool cache warmed")
+
+
+class FlushNotifications(dramatiq.Middleware):
+    """
+    Send queued Novu triggers before the worker's event loop stops.
+
+    Runs after the worker threads have drained, so notifications queued by runs
+    that finish during graceful shutdown are included. after_* hooks run in
+    reverse middleware order, so this fires before AsyncIO (added with the
+    broker) stops the event loop.
+    """
+
+    def after_worker_shutdown(self, broker, worker):
+        try:
+            from dramatiq.asyncio import get_event_loop_thread
+            from core.notifications.novu_service import novu_service
+            event_loop_thread = get_event_loop_thread()
+            if event_loop_thread is not None:
+                event_loop_thread.run_coroutine(novu_service.dispatcher.flush())
+        except Exception as e:
+            logger.warning(f"Failed to flush queued notifications on shutdown: {e}")
+
+
+redis_broker.add_middleware(WarmUpToolsCache())
+redis_broker.add_middleware(FlushNotifications())
+dramatiq.set_broker(redis_broker)
 
 _initialized = False
 db = DBConnection()
@@ -91,8 +126,7 @@ async def initialize():
     await retry(lambda: redis.initialize_async())
     await db.initialize()
     
-    from core.utils.tool_discovery import warm_up_tools_cache
-    warm_up_tools_cache()
+    # Tool schemas are warmed once per worker process at boot by WarmUpToolsCache
     
     try:
         from core.runtime_cache import warm_up_suna_config_cache
@@ -432,31 +466,101 @@ async def publish_final_control_signal(final_status: str, global_control_channel
         logger.warning(f"Failed to publish final control signal {control_signal}: {str(e)}")
 
 
-async def cleanup_pubsub(pubsub, agent_run_id: str):
-    if not pubsub:
+from core import thread_init_service
+from core.sandbox import teardown as sandbox_teardown
+
+@dramatiq.actor
+async def run_agent_background(
+    agent_run_id: str,
+    thread_id: str,
+    instance_id: str,
+    project_id: str,
+    model_name: str = "openai/gpt-5-mini",
+    agent_id: Optional[str] = None,
+    account_id: Optional[str] = None,
+    request_id: Optional[str] = None
+):
+    await _execute_agent_run(
+        agent_run_id=agent_run_id,
+        thread_id=thread_id,
+        instance_id=instance_id,
+        project_id=project_id,
+        model_name=model_name,
+        agent_id=agent_id,
+        account_id=account_id,
+        request_id=request_id,
+    )
+
+
+async def schedule_agent_run(**run_kwargs):
+    """
+    Queue a run through the fair scheduler instead of sending it to Dramatiq directly.
+
+    Takes the same keyword arguments as run_agent_background.
+    """
+    account_id = run_kwargs.get('account_id') or "anonymous"
+    lane, weight, cap = await run_scheduler.resolve_account_lane(run_kwargs.get('account_id'))
+    queued = await run_scheduler.enqueue_run(lane, account_id, run_kwargs, weight, cap)
+    message = dispatch_actors[lane].send()
+    logger.info(f"🚦 Scheduled agent run {run_kwargs['agent_run_id']} in {lane} lane ({queued} queued for account)")
+    return message
+
+
+async def _dispatch_agent_run(lane: str):
+    structlog.contextvars.clear_contextvars()
+    try:
+        await initialize()
+    except Exception as e:
+        logger.critical(f"Failed to initialize worker resources (Redis/DB): {e}")
+        raise e
+
+    client = await redis.get_client()
+    status, run = await run_scheduler.claim_next_run(lane, client)
+    if status == run_scheduler.ALL_CAPPED:
+        # Every account with queued runs is at its in-flight cap; try again shortly
+        dispatch_actors[lane].send_with_options(delay=run_scheduler.CAPPED_RETRY_DELAY_MS)
         return
-    
-    pubsub_cleaned = False
+    if status != run_scheduler.CLAIMED:
+        return
+
+    enqueued_at = run.pop("enqueued_at", None)
+    if enqueued_at:
+        wait_seconds = time.time() - enqueued_at
+        logger.info(f"⏱️ [TIMING] Run {run['agent_run_id']} waited {wait_seconds * 1000:.0f}ms in {lane} lane")
+        try:
+            await run_scheduler.record_queue_wait(lane, wait_seconds, client)
+        except Exception as e:
+            logger.warning(f"Failed to record queue wait for {run['agent_run_id']}: {e}")
+
     try:
-        await pubsub.unsubscribe()
-        await pubsub.close()
-        pubsub_cleaned = True
-        logger.debug(f"Closed pubsub connection for {agent_run_id}")
-    except asyncio.CancelledError:
-        if not pubsub_cleaned:
-            try:
-                await pubsub.unsubscribe()
-                await pubsub.close()
-                logger.debug(f"Closed pubsub connection after cancellation for {agent_run_id}")
-            except Exception:
-                pass
+        await _execute_agent_run(**run)
     except Exception as e:
-        logger.warning(f"Error closing pubsub for {agent_run_id}: {str(e)}")
+        # A failed run must not retry the token, which would claim someone else's run
+        logger.error(f"Scheduled agent run {run['agent_run_id']} failed: {e}")
+    finally:
+        try:
+            await run_scheduler.release_run(run.get('account_id') or "anonymous", run['agent_run_id'], client)
+        except Exception as e:
+            logger.warning(f"Failed to release in-flight slot for {run['agent_run_id']}: {e}")
 
-from core import thread_init_service
 
-@dramatiq.actor
-async def run_agent_background(
+def _make_dispatch_actor(lane: str):
+    async def dispatch():
+        await _dispatch_agent_run(lane)
+
+    return dramatiq.actor(
+        dispatch,
+        actor_name=f"dispatch_agent_run_{lane}",
+        queue_name=run_scheduler.dramatiq_queue_name(lane),
+        priority=run_scheduler.LANE_ACTOR_PRIORITY[lane],
+        max_retries=0,
+    )
+
+
+dispatch_actors = {lane: _make_dispatch_actor(lane) for lane in run_scheduler.LANES}
+
+
+async def _execute_agent_run(
     agent_run_id: str,
     thread_id: str,
     instance_id: str,
@@ -504,21 +608,17 @@ async def run_agent_background(
         logger.info(f"🚀 Using model: {effective_model}")
         
         start_time = datetime.now(timezone.utc)
-        pubsub = None
-        stop_checker = None
         pending_redis_operations = []
         cancellation_event = asyncio.Event()
 
         redis_keys = create_redis_keys(agent_run_id, instance_id)
-        trace = langfuse.trace(
+        trace = langfuse_service.langfuse.trace(
             name="agent_run",
             id=agent_run_id,
             session_id=thread_id,
             metadata={"project_id": project_id, "instance_id": instance_id}
         )
 
-        pubsub_available = True
-        
     except Exception as e:
         logger.error(f"Critical error during worker setup for {agent_run_id}: {e}", exc_info=True)
         try:
@@ -529,72 +629,21 @@ async def run_agent_background(
             logger.error(f"Failed to update status after setup error: {inner_e}")
         return
     try:
-        try:
-            pubsub = await asyncio.wait_for(redis.create_pubsub(), timeout=5.0)
-            await asyncio.wait_for(
-                pubsub.subscribe(
-                    redis_keys['instance_control_channel'],
-                    redis_keys['global_control_channel']
-                ),
-                timeout=5.0
-            )
-            logger.info(f"Subscribed to control channels: {redis_keys['instance_control_channel']}, {redis_keys['global_control_channel']}")
-        except asyncio.TimeoutError:
-            logger.warning(f"Redis pubsub subscription timeout for {agent_run_id} - stop signals will not work but agent will continue")
-            pubsub = None
-            pubsub_available = False
-        except Exception as e:
-            logger.warning(f"Redis pubsub subscription failed for {agent_run_id}: {e} - stop signals will not work but agent will continue")
-            pubsub = None
-            pubsub_available = False
-        
         stop_signal_checker_state = {'stop_signal_received': False, 'total_responses': 0, 'stop_reason': None}
         
-        async def check_for_stop_signal_wrapper():
-            if not pubsub_available or pubsub is None:
-                logger.info(f"Stop signal checker disabled for {agent_run_id} - pubsub not available")
-                return
-            
-            while not stop_signal_checker_state.get('stop_signal_received'):
-                try:
-                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=0.5)
-                    if message and message.get("type") == "message":
-                        data = message.get("data")
-                        channel = message.get("channel")
-                        if isinstance(data, bytes):
-                            data = data.decode('utf-8')
-                        if isinstance(channel, bytes):
-                            channel = channel.decode('utf-8')
-                        if data == "STOP":
-                            if "control:" in channel and instance_id in channel:
-                                stop_reason = "instance_control_channel"
-                            else:
-                                stop_reason = "global_control_channel"
-                            logger.warning(f"🛑 Received STOP signal for agent run {agent_run_id} via {stop_reason} (Instance: {instance_id}, Channel: {channel})")
-                            stop_signal_checker_state['stop_signal_received'] = True
-                            stop_signal_checker_state['stop_reason'] = stop_reason
-                            cancellation_event.set()
-                            break
-                    
-                    if stop_signal_checker_state.get('total_responses', 0) % 50 == 0:
-                        try:
-                            await asyncio.wait_for(
-                                redis.expire(redis_keys['instance_active'], redis.REDIS_KEY_TTL),
-                                timeout=3.0
-                            )
-                        except asyncio.TimeoutError:
-                            logger.debug(f"TTL refresh timeout for {redis_keys['instance_active']} - continuing")
-                        except Exception as ttl_err:
-                            logger.warning(f"Failed to refresh TTL for {redis_keys['instance_active']}: {ttl_err}")
-                    await asyncio.sleep(0.1)
-                except asyncio.CancelledError:
-                    logger.debug(f"Stop signal checker wrapper cancelled for {agent_run_id}")
-                    break
-                except Exception as e:
-                    logger.error(f"Error in stop signal checker wrapper for {agent_run_id}: {e}", exc_info=True)
-                    await asyncio.sleep(1)
+        def on_stop_signal(stop_reason: str):
+            stop_signal_checker_state['stop_signal_received'] = True
+            stop_signal_checker_state['stop_reason'] = stop_reason
         
-        stop_checker = asyncio.create_task(check_for_stop_signal_wrapper())
+        # STOP signals arrive through the worker's shared control listener, which also
+        # refreshes instance_active for every local run in one pipelined heartbeat
+        await run_control.register(
+            agent_run_id,
+            instance_id,
+            redis_keys['instance_active'],
+            cancellation_event,
+            on_stop=on_stop_signal,
+        )
         try:
             await asyncio.wait_for(
                 redis.set(redis_keys['instance_active'], "running", ex=redis.REDIS_KEY_TTL),
@@ -607,7 +656,7 @@ async def run_agent_background(
 
         agent_config = await load_agent_config(agent_id, account_id)
 
-        agent_gen = run_agent(
+        agent_gen = agent_runtime.run_agent(
             thread_id=thread_id,
             project_id=project_id,
             model_name=effective_model,
@@ -686,16 +735,7 @@ async def run_agent_background(
             logger.warning(f"Failed to publish ERROR signal: {str(e)}")
 
     finally:
-        if stop_checker and not stop_checker.done():
-            stop_checker.cancel()
-            try:
-                await stop_checker
-            except asyncio.CancelledError:
-                pass
-            except Exception as e:
-                logger.warning(f"Error during stop_checker cancellation: {e}")
-
-        await cleanup_pubsub(pubsub, agent_run_id)
+        run_control.unregister(agent_run_id)
         await _cleanup_redis_response_stream(agent_run_id)
         await _cleanup_redis_instance_key(agent_run_id, instance_id)
         await _cleanup_redis_run_lock(agent_run_id)
@@ -0,0 +1,133 @@
+BEGIN;
+
+-- Content-addressed store for images loaded into context (image_context messages).
+-- One storage object per distinct image, keyed by the SHA-256 of the stored bytes,
+-- with a reference count maintained from image_context messages.
+CREATE TABLE IF NOT EXISTS image_blobs (
+    content_hash TEXT PRIMARY KEY,
+    storage_path TEXT NOT NULL,
+    mime_type TEXT NOT NULL,
+    size_bytes INTEGER NOT NULL,
+    ref_count INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    last_unreferenced_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_image_blobs_unreferenced
+    ON image_blobs(last_unreferenced_at)
+    WHERE ref_count = 0;
+
+ALTER TABLE image_blobs ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Service role manages image blobs" ON image_blobs;
+CREATE POLICY "Service role manages image blobs" ON image_blobs
+    FOR ALL
+    USING ((SELECT auth.role()) = 'service_role');
+
+-- Cached per-thread counter so the vision tool does not count rows on every load
+ALTER TABLE threads ADD COLUMN IF NOT EXISTS image_context_count INTEGER DEFAULT 0;
+
+UPDATE threads t SET image_context_count = COALESCE((
+    SELECT COUNT(*) FROM messages m
+    WHERE m.thread_id = t.thread_id AND m.type = 'image_context'
+), 0);
+
+CREATE OR REPLACE FUNCTION update_image_context_refs()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_row messages%ROWTYPE;
+    v_delta INTEGER;
+    v_hash TEXT;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        v_row := NEW;
+        v_delta := 1;
+    ELSE
+        v_row := OLD;
+        v_delta := -1;
+    END IF;
+
+    IF v_row.type <> 'image_context' THEN
+        RETURN NULL;
+    END IF;
+
+    UPDATE threads
+    SET image_context_count = GREATEST(COALESCE(image_context_count, 0) + v_delta, 0)
+    WHERE thread_id = v_row.thread_id;
+
+    v_hash := v_row.metadata->>'content_hash';
+    IF v_hash IS NOT NULL THEN
+        UPDATE image_blobs
+        SET ref_count = GREATEST(ref_count + v_delta, 0),
+            last_unreferenced_at = CASE WHEN ref_count + v_delta <= 0 THEN NOW() ELSE NULL END
+        WHERE content_hash = v_hash;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_update_image_context_refs ON messages;
+CREATE TRIGGER trigger_update_image_context_refs
+AFTER INSERT OR DELETE ON messages
+FOR EACH ROW EXECUTE FUNCTION update_image_context_refs();
+
+-- Remove blobs that have had no references for the grace period and return their
+-- storage paths so the caller can delete the objects
+CREATE OR REPLACE FUNCTION claim_unreferenced_image_blobs(
+    p_grace_seconds INTEGER DEFAULT 86400,
+    p_limit INTEGER DEFAULT 500
+)
+RETURNS TABLE(content_hash TEXT, storage_path TEXT)
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    RETURN QUERY
+    DELETE FROM image_blobs b
+    WHERE b.content_hash IN (
+        SELECT c.content_hash
+        FROM image_blobs c
+        WHERE c.ref_count = 0
+          AND c.last_unreferenced_at < NOW() - make_interval(secs => p_grace_seconds)
+        ORDER BY c.last_unreferenced_at
+        LIMIT p_limit
+        FOR UPDATE SKIP LOCKED
+    )
+    AND b.ref_count = 0
+    RETURNING b.content_hash, b.storage_path;
+END;
+$$;
+
+REVOKE ALL ON FUNCTION claim_unreferenced_image_blobs(INTEGER, INTEGER) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION claim_unreferenced_image_blobs(INTEGER, INTEGER) TO service_role;
+
+COMMIT;
+
+-- Daily garbage collection of unreferenced image blobs via the backend, which
+-- deletes the storage objects. Runs every day at 3:00 AM UTC.
+DO $do$
+DECLARE
+    v_job_id BIGINT;
+BEGIN
+    PERFORM cron.unschedule(j.jobid)
+    FROM cron.job j
+    WHERE j.jobname = 'gc-unreferenced-image-blobs';
+
+    v_job_id := cron.schedule(
+        'gc-unreferenced-image-blobs',
+        '0 3 * * *',
+        $$SELECT net.http_post(
+            url := 'https://app.prophet.build/v1/internal/gc-image-blobs',
+            headers := json_build_object(
+                'Content-Type', 'application/json',
+                'X-Admin-Api-Key', 'ACTUAL_KEY_GOES_HERE_JUST_RUN_IN_SQL_EDITOR_WITH_ACTUAL_KEY'
+            )::jsonb,
+            body := '{}'::jsonb,
+            timeout_milliseconds := 60000
+        );$$
+    );
+
+    RAISE NOTICE 'Scheduled image blob GC cron job with ID: %', v_job_id;
+END $do$;
@@ -0,0 +1,7 @@
+-- Keyset pagination for GET /threads/{thread_id}/messages orders by (created_at, message_id)
+-- within a thread; the ETag probe reads the latest updated_at per thread.
+CREATE INDEX IF NOT EXISTS idx_messages_thread_created_message
+    ON messages(thread_id, created_at, message_id);
+
+CREATE INDEX IF NOT EXISTS idx_messages_thread_updated_at
+    ON messages(thread_id, updated_at DESC);
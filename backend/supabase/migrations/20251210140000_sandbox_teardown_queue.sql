@@ -0,0 +1,179 @@
+BEGIN;
+
+-- Sandboxes waiting to be deleted after their account is deleted. Rows are
+-- recorded before account data is removed and outlive the account (no FK), so
+-- the background teardown can resume after a crash and skip finished deletions.
+CREATE TABLE IF NOT EXISTS sandbox_teardown_queue (
+    sandbox_id TEXT PRIMARY KEY,
+    account_id UUID NOT NULL,
+    project_id UUID,
+    status TEXT NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'deleted', 'failed')),
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_sandbox_teardown_queue_account_status
+    ON sandbox_teardown_queue(account_id, status);
+
+CREATE INDEX IF NOT EXISTS idx_sandbox_teardown_queue_pending
+    ON sandbox_teardown_queue(created_at)
+    WHERE status = 'pending';
+
+ALTER TABLE sandbox_teardown_queue ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Service role manages sandbox teardown queue" ON sandbox_teardown_queue;
+CREATE POLICY "Service role manages sandbox teardown queue" ON sandbox_teardown_queue
+    FOR ALL
+    USING ((SELECT auth.role()) = 'service_role');
+
+-- Record every sandbox of an account's projects for teardown; returns the number of new rows
+CREATE OR REPLACE FUNCTION enqueue_account_sandbox_teardown(p_account_id UUID)
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_count INTEGER := 0;
+BEGIN
+    INSERT INTO sandbox_teardown_queue (sandbox_id, account_id, project_id)
+    SELECT p.sandbox->>'id', p.account_id, p.project_id
+    FROM projects p
+    WHERE p.account_id = p_account_id
+      AND COALESCE(p.sandbox->>'id', '') <> ''
+    ON CONFLICT (sandbox_id) DO NOTHING;
+
+    GET DIAGNOSTICS v_count = ROW_COUNT;
+    RETURN v_count;
+END;
+$$;
+
+REVOKE ALL ON FUNCTION enqueue_account_sandbox_teardown(UUID) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION enqueue_account_sandbox_teardown(UUID) TO service_role;
+
+-- Same as before, but sandboxes are recorded in the teardown queue inside the
+-- transaction. net.http_post only fires after commit, when the projects (and
+-- their sandbox ids) are already gone.
+CREATE OR REPLACE FUNCTION process_scheduled_account_deletions()
+RETURNS TABLE(
+    processed_count INTEGER,
+    deleted_accounts INTEGER,
+    errors INTEGER
+)
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_deletion_request RECORD;
+    v_account_id UUID;
+    v_user_id UUID;
+    v_processed INTEGER := 0;
+    v_deleted INTEGER := 0;
+    v_errors INTEGER := 0;
+BEGIN
+    RAISE NOTICE 'Starting daily account deletion check at %', NOW();
+
+    -- Find all deletion requests that are due and not cancelled/deleted
+    FOR v_deletion_request IN
+        SELECT id, account_id, user_id
+        FROM account_deletion_requests
+        WHERE deletion_scheduled_for <= NOW()
+          AND is_cancelled = FALSE
+          AND is_deleted = FALSE
+        ORDER BY deletion_scheduled_for ASC
+    LOOP
+        v_processed := v_processed + 1;
+        v_account_id := v_deletion_request.account_id;
+        v_user_id := v_deletion_request.user_id;
+
+        RAISE NOTICE 'Processing deletion request: %, account: %, user: %',
+            v_deletion_request.id, v_account_id, v_user_id;
+
+        BEGIN
+            -- Record sandboxes for teardown and ask the backend to start deleting them
+            BEGIN
+                PERFORM enqueue_account_sandbox_teardown(v_account_id);
+                PERFORM net.http_post(
+                    url := 'https://app.prophet.build/v1/internal/delete-account-sandboxes',
+                    headers := json_build_object(
+                        'Content-Type', 'application/json',
+                        'X-Admin-Api-Key', 'ACTUAL_KEY_GOES_HERE_JUST_RUN_IN_SQL_EDITOR_WITH_ACTUAL_KEY'
+                    )::jsonb,
+                    body := json_build_object('account_id', v_account_id)::text::jsonb,
+                    timeout_milliseconds := 30000
+                );
+                RAISE NOTICE 'Requested sandbox deletion for account: %', v_account_id;
+            EXCEPTION WHEN OTHERS THEN
+                RAISE WARNING 'Failed to delete sandboxes via HTTP for account %: %', v_account_id, SQLERRM;
+                -- Continue with deletion even if sandbox deletion fails
+            END;
+
+            -- Delete account data
+            IF delete_user_data(v_account_id, v_user_id) THEN
+                -- Mark deletion request as completed
+                UPDATE account_deletion_requests
+                SET is_deleted = TRUE,
+                    deleted_at = NOW(),
+                    updated_at = NOW()
+                WHERE id = v_deletion_request.id;
+
+                -- Delete auth user
+                BEGIN
+                    DELETE FROM auth.users WHERE id = v_user_id;
+                    RAISE NOTICE 'Deleted auth user: %', v_user_id;
+                EXCEPTION WHEN OTHERS THEN
+                    RAISE WARNING 'Error deleting auth user %: %', v_user_id, SQLERRM;
+                END;
+
+                v_deleted := v_deleted + 1;
+                RAISE NOTICE 'Successfully processed deletion for account: %', v_account_id;
+            ELSE
+                RAISE WARNING 'Failed to delete data for account: %', v_account_id;
+                v_errors := v_errors + 1;
+            END IF;
+        EXCEPTION WHEN OTHERS THEN
+            RAISE WARNING 'Error processing deletion request %: %', v_deletion_request.id, SQLERRM;
+            v_errors := v_errors + 1;
+        END;
+    END LOOP;
+
+    RAISE NOTICE 'Daily deletion check completed. Processed: %, Deleted: %, Errors: %',
+        v_processed, v_deleted, v_errors;
+
+    RETURN QUERY SELECT v_processed, v_deleted, v_errors;
+END;
+$$;
+
+GRANT EXECUTE ON FUNCTION process_scheduled_account_deletions() TO service_role;
+
+COMMIT;
+
+-- Hourly pass that re-dispatches teardowns with pending sandboxes, in case a
+-- worker died before finishing one
+DO $do$
+DECLARE
+    v_job_id BIGINT;
+BEGIN
+    PERFORM cron.unschedule(j.jobid)
+    FROM cron.job j
+    WHERE j.jobname = 'resume-sandbox-teardowns';
+
+    v_job_id := cron.schedule(
+        'resume-sandbox-teardowns',
+        '30 * * * *',
+        $$SELECT net.http_post(
+            url := 'https://app.prophet.build/v1/internal/resume-sandbox-teardowns',
+            headers := json_build_object(
+                'Content-Type', 'application/json',
+                'X-Admin-Api-Key', 'ACTUAL_KEY_GOES_HERE_JUST_RUN_IN_SQL_EDITOR_WITH_ACTUAL_KEY'
+            )::jsonb,
+            body := '{}'::jsonb,
+            timeout_milliseconds := 30000
+        );$$
+    );
+
+    RAISE NOTICE 'Scheduled sandbox teardown resume cron job with ID: %', v_job_id;
+END $do$;
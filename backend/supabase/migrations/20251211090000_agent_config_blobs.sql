@@ -0,0 +1,30 @@
+BEGIN;
+
+-- Content-addressed sections of agent version configs (system prompt, each tool
+-- group, triggers, ...), keyed by the SHA-256 of the section's canonical JSON.
+-- Superseded versions keep only a map of section -> hash in config_refs, so a
+-- section that did not change between saves is stored once.
+CREATE TABLE IF NOT EXISTS agent_config_blobs (
+    blob_hash TEXT PRIMARY KEY,
+    content JSONB NOT NULL,
+    size_bytes INTEGER NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+ALTER TABLE agent_config_blobs ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Service role manages agent config blobs" ON agent_config_blobs;
+CREATE POLICY "Service role manages agent config blobs" ON agent_config_blobs
+    FOR ALL
+    USING ((SELECT auth.role()) = 'service_role');
+
+-- Section hashes of a compacted version. The agent's current version always
+-- keeps its full config, which the rest of the backend reads directly.
+ALTER TABLE agent_versions ADD COLUMN IF NOT EXISTS config_refs JSONB;
+
+COMMENT ON COLUMN agent_versions.config_refs IS 'Section -> agent_config_blobs.blob_hash for versions whose config was compacted';
+
+CREATE INDEX IF NOT EXISTS idx_agent_versions_agent_number
+    ON agent_versions(agent_id, version_number DESC);
+
+COMMIT;
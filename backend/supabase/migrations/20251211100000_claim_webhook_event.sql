@@ -0,0 +1,51 @@
+BEGIN;
+
+-- Claim a webhook event for processing in one statement. A new event is
+-- inserted as 'processing'; an existing one is taken over only if it failed,
+-- never started, stalled past p_stale_after_seconds, or is completed and a
+-- reprocess was forced. Concurrent deliveries of the same event serialize on
+-- the event_id unique index, so exactly one of them gets claimed = true.
+CREATE OR REPLACE FUNCTION claim_webhook_event(
+    p_event_id TEXT,
+    p_event_type TEXT,
+    p_payload JSONB DEFAULT NULL,
+    p_force_reprocess BOOLEAN DEFAULT FALSE,
+    p_stale_after_seconds INTEGER DEFAULT 300
+)
+RETURNS TABLE(claimed BOOLEAN, reason TEXT)
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_inserted BOOLEAN;
+    v_status TEXT;
+BEGIN
+    INSERT INTO webhook_events AS we (event_id, event_type, status, processing_started_at, payload)
+    VALUES (p_event_id, p_event_type, 'processing', NOW(), p_payload)
+    ON CONFLICT (event_id) DO UPDATE
+        SET status = 'processing',
+            processing_started_at = NOW(),
+            retry_count = COALESCE(we.retry_count, 0) + 1,
+            error_message = NULL
+        WHERE we.status IN ('pending', 'failed')
+           OR (we.status = 'processing'
+               AND (we.processing_started_at IS NULL
+                    OR we.processing_started_at < NOW() - make_interval(secs => p_stale_after_seconds)))
+           OR (we.status = 'completed' AND p_force_reprocess)
+    RETURNING (we.xmax = 0) INTO v_inserted;
+
+    IF FOUND THEN
+        RETURN QUERY SELECT TRUE, CASE WHEN v_inserted THEN NULL ELSE 'reclaimed' END;
+        RETURN;
+    END IF;
+
+    SELECT we.status INTO v_status FROM webhook_events we WHERE we.event_id = p_event_id;
+    RETURN QUERY SELECT FALSE, CASE WHEN v_status = 'completed' THEN 'already_completed' ELSE 'in_progress' END;
+END;
+$$;
+
+REVOKE ALL ON FUNCTION claim_webhook_event(TEXT, TEXT, JSONB, BOOLEAN, INTEGER) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION claim_webhook_event(TEXT, TEXT, JSONB, BOOLEAN, INTEGER) TO service_role;
+
+COMMIT;
@@ -0,0 +1,43 @@
+BEGIN;
+
+-- Compact a superseded agent version in one statement, and only while it is
+-- still not the agent's current version. The agents row is locked first, so an
+-- activation that points the agent at this version either commits before us
+-- (and the version is left alone) or waits for us and finds the compacted row,
+-- which it then restores.
+CREATE OR REPLACE FUNCTION compact_agent_version(
+    p_agent_id UUID,
+    p_version_id UUID,
+    p_config_refs JSONB
+)
+RETURNS BOOLEAN
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_current_version_id UUID;
+BEGIN
+    SELECT current_version_id INTO v_current_version_id
+    FROM agents
+    WHERE agent_id = p_agent_id
+    FOR UPDATE;
+
+    IF NOT FOUND OR v_current_version_id IS NOT DISTINCT FROM p_version_id THEN
+        RETURN FALSE;
+    END IF;
+
+    UPDATE agent_versions
+    SET config = '{}'::jsonb,
+        config_refs = p_config_refs
+    WHERE version_id = p_version_id
+      AND agent_id = p_agent_id;
+
+    RETURN FOUND;
+END;
+$$;
+
+REVOKE ALL ON FUNCTION compact_agent_version(UUID, UUID, JSONB) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION compact_agent_version(UUID, UUID, JSONB) TO service_role;
+
+COMMIT;